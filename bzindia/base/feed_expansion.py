@@ -0,0 +1,94 @@
+import time
+
+from django.conf import settings
+
+from location_api.multipage_cache import STATES_TAG, TaggedCache, collection_tag, multipage_model
+from locations.models import UniquePlace
+from locations.spatial_index import nearby_place_ids
+from utility.location import NEARBY_RADIUS_KM
+from utility.placeholders import DISTRICT, PLACE, STATE, render, template_store
+
+# Multipages per kind expanded over the nearby places, and items per kind in the expanded feed.
+PAGES_PER_KIND = 12
+ITEM_LIMIT = getattr(settings, "GEO_FEED_ITEM_LIMIT", 60)
+
+CACHE_KEY = "geo_feed:{}:{}"
+CACHE_TIMEOUT = getattr(settings, "GEO_FEED_CACHE_TIMEOUT", 60 * 15)
+
+TEXT_FIELDS = ("title", "meta_title", "description", "meta_description")
+
+geo_feed_cache = TaggedCache("geo_feed", CACHE_TIMEOUT)
+
+
+def recent_pages(kind, state_id):
+    """(row, compiled fields) of the newest multipages of ``kind`` available in the state."""
+    pages = list(multipage_model(kind).objects.filter(available_states=state_id).order_by("-updated", "-created").values(
+        "pk", *TEXT_FIELDS, "slug", "url_type", "created", "updated", "company__slug"
+    )[:PAGES_PER_KIND])
+
+    return list(zip(pages, template_store.get_many(kind, pages)))
+
+
+def nearby_places(lat, lon):
+    """(placeholder values, slug, state slug) of the places around the point, nearest first, one place per name."""
+    place_ids = nearby_place_ids(lat, lon, NEARBY_RADIUS_KM)
+    rank = {place_id: index for index, place_id in enumerate(place_ids)}
+
+    rows = UniquePlace.objects.filter(pk__in=place_ids).values_list(
+        "pk", "name", "district__name", "state__name", "slug", "state__slug"
+    )
+
+    nearest = {}
+    for pk, name, district_name, state_name, slug, state_slug in sorted(rows, key=lambda row: rank[row[0]]):
+        nearest.setdefault(name, ({PLACE: name, DISTRICT: district_name or "", STATE: state_name or ""}, slug, state_slug))
+
+    return list(nearest.values())
+
+
+def expand(pages, places, limit=ITEM_LIMIT):
+    """Feed items of ``pages`` for each place, nearest places first and newest pages first within one, at most ``limit``."""
+    items = []
+
+    for values, place_slug, state_slug in places:
+        for page, compiled in pages:
+            if len(items) >= limit:
+                return items
+
+            item = {field: render(compiled[field], values) for field in TEXT_FIELDS}
+
+            if page["url_type"] == "slug_filtered":
+                item["slug"] = render(compiled["slug"], {PLACE: place_slug})
+            else:
+                item["slug"] = f"{page['slug']}/{state_slug}/{place_slug}"
+
+            item.update({
+                "company__slug": page["company__slug"],
+                "url_type": page["url_type"],
+                "created": page["created"],
+                "updated": page["updated"],
+            })
+            items.append(item)
+
+    return items
+
+
+def geo_feed_items(kinds, coordinate, limit=ITEM_LIMIT):
+    """{kind: items} of the multipages around the client's location, or None without one.
+
+    Cached per nearest place and set of kinds, and purged with the
+    multipage cache tags whenever a multipage of one of the kinds changes.
+    """
+    if not coordinate or not coordinate.get("latitude") or not coordinate.get("longitude") or not coordinate.get("place_id"):
+        return None
+
+    key = CACHE_KEY.format("-".join(kinds), coordinate["place_id"])
+    tags = [collection_tag(kind) for kind in kinds] + [STATES_TAG]
+
+    items, versions = geo_feed_cache.get(key, tags)
+    if items is None:
+        start = time.perf_counter()
+        places = nearby_places(coordinate["latitude"], coordinate["longitude"])
+        items = {kind: expand(recent_pages(kind, coordinate["state_id"]), places, limit) for kind in kinds}
+        geo_feed_cache.set(key, items, versions, (time.perf_counter() - start) * 1000)
+
+    return items
@@ -1,7 +1,7 @@
-from django.http import HttpResponse
-from django.contrib.syndication.views import Feed
+from django.http import HttpResponse, Http404
+from utility.feed_cache import CachedFeed
 from utility.custom_feed import ContentEncodedFeed
-from utility.location import get_ip_location, get_nearby_locations
+from utility.location import get_ip_location
 from home.models import HomeContent
 from django.shortcuts import get_object_or_404
 
@@ -17,108 +17,69 @@ from company.models import Testimonial
 from django.utils.text import Truncator
 from django.utils.html import strip_tags
 
-from locations.trie_cache import get_place_trie, get_district_trie, get_state_trie
+from locations.resolver import resolve_location_slug
 
 from company.models import Company
+from company.registry import by_kind, company_type, for_company, for_page, resolve
 
-class DetailFeed(Feed):
+from base import url_catalog
+from base.sitemap_writer import multipage_models
+from base.feed_expansion import geo_feed_items
+
+class DetailFeed(CachedFeed):
     feed_type = ContentEncodedFeed
 
     def get_object(self, request, type_slug, company_slug, slug):
         company = get_object_or_404(Company, slug=company_slug)
+        detail_type = for_company(company)
 
-        item = None
-
-        if (company.type.name == "Service"):
-            item = get_object_or_404(ServiceDetail, slug=slug, company=company)
-        elif (company.type.name == "Education"):
-            item = get_object_or_404(CourseDetail, slug=slug, company=company)
-        elif (company.type.name == "Registration"):
-            item = get_object_or_404(RegistrationDetailPage, slug=slug, company=company)
-        elif (company.type.name == "Product"):
-            item = get_object_or_404(ProductDetailPage, slug=slug, company=company)
+        if detail_type is None:
+            return None
 
-        return item
+        return get_object_or_404(detail_type.details(), slug=slug, company=company)
 
     def title(self, obj):
         return obj.meta_title
 
     def link(self, obj):
-        return f"/{obj.company.type.slug}/{obj.company.slug}/{obj.slug}/feed/"
+        return f"/{company_type(obj.company).slug}/{obj.company.slug}/{obj.slug}/feed/"
 
     def description(self, obj):
         return obj.meta_description
 
     def items(self, obj):
-        if (obj.company.type.name == "Service"):
-            return [obj.service]
-        elif (obj.company.type.name == "Education"):
-            return [obj.course]
-        elif (obj.company.type.name == "Registration"):
-            return [obj.registration_sub_type]
-        elif (obj.company.type.name == "Product"):
-            return [obj.product]
-
         return [obj]
 
-    def item_title(self, item):
-        company_type = item.company.type.name
+    def item_image(self, item):
+        detail_type = for_page(item)
+        return detail_type.image(item) if detail_type else None
 
-        if (company_type == "Service"):
-            return item.service.meta_title or item.service.name
-        elif (company_type == "Education"):
-            return item.course.meta_title or item.course.name
-        elif (company_type == "Registration"):
-            return item.registration_sub_type.meta_title or item.registration_sub_type.name
-        elif (company_type == "Product"):
-            return item.product.meta_title or item.product.name
+    def item_title(self, item):
+        detail_type = for_page(item)
+        if detail_type is None:
+            return ""
 
-        return ""
+        return resolve(detail_type.item(item), "meta_title") or detail_type.title(item) or ""
 
     def item_description(self, item):
         return item.meta_description or item.name
 
     def item_link(self, item):
-        return f"/{item.company.type.slug}/{item.company.slug}/{item.slug}/"
+        return f"/{company_type(item.company).slug}/{item.company.slug}/{item.slug}/"
 
     def item_pubdate(self, item):
         return item.updated or item.created
     
     def item_enclosure_url(self, item):
-        if (item.company.type.name == "Service"):
-            return item.service.image.url if item.service.image else None
-        elif (item.company.type.name == "Education"):
-            return item.course.image.url if item.course.image else None
-        elif (item.company.type.name == "Registration"):
-            return item.registration_sub_type.image.url if item.registration_sub_type.image else None
-        elif (item.company.type.name == "Product"):
-            return item.product.image.url if item.product.image else None
-        
-        return None
+        image = self.item_image(item)
+        return image.url if image else None
 
     def item_enclosure_length(self, item):
-        if (item.company.type.name == "Service"):
-            return item.service.image.size if item.service.image else 0
-        elif (item.company.type.name == "Education"):
-            return item.course.image.size if item.course.image else 0
-        elif (item.company.type.name == "Registration"):
-            return item.registration_sub_type.image.size if item.registration_sub_type.image else 0
-        elif (item.company.type.name == "Product"):
-            return item.product.image.size if item.product.image else 0
-        
-        return 0
+        image = self.item_image(item)
+        return image.size if image else 0
 
     def item_enclosure_mime_type(self, item):
-        if (item.company.type.name == "Service"):
-            return "image/jpeg" if item.service.image else None
-        elif (item.company.type.name == "Education"):
-            return "image/jpeg" if item.course.image else None
-        elif (item.company.type.name == "Registration"):
-            return "image/jpeg" if item.registration_sub_type.image else None
-        elif (item.company.type.name == "Product"):
-            return "image/jpeg" if item.product.image else None
-
-        return  None
+        return "image/jpeg" if self.item_image(item) else None
 
     def item_extra_kwargs(self, item):
         return {
@@ -127,38 +88,25 @@ class DetailFeed(Feed):
 
 # Optional: Serve with XML stylesheet
 class StyledDetailFeed(DetailFeed):
-    def __call__(self, request, *args, **kwargs):
-        feedgen = self.get_feed(self.get_object(request, *args, **kwargs), request)
-        response = HttpResponse(content_type=feedgen.content_type)
-        response.write('<?xml version="1.0" encoding="utf-8"?>\n')
-        response.write('<?xml-stylesheet type="text/xsl" href="/static/rss-stylesheet.xsl"?>\n')
-        feedgen.write(response, 'utf-8')
-        return response
-
-MATCH_ORDER = [
-    ("state", get_state_trie, UniqueState),
-    ("district", get_district_trie, UniqueDistrict),
-    ("place", get_place_trie, UniquePlace),
-]
-
-def retrieve(slug):                 
-    # for model_type, trie, model, serializer_class in MATCH_ORDER:
-    for model_type, get_trie_fn, model in MATCH_ORDER:
-        trie = get_trie_fn()
-        matched_slug = trie.match_suffix(slug)
-        if matched_slug:
-            try:
-                instance = model.objects.get(slug=matched_slug)
-                return model_type, instance
-                
-            except model.DoesNotExist:
-                return None, None
+    stylesheet = True
+
+
+def retrieve(slug):
+    resolution = resolve_location_slug(slug)
+
+    if not resolution:
+        return None, None
+
+    return resolution.match_type, resolution.matched_slug
         
 
-class MultipageFeed(Feed):
+class MultipageFeed(CachedFeed):
     feed_type = ContentEncodedFeed
 
     def get_object(self, request, company_slug, slug, state_slug=None, location_slug=None):
+        if url_catalog.catalog_enabled():
+            return self.get_catalog_object(company_slug, slug, state_slug, location_slug)
+
         company = get_object_or_404(Company, slug=company_slug)        
 
         self.slug = slug
@@ -169,20 +117,36 @@ class MultipageFeed(Feed):
             self.location_slug = location_slug
         
         else:
-            _, location = retrieve(slug)
+            _, location_slug = retrieve(slug)
+
+            if not location_slug:
+                raise Http404("Location not found")
+
             self.region_slug = self.slug
-            self.slug = slug.replace(location.slug, "place_name")
+            self.slug = slug.replace(location_slug, "place_name")
 
-        item = None
+        detail_type = for_company(company)
+        if detail_type is None:
+            return None
 
-        if (company.type.name == "Service"):
-            item = get_object_or_404(ServiceMultiPage, slug=self.slug, company=company)
-        elif (company.type.name == "Education"):
-            item = get_object_or_404(CourseMultiPage, slug=self.slug, company=company)
-        elif (company.type.name == "Registration"):
-            item = get_object_or_404(RegistrationMultiPage, slug=self.slug, company=company)
-        elif (company.type.name == "Product"):
-            item = get_object_or_404(ProductMultiPage, slug=self.slug, company=company)
+        return get_object_or_404(detail_type.multipages(), slug=self.slug, company=company)
+
+    def get_catalog_object(self, company_slug, slug, state_slug, location_slug):
+        if state_slug and location_slug:
+            path = f"/{company_slug}/{slug}/{state_slug}/{location_slug}/"
+        else:
+            path = f"/{company_slug}/{slug}/"
+
+        row = url_catalog.lookup(path)
+        if row is None:
+            raise Http404("Page not found")
+
+        item = get_object_or_404(multipage_models()[row.multipage_type], pk=row.multipage_id)
+
+        self.slug = item.slug
+        self.region_slug = None if state_slug and location_slug else slug
+        self.state_slug = state_slug
+        self.location_slug = location_slug
 
         return item
 
@@ -201,19 +165,13 @@ class MultipageFeed(Feed):
     def items(self, obj):
         return [obj]
 
-    def item_title(self, item):
-        company_type = item.company.type.name
+    def item_image(self, item):
+        detail_type = for_page(item)
+        return detail_type.image(item) if detail_type else None
 
-        if (company_type == "Service"):
-            return item.service.name
-        elif (company_type == "Education"):
-            return item.course.name
-        elif (company_type == "Registration"):
-            return item.registration_sub_type.name
-        elif (company_type == "Product"):
-            return item.product.name
-
-        return item.name
+    def item_title(self, item):
+        detail_type = for_page(item)
+        return (detail_type.title(item) if detail_type else None) or item.title
 
     def item_description(self, item):
         return item.meta_description or item.name
@@ -228,40 +186,15 @@ class MultipageFeed(Feed):
         return item.updated or item.created
     
     def item_enclosure_url(self, item):
-        if (item.company.type.name == "Service"):
-            return item.service.image.url if item.service.image else None
-        elif (item.company.type.name == "Education"):
-            return item.course.image.url if item.course.image else None
-        elif (item.company.type.name == "Registration"):
-            return item.registration_sub_type.image.url if item.registration_sub_type.image else None
-        elif (item.company.type.name == "Product"):
-            return item.product.image.url if item.product.image else None
-        
-        return None
+        image = self.item_image(item)
+        return image.url if image else None
 
     def item_enclosure_length(self, item):
-        if (item.company.type.name == "Service"):
-            return item.service.image.size if item.service.image else 0
-        elif (item.company.type.name == "Education"):
-            return item.course.image.size if item.course.image else 0
-        elif (item.company.type.name == "Registration"):
-            return item.registration_sub_type.image.size if item.registration_sub_type.image else 0
-        elif (item.company.type.name == "Product"):
-            return item.product.image.size if item.product.image else 0
-        
-        return 0
+        image = self.item_image(item)
+        return image.size if image else 0
 
     def item_enclosure_mime_type(self, item):
-        if (item.company.type.name == "Service"):
-            return "image/jpeg" if item.service.image else None
-        elif (item.company.type.name == "Education"):
-            return "image/jpeg" if item.course.image else None
-        elif (item.company.type.name == "Registration"):
-            return "image/jpeg" if item.registration_sub_type.image else None
-        elif (item.company.type.name == "Product"):
-            return "image/jpeg" if item.product.image else None
-
-        return  None
+        return "image/jpeg" if self.item_image(item) else None
 
     def item_extra_kwargs(self, item):
         return {
@@ -270,17 +203,12 @@ class MultipageFeed(Feed):
 
 # Optional: Serve with XML stylesheet
 class StyledMultipageFeed(MultipageFeed):
-    def __call__(self, request, *args, **kwargs):
-        feedgen = self.get_feed(self.get_object(request, *args, **kwargs), request)
-        response = HttpResponse(content_type=feedgen.content_type)
-        response.write('<?xml version="1.0" encoding="utf-8"?>\n')
-        response.write('<?xml-stylesheet type="text/xsl" href="/static/rss-stylesheet.xsl"?>\n')
-        feedgen.write(response, 'utf-8')
-        return response
+    stylesheet = True
 
 
-class ServiceMultipagesFeed(Feed):
+class ServiceMultipagesFeed(CachedFeed):
     feed_type = ContentEncodedFeed
+    personalised = True
     link = "/services/feed/"
 
     def __call__(self, request, *args, **kwargs):
@@ -288,41 +216,9 @@ class ServiceMultipagesFeed(Feed):
         return super().__call__(request, *args, **kwargs)
 
     def items(self):
-        coordinate = get_ip_location(self.request)
-
-        if coordinate:
-            lat = coordinate.get("latitude")
-            lon = coordinate.get("longitude")
-
-            if lat and lon:
-                places = get_nearby_locations(lat, lon)
-
-                services = ServiceMultiPage.objects.filter(available_states = places.first().state).order_by("-updated", "-created")[:12]            
-
-                service_list = []
-
-                for place in places:
-                    for service in services:
-                        obj_title =service.title.replace("place_name", place.name)
-                        obj_meta_title =service.meta_title.replace("place_name", place.name)
-                        obj_description =service.description.replace("place_name", place.name)
-                        obj_meta_description =service.meta_description.replace("place_name", place.name)
-                        obj_slug = service.slug.replace("place_name", place.slug) if service.url_type == "slug_filtered" else f"{service.slug}/{place.state.slug}/{place.slug}"
-
-                        service_list.append({
-                            "title": obj_title,
-                            "meta_title": obj_meta_title,
-                            "description": obj_description,
-                            "meta_description": obj_meta_description,
-                            "slug": obj_slug,
-
-                            "company__slug": service.company.slug,
-                            "url_type": service.url_type,
-                            "created": service.created,
-                            "updated": service.updated
-                        })
-
-                return service_list
+        expanded = geo_feed_items(("service",), get_ip_location(self.request))
+        if expanded is not None:
+            return expanded["service"]
 
         return list(ServiceMultiPage.objects.values(
             "title", "meta_title", "description", "meta_description", "slug", "company__slug",
@@ -348,17 +244,12 @@ class ServiceMultipagesFeed(Feed):
 
 # Optional: Serve with XML stylesheet
 class StyledServiceMultipagesFeed(ServiceMultipagesFeed):
-    def __call__(self, request, *args, **kwargs):
-        feedgen = self.get_feed(self.get_object(request, *args, **kwargs), request)
-        response = HttpResponse(content_type=feedgen.content_type)
-        response.write('<?xml version="1.0" encoding="utf-8"?>\n')
-        response.write('<?xml-stylesheet type="text/xsl" href="/static/rss-stylesheet.xsl"?>\n')
-        feedgen.write(response, 'utf-8')
-        return response
+    stylesheet = True
     
 
-class ProductMultipagesFeed(Feed):
+class ProductMultipagesFeed(CachedFeed):
     feed_type = ContentEncodedFeed
+    personalised = True
     link = "/products/feed/"
 
     def __call__(self, request, *args, **kwargs):
@@ -366,41 +257,9 @@ class ProductMultipagesFeed(Feed):
         return super().__call__(request, *args, **kwargs)
 
     def items(self):
-        coordinate = get_ip_location(self.request)
-
-        if coordinate:
-            lat = coordinate.get("latitude")
-            lon = coordinate.get("longitude")
-
-            if lat and lon:
-                places = get_nearby_locations(lat, lon)
-
-                products = ProductMultiPage.objects.filter(available_states = places.first().state).order_by("-updated", "-created")[:12]            
-
-                product_list = []
-
-                for place in places:
-                    for product in products:
-                        obj_title =product.title.replace("place_name", place.name)
-                        obj_meta_title =product.meta_title.replace("place_name", place.name)
-                        obj_description =product.description.replace("place_name", place.name)
-                        obj_meta_description =product.meta_description.replace("place_name", place.name)
-                        obj_slug = product.slug.replace("place_name", place.slug) if product.url_type == "slug_filtered" else f"{product.slug}/{place.state.slug}/{place.slug}"
-
-                        product_list.append({
-                            "title": obj_title,
-                            "meta_title": obj_meta_title,
-                            "description": obj_description,
-                            "meta_description": obj_meta_description,
-                            "slug": obj_slug,
-
-                            "company__slug": product.company.slug,
-                            "url_type": product.url_type,
-                            "created": product.created,
-                            "updated": product.updated
-                        })
-
-                return product_list
+        expanded = geo_feed_items(("product",), get_ip_location(self.request))
+        if expanded is not None:
+            return expanded["product"]
 
         return list(ProductMultiPage.objects.values(
             "title", "meta_title", "description", "meta_description", "slug", "company__slug",
@@ -426,17 +285,12 @@ class ProductMultipagesFeed(Feed):
 
 # Optional: Serve with XML stylesheet
 class StyledProductMultipagesFeed(ProductMultipagesFeed):
-    def __call__(self, request, *args, **kwargs):
-        feedgen = self.get_feed(self.get_object(request, *args, **kwargs), request)
-        response = HttpResponse(content_type=feedgen.content_type)
-        response.write('<?xml version="1.0" encoding="utf-8"?>\n')
-        response.write('<?xml-stylesheet type="text/xsl" href="/static/rss-stylesheet.xsl"?>\n')
-        feedgen.write(response, 'utf-8')
-        return response
+    stylesheet = True
 
 
-class CourseMultipagesFeed(Feed):
+class CourseMultipagesFeed(CachedFeed):
     feed_type = ContentEncodedFeed
+    personalised = True
     link = "/courses/feed/"
 
     def __call__(self, request, *args, **kwargs):
@@ -444,41 +298,9 @@ class CourseMultipagesFeed(Feed):
         return super().__call__(request, *args, **kwargs)
 
     def items(self):
-        coordinate = get_ip_location(self.request)
-
-        if coordinate:
-            lat = coordinate.get("latitude")
-            lon = coordinate.get("longitude")
-
-            if lat and lon:
-                places = get_nearby_locations(lat, lon)
-
-                courses = CourseMultiPage.objects.filter(available_states = places.first().state).order_by("-updated", "-created")[:12]            
-
-                course_list = []
-
-                for place in places:
-                    for course in courses:
-                        obj_title =course.title.replace("place_name", place.name)
-                        obj_meta_title =course.meta_title.replace("place_name", place.name)
-                        obj_description =course.description.replace("place_name", place.name)
-                        obj_meta_description =course.meta_description.replace("place_name", place.name)
-                        obj_slug = course.slug.replace("place_name", place.slug) if course.url_type == "slug_filtered" else f"{course.slug}/{place.state.slug}/{place.slug}"
-
-                        course_list.append({
-                            "title": obj_title,
-                            "meta_title": obj_meta_title,
-                            "description": obj_description,
-                            "meta_description": obj_meta_description,
-                            "slug": obj_slug,
-
-                            "company__slug": course.company.slug,
-                            "url_type": course.url_type,
-                            "created": course.created,
-                            "updated": course.updated
-                        })
-
-                return course_list
+        expanded = geo_feed_items(("course",), get_ip_location(self.request))
+        if expanded is not None:
+            return expanded["course"]
 
         return list(CourseMultiPage.objects.values(
             "title", "meta_title", "description", "meta_description", "slug", "company__slug",
@@ -504,17 +326,12 @@ class CourseMultipagesFeed(Feed):
 
 # Optional: Serve with XML stylesheet
 class StyledCourseMultipagesFeed(CourseMultipagesFeed):
-    def __call__(self, request, *args, **kwargs):
-        feedgen = self.get_feed(self.get_object(request, *args, **kwargs), request)
-        response = HttpResponse(content_type=feedgen.content_type)
-        response.write('<?xml version="1.0" encoding="utf-8"?>\n')
-        response.write('<?xml-stylesheet type="text/xsl" href="/static/rss-stylesheet.xsl"?>\n')
-        feedgen.write(response, 'utf-8')
-        return response
+    stylesheet = True
 
 
-class RegistrationMultipagesFeed(Feed):
+class RegistrationMultipagesFeed(CachedFeed):
     feed_type = ContentEncodedFeed
+    personalised = True
     link = "/registrations/feed/"
 
     def __call__(self, request, *args, **kwargs):
@@ -522,41 +339,9 @@ class RegistrationMultipagesFeed(Feed):
         return super().__call__(request, *args, **kwargs)
 
     def items(self):
-        coordinate = get_ip_location(self.request)
-
-        if coordinate:
-            lat = coordinate.get("latitude")
-            lon = coordinate.get("longitude")
-
-            if lat and lon:
-                places = get_nearby_locations(lat, lon)
-
-                registrations = RegistrationMultiPage.objects.filter(available_states = places.first().state).order_by("-updated", "-created")[:12]            
-
-                registration_list = []
-
-                for place in places:
-                    for registration in registrations:
-                        obj_title =registration.title.replace("place_name", place.name)
-                        obj_meta_title =registration.meta_title.replace("place_name", place.name)
-                        obj_description =registration.description.replace("place_name", place.name)
-                        obj_meta_description =registration.meta_description.replace("place_name", place.name)
-                        obj_slug = registration.slug.replace("place_name", place.slug) if registration.url_type == "slug_filtered" else f"{registration.slug}/{place.state.slug}/{place.slug}"
-
-                        registration_list.append({
-                            "title": obj_title,
-                            "meta_title": obj_meta_title,
-                            "description": obj_description,
-                            "meta_description": obj_meta_description,
-                            "slug": obj_slug,
-
-                            "company__slug": registration.company.slug,
-                            "url_type": registration.url_type,
-                            "created": registration.created,
-                            "updated": registration.updated
-                        })
-
-                return registration_list
+        expanded = geo_feed_items(("registration",), get_ip_location(self.request))
+        if expanded is not None:
+            return expanded["registration"]
 
         return list(RegistrationMultiPage.objects.values(
             "title", "meta_title", "description", "meta_description", "slug", "company__slug",
@@ -582,20 +367,14 @@ class RegistrationMultipagesFeed(Feed):
 
 # Optional: Serve with XML stylesheet
 class StyledRegistrationMultipagesFeed(RegistrationMultipagesFeed):
-    def __call__(self, request, *args, **kwargs):
-        feedgen = self.get_feed(self.get_object(request, *args, **kwargs), request)
-        response = HttpResponse(content_type=feedgen.content_type)
-        response.write('<?xml version="1.0" encoding="utf-8"?>\n')
-        response.write('<?xml-stylesheet type="text/xsl" href="/static/rss-stylesheet.xsl"?>\n')
-        feedgen.write(response, 'utf-8')
-        return response
+    stylesheet = True
 
 
-class CompanyServicesFeed(Feed):
+class CompanyServicesFeed(CachedFeed):
     feed_type = ContentEncodedFeed    
 
     def items(self):
-        return ServiceDetail.objects.order_by("-updated", "-created")[:20]
+        return by_kind("service").details().order_by("-updated", "-created")[:20]
 
     def item_title(self, item):
         return item.meta_title or item.service.name or ""
@@ -605,7 +384,7 @@ class CompanyServicesFeed(Feed):
         return Truncator(strip_tags(item.meta_description or item.description or "")).words(50)
 
     def item_link(self, item):
-        return f"/{item.company.type.slug}/{item.company.slug}/{item.slug}/" or ""
+        return f"/{company_type(item.company).slug}/{item.company.slug}/{item.slug}/" or ""
 
     def item_pubdate(self, item):
         return item.updated or item.created
@@ -617,21 +396,15 @@ class CompanyServicesFeed(Feed):
 
 # Optional: Serve with XML stylesheet
 class StyledCompanyServicesFeed(CompanyServicesFeed):
-    def __call__(self, request, *args, **kwargs):
-        feedgen = self.get_feed(self.get_object(request, *args, **kwargs), request)
-        response = HttpResponse(content_type=feedgen.content_type)
-        response.write('<?xml version="1.0" encoding="utf-8"?>\n')
-        response.write('<?xml-stylesheet type="text/xsl" href="/static/rss-stylesheet.xsl"?>\n')
-        feedgen.write(response, 'utf-8')
-        return response
+    stylesheet = True
     
 
-class CompanyProductsFeed(Feed):
+class CompanyProductsFeed(CachedFeed):
     feed_type = ContentEncodedFeed
     link = "/products/feed/"
 
     def items(self):
-        return ProductDetailPage.objects.order_by("-updated", "-created")[:20]
+        return by_kind("product").details().order_by("-updated", "-created")[:20]
 
     def item_title(self, item):
         return item.meta_title or item.product.name or ""
@@ -641,7 +414,7 @@ class CompanyProductsFeed(Feed):
         return Truncator(strip_tags(item.meta_description or item.description or "")).words(50)
 
     def item_link(self, item):
-        return f"/{item.company.type.slug}/{item.company.slug}/{item.slug}/" or ""
+        return f"/{company_type(item.company).slug}/{item.company.slug}/{item.slug}/" or ""
 
     def item_pubdate(self, item):
         return item.updated or item.created
@@ -653,21 +426,15 @@ class CompanyProductsFeed(Feed):
 
 # Optional: Serve with XML stylesheet
 class StyledCompanyProductsFeed(CompanyProductsFeed):
-    def __call__(self, request, *args, **kwargs):
-        feedgen = self.get_feed(self.get_object(request, *args, **kwargs), request)
-        response = HttpResponse(content_type=feedgen.content_type)
-        response.write('<?xml version="1.0" encoding="utf-8"?>\n')
-        response.write('<?xml-stylesheet type="text/xsl" href="/static/rss-stylesheet.xsl"?>\n')
-        feedgen.write(response, 'utf-8')
-        return response
+    stylesheet = True
     
 
-class CompanyCoursesFeed(Feed):
+class CompanyCoursesFeed(CachedFeed):
     feed_type = ContentEncodedFeed
     link = "/courses/feed/"
 
     def items(self):
-        return CourseDetail.objects.order_by("-updated", "-created")[:20]
+        return by_kind("course").details().order_by("-updated", "-created")[:20]
 
     def item_title(self, item):
         return item.meta_title or item.course.name or ""
@@ -677,7 +444,7 @@ class CompanyCoursesFeed(Feed):
         return Truncator(strip_tags(item.meta_description or item.description or "")).words(50)
 
     def item_link(self, item):
-        return f"/{item.company.type.slug}/{item.company.slug}/{item.slug}/" or ""
+        return f"/{company_type(item.company).slug}/{item.company.slug}/{item.slug}/" or ""
 
     def item_pubdate(self, item):
         return item.updated or item.created
@@ -689,31 +456,25 @@ class CompanyCoursesFeed(Feed):
 
 # Optional: Serve with XML stylesheet
 class StyledCompanyCoursesFeed(CompanyCoursesFeed):
-    def __call__(self, request, *args, **kwargs):
-        feedgen = self.get_feed(self.get_object(request, *args, **kwargs), request)
-        response = HttpResponse(content_type=feedgen.content_type)
-        response.write('<?xml version="1.0" encoding="utf-8"?>\n')
-        response.write('<?xml-stylesheet type="text/xsl" href="/static/rss-stylesheet.xsl"?>\n')
-        feedgen.write(response, 'utf-8')
-        return response
+    stylesheet = True
     
 
-class CompanyRegistrationsFeed(Feed):
+class CompanyRegistrationsFeed(CachedFeed):
     feed_type = ContentEncodedFeed
     link = "/registrations/feed/"
 
     def items(self):
-        return RegistrationDetailPage.objects.order_by("-updated", "-created")[:20]
+        return by_kind("registration").details().order_by("-updated", "-created")[:20]
 
     def item_title(self, item):
-        return item.meta_title or item.registration_sub_type.name or ""
+        return item.meta_title or by_kind("registration").title(item) or ""
 
     def item_description(self, item):
         # You can remove `Truncator(...).words(50)` if you want full content (not recommended for raw HTML)
         return Truncator(strip_tags(item.meta_description or item.description or "")).words(50)
 
     def item_link(self, item):
-        return f"/{item.company.type.slug}/{item.company.slug}/{item.slug}/" or ""
+        return f"/{company_type(item.company).slug}/{item.company.slug}/{item.slug}/" or ""
 
     def item_pubdate(self, item):
         return item.updated or item.created
@@ -725,16 +486,10 @@ class CompanyRegistrationsFeed(Feed):
 
 # Optional: Serve with XML stylesheet
 class StyledCompanyRegistrationsFeed(CompanyRegistrationsFeed):
-    def __call__(self, request, *args, **kwargs):
-        feedgen = self.get_feed(self.get_object(request, *args, **kwargs), request)
-        response = HttpResponse(content_type=feedgen.content_type)
-        response.write('<?xml version="1.0" encoding="utf-8"?>\n')
-        response.write('<?xml-stylesheet type="text/xsl" href="/static/rss-stylesheet.xsl"?>\n')
-        feedgen.write(response, 'utf-8')
-        return response
+    stylesheet = True
     
 
-class MetaTagFeed(Feed):
+class MetaTagFeed(CachedFeed):
     feed_type = ContentEncodedFeed
     description = "List of all tags used in the site."
 
@@ -808,17 +563,12 @@ class MetaTagFeed(Feed):
 
 # Optional: Serve with XML stylesheet
 class StyledMetaTagFeed(MetaTagFeed):
-    def __call__(self, request, *args, **kwargs):
-        feedgen = self.get_feed(self.get_object(request, *args, **kwargs), request)
-        response = HttpResponse(content_type=feedgen.content_type)
-        response.write('<?xml version="1.0" encoding="utf-8"?>\n')
-        response.write('<?xml-stylesheet type="text/xsl" href="/static/rss-stylesheet.xsl"?>\n')
-        feedgen.write(response, 'utf-8')
-        return response
+    stylesheet = True
     
 
-class HomeFeed(Feed):
+class HomeFeed(CachedFeed):
     feed_type = ContentEncodedFeed
+    personalised = True
     link = "/feed/"
 
     def get_object(self, request):
@@ -838,105 +588,9 @@ class HomeFeed(Feed):
             "name", "description", "slug", "created", "updated"
             ).order_by("-updated", "-created")[:12])   
 
-        if coordinate:
-            lat = coordinate.get("latitude")
-            lon = coordinate.get("longitude")
-
-            if lat and lon:
-                places = get_nearby_locations(lat, lon)
-
-                service_collection = ServiceMultiPage.objects.filter(available_states = places.first().state).order_by("-updated", "-created")[:12]
-                product_collection = ProductMultiPage.objects.filter(available_states = places.first().state).order_by("-updated", "-created")[:12]
-                course_collection = CourseMultiPage.objects.filter(available_states = places.first().state).order_by("-updated", "-created")[:12]
-                registration_collection = RegistrationMultiPage.objects.filter(available_states = places.first().state).order_by("-updated", "-created")[:12]
-
-                services = []
-                products = []
-                courses = []
-                registrations = []
-
-                for place in places:
-                    for service in service_collection:
-                        obj_title =service.title.replace("place_name", place.name)
-                        obj_meta_title =service.meta_title.replace("place_name", place.name)
-                        obj_description =service.description.replace("place_name", place.name)
-                        obj_meta_description =service.meta_description.replace("place_name", place.name)
-                        obj_slug = service.slug.replace("place_name", place.slug) if service.url_type == "slug_filtered" else f"{service.slug}/{place.state.slug}/{place.slug}"
-
-                        services.append({
-                            "title": obj_title,
-                            "meta_title": obj_meta_title,
-                            "description": obj_description,
-                            "meta_description": obj_meta_description,
-                            "slug": obj_slug,
-
-                            "company__slug": service.company.slug,
-                            "url_type": service.url_type,
-                            "created": service.created,
-                            "updated": service.updated
-                        })
-
-                    for product in product_collection:
-                        obj_title =product.title.replace("place_name", place.name)
-                        obj_meta_title =product.meta_title.replace("place_name", place.name)
-                        obj_description =product.description.replace("place_name", place.name)
-                        obj_meta_description =product.meta_description.replace("place_name", place.name)
-                        obj_slug = product.slug.replace("place_name", place.slug) if product.url_type == "slug_filtered" else f"{product.slug}/{place.state.slug}/{place.slug}"
-
-                        products.append({
-                            "title": obj_title,
-                            "meta_title": obj_meta_title,
-                            "description": obj_description,
-                            "meta_description": obj_meta_description,
-                            "slug": obj_slug,
-
-                            "company__slug": product.company.slug,
-                            "url_type": product.url_type,
-                            "created": product.created,
-                            "updated": product.updated
-                        })
-
-                    for course in course_collection:
-                        obj_title =course.title.replace("place_name", place.name)
-                        obj_meta_title =course.meta_title.replace("place_name", place.name)
-                        obj_description =course.description.replace("place_name", place.name)
-                        obj_meta_description =course.meta_description.replace("place_name", place.name)
-                        obj_slug = course.slug.replace("place_name", place.slug) if course.url_type == "slug_filtered" else f"{course.slug}/{place.state.slug}/{place.slug}"
-
-                        courses.append({
-                            "title": obj_title,
-                            "meta_title": obj_meta_title,
-                            "description": obj_description,
-                            "meta_description": obj_meta_description,
-                            "slug": obj_slug,
-
-                            "company__slug": course.company.slug,
-                            "url_type": course.url_type,
-                            "created": course.created,
-                            "updated": course.updated
-                        })
-
-                    for registration in registration_collection:
-                        obj_title =registration.title.replace("place_name", place.name)
-                        obj_meta_title =registration.meta_title.replace("place_name", place.name)
-                        obj_description =registration.description.replace("place_name", place.name)
-                        obj_meta_description =registration.meta_description.replace("place_name", place.name)
-                        obj_slug = registration.slug.replace("place_name", place.slug) if registration.url_type == "slug_filtered" else f"{registration.slug}/{place.state.slug}/{place.slug}"
-
-                        registrations.append({
-                            "title": obj_title,
-                            "meta_title": obj_meta_title,
-                            "description": obj_description,
-                            "meta_description": obj_meta_description,
-                            "slug": obj_slug,
-
-                            "company__slug": registration.company.slug,
-                            "url_type": registration.url_type,
-                            "created": registration.created,
-                            "updated": registration.updated
-                        })
-
-                return services + products + registrations + courses + destinations
+        expanded = geo_feed_items(("service", "product", "registration", "course"), coordinate)
+        if expanded is not None:
+            return expanded["service"] + expanded["product"] + expanded["registration"] + expanded["course"] + destinations
 
         services = list(ServiceMultiPage.objects.values(
             "title", "meta_title", "description", "meta_description", "slug", "company__slug",
@@ -980,16 +634,10 @@ class HomeFeed(Feed):
 
 
 class StyledHomeFeed(HomeFeed):
-    def __call__(self, request, *args, **kwargs):
-        feedgen = self.get_feed(self.get_object(request, *args, **kwargs), request)
-        response = HttpResponse(content_type=feedgen.content_type)
-        response.write('<?xml version="1.0" encoding="utf-8"?>\n')
-        response.write('<?xml-stylesheet type="text/xsl" href="/static/rss-stylesheet.xsl"?>\n')
-        feedgen.write(response, 'utf-8')
-        return response
+    stylesheet = True
 
 
-class TestimonialFeed(Feed):
+class TestimonialFeed(CachedFeed):
     feed_type = ContentEncodedFeed
 
     title = "Customer Testimonials – BZ India"
@@ -1013,13 +661,7 @@ class TestimonialFeed(Feed):
 
 # Optional: Serve with XML stylesheet
 class StyledTestimonialFeed(TestimonialFeed):
-    def __call__(self, request, *args, **kwargs):
-        feedgen = self.get_feed(self.get_object(request, *args, **kwargs), request)
-        response = HttpResponse(content_type=feedgen.content_type)
-        response.write('<?xml version="1.0" encoding="utf-8"?>\n')
-        response.write('<?xml-stylesheet type="text/xsl" href="/static/rss-stylesheet.xsl"?>\n')
-        feedgen.write(response, 'utf-8')
-        return response
+    stylesheet = True
 
 
 def nothing(request):
@@ -0,0 +1,55 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+
+from utility.feed_cache import feed_cache_stats
+
+DEFAULT_PATHS = ["/feed/", "/blog/feed/", "/services/feed/", "/products/feed/"]
+
+
+class Command(BaseCommand):
+    help = "Measure feed polls per second rendered every time, served from the feed cache and answered with 304"
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', help=f'Feed paths, default {" ".join(DEFAULT_PATHS)}')
+        parser.add_argument('--polls', type=int, default=200, help='Polls per path and mode')
+
+    def poll(self, client, path, polls, **headers):
+        start = time.perf_counter()
+        for _ in range(polls):
+            response = client.get(path, **headers)
+        elapsed = time.perf_counter() - start
+
+        return response, polls / elapsed if elapsed else float("inf")
+
+    def handle(self, *args, **kwargs):
+        paths = kwargs['paths'] or DEFAULT_PATHS
+        polls = kwargs['polls']
+        client = Client()
+
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            for path in paths:
+                with override_settings(FEED_CACHE=False):
+                    response, uncached = self.poll(client, path, polls)
+
+                if response.status_code != 200:
+                    raise CommandError(f"{path} returned {response.status_code}")
+
+                # The first poll renders and caches the document, the rest are served from the cache.
+                response = client.get(path)
+                _, cached = self.poll(client, path, polls)
+
+                etag = response.headers.get("ETag")
+                response, not_modified = self.poll(client, path, polls, HTTP_IF_NONE_MATCH=etag)
+                if response.status_code != 304:
+                    self.stdout.write(self.style.WARNING(f"⚠️ {path} answered {response.status_code} to its own ETag"))
+
+                self.stdout.write(
+                    f"{path}: {uncached:.0f} polls/s rendered, {cached:.0f} polls/s cached "
+                    f"({cached / uncached:.1f}x), {not_modified:.0f} polls/s 304 ({not_modified / uncached:.1f}x)"
+                )
+
+        self.stdout.write(self.style.SUCCESS(f"✅ {len(paths)} feeds polled {polls} times per mode: {feed_cache_stats.stats()}"))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from base.sitemap_writer import multipage_models
+from base.url_catalog import BATCH_SIZE, sync_all, sync_locations
+
+
+class Command(BaseCommand):
+    help = "Build or reconcile the multipage URL catalog"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--type', choices=list(multipage_models()), help='Only sync multipages of this type')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Rows per bulk insert/update')
+        parser.add_argument('--locations-only', action='store_true', help='Only sync locations changed since the last sync')
+
+    def handle(self, *args, **kwargs):
+        if kwargs['locations_only']:
+            counts = sync_locations()
+        else:
+            counts = sync_all(kwargs['type'], kwargs['batch_size'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Multipage URL catalog synced: {counts['created']} created, {counts['updated']} updated, {counts['deleted']} deleted"
+        ))
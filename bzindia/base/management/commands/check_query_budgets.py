@@ -0,0 +1,75 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from utility.prefetch import QueryBudgetExceeded
+
+STATE_ENDPOINTS = [
+    "location_api:state-course_multipage-list",
+    "location_api:state-registration_multipage-list",
+    "location_api:state-product_multipage-list",
+    "location_api:state-service_multipage-list",
+]
+
+COMPANY_ENDPOINTS = [
+    "course_api:company-detail-list",
+    "registration_api:company-detail-list",
+    "service_api:company-detail-list",
+    "product_api:company-detail-list",
+    "product_api:company-multipage-list",
+]
+
+
+class Command(BaseCommand):
+    help = "Request the multipage and detail endpoints and fail any page running more queries than its budget"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--state', default="india", help='State slug for the multipage endpoints')
+        parser.add_argument('--company', default="all", help='Company slug for the detail endpoints')
+        parser.add_argument('--pages', type=int, default=3, help='Pages followed per endpoint')
+
+    def check(self, client, url, pages):
+        counts = []
+
+        while url and len(counts) < pages:
+            with CaptureQueriesContext(connection) as captured:
+                response = client.get(url)
+
+            if response.status_code != 200:
+                self.stdout.write(self.style.WARNING(f"⚠️ {url} returned {response.status_code}"))
+                break
+
+            counts.append(len(captured))
+            data = response.json()
+            url = data.get("next") if isinstance(data, dict) else None
+
+        return counts
+
+    def handle(self, *args, **kwargs):
+        endpoints = [reverse(name, kwargs={"state_slug": kwargs['state']}) for name in STATE_ENDPOINTS]
+        endpoints += [reverse(name, kwargs={"company_slug": kwargs['company']}) for name in COMPANY_ENDPOINTS]
+
+        client = Client()
+        failures = []
+
+        with override_settings(
+            QUERY_BUDGET_CHECKS=True, QUERY_BUDGET_STRICT=True,
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"], DEBUG=True,
+        ):
+            for url in endpoints:
+                try:
+                    counts = self.check(client, url, kwargs['pages'])
+                except QueryBudgetExceeded as e:
+                    failures.append(url)
+                    self.stdout.write(self.style.ERROR(f"❌ {e}"))
+                    continue
+
+                self.stdout.write(f"{url}: {counts} queries per page")
+
+        if failures:
+            raise CommandError(f"{len(failures)} endpoint(s) over their query budget")
+
+        self.stdout.write(self.style.SUCCESS(f"✅ {len(endpoints)} endpoints within their query budgets"))
@@ -1,151 +1,114 @@
+import glob
+import multiprocessing
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from django.core.management.base import BaseCommand
-from django.conf import settings
-from datetime import datetime, timezone
-from service.models import MultiPage as ServiceMultiPage
-from product.models import MultiPage as ProductMultiPage
-from registration.models import MultiPage as RegistrationMultiPage
-from educational.models import MultiPage as CourseMultiPage
-from locations.models import UniquePlace, UniqueState, UniqueDistrict
+from django.db import connections
 from django.utils.text import slugify
 from unidecode import unidecode
 
-SITEMAP_DIR = os.path.join(settings.BASE_DIR, "static", "sitemaps")
-BASE_URL = settings.SITE_URL.rstrip("/")
-CHUNK_SIZE = 25000
-
-def write_sitemap_file(filename, urls):
-    now = datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace('+00:00', 'Z')
-    path = os.path.join(SITEMAP_DIR, filename)
-
-    lines = ['<?xml version="1.0" encoding="UTF-8"?>']
-    lines.append('<?xml-stylesheet type="text/xsl" href="/static/sitemaps/sitemap1.xsl"?>')
-    lines.append('''<urlset
-    xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
-    xmlns:image="http://www.google.com/schemas/sitemap-image/1.1"
-    xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
-    xmlns:bz="https://bzindia.in/schemas"
-    xsi:schemaLocation="http://www.sitemaps.org/schemas/sitemap/0.9 
-    http://www.sitemaps.org/schemas/sitemap/0.9/sitemap.xsd">''')
-
-    for url in urls:
-        lines.append("  <url>")
-        lines.append(f"    <loc>{url['loc']}</loc>")
-        lines.append(f"    <lastmod>{now}</lastmod>")
-        lines.append(f"    <changefreq>weekly</changefreq>")
-        lines.append(f"    <priority>0.8</priority>")
-        lines.append(f"    <bz:imageCount>{url['image_count']}</bz:imageCount>")
-        lines.append("  </url>")
-
-    lines.append("</urlset>")
-    with open(path, "w", encoding="utf-8") as f:
-        f.write("\n".join(lines))
+from base.sitemap_writer import (
+    SITEMAP_DIR, BASE_URL, SitemapLocations, chunked, digest, format_lastmod, format_timestamp, init_worker,
+    is_current, load_manifest, multipage_tasks, save_manifest, state_sitemaps, write_multipage_sitemaps,
+    write_sitemap_file, write_sitemap_index
+)
 
 
 class Command(BaseCommand):
     help = "Generate all sitemaps and a unified sitemap index"
 
-    def handle(self, *args, **kwargs):
-        os.makedirs(SITEMAP_DIR, exist_ok=True)
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=1, help='Processes writing multipage sitemaps in parallel')
+        parser.add_argument(
+            '--incremental', action='store_true',
+            help='Only rewrite sitemap chunks whose inputs changed since the last run'
+        )
 
-        now = datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
-        sitemap_files = []
+    def write_multipages(self, workers, locations, manifest, incremental):
+        tasks = multipage_tasks()
+        self.stdout.write(f"📝 Writing sitemaps for {len(tasks)} multipages with {workers} worker(s)")
 
-        # ---------- Part 1: Multipage Sitemaps ----------
-        services = ServiceMultiPage.objects.select_related("company")
-        products = ProductMultiPage.objects.select_related("company")
-        courses = CourseMultiPage.objects.select_related("company")
-        registrations = RegistrationMultiPage.objects.select_related("company")
-
-        place_slugs = list(UniquePlace.objects.values_list("slug", flat=True))
-        district_slugs = list(UniqueDistrict.objects.values_list("slug", flat=True))
-        state_slugs = list(UniqueState.objects.values_list("slug", flat=True))
-        location_slugs = list(set(place_slugs + district_slugs + state_slugs))
-
-        place_data = list(
-            UniquePlace.objects.values("slug", "district__slug", "state__slug")
-        )
+        if workers <= 1:
+            init_worker(locations, manifest, incremental)
+            yield from map(write_multipage_sitemaps, tasks)
+            return
 
-        all_pages = [
-            *[(s, "service") for s in services],
-            *[(p, "product") for p in products],
-            *[(c, "course") for c in courses],
-            *[(r, "registration") for r in registrations],
-        ]
+        # Forked workers inherit the loaded locations without pickling them, and
+        # must open their own database connections rather than share the parent's.
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        initargs = (locations, manifest, incremental)
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=init_worker, initargs=initargs) as executor:
+            yield from executor.map(write_multipage_sitemaps, tasks, chunksize=4)
 
-        all_urls = []
+    def handle(self, *args, **kwargs):
+        os.makedirs(SITEMAP_DIR, exist_ok=True)
 
-        for instance, _type in all_pages:
-            base_slug = getattr(instance, "slug", "") or getattr(instance, "item_slug", "")
-            company_slug = instance.company.slug
-            image_count = instance.image_count or 0
+        incremental = kwargs['incremental']
+        manifest = load_manifest()
 
-            if instance.url_type == "slug_filtered":
-                for location_slug in location_slugs:
-                    url = f"{BASE_URL}/{company_slug}/{base_slug.replace('place_name', location_slug)}/"
-                    all_urls.append({"loc": url, "image_count": image_count})
+        start = time.perf_counter()
+        files = {}
+        url_count = 0
+        skipped = 0
 
-            elif instance.url_type == "location_filtered":
-                for place in place_data:
-                    state_slug = place["state__slug"]
-                    for region_slug in (place["district__slug"], place["slug"]):
-                        url = f"{BASE_URL}/{company_slug}/{base_slug}/{state_slug}/{region_slug}/"
-                        all_urls.append({"loc": url, "image_count": image_count})
+        # ---------- Part 1: Multipage Sitemaps ----------
+        locations = SitemapLocations.load()
+
+        for page_files, written, page_skipped in self.write_multipages(
+            max(kwargs['workers'], 1), locations, manifest, incremental
+        ):
+            files.update(page_files)
+            url_count += written
+            skipped += page_skipped
 
-        for i in range(0, len(all_urls), CHUNK_SIZE):
-            chunk = all_urls[i:i + CHUNK_SIZE]
-            filename = f"sitemap-multipage-{i//CHUNK_SIZE + 1}.xml"
-            write_sitemap_file(filename, chunk)
-            sitemap_files.append(filename)
+        del locations
 
         # ---------- Part 2: State-Based Place Sitemaps ----------
-        states = UniqueState.objects.all().order_by("name")
-        for state in states:
-            urls = []
+        for state_name, urls in state_sitemaps():
+            state_slug = slugify(unidecode(state_name))
+            state_count = 0
 
-            url = f"{BASE_URL}/state-list-in-india/{state.slug}/"
-            urls.append({"loc": url, "image_count": 6})
+            for number, chunk in enumerate(chunked(urls), start=1):
+                filename = f"sitemap-{state_slug}-{number}.xml.gz"
+                chunk_hash = digest(chunk)
 
-            districts = UniqueDistrict.objects.filter(state=state)
-            for district in districts:
-                url = f"{BASE_URL}/state-list-in-india/{district.state.slug}/{district.slug}/"
-                urls.append({"loc": url, "image_count": 6})
+                if incremental and is_current(filename, chunk_hash, manifest):
+                    files[filename] = manifest[filename]
+                    skipped += 1
+                    continue
 
-            places = UniquePlace.objects.filter(state=state)
-            for place in places:
-                url = f"{BASE_URL}/state-list-in-india/{place.state.slug}/{place.district.slug}/{place.slug}/"
-                urls.append({"loc": url, "image_count": 6})
+                count, newest = write_sitemap_file(filename, chunk)
+                files[filename] = {"hash": chunk_hash, "timestamp": newest, "urls": count}
+                state_count += count
 
-            urls.sort(key=lambda x: (x["loc"].count("/"), x["loc"]))
+            if state_count:
+                self.stdout.write(f"📝 Wrote sitemap for state: {state_name} ({state_count} URLs)")
+            url_count += state_count
 
-            filename = f"sitemap-{slugify(unidecode(state.name))}.xml"
-            self.stdout.write(f"📝 Writing sitemap for state: {state.name} ({len(urls)} URLs)")
-            write_sitemap_file(filename, urls)
-            sitemap_files.append(filename)
+        # Files from multipages or states that no longer exist.
+        for path in glob.glob(os.path.join(SITEMAP_DIR, "sitemap-*.xml.gz")):
+            if os.path.basename(path) not in files:
+                os.remove(path)
 
-        # ---------- Write Combined Sitemap Index ----------
-        index_lines = [
-            '<?xml version="1.0" encoding="UTF-8"?>',
-            '<?xml-stylesheet type="text/xsl" href="/static/sitemaps/sitemap.xsl"?>',
-            '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
-        ]
+        # Uncompressed sitemap-multipage-N.xml and sitemap-<state>-N.xml of the old layout.
+        for path in glob.glob(os.path.join(SITEMAP_DIR, "sitemap-*.xml")):
+            os.remove(path)
 
-        for fname in sitemap_files:
-            index_lines.append("  <sitemap>")
-            index_lines.append(f"    <loc>{BASE_URL}/static/sitemaps/{fname}</loc>")
-            index_lines.append(f"    <lastmod>{now}</lastmod>")
-            index_lines.append("  </sitemap>")
+        save_manifest(files)
 
-        # Optional: Add Django sitemap if needed
-        index_lines.append("  <sitemap>")
-        index_lines.append(f"    <loc>{BASE_URL}/sitemap-django.xml</loc>")
-        index_lines.append(f"    <lastmod>{now}</lastmod>")
-        index_lines.append("  </sitemap>")
-        index_lines.append("</sitemapindex>")
-
-        with open(os.path.join(SITEMAP_DIR, "sitemap_index.xml"), "w", encoding="utf-8") as f:
-            f.write("\n".join(index_lines))
+        # ---------- Write Combined Sitemap Index ----------
+        index_entries = [
+            (f"{BASE_URL}/static/sitemaps/{fname}", format_timestamp(entry["timestamp"]))
+            for fname, entry in sorted(files.items())
+        ]
+        index_entries.append((f"{BASE_URL}/sitemap-django.xml", format_lastmod()))
+        indexes = write_sitemap_index(index_entries)
 
+        elapsed = time.perf_counter() - start
         self.stdout.write(self.style.SUCCESS(
-            f"✅ Generated {len(sitemap_files)} sitemaps and index at: /static/sitemaps/sitemap_index.xml"
+            f"✅ Generated {len(files)} sitemaps ({len(files) - skipped} rewritten, {skipped} unchanged; "
+            f"{url_count} URLs in {elapsed:.1f}s, {url_count / elapsed:.0f} URLs/s) "
+            f"and {len(indexes)} index(es) at: {', '.join(f'/static/sitemaps/{name}' for name in indexes)}"
         ))
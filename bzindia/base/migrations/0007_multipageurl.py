@@ -0,0 +1,32 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0006_metatag_meta_description_metatag_meta_title'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MultipageUrl',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('multipage_type', models.CharField(max_length=20)),
+                ('multipage_id', models.PositiveBigIntegerField()),
+                ('location_type', models.CharField(max_length=10)),
+                ('location_id', models.PositiveBigIntegerField()),
+                ('path', models.CharField(max_length=500)),
+                ('image_count', models.PositiveIntegerField(default=0)),
+                ('lastmod', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'multipage_urls',
+                'unique_together': {('multipage_type', 'multipage_id', 'location_type', 'location_id')},
+                'indexes': [
+                    models.Index(fields=['path'], name='multipage_urls_path'),
+                    models.Index(fields=['location_type', 'location_id'], name='multipage_urls_location'),
+                ],
+            },
+        ),
+    ]
@@ -38,4 +38,28 @@ class MetaTag(models.Model):
 
     class Meta:
         db_table = "meta_tags"
-        ordering = ["name"]
\ No newline at end of file
+        ordering = ["name"]
+
+class MultipageUrl(models.Model):
+    """One URL of a multipage expanded over a location, maintained by base.url_catalog."""
+
+    multipage_type = models.CharField(max_length=20)
+    multipage_id = models.PositiveBigIntegerField()
+
+    location_type = models.CharField(max_length=10)
+    location_id = models.PositiveBigIntegerField()
+
+    path = models.CharField(max_length=500)
+    image_count = models.PositiveIntegerField(default=0)
+    lastmod = models.DateTimeField()
+
+    def __str__(self):
+        return self.path
+
+    class Meta:
+        db_table = "multipage_urls"
+        unique_together = ("multipage_type", "multipage_id", "location_type", "location_id")
+        indexes = [
+            models.Index(fields=["path"], name="multipage_urls_path"),
+            models.Index(fields=["location_type", "location_id"], name="multipage_urls_location"),
+        ]
@@ -0,0 +1,108 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from company.models import Company
+from educational.models import MultiPage as CourseMultiPage
+from locations.models import UniqueState, UniqueDistrict, UniquePlace
+from product.models import MultiPage as ProductMultiPage
+from registration.models import MultiPage as RegistrationMultiPage
+from service.models import MultiPage as ServiceMultiPage
+from utility.placeholders import TEMPLATE_FIELDS, template_store
+
+from .url_catalog import catalog_enabled, remove_location
+
+MULTIPAGE_TYPES = {
+    ServiceMultiPage: "service",
+    ProductMultiPage: "product",
+    CourseMultiPage: "course",
+    RegistrationMultiPage: "registration",
+}
+
+LOCATION_TYPES = {UniqueState: "state", UniqueDistrict: "district", UniquePlace: "place"}
+
+LOCATION_SYNC_LOCK = "base:url_catalog:location_sync_scheduled"
+LOCATION_SYNC_DELAY = 60
+
+
+def sync_on_commit(multipage_type, pk):
+    from .tasks import sync_multipage_urls
+    transaction.on_commit(lambda: sync_multipage_urls.delay(multipage_type, pk))
+
+
+def schedule_location_sync():
+    # Debounce: a bulk of location saves within the delay window is synced by one run.
+    if cache.add(LOCATION_SYNC_LOCK, 1, timeout=LOCATION_SYNC_DELAY):
+        from .tasks import sync_location_urls
+        sync_location_urls.apply_async(countdown=LOCATION_SYNC_DELAY)
+
+
+@receiver(post_save, sender=ServiceMultiPage)
+@receiver(post_save, sender=ProductMultiPage)
+@receiver(post_save, sender=CourseMultiPage)
+@receiver(post_save, sender=RegistrationMultiPage)
+def multipage_saved(sender, instance, **kwargs):
+    values = {field: getattr(instance, field) for field in TEMPLATE_FIELDS}
+    template_store.put(MULTIPAGE_TYPES[sender], instance.pk, instance.updated, values)
+
+    if catalog_enabled():
+        sync_on_commit(MULTIPAGE_TYPES[sender], instance.pk)
+
+
+@receiver(post_delete, sender=ServiceMultiPage)
+@receiver(post_delete, sender=ProductMultiPage)
+@receiver(post_delete, sender=CourseMultiPage)
+@receiver(post_delete, sender=RegistrationMultiPage)
+def multipage_deleted(sender, instance, **kwargs):
+    if catalog_enabled():
+        from .tasks import remove_multipage_urls
+        multipage_type, pk = MULTIPAGE_TYPES[sender], instance.pk
+        transaction.on_commit(lambda: remove_multipage_urls.delay(multipage_type, pk))
+
+
+@receiver(m2m_changed, sender=ServiceMultiPage.available_states.through)
+@receiver(m2m_changed, sender=ProductMultiPage.available_states.through)
+@receiver(m2m_changed, sender=CourseMultiPage.available_states.through)
+@receiver(m2m_changed, sender=RegistrationMultiPage.available_states.through)
+def multipage_states_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
+    # A clear is caught before it runs, while the multipages it detaches can still be found.
+    if not catalog_enabled() or action not in ("post_add", "post_remove", "pre_clear"):
+        return
+
+    if not reverse:
+        sync_on_commit(MULTIPAGE_TYPES[type(instance)], instance.pk)
+        return
+
+    # Changed from the state's side, pk_set holds multipages.
+    pks = pk_set if pk_set is not None else model.objects.filter(available_states=instance).values_list("pk", flat=True)
+    for pk in pks:
+        sync_on_commit(MULTIPAGE_TYPES[model], pk)
+
+
+@receiver(post_save, sender=Company)
+def company_saved(sender, instance, **kwargs):
+    # The company slug is part of every URL, its timestamp of every lastmod.
+    if not catalog_enabled() or kwargs.get("raw"):
+        return
+
+    for model, multipage_type in MULTIPAGE_TYPES.items():
+        for pk in model.objects.filter(company=instance).values_list("pk", flat=True):
+            sync_on_commit(multipage_type, pk)
+
+
+@receiver(post_save, sender=UniqueState)
+@receiver(post_save, sender=UniqueDistrict)
+@receiver(post_save, sender=UniquePlace)
+def location_saved(sender, instance, **kwargs):
+    if catalog_enabled():
+        transaction.on_commit(schedule_location_sync)
+
+
+@receiver(post_delete, sender=UniqueState)
+@receiver(post_delete, sender=UniqueDistrict)
+@receiver(post_delete, sender=UniquePlace)
+def location_deleted(sender, instance, **kwargs):
+    if catalog_enabled():
+        location_type, pk = LOCATION_TYPES[sender], instance.pk
+        transaction.on_commit(lambda: remove_location(location_type, pk))
@@ -0,0 +1,347 @@
+import glob
+import gzip
+import hashlib
+import itertools
+import json
+import os
+from datetime import datetime, timezone
+from functools import lru_cache
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+
+from utility.placeholders import compile_template, render_many
+
+SITEMAP_DIR = os.path.join(settings.BASE_DIR, "static", "sitemaps")
+MANIFEST_PATH = os.path.join(SITEMAP_DIR, "sitemap_manifest.json")
+BASE_URL = settings.SITE_URL.rstrip("/")
+CHUNK_SIZE = 25000
+# Sitemaps one index may list, per the sitemap protocol.
+INDEX_LIMIT = 50000
+
+URLSET_OPEN = '''<?xml version="1.0" encoding="UTF-8"?>
+<?xml-stylesheet type="text/xsl" href="/static/sitemaps/sitemap1.xsl"?>
+<urlset
+    xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
+    xmlns:image="http://www.google.com/schemas/sitemap-image/1.1"
+    xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
+    xmlns:bz="https://bzindia.in/schemas"
+    xsi:schemaLocation="http://www.sitemaps.org/schemas/sitemap/0.9
+    http://www.sitemaps.org/schemas/sitemap/0.9/sitemap.xsd">
+'''
+URLSET_CLOSE = "</urlset>"
+
+URL_ENTRY = '''  <url>
+    <loc>{loc}</loc>
+    <lastmod>{lastmod}</lastmod>
+    <changefreq>weekly</changefreq>
+    <priority>0.8</priority>
+    <bz:imageCount>{image_count}</bz:imageCount>
+  </url>
+'''
+
+
+def format_lastmod(value=None):
+    value = value or datetime.now(timezone.utc)
+    return value.astimezone(timezone.utc).replace(microsecond=0).isoformat().replace('+00:00', 'Z')
+
+
+@lru_cache(maxsize=65536)
+def format_timestamp(timestamp):
+    return format_lastmod(datetime.fromtimestamp(timestamp, timezone.utc))
+
+
+def to_timestamp(value):
+    return int(value.timestamp()) if value else 0
+
+
+def write_sitemap_file(filename, urls, directory=SITEMAP_DIR):
+    """Stream (loc, image_count, timestamp) rows into a gzipped urlset.
+
+    Returns the number of URLs and the newest timestamp written.
+    """
+    path = os.path.join(directory, filename)
+    tmp_path = f"{path}.tmp"
+    count = 0
+    newest = 0
+
+    with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=6) as f:
+        f.write(URLSET_OPEN)
+        for loc, image_count, timestamp in urls:
+            f.write(URL_ENTRY.format(loc=escape(loc), lastmod=format_timestamp(timestamp), image_count=image_count))
+            count += 1
+            newest = max(newest, timestamp)
+        f.write(URLSET_CLOSE)
+
+    os.replace(tmp_path, path)
+    return count, newest
+
+
+def index_filename(number):
+    return "sitemap_index.xml" if number == 1 else f"sitemap_index-{number}.xml"
+
+
+def write_sitemap_index(entries, directory=SITEMAP_DIR, limit=INDEX_LIMIT):
+    """Write (loc, lastmod) pairs to sitemap_index.xml, continued in sitemap_index-N.xml past ``limit``.
+
+    Indexes can't list other indexes, every one is submitted on its own.
+    Returns the filenames written and removes the ones no longer needed.
+    """
+    filenames = []
+
+    for number, chunk in enumerate(chunked(entries, limit), start=1):
+        filename = index_filename(number)
+        path = os.path.join(directory, filename)
+
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+            f.write('<?xml-stylesheet type="text/xsl" href="/static/sitemaps/sitemap.xsl"?>\n')
+            f.write('<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+            for loc, lastmod in chunk:
+                f.write(f"  <sitemap>\n    <loc>{escape(loc)}</loc>\n    <lastmod>{lastmod}</lastmod>\n  </sitemap>\n")
+            f.write("</sitemapindex>")
+
+        os.replace(f"{path}.tmp", path)
+        filenames.append(filename)
+
+    for path in glob.glob(os.path.join(directory, "sitemap_index-*.xml")):
+        if os.path.basename(path) not in filenames:
+            os.remove(path)
+
+    return filenames
+
+
+def load_manifest(path=MANIFEST_PATH):
+    """{filename: {"hash", "timestamp", "urls"}} recorded by the previous run."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f).get("files", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(files, path=MANIFEST_PATH):
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump({"generated": format_lastmod(), "files": files}, f, separators=(",", ":"), sort_keys=True)
+
+    os.replace(f"{path}.tmp", path)
+
+
+def chunked(rows, chunk_size=CHUNK_SIZE):
+    """Split an iterator into consecutive lists of at most ``chunk_size``."""
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def digest(*parts):
+    sha = hashlib.sha1()
+    for part in parts:
+        sha.update(repr(part).encode("utf-8"))
+        sha.update(b"\x00")
+    return sha.hexdigest()
+
+
+def multipage_models():
+    from company.registry import REGISTRY
+
+    return {detail_type.kind: detail_type.multipages() for detail_type in REGISTRY.values()}
+
+
+def multipage_tasks():
+    """Every (type, pk) to render, the unit of work handed to the workers."""
+    return [
+        (_type, pk)
+        for _type, queryset in multipage_models().items()
+        for pk in queryset.order_by("pk").values_list("pk", flat=True)
+    ]
+
+
+class SitemapLocations:
+    """Location slugs every multipage is expanded over, loaded once per run.
+
+    ``location_slugs`` holds (slug, timestamp) for slug_filtered pages and
+    ``place_rows`` holds (state, district, district timestamp, place, place
+    timestamp) for location_filtered pages. Both are cut into fixed chunks
+    whose digests are computed once and shared by every multipage.
+    """
+
+    def __init__(self, location_slugs, place_rows, chunk_size=CHUNK_SIZE):
+        self.location_slugs = location_slugs
+        self.place_rows = place_rows
+        self.chunk_size = chunk_size
+        # Every place yields a district and a place URL.
+        self.place_step = chunk_size // 2
+
+        self.slug_digests = [
+            digest(location_slugs[start:start + chunk_size]) for start in range(0, len(location_slugs), chunk_size)
+        ]
+        self.place_digests = [
+            digest(place_rows[start:start + self.place_step]) for start in range(0, len(place_rows), self.place_step)
+        ]
+
+    @classmethod
+    def load(cls):
+        from locations.models import UniquePlace, UniqueState, UniqueDistrict
+
+        # A slug shared by several locations takes the newest of their timestamps.
+        slugs = {}
+        for model in (UniquePlace, UniqueDistrict, UniqueState):
+            rows = model.objects.exclude(slug=None).values_list("slug", "updated").iterator(chunk_size=20000)
+            for slug, updated in rows:
+                slugs[slug] = max(slugs.get(slug, 0), to_timestamp(updated))
+
+        places = UniquePlace.objects.order_by("pk").values_list(
+            "state__slug", "district__slug", "district__updated", "slug", "updated"
+        )
+        place_rows = [
+            (state_slug, district_slug, to_timestamp(district_updated), place_slug, to_timestamp(place_updated))
+            for state_slug, district_slug, district_updated, place_slug, place_updated in places.iterator(chunk_size=20000)
+        ]
+        return cls(sorted(slugs.items()), place_rows)
+
+
+def multipage_signature(_type, page):
+    return (
+        _type, page.pk, page.slug, page.url_type, page.image_count or 0,
+        page.company.slug, to_timestamp(page.updated), to_timestamp(page.company.updated),
+    )
+
+
+def multipage_chunks(_type, page, locations):
+    """Yield (chunk number, input hash, URL iterator) for one multipage.
+
+    Chunks are fixed slices of the location lists, so a chunk number always
+    covers the same locations and its hash only changes with its inputs.
+    """
+    signature = multipage_signature(_type, page)
+    base_slug = page.slug or ""
+    company_slug = page.company.slug
+    image_count = page.image_count or 0
+    page_timestamp = max(to_timestamp(page.updated), to_timestamp(page.company.updated))
+
+    if page.url_type == "slug_filtered":
+        slugs, size = locations.location_slugs, locations.chunk_size
+        tokens = compile_template(base_slug)
+        for number, chunk_digest in enumerate(locations.slug_digests, start=1):
+            start = (number - 1) * size
+            chunk = slugs[start:start + size]
+            paths = render_many(tokens, (location_slug for location_slug, _ in chunk))
+            yield number, digest(signature, chunk_digest), (
+                (f"{BASE_URL}/{company_slug}/{path}/", image_count, max(page_timestamp, timestamp))
+                for path, (_, timestamp) in zip(paths, chunk)
+            )
+
+    elif page.url_type == "location_filtered":
+        rows, size = locations.place_rows, locations.place_step
+        for number, chunk_digest in enumerate(locations.place_digests, start=1):
+            start = (number - 1) * size
+            yield number, digest(signature, chunk_digest), (
+                (f"{BASE_URL}/{company_slug}/{base_slug}/{state_slug}/{region_slug}/", image_count, max(page_timestamp, timestamp))
+                for state_slug, district_slug, district_timestamp, place_slug, place_timestamp in rows[start:start + size]
+                for region_slug, timestamp in ((district_slug, district_timestamp), (place_slug, place_timestamp))
+            )
+
+
+def catalog_chunks(_type, pk, chunk_size=CHUNK_SIZE):
+    """Like ``multipage_chunks``, streamed from the materialized MultipageUrl catalog.
+
+    Rows are scanned in path order and a path shared by several locations
+    (a slug used by more than one of them) is written once.
+    """
+    from base.models import MultipageUrl
+
+    rows = MultipageUrl.objects.filter(multipage_type=_type, multipage_id=pk).order_by("path").values_list(
+        "path", "image_count", "lastmod"
+    )
+
+    def urls():
+        for path, group in itertools.groupby(rows.iterator(chunk_size=20000), key=lambda row: row[0]):
+            group = list(group)
+            yield (
+                f"{BASE_URL}{path}", max(row[1] for row in group), max(to_timestamp(row[2]) for row in group)
+            )
+
+    for number, chunk in enumerate(chunked(urls(), chunk_size), start=1):
+        yield number, digest(chunk), iter(chunk)
+
+
+def multipage_filename(_type, pk, number):
+    return f"sitemap-{_type}-multipage-{pk}-{number}.xml.gz"
+
+
+_locations = None
+_manifest = {}
+_incremental = False
+
+
+def init_worker(locations, manifest, incremental):
+    global _locations, _manifest, _incremental
+    _locations = locations
+    _manifest = manifest
+    _incremental = incremental
+
+
+def is_current(filename, chunk_hash, manifest=None):
+    entry = (_manifest if manifest is None else manifest).get(filename)
+    return bool(entry) and entry["hash"] == chunk_hash and os.path.exists(os.path.join(SITEMAP_DIR, filename))
+
+
+def write_multipage_sitemaps(task):
+    """Write the chunks of one multipage, skipping unchanged ones in incremental mode.
+
+    Returns ({filename: manifest entry}, URLs written, chunks skipped).
+    """
+    _type, pk = task
+    page = multipage_models()[_type].filter(pk=pk).first()
+    if page is None:
+        return {}, 0, 0
+
+    files = {}
+    written = 0
+    skipped = 0
+
+    if getattr(settings, "MULTIPAGE_URL_CATALOG", False):
+        chunks = catalog_chunks(_type, pk)
+    else:
+        chunks = multipage_chunks(_type, page, _locations)
+
+    for number, chunk_hash, urls in chunks:
+        filename = multipage_filename(_type, pk, number)
+
+        if _incremental and is_current(filename, chunk_hash):
+            files[filename] = _manifest[filename]
+            skipped += 1
+            continue
+
+        count, newest = write_sitemap_file(filename, urls)
+        files[filename] = {"hash": chunk_hash, "timestamp": newest, "urls": count}
+        written += count
+
+    return files, written, skipped
+
+
+def state_sitemaps():
+    """Yield (state name, row iterator) with the state, its districts and its places."""
+    from locations.models import UniqueState, UniqueDistrict, UniquePlace
+
+    states = UniqueState.objects.order_by("name").values_list("pk", "name", "slug", "updated")
+
+    for state_id, state_name, state_slug, state_updated in states:
+        def urls(state_id=state_id, state_slug=state_slug, state_updated=state_updated):
+            yield f"{BASE_URL}/state-list-in-india/{state_slug}/", 6, to_timestamp(state_updated)
+
+            districts = UniqueDistrict.objects.filter(state_id=state_id).order_by("slug").values_list("slug", "updated")
+            for district_slug, updated in districts.iterator(chunk_size=5000):
+                yield f"{BASE_URL}/state-list-in-india/{state_slug}/{district_slug}/", 6, to_timestamp(updated)
+
+            places = UniquePlace.objects.filter(state_id=state_id).order_by("district__slug", "slug").values_list(
+                "district__slug", "slug", "updated"
+            )
+            for district_slug, place_slug, updated in places.iterator(chunk_size=5000):
+                yield f"{BASE_URL}/state-list-in-india/{state_slug}/{district_slug}/{place_slug}/", 6, to_timestamp(updated)
+
+        yield state_name, urls()
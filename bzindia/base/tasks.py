@@ -0,0 +1,23 @@
+import logging
+
+from celery import shared_task
+
+from . import url_catalog
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def sync_multipage_urls(multipage_type, pk):
+    counts = url_catalog.sync_page(multipage_type, pk)
+    logger.info(f"Synced multipage URL catalog of {multipage_type} multipage {pk}: {counts}")
+
+
+@shared_task
+def remove_multipage_urls(multipage_type, pk):
+    url_catalog.remove_page(multipage_type, pk)
+
+
+@shared_task
+def sync_location_urls():
+    url_catalog.sync_locations()
@@ -0,0 +1,283 @@
+import itertools
+import logging
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max, Q
+
+from utility.placeholders import compile_template, render_many
+
+from .sitemap_writer import multipage_models
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 5000
+
+# Location changes are synced since this watermark by the debounced sync_location_urls task.
+LOCATION_WATERMARK_KEY = "base:url_catalog:location_watermark"
+
+# Merge order of the location types, the rows of each type are read in pk order.
+LOCATION_TYPES = ("district", "place", "state")
+
+URL_TYPE_LOCATIONS = {
+    "slug_filtered": ("district", "place", "state"),
+    "location_filtered": ("district", "place"),
+}
+
+
+def catalog_enabled():
+    return getattr(settings, "MULTIPAGE_URL_CATALOG", False)
+
+
+def location_model(location_type):
+    from locations.models import UniqueState, UniqueDistrict, UniquePlace
+
+    return {"state": UniqueState, "district": UniqueDistrict, "place": UniquePlace}[location_type]
+
+
+def location_queryset(location_type, state_ids, pks=None):
+    """Locations of one type with a slug, limited to ``state_ids`` when the page names its states."""
+    queryset = location_model(location_type).objects.exclude(slug=None)
+
+    if state_ids:
+        queryset = queryset.filter(pk__in=state_ids) if location_type == "state" else queryset.filter(state__in=state_ids)
+
+    if pks is not None:
+        queryset = queryset.filter(pk__in=pks)
+
+    return queryset.order_by("pk")
+
+
+def page_urls(page, changes=None):
+    """Yield (location type, location id, path, location updated) for every URL of ``page``.
+
+    Rows come in (location type, location id) order. Pages with available
+    states are expanded over those states only, pages without over every
+    location. ``changes`` ({location type: pks}) limits the locations read.
+    """
+    location_types = URL_TYPE_LOCATIONS.get(page.url_type, ())
+    state_ids = [state.pk for state in page.available_states.all()]
+    company_slug = page.company.slug
+    slug = page.slug or ""
+
+    for location_type in LOCATION_TYPES:
+        if location_type not in location_types or (changes is not None and location_type not in changes):
+            continue
+
+        queryset = location_queryset(location_type, state_ids, None if changes is None else changes[location_type])
+
+        if page.url_type == "slug_filtered":
+            tokens = compile_template(slug)
+            rows, slugs = itertools.tee(queryset.values_list("pk", "slug", "updated").iterator(chunk_size=20000))
+            paths = render_many(tokens, (location_slug for _, location_slug, _ in slugs))
+            for (pk, _, updated), path in zip(rows, paths):
+                yield location_type, pk, f"/{company_slug}/{path}/", updated
+
+        else:
+            rows = queryset.values_list("pk", "state__slug", "slug", "updated")
+            for pk, state_slug, location_slug, updated in rows.iterator(chunk_size=20000):
+                yield location_type, pk, f"/{company_slug}/{slug}/{state_slug}/{location_slug}/", updated
+
+
+class CatalogWriter:
+    """Buffers catalog inserts, updates and deletes into bulk queries."""
+
+    def __init__(self, batch_size=BATCH_SIZE):
+        from .models import MultipageUrl
+
+        self.model = MultipageUrl
+        self.batch_size = batch_size
+        self.creates = []
+        self.updates = []
+        self.deletes = []
+        self.counts = {"created": 0, "updated": 0, "deleted": 0}
+
+    def create(self, **fields):
+        self.creates.append(self.model(**fields))
+        if len(self.creates) >= self.batch_size:
+            self.flush_creates()
+
+    def update(self, pk, **fields):
+        self.updates.append(self.model(pk=pk, **fields))
+        if len(self.updates) >= self.batch_size:
+            self.flush_updates()
+
+    def delete(self, pk):
+        self.deletes.append(pk)
+        if len(self.deletes) >= self.batch_size:
+            self.flush_deletes()
+
+    def flush_creates(self):
+        self.model.objects.bulk_create(self.creates, batch_size=self.batch_size)
+        self.counts["created"] += len(self.creates)
+        self.creates = []
+
+    def flush_updates(self):
+        self.model.objects.bulk_update(self.updates, ["path", "image_count", "lastmod"], batch_size=self.batch_size)
+        self.counts["updated"] += len(self.updates)
+        self.updates = []
+
+    def flush_deletes(self):
+        self.model.objects.filter(pk__in=self.deletes).delete()
+        self.counts["deleted"] += len(self.deletes)
+        self.deletes = []
+
+    def flush(self):
+        self.flush_creates()
+        self.flush_updates()
+        self.flush_deletes()
+        return self.counts
+
+
+def sync_page(multipage_type, pk, changes=None, writer=None):
+    """Bring the catalog rows of one multipage in line with the page and its locations.
+
+    Existing rows and expected URLs are both read in (location type,
+    location id) order and merged, so memory stays flat however many
+    locations a page expands to. Returns the writer's counts.
+    """
+    from .models import MultipageUrl
+
+    own_writer = writer is None
+    writer = writer or CatalogWriter()
+
+    existing = MultipageUrl.objects.filter(multipage_type=multipage_type, multipage_id=pk)
+    if changes is not None:
+        locations = Q()
+        for location_type, location_ids in changes.items():
+            locations |= Q(location_type=location_type, location_id__in=location_ids)
+        existing = existing.filter(locations) if changes else existing.none()
+
+    page = multipage_models()[multipage_type].prefetch_related("available_states").filter(pk=pk).first()
+
+    if page is None:
+        for row_pk in existing.values_list("pk", flat=True).iterator(chunk_size=20000):
+            writer.delete(row_pk)
+        return writer.flush() if own_writer else writer.counts
+
+    page_updated = max(page.updated or datetime.min, page.company.updated or datetime.min)
+    image_count = page.image_count or 0
+
+    # Saving a page moves every lastmod and often nothing else, one UPDATE
+    # catches those up before the merge instead of rewriting row by row.
+    existing.filter(lastmod__lt=page_updated).update(lastmod=page_updated)
+    existing.exclude(image_count=image_count).update(image_count=image_count)
+
+    current = existing.order_by("location_type", "location_id").values_list(
+        "pk", "location_type", "location_id", "path", "image_count", "lastmod"
+    ).iterator(chunk_size=20000)
+    row = next(current, None)
+
+    for location_type, location_id, path, updated in page_urls(page, changes):
+        lastmod = max(page_updated, updated or datetime.min)
+
+        while row is not None and (row[1], row[2]) < (location_type, location_id):
+            writer.delete(row[0])
+            row = next(current, None)
+
+        if row is not None and (row[1], row[2]) == (location_type, location_id):
+            if (row[3], row[4], row[5]) != (path, image_count, lastmod):
+                writer.update(row[0], path=path, image_count=image_count, lastmod=lastmod)
+            row = next(current, None)
+        else:
+            writer.create(
+                multipage_type=multipage_type, multipage_id=pk, location_type=location_type,
+                location_id=location_id, path=path, image_count=image_count, lastmod=lastmod,
+            )
+
+    while row is not None:
+        writer.delete(row[0])
+        row = next(current, None)
+
+    return writer.flush() if own_writer else writer.counts
+
+
+def sync_all(multipage_type=None, batch_size=BATCH_SIZE):
+    """Sync every multipage, or every one of ``multipage_type``, returning the total counts."""
+    started = datetime.now()
+    writer = CatalogWriter(batch_size)
+
+    for _type, queryset in multipage_models().items():
+        if multipage_type and _type != multipage_type:
+            continue
+
+        for pk in queryset.order_by("pk").values_list("pk", flat=True):
+            sync_page(_type, pk, writer=writer)
+            writer.flush()
+
+        # Rows of pages deleted while the catalog was not maintained.
+        from .models import MultipageUrl
+        stale = MultipageUrl.objects.filter(multipage_type=_type).exclude(multipage_id__in=queryset.values("pk"))
+        writer.counts["deleted"] += stale.delete()[0]
+
+    # A full sync covers every location change made before it started.
+    if not multipage_type:
+        cache.set(LOCATION_WATERMARK_KEY, started, timeout=None)
+
+    return writer.counts
+
+
+def changed_locations(since):
+    """{location type: pks} of the locations updated at or after ``since``.
+
+    Districts and places of a changed state are included, their
+    location filtered paths embed the state's slug.
+    """
+    changes = {
+        location_type: set(location_model(location_type).objects.filter(updated__gte=since).values_list("pk", flat=True))
+        for location_type in LOCATION_TYPES
+    }
+
+    if changes["state"]:
+        for location_type in ("district", "place"):
+            in_states = location_model(location_type).objects.filter(state__in=changes["state"]).values_list("pk", flat=True)
+            changes[location_type].update(in_states.iterator(chunk_size=20000))
+
+    return {location_type: sorted(pks) for location_type, pks in changes.items()}
+
+
+def sync_locations(since=None):
+    """Sync the catalog rows of locations changed since the watermark, across every multipage.
+
+    Without a stored watermark, the newest lastmod in the catalog stands in;
+    the build_multipage_catalog command reconciles anything that misses.
+    """
+    from .models import MultipageUrl
+
+    started = datetime.now()
+    since = since or cache.get(LOCATION_WATERMARK_KEY) or MultipageUrl.objects.aggregate(newest=Max("lastmod"))["newest"]
+    if since is None:
+        return {"created": 0, "updated": 0, "deleted": 0}
+
+    changes = changed_locations(since)
+    writer = CatalogWriter()
+
+    if any(changes.values()):
+        for _type, queryset in multipage_models().items():
+            for pk in queryset.order_by("pk").values_list("pk", flat=True):
+                sync_page(_type, pk, changes, writer=writer)
+
+    counts = writer.flush()
+    cache.set(LOCATION_WATERMARK_KEY, started, timeout=None)
+    logger.info(f"Multipage URL catalog synced {sum(map(len, changes.values()))} changed locations: {counts}")
+    return counts
+
+
+def remove_location(location_type, pk):
+    from .models import MultipageUrl
+
+    return MultipageUrl.objects.filter(location_type=location_type, location_id=pk).delete()[0]
+
+
+def remove_page(multipage_type, pk):
+    from .models import MultipageUrl
+
+    return MultipageUrl.objects.filter(multipage_type=multipage_type, multipage_id=pk).delete()[0]
+
+
+def lookup(path):
+    """The catalog row serving ``path``, an indexed lookup, or None when no multipage has that URL."""
+    from .models import MultipageUrl
+
+    return MultipageUrl.objects.filter(path=path).order_by("pk").first()
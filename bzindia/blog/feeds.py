@@ -1,5 +1,4 @@
-from django.http import HttpResponse
-from django.contrib.syndication.views import Feed
+from utility.feed_cache import CachedFeed
 from .models import Blog
 from utility.custom_feed import ContentEncodedFeed
 from home.models import HomeContent
@@ -7,7 +6,7 @@ from django.utils.text import Truncator
 from django.utils.html import strip_tags
 from django.shortcuts import get_object_or_404
 
-class BlogFeed(Feed):
+class BlogFeed(CachedFeed):
     feed_type = ContentEncodedFeed
     title = "BZ India - Find the top companies in India"
     link = "/blog/feed/"
@@ -61,16 +60,10 @@ class BlogFeed(Feed):
 
 # Optional: Serve with XML stylesheet
 class StyledBlogFeed(BlogFeed):
-    def __call__(self, request, *args, **kwargs):
-        feedgen = self.get_feed(self.get_object(request, *args, **kwargs), request)
-        response = HttpResponse(content_type=feedgen.content_type)
-        response.write('<?xml version="1.0" encoding="utf-8"?>\n')
-        response.write('<?xml-stylesheet type="text/xsl" href="/static/rss-stylesheet.xsl"?>\n')
-        feedgen.write(response, 'utf-8')
-        return response
+    stylesheet = True
 
 
-class BlogDetailFeed(Feed):
+class BlogDetailFeed(CachedFeed):
     feed_type = ContentEncodedFeed    
 
     def get_object(self, request, blog_slug):
@@ -109,10 +102,4 @@ class BlogDetailFeed(Feed):
 
 # Optional: Serve with XML stylesheet
 class StyledBlogDetailFeed(BlogDetailFeed):
-    def __call__(self, request, *args, **kwargs):
-        feedgen = self.get_feed(self.get_object(request, *args, **kwargs), request)
-        response = HttpResponse(content_type=feedgen.content_type)
-        response.write('<?xml version="1.0" encoding="utf-8"?>\n')
-        response.write('<?xml-stylesheet type="text/xsl" href="/static/rss-stylesheet.xsl"?>\n')
-        feedgen.write(response, 'utf-8')
-        return response
+    stylesheet = True
@@ -1,16 +1,32 @@
 from rest_framework import serializers
 from django.conf import settings
 from datetime import datetime
-from django.db.models import Q
+from django.db.models import Q, Count
 
 from blog.models import Blog
 from meta_api.serializers import MetaTagSerializer
+from utility.dataloader import BatchedListSerializer, DataLoaderMixin
 
-class BlogSerializer(serializers.ModelSerializer):
+
+def category_counts(names):
+    """(category name, count) pairs of the blogs filed under any of ``names``, one grouped query."""
+    rows = Blog.objects.filter(
+        Q(course__name__in=names) | Q(product__name__in=names) | Q(service__name__in=names) | Q(registration__title__in=names)
+    ).values_list("course__name", "product__name", "service__name", "registration__title").annotate(count=Count("id")).order_by()
+
+    for *row_names, count in rows:
+        for name in set(row_names) & names:
+            yield name, count
+
+
+class BlogSerializer(DataLoaderMixin, serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
     published_on = serializers.SerializerMethodField()
     meta_tags = MetaTagSerializer(many=True, read_only=True)
     company_slug = serializers.CharField(source="company.slug", read_only = True)
+    category_count = serializers.SerializerMethodField()
+
+    dataloaders = {"blog_category_counts": ("category", category_counts)}
 
     class Meta:
         model = Blog
@@ -20,6 +36,15 @@ class BlogSerializer(serializers.ModelSerializer):
             "category", "category_slug", "published_on", "company", "content",
             "category_count", "meta_description", "company_slug",            
             ]
+        select_related = ["course", "product", "service", "registration"]
+        list_serializer_class = BatchedListSerializer
+
+    def get_category_count(self, obj):
+        category = obj.category
+        if category is None:
+            return obj.category_count
+
+        return sum(self.load("blog_category_counts", obj))
         
     def get_image_url(self, obj):
         request = self.context.get('request')
@@ -20,6 +20,12 @@ load_dotenv()
 
 OPENCAGE_API_KEY = os.getenv('OPENCAGE_API_KEY')
 
+# Keys shared by the async geocoding engine (locations.geocoding), each with its own rate limit and daily quota
+OPENCAGE_API_KEYS = [os.getenv(f'OPENCAGE_API_KEY_{n}') for n in (1, 2, 3)]
+OPENCAGE_URL = os.getenv('OPENCAGE_URL', 'https://api.opencagedata.com/geocode/v1/json')
+OPENCAGE_REQUESTS_PER_SECOND = 4
+OPENCAGE_DAILY_QUOTA = 6666
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -283,4 +289,51 @@ SIMPLE_JWT = {
     "ROTATE_REFRESH_TOKENS": True,
 }
 
-GEOIP_PATH = os.path.join(BASE_DIR, 'geoip')
\ No newline at end of file
+GEOIP_PATH = os.path.join(BASE_DIR, 'geoip')
+
+# Memory-mapped location suffix index, built by `manage.py build_suffix_index`
+LOCATION_SUFFIX_INDEX_PATH = os.path.join(BASE_DIR, 'location_index', 'suffix.idx')
+
+# Serve search_api from the full-text SearchDocument table, False pages through the detail models directly
+SEARCH_DOCUMENT_INDEX = True
+
+# Viewsets using utility.prefetch.PlannedQuerysetMixin measure their queries per request,
+# failing over budget in strict mode and logging a warning otherwise
+QUERY_BUDGET_CHECKS = False
+QUERY_BUDGET_STRICT = False
+QUERY_BUDGET_SLACK = 10
+
+# Rendered multipage landing pages, shared across locations and purged by cache tags on model changes
+MULTIPAGE_RESPONSE_CACHE = True
+MULTIPAGE_CACHE_TIMEOUT = 60 * 60 * 6
+
+# Service detail pages inlined per category in category listings, the total is in detail_pages_count
+SERVICE_CATEGORY_DETAIL_PAGES = 12
+
+# Multipage URLs are read from the materialized multipage_urls table, build it with build_multipage_catalog before enabling
+MULTIPAGE_URL_CATALOG = False
+
+# Overpass responses are cached, gzipped, in OVERPASS_CACHE_DIR (default BASE_DIR/cache), least recently used ones evicted past the size bound
+OVERPASS_CACHE_MAX_BYTES = 1024 ** 3
+OVERPASS_REPLAY = False
+
+# GeoIP results are cached per network block (/24, /48), in process and in the shared cache
+GEOIP_CACHE_SIZE = 50000
+GEOIP_REDIS_CACHE = True
+
+# Location expanded feeds: items per multipage kind, nearest places first, cached per nearest place
+GEO_FEED_ITEM_LIMIT = 60
+GEO_FEED_CACHE_TIMEOUT = 60 * 15
+
+# Compiled placeholder templates of multipages kept in process, beyond those in the shared cache
+PLACEHOLDER_TEMPLATE_CACHE_SIZE = 2000
+
+# Computed company properties (categories, rating, clients, add on types, price range) cached per company, versions bumped by signals
+COMPANY_SUMMARY_TIMEOUT = 60 * 60 * 6
+
+# Rendered feeds are cached per feed, path and version (ETag), and polls matching ETag or Last-Modified get a 304
+FEED_CACHE = True
+FEED_CACHE_TIMEOUT = 60 * 60
+
+# Company types are kept in process by id, reloaded after this many seconds
+COMPANY_TYPE_CACHE_TTL = 300
\ No newline at end of file
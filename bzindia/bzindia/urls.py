@@ -151,23 +151,14 @@ urlpatterns += [
         name='sitemap-index'
     ),
 
-    # ✅ Serve static multipage sitemaps like /sitemap-multipage-1.xml
+    # ✅ Serve the index continuations past 50,000 sitemaps at /sitemap_index-2.xml...
     re_path(
-        r'^(?P<path>sitemap-multipage-\d+\.xml)$',
+        r'^(?P<path>sitemap_index-\d+\.xml)$',
         serve,
         {
             'document_root': os.path.join(settings.BASE_DIR, 'static', 'sitemaps'),
         },
-        name='multipage-sitemap'
-    ),
-
-    re_path(
-        r'^sitemap-[a-z0-9\-]+-\d+\.xml$',
-        serve,
-        {
-            'document_root': os.path.join(settings.BASE_DIR, 'static', 'sitemaps'),
-        },
-        name='location-sitemap'
+        name='sitemap-index-part'
     ),
 
     # re_path(
@@ -1,14 +1,10 @@
-from django.http import HttpResponse
-from django.contrib.syndication.views import Feed
+from utility.feed_cache import CachedFeed
 from .models import Company
+from .registry import for_company, for_page, type_name
 from utility.custom_feed import ContentEncodedFeed
 from django.shortcuts import get_object_or_404
 from django.utils.text import slugify
 
-from product.models import ProductDetailPage
-from service.models import ServiceDetail
-from registration.models import RegistrationDetailPage
-from educational.models import CourseDetail
 from blog.models import Blog
 
 from django.utils.html import escape
@@ -21,7 +17,7 @@ from custom_pages.models import (
     ShippingAndDeliveryPolicy, CancellationAndRefundPolicy
     )
 
-class CompanyFeed(Feed):
+class CompanyFeed(CachedFeed):
     feed_type = ContentEncodedFeed
     title = "BZ India - Find the top companies in India"
     description = "BZ India blog feed updates."
@@ -39,34 +35,25 @@ class CompanyFeed(Feed):
         return obj.meta_description if obj.meta_description else obj.name
 
     def items(self, obj):
-        if (obj.type.name == "Service"):
-            return ServiceDetail.objects.filter(company=obj).order_by('-created')[:15]
-        elif (obj.type.name == "Education"):
-            return CourseDetail.objects.filter(company=obj).order_by('-created')[:15]
-        elif (obj.type.name == "Registration"):
-            return RegistrationDetailPage.objects.filter(company=obj).order_by('-created')[:15]
-        elif (obj.type.name == "Product"):
-            return ProductDetailPage.objects.filter(company=obj).order_by('-created')[:15]
-        
-        return []
+        detail_type = for_company(obj)
+        if detail_type is None:
+            return []
 
-    def item_title(self, item):
-        if (item.company.type.name == "Service"):
-            return item.service.name
-        elif (item.company.type.name == "Education"):
-            return item.course.name
-        elif (item.company.type.name == "Registration"):
-            return item.registration_sub_type.name
-        elif (item.company.type.name == "Product"):
-            return item.product.name
+        return detail_type.details().filter(company=obj).order_by('-created')[:15]
+
+    def item_image(self, item):
+        detail_type = for_page(item)
+        return detail_type.image(item) if detail_type else None
 
-        return ""
+    def item_title(self, item):
+        detail_type = for_page(item)
+        return (detail_type.title(item) if detail_type else None) or ""
 
     def item_description(self, item):
         return item.meta_description or ""
 
     def item_link(self, item):
-        return f"/{slugify(item.company.type.name)}/{item.company.slug}/{item.slug}/"
+        return f"/{slugify(type_name(item.company))}/{item.company.slug}/{item.slug}/"
 
     def item_guid(self, item):
         return f"{item.pk}-{item.slug}"
@@ -78,40 +65,15 @@ class CompanyFeed(Feed):
         return item.company.name if item.company else "BZ India"
 
     def item_enclosure_url(self, item):
-        if (item.company.type.name == "Service"):
-            return item.service.image.url if item.service.image else None
-        elif (item.company.type.name == "Education"):
-            return item.course.image.url if item.course.image else None
-        elif (item.company.type.name == "Registration"):
-            return item.registration_sub_type.image.url if item.registration_sub_type.image else None
-        elif (item.company.type.name == "Product"):
-            return item.product.image.url if item.product.image else None
-        
-        return None
+        image = self.item_image(item)
+        return image.url if image else None
 
     def item_enclosure_length(self, item):
-        if (item.company.type.name == "Service"):
-            return item.service.image.size if item.service.image else 0
-        elif (item.company.type.name == "Education"):
-            return item.course.image.size if item.course.image else 0
-        elif (item.company.type.name == "Registration"):
-            return item.registration_sub_type.image.size if item.registration_sub_type.image else 0
-        elif (item.company.type.name == "Product"):
-            return item.product.image.size if item.product.image else 0
-        
-        return 0
+        image = self.item_image(item)
+        return image.size if image else 0
 
     def item_enclosure_mime_type(self, item):
-        if (item.company.type.name == "Service"):
-            return "image/jpeg" if item.service.image else None
-        elif (item.company.type.name == "Education"):
-            return "image/jpeg" if item.course.image else None
-        elif (item.company.type.name == "Registration"):
-            return "image/jpeg" if item.registration_sub_type.image else None
-        elif (item.company.type.name == "Product"):
-            return "image/jpeg" if item.product.image else None
-
-        return  None
+        return "image/jpeg" if self.item_image(item) else None
 
     def item_extra_kwargs(self, item):
         return {
@@ -120,16 +82,10 @@ class CompanyFeed(Feed):
 
 # Optional: Serve with XML stylesheet
 class StyledCompanyFeed(CompanyFeed):
-    def __call__(self, request, *args, **kwargs):
-        feedgen = self.get_feed(self.get_object(request, *args, **kwargs), request)
-        response = HttpResponse(content_type=feedgen.content_type)
-        response.write('<?xml version="1.0" encoding="utf-8"?>\n')
-        response.write('<?xml-stylesheet type="text/xsl" href="/static/rss-stylesheet.xsl"?>\n')
-        feedgen.write(response, 'utf-8')
-        return response
+    stylesheet = True
 
 
-class ContactFeed(Feed):
+class ContactFeed(CachedFeed):
     feed_type = ContentEncodedFeed
 
     def get_object(self, request, company_slug):
@@ -178,16 +134,10 @@ class ContactFeed(Feed):
 
 # Optional: Serve with XML stylesheet
 class StyledContactFeed(ContactFeed):
-    def __call__(self, request, *args, **kwargs):
-        feedgen = self.get_feed(self.get_object(request, *args, **kwargs), request)
-        response = HttpResponse(content_type=feedgen.content_type)
-        response.write('<?xml version="1.0" encoding="utf-8"?>\n')
-        response.write('<?xml-stylesheet type="text/xsl" href="/static/rss-stylesheet.xsl"?>\n')
-        feedgen.write(response, 'utf-8')
-        return response
+    stylesheet = True
     
 
-class CompanyAboutFeed(Feed):
+class CompanyAboutFeed(CachedFeed):
     feed_type = ContentEncodedFeed
 
     def get_object(self, request, company_slug):
@@ -225,16 +175,10 @@ class CompanyAboutFeed(Feed):
 
 # Optional: Serve with XML stylesheet
 class StyledCompanyAboutFeed(CompanyAboutFeed):
-    def __call__(self, request, *args, **kwargs):
-        feedgen = self.get_feed(self.get_object(request, *args, **kwargs), request)
-        response = HttpResponse(content_type=feedgen.content_type)
-        response.write('<?xml version="1.0" encoding="utf-8"?>\n')
-        response.write('<?xml-stylesheet type="text/xsl" href="/static/rss-stylesheet.xsl"?>\n')
-        feedgen.write(response, 'utf-8')
-        return response
+    stylesheet = True
     
 
-class CompanyPrivacyPolicyFeed(Feed):
+class CompanyPrivacyPolicyFeed(CachedFeed):
     feed_type = ContentEncodedFeed
 
     def get_object(self, request, company_slug):
@@ -273,16 +217,10 @@ class CompanyPrivacyPolicyFeed(Feed):
 
 # Optional: Serve with XML stylesheet
 class StyledCompanyPrivacyPolicyFeed(CompanyPrivacyPolicyFeed):
-    def __call__(self, request, *args, **kwargs):
-        feedgen = self.get_feed(self.get_object(request, *args, **kwargs), request)
-        response = HttpResponse(content_type=feedgen.content_type)
-        response.write('<?xml version="1.0" encoding="utf-8"?>\n')
-        response.write('<?xml-stylesheet type="text/xsl" href="/static/rss-stylesheet.xsl"?>\n')
-        feedgen.write(response, 'utf-8')
-        return response
+    stylesheet = True
     
 
-class CompanyTermsAndConditionsFeed(Feed):
+class CompanyTermsAndConditionsFeed(CachedFeed):
     feed_type = ContentEncodedFeed
 
     def get_object(self, request, company_slug):
@@ -320,16 +258,10 @@ class CompanyTermsAndConditionsFeed(Feed):
 
 # Optional: Serve with XML stylesheet
 class StyledCompanyTermsAndConditionsFeed(CompanyTermsAndConditionsFeed):
-    def __call__(self, request, *args, **kwargs):
-        feedgen = self.get_feed(self.get_object(request, *args, **kwargs), request)
-        response = HttpResponse(content_type=feedgen.content_type)
-        response.write('<?xml version="1.0" encoding="utf-8"?>\n')
-        response.write('<?xml-stylesheet type="text/xsl" href="/static/rss-stylesheet.xsl"?>\n')
-        feedgen.write(response, 'utf-8')
-        return response
+    stylesheet = True
     
 
-class CompanyShippingAndDeliveryPolicyFeed(Feed):
+class CompanyShippingAndDeliveryPolicyFeed(CachedFeed):
     feed_type = ContentEncodedFeed
 
     def get_object(self, request, company_slug):
@@ -367,16 +299,10 @@ class CompanyShippingAndDeliveryPolicyFeed(Feed):
 
 # Optional: Serve with XML stylesheet
 class StyledCompanyShippingAndDeliveryPolicyFeed(CompanyShippingAndDeliveryPolicyFeed):
-    def __call__(self, request, *args, **kwargs):
-        feedgen = self.get_feed(self.get_object(request, *args, **kwargs), request)
-        response = HttpResponse(content_type=feedgen.content_type)
-        response.write('<?xml version="1.0" encoding="utf-8"?>\n')
-        response.write('<?xml-stylesheet type="text/xsl" href="/static/rss-stylesheet.xsl"?>\n')
-        feedgen.write(response, 'utf-8')
-        return response
+    stylesheet = True
     
 
-class CompanyCancellationAndRefundPolicyFeed(Feed):
+class CompanyCancellationAndRefundPolicyFeed(CachedFeed):
     feed_type = ContentEncodedFeed
 
     def get_object(self, request, company_slug):
@@ -414,16 +340,10 @@ class CompanyCancellationAndRefundPolicyFeed(Feed):
 
 # Optional: Serve with XML stylesheet
 class StyledCompanyCancellationAndRefundPolicyFeed(CompanyCancellationAndRefundPolicyFeed):
-    def __call__(self, request, *args, **kwargs):
-        feedgen = self.get_feed(self.get_object(request, *args, **kwargs), request)
-        response = HttpResponse(content_type=feedgen.content_type)
-        response.write('<?xml version="1.0" encoding="utf-8"?>\n')
-        response.write('<?xml-stylesheet type="text/xsl" href="/static/rss-stylesheet.xsl"?>\n')
-        feedgen.write(response, 'utf-8')
-        return response
+    stylesheet = True
     
 
-class CompanyFaqFeed(Feed):
+class CompanyFaqFeed(CachedFeed):
     feed_type = ContentEncodedFeed
 
     def get_object(self, request, company_slug):
@@ -455,16 +375,10 @@ class CompanyFaqFeed(Feed):
 
 # Optional: Serve with XML stylesheet
 class StyledCompanyFaqFeed(CompanyFaqFeed):
-    def __call__(self, request, *args, **kwargs):
-        feedgen = self.get_feed(self.get_object(request, *args, **kwargs), request)
-        response = HttpResponse(content_type=feedgen.content_type)
-        response.write('<?xml version="1.0" encoding="utf-8"?>\n')
-        response.write('<?xml-stylesheet type="text/xsl" href="/static/rss-stylesheet.xsl"?>\n')
-        feedgen.write(response, 'utf-8')
-        return response
+    stylesheet = True
     
 
-class CompanyBlogFeed(Feed):
+class CompanyBlogFeed(CachedFeed):
     feed_type = ContentEncodedFeed
 
     def get_object(self, request, company_slug):
@@ -509,16 +423,10 @@ class CompanyBlogFeed(Feed):
 
 # Optional: Serve with XML stylesheet
 class StyledCompanyBlogFeed(CompanyBlogFeed):
-    def __call__(self, request, *args, **kwargs):
-        feedgen = self.get_feed(self.get_object(request, *args, **kwargs), request)
-        response = HttpResponse(content_type=feedgen.content_type)
-        response.write('<?xml version="1.0" encoding="utf-8"?>\n')
-        response.write('<?xml-stylesheet type="text/xsl" href="/static/rss-stylesheet.xsl"?>\n')
-        feedgen.write(response, 'utf-8')
-        return response
+    stylesheet = True
     
 
-class CompanyBlogDetailFeed(Feed):
+class CompanyBlogDetailFeed(CachedFeed):
     feed_type = ContentEncodedFeed
 
     def get_object(self, request, company_slug, blog_slug):
@@ -566,10 +474,4 @@ class CompanyBlogDetailFeed(Feed):
 
 # Optional: Serve with XML stylesheet
 class StyledCompanyDetailBlogFeed(CompanyBlogDetailFeed):
-    def __call__(self, request, *args, **kwargs):
-        feedgen = self.get_feed(self.get_object(request, *args, **kwargs), request)
-        response = HttpResponse(content_type=feedgen.content_type)
-        response.write('<?xml version="1.0" encoding="utf-8"?>\n')
-        response.write('<?xml-stylesheet type="text/xsl" href="/static/rss-stylesheet.xsl"?>\n')
-        feedgen.write(response, 'utf-8')
-        return response
\ No newline at end of file
+    stylesheet = True
\ No newline at end of file
@@ -0,0 +1,22 @@
+import time
+from django.core.management.base import BaseCommand
+
+from company.ratings import reconcile_summaries
+
+
+class Command(BaseCommand):
+    help = "Recompute company rating summaries from their testimonials and correct any drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Summaries written per query')
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without writing')
+
+    def handle(self, *args, **kwargs):
+        start = time.perf_counter()
+        checked, created, corrected = reconcile_summaries(kwargs['batch_size'], dry_run=kwargs['dry_run'])
+        elapsed = time.perf_counter() - start
+
+        action = "Would write" if kwargs['dry_run'] else "Wrote"
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Checked {checked} companies in {elapsed:.2f}s. {action} {created} new and {corrected} corrected summaries"
+        ))
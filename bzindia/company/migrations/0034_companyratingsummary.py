@@ -0,0 +1,27 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('company', '0033_remove_company_facebook_remove_company_linkedin_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompanyRatingSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rating', models.FloatField(default=0)),
+                ('rating_count', models.PositiveIntegerField(default=0)),
+                ('rating_total', models.PositiveIntegerField(default=0)),
+                ('histogram', models.JSONField(default=dict)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('company', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='rating_summary', to='company.company')),
+            ],
+            options={
+                'db_table': 'company_rating_summaries',
+            },
+        ),
+    ]
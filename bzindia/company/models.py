@@ -1,7 +1,6 @@
 from django.db import models
 from django.utils.text import slugify
 from ckeditor.fields import RichTextField
-from django.db.models import Avg, Max, Min
 
 from locations.models import UniquePlace, UniqueState
 from base.models import MetaTag
@@ -69,6 +68,32 @@ class CompanyType(models.Model):
     #     return Company.objects.filter(type = self).order_by("name")
     
 
+class CompanyQuerySet(models.QuerySet):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._with_summaries = False
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._with_summaries = self._with_summaries
+        return clone
+
+    def with_summaries(self):
+        """Load the computed properties of every company fetched in one batch, from the cache or a fixed set of queries."""
+        clone = self._chain()
+        clone._with_summaries = True
+        return clone
+
+    def _fetch_all(self):
+        fetching = self._result_cache is None
+        super()._fetch_all()
+
+        if fetching and self._with_summaries:
+            from .summaries import attach_summaries
+
+            attach_summaries([company for company in self._result_cache if isinstance(company, Company)])
+
+
 class Company(models.Model):
     name = models.CharField(max_length=150)
     type = models.ForeignKey(CompanyType, on_delete=models.CASCADE, related_name="companies")
@@ -95,6 +120,8 @@ class Company(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
 
+    objects = CompanyQuerySet.as_manager()
+
     def save(self, *args, **kwargs):
 
         if not self.meta_title:
@@ -119,30 +146,9 @@ class Company(models.Model):
 
     @property
     def categories(self):
-        from educational.models import Program
-        from product.models import Category as ProductCategory
-        from registration.models import RegistrationType
-        from service.models import Category as ServiceCategory
-
-        company_type = self.type.name
-        Category = None
-
-        if company_type == "Education":
-            Category = Program
-
-        elif company_type == "Product":
-            Category = ProductCategory
-
-        elif company_type == "Registration":
-            Category = RegistrationType
-
-        elif company_type == "Service":
-            Category = ServiceCategory
+        from .summaries import company_summary
 
-        if Category:
-            return Category.objects.filter(company = self).values("name", "slug").order_by("name")
-
-        return None
+        return company_summary(self).get("categories")
 
 
     @property
@@ -157,15 +163,15 @@ class Company(models.Model):
 
     @property
     def rating(self):
-        TestimonialModel = Testimonial
-        if self.type == "Education":
-            from educational.models import Testimonial as CourseTestimonial
+        from .summaries import company_summary
 
-            TestimonialModel = CourseTestimonial
+        return company_summary(self).get("rating", 0)
 
-        testimonials = TestimonialModel.objects.filter(company = self).values_list("rating", flat=True)        
-        
-        return testimonials.aggregate(Avg('rating'))['rating__avg'] if testimonials else 0
+    @property
+    def rating_count(self):
+        from .summaries import company_summary
+
+        return company_summary(self).get("rating_count", 0)
     
     @property
     def get_absolute_url(self):
@@ -185,34 +191,21 @@ class Company(models.Model):
     
     @property
     def price_range(self):
-        from educational.models import Course
-        from product.models import Product
-        from registration.models import Registration
-        from service.models import Service
-
-        if self.type == "Education":
-            prices = Course.objects.filter(company=self.company).aggregate(
-                min_price=Min("price"),
-                max_price=Max("price")
-            )
-
-            if prices["min_price"] is not None:
-                if prices["min_price"] == prices["max_price"]:
-                    return prices["min_price"]
-                return f"{prices['min_price']} - {prices['max_price']}"
-            
-        return None
+        from .summaries import company_summary
+
+        return company_summary(self).get("price_range")
     
     @property
     def clients(self):
-        if self.type.name != "Education":
-            return Client.objects.filter(company = self)
-        
-        return []
+        from .summaries import company_summary
+
+        return [Client(**values) for values in company_summary(self).get("clients", [])]
 
     @property
     def add_on_types(self):
-        return [company_type.name for company_type in self.add_on_company_types.all()]
+        from .summaries import company_summary
+
+        return company_summary(self).get("add_on_types", [])
 
 class Client(models.Model):
     company = models.ForeignKey(Company, on_delete=models.CASCADE)
@@ -295,8 +288,25 @@ class Testimonial(models.Model):
         if self.image:
             return f"{self.image.name}".replace('testimonials/', '')
         return None
-    
-    
+
+
+class CompanyRatingSummary(models.Model):
+    company = models.OneToOneField(Company, on_delete=models.CASCADE, related_name="rating_summary")
+
+    rating = models.FloatField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_total = models.PositiveIntegerField(default=0)
+    histogram = models.JSONField(default=dict)
+
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.company.name} - {self.rating:.2f} ({self.rating_count})"
+
+    class Meta:
+        db_table = "company_rating_summaries"
+
+
 class ContactEnquiry(models.Model):
     company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name="contact_enquiry_company")
 
@@ -0,0 +1,126 @@
+import logging
+
+from django.db import transaction
+from django.db.models import Count
+
+logger = logging.getLogger(__name__)
+
+EDUCATION = "Education"
+
+
+def testimonial_models():
+    """Testimonial model rated per company type, student testimonials for education companies."""
+    from educational.models import Testimonial as StudentTestimonial
+    from .models import Testimonial
+
+    return Testimonial, StudentTestimonial
+
+
+def rated_model(type_name):
+    Testimonial, StudentTestimonial = testimonial_models()
+    return StudentTestimonial if type_name == EDUCATION else Testimonial
+
+
+def summarize(counts):
+    """(average, count, total, histogram) from {rating: number of testimonials}."""
+    rating_count = sum(counts.values())
+    rating_total = sum(rating * count for rating, count in counts.items())
+    histogram = {str(rating): count for rating, count in sorted(counts.items())}
+
+    return (rating_total / rating_count if rating_count else 0), rating_count, rating_total, histogram
+
+
+def apply_summary(summary, counts):
+    """Copy the aggregates onto ``summary``, returning True when any of them changed."""
+    rating, rating_count, rating_total, histogram = summarize(counts)
+    changed = (
+        summary.rating_count != rating_count or summary.rating_total != rating_total or summary.histogram != histogram
+    )
+
+    summary.rating = rating
+    summary.rating_count = rating_count
+    summary.rating_total = rating_total
+    summary.histogram = histogram
+
+    return changed
+
+
+def refresh_summary(company_id):
+    """Recompute one company's summary, called from the testimonial signals inside their transaction."""
+    from .models import Company, CompanyRatingSummary
+
+    type_name = Company.objects.filter(pk=company_id).values_list("type__name", flat=True).first()
+    if type_name is None:
+        return None
+
+    # Joins the testimonial write's transaction when there is one, and locks the
+    # row before counting so concurrent writes for the same company serialize here.
+    with transaction.atomic():
+        summary, _ = CompanyRatingSummary.objects.select_for_update().get_or_create(company_id=company_id)
+
+        ratings = rated_model(type_name).objects.filter(company_id=company_id).values("rating").annotate(
+            count=Count("id")
+        )
+        apply_summary(summary, {row["rating"]: row["count"] for row in ratings})
+        summary.save()
+
+    return summary
+
+
+def company_rating(company):
+    """(average, count) of a company read from its summary row, no aggregate queries."""
+    from .models import CompanyRatingSummary
+
+    if company is None:
+        return 0, 0
+
+    try:
+        summary = company.rating_summary
+    except CompanyRatingSummary.DoesNotExist:
+        return 0, 0
+
+    return summary.rating, summary.rating_count
+
+
+def reconcile_summaries(batch_size=1000, dry_run=False):
+    """Rebuild every summary from grouped aggregates and fix the ones that drifted.
+
+    Returns (companies checked, summaries created, summaries corrected).
+    """
+    from .models import Company, CompanyRatingSummary
+    from .summaries import bump
+
+    company_types = dict(Company.objects.values_list("pk", "type__name"))
+
+    expected = {pk: {} for pk in company_types}
+    for model in testimonial_models():
+        rows = model.objects.values("company", "rating").annotate(count=Count("id")).order_by()
+        for row in rows.iterator(chunk_size=10000):
+            company_id = row["company"]
+            if company_id in expected and rated_model(company_types[company_id]) is model:
+                expected[company_id][row["rating"]] = row["count"]
+
+    existing = {summary.company_id: summary for summary in CompanyRatingSummary.objects.all()}
+
+    created = []
+    corrected = []
+    for company_id, counts in expected.items():
+        summary = existing.get(company_id)
+        if summary is None:
+            summary = CompanyRatingSummary(company_id=company_id)
+            apply_summary(summary, counts)
+            created.append(summary)
+        elif apply_summary(summary, counts):
+            logger.warning(f"Rating summary of company {company_id} drifted, corrected to {summary.rating_count} ratings")
+            corrected.append(summary)
+
+    if not dry_run:
+        CompanyRatingSummary.objects.bulk_create(created, batch_size=batch_size)
+        CompanyRatingSummary.objects.bulk_update(
+            corrected, ["rating", "rating_count", "rating_total", "histogram"], batch_size=batch_size
+        )
+
+        # Bulk writes skip the signals that drop cached company summaries.
+        bump([summary.company_id for summary in created + corrected])
+
+    return len(expected), len(created), len(corrected)
@@ -0,0 +1,152 @@
+import threading
+import time
+
+from django.apps import apps
+from django.conf import settings
+
+COMPANY_TYPE_TTL = getattr(settings, "COMPANY_TYPE_CACHE_TTL", 300)
+
+
+class CompanyTypes:
+    """Every CompanyType by id, loaded once per process.
+
+    Reloaded after ``COMPANY_TYPE_TTL`` seconds, or at once in the process
+    saving or deleting a type, so ``type_name(company)`` never queries.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.types = None
+        self.loaded_at = 0.0
+
+    def all(self):
+        types = self.types
+        if types is not None and time.monotonic() - self.loaded_at < COMPANY_TYPE_TTL:
+            return types
+
+        from .models import CompanyType
+
+        with self.lock:
+            self.types = {company_type.pk: company_type for company_type in CompanyType.objects.all()}
+            self.loaded_at = time.monotonic()
+            return self.types
+
+    def get(self, type_id):
+        company_type = self.all().get(type_id)
+        if company_type is None and type_id is not None:
+            # Created in another process since the last load.
+            self.clear()
+            company_type = self.all().get(type_id)
+
+        return company_type
+
+    def clear(self):
+        with self.lock:
+            self.types = None
+
+
+company_types = CompanyTypes()
+
+
+def company_type(company):
+    return company_types.get(company.type_id) if company is not None else None
+
+
+def type_name(company):
+    found = company_type(company)
+    return found.name if found else None
+
+
+def resolve(value, path):
+    """Follow the dotted attribute ``path`` from ``value``, None as soon as a step is missing."""
+    for attr in path.split("."):
+        if value is None:
+            return None
+        value = getattr(value, attr, None)
+
+    return value
+
+
+class DetailType:
+    """Models and accessors of one company type's detail pages and multipages.
+
+    ``item_field`` is the item (service, course...) a detail page or
+    multipage is about, ``title_path`` and ``image_path`` are read from
+    that item. Product multipages list several products and have no item.
+    """
+
+    def __init__(self, name, kind, detail_model, multipage_model, item_field, title_path="name", image_path="image", multipage_prefetch=()):
+        self.name = name
+        self.kind = kind
+        self.detail_label = detail_model
+        self.multipage_label = multipage_model
+        self.item_field = item_field
+        self.title_path = title_path
+        self.image_path = image_path
+        self.multipage_prefetch = multipage_prefetch
+
+    @property
+    def detail_model(self):
+        return apps.get_model(self.detail_label)
+
+    @property
+    def multipage_model(self):
+        return apps.get_model(self.multipage_label)
+
+    def item_related(self, model):
+        """select_related paths from ``model`` to the item and what its title is read through."""
+        if not any(field.name == self.item_field for field in model._meta.get_fields()):
+            return []
+
+        steps = self.title_path.split(".")[:-1]
+        return [self.item_field] + (["__".join([self.item_field, *steps])] if steps else [])
+
+    def details(self, *related):
+        model = self.detail_model
+        return model.objects.select_related("company", *self.item_related(model), *related)
+
+    def multipages(self, *related):
+        model = self.multipage_model
+        queryset = model.objects.select_related("company", *self.item_related(model), *related)
+        return queryset.prefetch_related(*self.multipage_prefetch) if self.multipage_prefetch else queryset
+
+    def item(self, page):
+        return getattr(page, self.item_field, None)
+
+    def title(self, page):
+        return resolve(self.item(page), self.title_path)
+
+    def image(self, page):
+        image = resolve(self.item(page), self.image_path) if self.image_path else None
+        return image if image else None
+
+
+REGISTRY = {
+    detail_type.name: detail_type for detail_type in (
+        DetailType("Service", "service", "service.ServiceDetail", "service.MultiPage", "service"),
+        DetailType("Education", "course", "educational.CourseDetail", "educational.MultiPage", "course"),
+        DetailType(
+            "Registration", "registration", "registration.RegistrationDetailPage", "registration.MultiPage",
+            "registration", title_path="sub_type.name", image_path=None
+        ),
+        DetailType(
+            "Product", "product", "product.ProductDetailPage", "product.MultiPage", "product",
+            multipage_prefetch=("products",)
+        ),
+    )
+}
+
+BY_KIND = {detail_type.kind: detail_type for detail_type in REGISTRY.values()}
+
+
+def for_company(company):
+    """The DetailType of ``company``'s type, or None for a type without detail pages."""
+    return REGISTRY.get(type_name(company))
+
+
+def for_page(page):
+    return for_company(page.company) if page is not None else None
+
+
+def by_kind(kind):
+    return BY_KIND[kind]
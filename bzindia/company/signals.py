@@ -0,0 +1,105 @@
+from django.db.models.signals import pre_save, post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from educational.models import Course, Program, Testimonial as StudentTestimonial
+from product.models import Category as ProductCategory
+from registration.models import RegistrationType
+from service.models import Category as ServiceCategory
+
+from .models import Client, Company, CompanyRatingSummary, CompanyType, Testimonial
+from .ratings import refresh_summary
+from .registry import company_types
+from .summaries import bump_on_commit
+
+
+@receiver(pre_save, sender=Testimonial)
+@receiver(pre_save, sender=StudentTestimonial)
+def testimonial_saving(sender, instance, **kwargs):
+    # A testimonial moved to another company leaves the old company's summary stale.
+    instance._previous_company_id = (
+        sender.objects.filter(pk=instance.pk).values_list("company_id", flat=True).first() if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Testimonial)
+@receiver(post_save, sender=StudentTestimonial)
+def testimonial_saved(sender, instance, **kwargs):
+    previous_company_id = getattr(instance, "_previous_company_id", None)
+    if previous_company_id and previous_company_id != instance.company_id:
+        refresh_summary(previous_company_id)
+
+    refresh_summary(instance.company_id)
+
+
+@receiver(post_delete, sender=Testimonial)
+@receiver(post_delete, sender=StudentTestimonial)
+def testimonial_deleted(sender, instance, origin=None, **kwargs):
+    # Deleting the company cascades here, its summary goes with it.
+    if isinstance(origin, Company) or getattr(origin, "model", None) is Company:
+        return
+
+    refresh_summary(instance.company_id)
+
+
+@receiver(post_save, sender=Company)
+def company_saved(sender, instance, created, **kwargs):
+    # The type decides which testimonials are rated, so recompute on every save.
+    if not kwargs.get("raw"):
+        refresh_summary(instance.pk)
+
+
+@receiver(post_save, sender=Company)
+def company_summary_saved(sender, instance, **kwargs):
+    bump_on_commit(instance.pk)
+
+
+@receiver(m2m_changed, sender=Company.add_on_company_types.through)
+def add_on_types_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if reverse:
+        # Changed from the type's side, a clear leaves no pks so every company it was added on is bumped.
+        company_ids = pk_set or Company.objects.values_list("pk", flat=True)
+        bump_on_commit(*company_ids)
+    else:
+        bump_on_commit(instance.pk)
+
+
+@receiver(pre_save, sender=Client)
+@receiver(pre_save, sender=Program)
+@receiver(pre_save, sender=ProductCategory)
+@receiver(pre_save, sender=RegistrationType)
+@receiver(pre_save, sender=ServiceCategory)
+@receiver(pre_save, sender=Course)
+def company_summary_saving(sender, instance, **kwargs):
+    # A row moved to another company leaves the old company's summary stale.
+    instance._previous_company_id = (
+        sender.objects.filter(pk=instance.pk).values_list("company_id", flat=True).first() if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=CompanyRatingSummary)
+@receiver(post_delete, sender=CompanyRatingSummary)
+@receiver(post_save, sender=Client)
+@receiver(post_delete, sender=Client)
+@receiver(post_save, sender=Program)
+@receiver(post_delete, sender=Program)
+@receiver(post_save, sender=ProductCategory)
+@receiver(post_delete, sender=ProductCategory)
+@receiver(post_save, sender=RegistrationType)
+@receiver(post_delete, sender=RegistrationType)
+@receiver(post_save, sender=ServiceCategory)
+@receiver(post_delete, sender=ServiceCategory)
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def company_summary_changed(sender, instance, **kwargs):
+    # Categories, clients, ratings and course prices all feed the company's cached summary.
+    bump_on_commit(instance.company_id, getattr(instance, "_previous_company_id", None))
+
+
+@receiver(post_save, sender=CompanyType)
+@receiver(post_delete, sender=CompanyType)
+def company_type_changed(sender, instance, **kwargs):
+    # Other processes pick the change up when their copy expires.
+    company_types.clear()
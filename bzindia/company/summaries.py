@@ -0,0 +1,164 @@
+import logging
+import uuid
+from collections import defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max, Min
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_KEY = "company_summary:v2:{}:{}"
+VERSION_KEY = "company_summary:version:{}"
+SUMMARY_TIMEOUT = getattr(settings, "COMPANY_SUMMARY_TIMEOUT", 60 * 60 * 6)
+
+EDUCATION = "Education"
+
+# Category model of each company type.
+CATEGORY_MODELS = {
+    "Education": "educational.Program",
+    "Product": "product.Category",
+    "Registration": "registration.RegistrationType",
+    "Service": "service.Category",
+}
+
+# Client fields kept in a summary, Company.clients builds the instances from them.
+CLIENT_FIELDS = ("id", "company_id", "name", "image", "slug")
+
+# Attribute the queryset leaves the summary under, ``summary`` being a Company field.
+ATTRIBUTE = "_computed_summary"
+
+
+def compute_summaries(company_ids):
+    """{company id: summary} computed with a constant number of queries whatever the number of companies.
+
+    A summary holds the company type name, its categories ({name, slug}),
+    rating and rating count, clients (the field values ClientSerializer
+    reads), add on type names and price range. Only plain values, so cached
+    summaries don't depend on the models' pickled state.
+    """
+    from .models import Client, Company, CompanyRatingSummary
+
+    type_names = dict(Company.objects.filter(pk__in=company_ids).values_list("pk", "type__name"))
+    summaries = {
+        pk: {
+            "type_name": type_name, "categories": None, "rating": 0, "rating_count": 0,
+            "clients": [], "add_on_types": [], "price_range": None,
+        }
+        for pk, type_name in type_names.items()
+    }
+
+    by_type = defaultdict(list)
+    for pk, type_name in type_names.items():
+        by_type[type_name].append(pk)
+
+    for type_name, label in CATEGORY_MODELS.items():
+        if not by_type.get(type_name):
+            continue
+
+        for pk in by_type[type_name]:
+            summaries[pk]["categories"] = []
+
+        rows = apps.get_model(label).objects.filter(company_id__in=by_type[type_name]).order_by("name")
+        for company_id, name, slug in rows.values_list("company_id", "name", "slug"):
+            summaries[company_id]["categories"].append({"name": name, "slug": slug})
+
+    ratings = CompanyRatingSummary.objects.filter(company_id__in=summaries).values_list("company_id", "rating", "rating_count")
+    for company_id, rating, rating_count in ratings:
+        summaries[company_id].update(rating=rating, rating_count=rating_count)
+
+    client_company_ids = [pk for pk, type_name in type_names.items() if type_name != EDUCATION]
+    for client in Client.objects.filter(company_id__in=client_company_ids).values(*CLIENT_FIELDS):
+        summaries[client["company_id"]]["clients"].append(client)
+
+    through = Company.add_on_company_types.through
+    for company_id, name in through.objects.filter(company_id__in=summaries).values_list("company_id", "companytype__name"):
+        summaries[company_id]["add_on_types"].append(name)
+
+    if by_type.get(EDUCATION):
+        prices = apps.get_model("educational.Course").objects.filter(company_id__in=by_type[EDUCATION]).values(
+            "company_id"
+        ).annotate(min_price=Min("price"), max_price=Max("price")).order_by()
+
+        for row in prices:
+            if row["min_price"] is None:
+                continue
+
+            price_range = row["min_price"] if row["min_price"] == row["max_price"] else f"{row['min_price']} - {row['max_price']}"
+            summaries[row["company_id"]]["price_range"] = price_range
+
+    return summaries
+
+
+def versions(company_ids):
+    """{company id: version}, creating the versions not in the cache yet."""
+    keys = {pk: VERSION_KEY.format(pk) for pk in company_ids}
+    found = cache.get_many(keys.values())
+
+    missing = {key: uuid.uuid4().hex for key in keys.values() if key not in found}
+    if missing:
+        for key, version in missing.items():
+            cache.add(key, version, timeout=None)
+        found.update(cache.get_many(missing))
+
+    return {pk: found.get(key) for pk, key in keys.items()}
+
+
+def get_summaries(company_ids):
+    """{company id: summary} from the cache, computing and storing the missing ones in one batch."""
+    company_ids = list(company_ids)
+
+    try:
+        keys = {pk: SUMMARY_KEY.format(pk, version) for pk, version in versions(company_ids).items()}
+        found = cache.get_many(keys.values())
+    except Exception as e:
+        logger.warning(f"Company summary cache unavailable: {e}")
+        return compute_summaries(company_ids)
+
+    summaries = {pk: found[key] for pk, key in keys.items() if key in found}
+
+    missing = [pk for pk in company_ids if pk not in summaries]
+    if missing:
+        computed = compute_summaries(missing)
+        summaries.update(computed)
+
+        try:
+            cache.set_many({keys[pk]: summary for pk, summary in computed.items()}, timeout=SUMMARY_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Company summary cache unavailable: {e}")
+
+    return summaries
+
+
+def company_summary(company):
+    """The summary of one company, kept on the instance once read."""
+    summary = getattr(company, ATTRIBUTE, None)
+    if summary is None:
+        summary = get_summaries([company.pk]).get(company.pk, {})
+        setattr(company, ATTRIBUTE, summary)
+
+    return summary
+
+
+def attach_summaries(companies):
+    summaries = get_summaries({company.pk for company in companies})
+    for company in companies:
+        setattr(company, ATTRIBUTE, summaries.get(company.pk, {}))
+
+
+def bump(company_ids):
+    """New versions for the companies, their cached summaries are left to expire."""
+    company_ids = {pk for pk in company_ids if pk}
+    if not company_ids:
+        return
+
+    try:
+        cache.set_many({VERSION_KEY.format(pk): uuid.uuid4().hex for pk in company_ids}, timeout=None)
+    except Exception as e:
+        logger.warning(f"Company summary invalidation of {len(company_ids)} companies failed: {e}")
+
+
+def bump_on_commit(*company_ids):
+    transaction.on_commit(lambda: bump(company_ids))
@@ -1,7 +1,14 @@
 from rest_framework import serializers
 from django.conf import settings
+from django.db.models import Prefetch
 
 from company.models import Company, CompanyType, Client, ContactEnquiry, Testimonial, Banner
+from company.ratings import company_rating
+from blog.models import Blog
+from educational.models import CourseDetail, Program
+from product.models import ProductDetailPage, Category as ProductCategory
+from registration.models import RegistrationDetailPage, RegistrationType
+from service.models import ServiceDetail, Category as ServiceCategory
 
 from blog_api.serializers import BlogSerializer
 from meta_api.serializers import MetaTagSerializer
@@ -9,6 +16,30 @@ from custom_pages_api.serializers import FaqSerializer
 from locations.models import UniqueState
 
 from utility.text import clean_string
+from utility.prefetch import prefetched
+
+# Reverse relations holding each company type's categories and detail pages.
+CATEGORY_RELATIONS = {
+    "Education": "program_set",
+    "Product": "category_set",
+    "Registration": "registrationtype_set",
+    "Service": "service_category_company",
+}
+
+# Prefetched in name order, as Company.categories lists them.
+CATEGORY_PREFETCHES = [
+    Prefetch(CATEGORY_RELATIONS["Education"], queryset=Program.objects.order_by("name")),
+    Prefetch(CATEGORY_RELATIONS["Product"], queryset=ProductCategory.objects.order_by("name")),
+    Prefetch(CATEGORY_RELATIONS["Registration"], queryset=RegistrationType.objects.order_by("name")),
+    Prefetch(CATEGORY_RELATIONS["Service"], queryset=ServiceCategory.objects.order_by("name")),
+]
+
+DETAIL_PAGE_RELATIONS = {
+    "Education": "course_details",
+    "Service": "service_details",
+    "Product": "product_details",
+    "Registration": "registration_details",
+}
 
 class ClientSerializer(serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
@@ -37,17 +68,11 @@ class TestimonialSerializer(serializers.ModelSerializer):
             "name", "image_url", "slug", "client_company", "place_name",
             "text", "rating", "company_rating"
             ]
+        select_related = ["company__rating_summary"]
         
     
     def get_company_rating(self, obj):
-        from django.db.models import Avg
-
-        if not obj.company:
-            return 0
-        
-        testimonials = obj.company.testimonials.values_list("rating", flat=True)
-
-        return testimonials.aggregate(Avg('rating'))['rating__avg'] if testimonials else 0
+        return company_rating(obj.company)[0]
         
     
 
@@ -140,11 +165,12 @@ class CompanySerializer(serializers.ModelSerializer):
     logo_url = serializers.SerializerMethodField()
     favicon_url = serializers.SerializerMethodField()
     company_type = serializers.CharField(source = "type.name", read_only=True)    
-    blogs = BlogSerializer(many=True, read_only=True)
-    faqs = FaqSerializer(many=True, read_only = True)
+    blogs = serializers.SerializerMethodField()
+    faqs = FaqSerializer(many=True, read_only = True, source="faq_set")
     meta_tags = MetaTagSerializer(many=True, read_only = True)
-    clients = ClientSerializer(many=True, read_only=True)
+    clients = serializers.SerializerMethodField()
     type_slug = serializers.CharField(source = "type.slug", read_only=True)    
+    categories = serializers.SerializerMethodField()
     detail_pages = serializers.SerializerMethodField()
     # multipages = serializers.SerializerMethodField()
     phone = serializers.SerializerMethodField()
@@ -164,11 +190,41 @@ class CompanySerializer(serializers.ModelSerializer):
             # "multipages",
             "items_url"
         ]
+        select_related = ["rating_summary"]
+        prefetch_related = [
+            (Prefetch("blog_set", queryset=Blog.objects.filter(is_published=True), to_attr="published_blogs"), BlogSerializer),
+            (Prefetch("client_set", to_attr="company_clients"), ClientSerializer),
+            "contacts", *CATEGORY_PREFETCHES,
+
+            Prefetch("course_details", queryset=CourseDetail.objects.order_by("course__name")),
+            "course_details__course__program", "course_details__course__specialization",
+            Prefetch("service_details", queryset=ServiceDetail.objects.order_by("service__name")),
+            "service_details__service__category", "service_details__service__sub_category",
+            Prefetch("product_details", queryset=ProductDetailPage.objects.order_by("product__name")),
+            "product_details__product__category", "product_details__product__sub_category",
+            Prefetch("registration_details", queryset=RegistrationDetailPage.objects.order_by("registration__title")),
+            "registration_details__registration__registration_type", "registration_details__registration__sub_type",
+        ]
 
     read_only_fields = "__all__"
 
+    def get_blogs(self, obj):
+        blogs = prefetched(obj, "published_blogs", obj.blogs)
+
+        return BlogSerializer(blogs, many=True, context=self.context).data
+
+    def get_clients(self, obj):
+        clients = prefetched(obj, "company_clients", None)
+        if clients is None:
+            clients = obj.clients
+        elif obj.type.name == "Education":
+            clients = []
+
+        return ClientSerializer(clients, many=True, context=self.context).data
+
     def get_phone(self, obj):
-        first_contact_obj_of_company = obj.contacts.first()
+        contacts = prefetched(obj, "contacts", None)
+        first_contact_obj_of_company = obj.contacts.first() if contacts is None else next(iter(contacts), None)
 
         if first_contact_obj_of_company:
             return first_contact_obj_of_company.mobile or first_contact_obj_of_company.tel or None
@@ -192,20 +248,25 @@ class CompanySerializer(serializers.ModelSerializer):
         return None
     
     def get_categories(self, obj):
-        categories = obj.categories
-        return list(categories) if categories else []      
+        relation = CATEGORY_RELATIONS.get(obj.type.name)
+        categories = prefetched(obj, relation, None) if relation else None
+
+        if categories is None:
+            categories = obj.categories
+            return list(categories) if categories is not None else None
+
+        return [{"name": category.name, "slug": category.slug} for category in categories]
     
     def get_detail_pages(self, obj):
-        from educational.models import CourseDetail
-        from service.models import ServiceDetail
-        from product.models import ProductDetailPage
-        from registration.models import RegistrationDetailPage
-
         if not obj.type:
             return None
-        
+
+        relation = DETAIL_PAGE_RELATIONS.get(obj.type.name)
+        detail_pages = prefetched(obj, relation, None) if relation else None
+
         if obj.type.name == "Education":
-            detail_pages = CourseDetail.objects.filter(company = obj).order_by("course__name")
+            if detail_pages is None:
+                detail_pages = CourseDetail.objects.filter(company = obj).order_by("course__name")
 
             return [{
                 "title": page.course.name,
@@ -214,7 +275,8 @@ class CompanySerializer(serializers.ModelSerializer):
             } for page in detail_pages]
         
         elif obj.type.name == "Service":
-            detail_pages = ServiceDetail.objects.filter(company = obj).order_by("service__name")
+            if detail_pages is None:
+                detail_pages = ServiceDetail.objects.filter(company = obj).order_by("service__name")
 
             return [{
                 "title": page.service.name,
@@ -223,7 +285,8 @@ class CompanySerializer(serializers.ModelSerializer):
             } for page in detail_pages]
         
         elif obj.type.name == "Product":
-            detail_pages = ProductDetailPage.objects.filter(company = obj).order_by("product__name")
+            if detail_pages is None:
+                detail_pages = ProductDetailPage.objects.filter(company = obj).order_by("product__name")
 
             return [{
                 "title": page.product.name,
@@ -232,7 +295,8 @@ class CompanySerializer(serializers.ModelSerializer):
             } for page in detail_pages]
         
         elif obj.type.name == "Registration":
-            detail_pages = RegistrationDetailPage.objects.filter(company = obj).order_by("registration__title")
+            if detail_pages is None:
+                detail_pages = RegistrationDetailPage.objects.filter(company = obj).order_by("registration__title")
 
             return [{
                 "title": page.registration.title,
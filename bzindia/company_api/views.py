@@ -35,7 +35,7 @@ logger = logging.getLogger(__name__)
 
 class CompanyApiViewset(viewsets.ReadOnlyModelViewSet):
     serializer_class = CompanySerializer
-    queryset = Company.objects.all().order_by("?")
+    queryset = Company.objects.with_summaries().order_by("?")
     lookup_field  = "slug"
 
     def get_serializer_context(self):
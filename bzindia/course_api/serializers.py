@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from django.conf import settings
+from django.db.models import Prefetch
 from datetime import datetime
 
 from utility.text import clean_string
@@ -22,6 +23,7 @@ from company_api.serializers import CompanySerializer
 from blog_api.serializers import BlogSerializer
 from custom_pages_api.serializers import FaqSerializer
 from meta_api.serializers import MetaTagSerializer
+from utility.prefetch import prefetched
 
 from .paginations import CoursePagination
 
@@ -59,6 +61,9 @@ class CourseSerializer(serializers.ModelSerializer):
     program_slug = serializers.CharField(source='program.slug', read_only=True)
     specialization_slug = serializers.CharField(source='specialization.slug', read_only=True)
     specialization_name = serializers.CharField(source='specialization.name', read_only=True)
+    description = serializers.SerializerMethodField()
+    rating = serializers.SerializerMethodField()
+    rating_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Course
@@ -71,6 +76,29 @@ class CourseSerializer(serializers.ModelSerializer):
             ]
         
         read_only_fields = fields
+        prefetch_related = [
+            "coursedetail_set",
+            Prefetch("testimonial_set", queryset=Testimonial.objects.only("id", "course", "rating"), to_attr="rated_testimonials"),
+        ]
+
+    def get_description(self, obj):
+        detail_pages = prefetched(obj, "coursedetail_set", None)
+        if detail_pages is None:
+            return obj.description
+
+        detail_page = next(iter(detail_pages), None)
+        return detail_page.summary if detail_page else None
+
+    def get_rating(self, obj):
+        testimonials = prefetched(obj, "rated_testimonials", None)
+        if testimonials is None:
+            return obj.rating
+
+        return sum(testimonial.rating for testimonial in testimonials) / len(testimonials) if testimonials else 0
+
+    def get_rating_count(self, obj):
+        testimonials = prefetched(obj, "rated_testimonials", None)
+        return obj.rating_count if testimonials is None else len(testimonials)
 
     def get_image_url(self, obj):
         request = self.context.get('request')
@@ -196,8 +224,8 @@ class DetailSerializer(serializers.ModelSerializer):
     tables = TableSerializer(many=True, read_only=True)
     bullet_points = BulletPointSerializer(many=True, read_only=True)    
     timelines = TimelineSerializer(many=True, read_only=True)
-    faqs = CourseFaqSerializer(many=True, read_only=True)
-    testimonials = StudentTestimonialSerializer(many=True, read_only=True)
+    faqs = serializers.SerializerMethodField()
+    testimonials = serializers.SerializerMethodField()
     meta_tags = MetaTagSerializer(many=True, read_only=True)
     item_name = serializers.CharField(source="course.name", read_only = True)
     company_slug = serializers.CharField(source="company.slug", read_only = True)
@@ -217,6 +245,28 @@ class DetailSerializer(serializers.ModelSerializer):
             "faqs", "testimonials", "meta_tags", "published",
             "modified", "item_name", "created", "updated", "url"
             ]
+        prefetch_related = [
+            "tables__datas", ("course__faq_set", CourseFaqSerializer),
+            ("course__testimonial_set", StudentTestimonialSerializer),
+        ]
+
+    def get_faqs(self, obj):
+        faqs = prefetched(obj.course, "faq_set", None)
+        if faqs is None:
+            faqs = obj.faqs
+        else:
+            faqs = [faq for faq in faqs if faq.company_id == obj.company_id]
+
+        return CourseFaqSerializer(faqs, many=True, context=self.context).data
+
+    def get_testimonials(self, obj):
+        testimonials = prefetched(obj.course, "testimonial_set", None)
+        if testimonials is None:
+            testimonials = obj.testimonials
+        else:
+            testimonials = [testimonial for testimonial in testimonials if testimonial.company_id == obj.company_id]
+
+        return StudentTestimonialSerializer(testimonials, many=True, context=self.context).data
         
     def get_url(self, obj):
         try:
@@ -462,9 +512,9 @@ class MultiPageSerializer(serializers.ModelSerializer):
     bullet_points = MultipageBulletPointSerializer(many=True, read_only=True)    
     tags = serializers.SerializerMethodField()
     timelines = MultipageTimelineSerializer(many=True, read_only=True)
-    blogs = BlogSerializer(many=True, read_only=True)
+    blogs = serializers.SerializerMethodField()
     faqs = MultiPageFaqSerializer(many=True, read_only=True)
-    testimonials = StudentTestimonialSerializer(many=True, read_only=True)
+    testimonials = serializers.SerializerMethodField()
     meta_tags = MetaTagSerializer(many=True, read_only=True)
 
     slider_courses = DetailSerializer(many=True)
@@ -482,10 +532,33 @@ class MultiPageSerializer(serializers.ModelSerializer):
             "blogs", "faqs", "testimonials", "url_type", "meta_tags", 
             "published", "modified", "meta_description", "company_name",
             "company_slug", "course", "sub_title", "meta_title",
-            "updated", "created"
+            "updated", "created", "rating", "rating_count"
             ]
+        select_related = ["company__rating_summary"]
+        prefetch_related = [
+            "tables__datas", ("course__blog_set", BlogSerializer),
+            ("course__testimonial_set", StudentTestimonialSerializer),
+        ]
         
     read_only_fields = "__all___"
+
+    def get_blogs(self, obj):
+        blogs = prefetched(obj.course, "blog_set", None)
+        if blogs is None:
+            blogs = obj.blogs
+        else:
+            blogs = [blog for blog in blogs if blog.company_id == obj.company_id]
+
+        return BlogSerializer(blogs, many=True, context=self.context).data
+
+    def get_testimonials(self, obj):
+        testimonials = prefetched(obj.course, "testimonial_set", None)
+        if testimonials is None:
+            testimonials = obj.testimonials
+        else:
+            testimonials = [testimonial for testimonial in testimonials if testimonial.company_id == obj.company_id]
+
+        return StudentTestimonialSerializer(testimonials, many=True, context=self.context).data
         
     def get_tags(self, obj):
         if not obj.meta_tags:
@@ -24,6 +24,7 @@ from .serializers import (
 from company_api.serializers import CompanySerializer, ClientSerializer
 
 from .paginations import CoursePagination
+from utility.prefetch import PlannedQuerysetMixin
 
 logger = logging.getLogger(__name__)
 
@@ -195,7 +196,7 @@ class EnquiryViewSet(viewsets.ModelViewSet):
             return Response(response_data, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
 
-class DetailViewSet(viewsets.ReadOnlyModelViewSet):
+class DetailViewSet(PlannedQuerysetMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = DetailSerializer
     lookup_field = "slug"
     pagination_class = CoursePagination
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from directory import overpass
+from directory.views import import_attractions, import_courts_data, import_police_stations
+
+IMPORTERS = {
+    "police_stations": import_police_stations,
+    "courts": import_courts_data,
+    "attractions": import_attractions,
+}
+
+
+class Command(BaseCommand):
+    help = "Import directory entries from Overpass responses, cached in the Overpass response store"
+
+    def add_arguments(self, parser):
+        parser.add_argument('kinds', nargs='*', help=f'Importers to run, any of {", ".join(IMPORTERS)}, all by default')
+        parser.add_argument('--replay', action='store_true', help='Only use cached responses, never query Overpass')
+        parser.add_argument('--adopt', action='store_true', help='Compress and index uncompressed responses in the cache directory first')
+
+    def handle(self, *args, **kwargs):
+        unknown = set(kwargs['kinds']) - set(IMPORTERS)
+        if unknown:
+            raise CommandError(f"Unknown importers: {', '.join(sorted(unknown))}")
+
+        if kwargs['adopt']:
+            adopted = overpass.overpass_cache.adopt()
+            self.stdout.write(f"Adopted {adopted} cached responses")
+
+        for kind in kwargs['kinds'] or IMPORTERS:
+            self.stdout.write(f"Importing {kind}...")
+            IMPORTERS[kind](replay=kwargs['replay'])
+
+        stats = overpass.overpass_cache.stats()
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Overpass imports done, cache holds {stats['entries']} responses in {stats['bytes']} bytes"
+        ))
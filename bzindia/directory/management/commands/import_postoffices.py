@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from directory.views import import_postoffice_data
+from utility.tabular import CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = "Import post offices from a CSV or Excel file"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', type=str, help='Post office CSV/Excel file')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Rows read and committed per chunk')
+        parser.add_argument('--no-resume', action='store_true', help='Ignore the checkpoint of an earlier run and start over')
+
+    def handle(self, *args, **kwargs):
+        counts = import_postoffice_data(kwargs['path'], resume=not kwargs['no_resume'], chunk_size=kwargs['chunk_size'])
+        summary = ", ".join(f"{count} {name}" for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"✅ Imported {kwargs['path']}: {summary}"))
@@ -0,0 +1,41 @@
+from django.db import migrations, models
+
+from utility.geohash import encode, to_coordinate
+
+
+def backfill_geohash(apps, schema_editor):
+    CscCenter = apps.get_model('directory', 'CscCenter')
+
+    batch = []
+    for center in CscCenter.objects.only('id', 'latitude', 'longitude').iterator(chunk_size=5000):
+        lat = to_coordinate(center.latitude)
+        lon = to_coordinate(center.longitude)
+
+        if lat is None or lon is None:
+            continue
+
+        center.geohash = encode(lat, lon)
+        batch.append(center)
+
+        if len(batch) >= 5000:
+            CscCenter.objects.bulk_update(batch, ['geohash'])
+            batch = []
+
+    if batch:
+        CscCenter.objects.bulk_update(batch, ['geohash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('directory', '0047_alter_csccenter_owner'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='csccenter',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, max_length=12, null=True),
+        ),
+        migrations.RunPython(backfill_geohash, migrations.RunPython.noop),
+    ]
@@ -4,6 +4,7 @@ import uuid
 
 from locations.models import UniquePlace, UniqueDistrict, UniqueState
 from registration.models import RegistrationSubType
+from utility.geohash import encode, to_coordinate
 
 class PostOffice(models.Model):
     circle_name = models.CharField(max_length=150, null=True, blank=True)
@@ -534,11 +535,20 @@ class CscCenter(models.Model):
 
     latitude = models.CharField(max_length=100, null=True)
     longitude = models.CharField(max_length=100, null=True)
+    geohash = models.CharField(max_length=12, blank=True, null=True, db_index=True)
 
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
 
+    def set_geohash(self):
+        lat = to_coordinate(self.latitude)
+        lon = to_coordinate(self.longitude)
+
+        self.geohash = encode(lat, lon) if lat is not None and lon is not None else None
+
     def save(self, *args, **kwargs):
+        self.set_geohash()
+
         if not self.slug:
             base_slug = slugify(f"{self.name}-{self.place.name}-{self.district.name}-{self.state.name}")
 
@@ -0,0 +1,252 @@
+import gzip
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+import requests
+from django.conf import settings
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+logger = logging.getLogger(__name__)
+
+OVERPASS_URL = "https://overpass-api.de/api/interpreter"
+
+CACHE_DIR = getattr(settings, "OVERPASS_CACHE_DIR", os.path.join(settings.BASE_DIR, "cache"))
+CACHE_MAX_BYTES = getattr(settings, "OVERPASS_CACHE_MAX_BYTES", 1024 ** 3)
+REPLAY = getattr(settings, "OVERPASS_REPLAY", False)
+
+INDEX_NAME = "index.json"
+# Cache hits recorded in memory before the index is written with their last use.
+INDEX_SAVE_HITS = 100
+READ_SIZE = 1 << 16
+
+WHITESPACE = re.compile(r"[\s,]*")
+
+
+class OverpassCacheMiss(LookupError):
+    pass
+
+
+def query_key(query, url=OVERPASS_URL):
+    """SHA1 of the GET url of ``query``, the names the responses already in ``cache/`` were saved under."""
+    prepared = requests.Request("GET", url, params={"data": query}).prepare().url
+    return hashlib.sha1(prepared.encode("utf-8")).hexdigest()
+
+
+class OverpassCache:
+    """Content addressed store of Overpass responses, gzipped, with an LRU bounded index.
+
+    Responses live in ``<key>.json.gz`` beside an ``index.json`` of their
+    size and last use. Uncompressed ``<key>.json`` files from before the
+    store are served as they are and compressed by ``adopt``.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.index = self.load_index()
+        self.unsaved_hits = 0
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def load_index(self):
+        try:
+            with open(self.path(INDEX_NAME), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_index(self):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.path(f"{INDEX_NAME}.tmp"), "w", encoding="utf-8") as f:
+            json.dump(self.index, f, separators=(",", ":"), sort_keys=True)
+
+        os.replace(self.path(f"{INDEX_NAME}.tmp"), self.path(INDEX_NAME))
+        self.unsaved_hits = 0
+
+    def open(self, key):
+        """The response stored under ``key`` as a binary file, or None."""
+        with self.lock:
+            entry = self.index.get(key)
+
+            if entry and os.path.exists(self.path(entry["file"])):
+                # Last uses only order evictions, they are written with the next store or in batches.
+                entry["used"] = time.time()
+                self.unsaved_hits += 1
+                if self.unsaved_hits >= INDEX_SAVE_HITS:
+                    self.save_index()
+                return gzip.open(self.path(entry["file"]), "rb")
+
+            if os.path.exists(self.path(f"{key}.json")):
+                return open(self.path(f"{key}.json"), "rb")
+
+        return None
+
+    def store(self, key, chunks, query=None):
+        """Compress ``chunks`` of a response into the store and return it opened as a binary file.
+
+        Least recently used entries over the size bound are evicted, never
+        the one just stored, which stays readable through the returned file
+        even if a later store evicts it.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        name = f"{key}.json.gz"
+
+        with gzip.open(self.path(f"{name}.tmp"), "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+
+        os.replace(self.path(f"{name}.tmp"), self.path(name))
+
+        with self.lock:
+            self.index[key] = {
+                "file": name,
+                "size": os.path.getsize(self.path(name)),
+                "used": time.time(),
+                "query": (query or "").strip()[:500],
+            }
+            f = gzip.open(self.path(name), "rb")
+            self.evict(keep=key)
+            self.save_index()
+
+        return f
+
+    def evict(self, keep=None):
+        total = sum(entry["size"] for entry in self.index.values())
+
+        for key, entry in sorted(self.index.items(), key=lambda item: item[1]["used"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+
+            try:
+                os.remove(self.path(entry["file"]))
+            except OSError:
+                pass
+
+            total -= entry["size"]
+            del self.index[key]
+            logger.info(f"Evicted Overpass response {key} from the cache")
+
+    def adopt(self):
+        """Compress and index the uncompressed ``<sha1>.json`` responses in the directory, returning how many."""
+        adopted = 0
+
+        for name in sorted(os.listdir(self.directory)):
+            key, extension = os.path.splitext(name)
+            if extension != ".json" or name == INDEX_NAME or key in self.index:
+                continue
+
+            with open(self.path(name), "rb") as f:
+                self.store(key, iter(lambda: f.read(READ_SIZE), b"")).close()
+
+            os.remove(self.path(name))
+            adopted += 1
+
+        return adopted
+
+    def stats(self):
+        with self.lock:
+            return {
+                "entries": len(self.index),
+                "bytes": sum(entry["size"] for entry in self.index.values()),
+                "max_bytes": self.max_bytes,
+            }
+
+
+overpass_cache = OverpassCache()
+
+
+def fetch(query, replay=None, cache=None):
+    """The Overpass response to ``query`` as a binary file, from the cache or else fetched and cached.
+
+    In replay mode a query missing from the cache raises OverpassCacheMiss
+    instead of reaching the network.
+    """
+    cache = cache or overpass_cache
+    replay = REPLAY if replay is None else replay
+    key = query_key(query)
+
+    f = cache.open(key)
+    if f is not None:
+        return f
+
+    if replay:
+        raise OverpassCacheMiss(f"Overpass query {key} is not cached")
+
+    logger.info(f"Fetching Overpass query {key}")
+    with requests.post(OVERPASS_URL, data={"data": query}, stream=True) as response:
+        response.raise_for_status()
+        return cache.store(key, response.iter_content(READ_SIZE), query)
+
+
+def iter_array(stream, name="elements"):
+    """Items of the top level ``name`` array of a JSON document, decoded one at a time.
+
+    Reads ``READ_SIZE`` characters at a time so memory holds the current
+    item, not the document, when ijson isn't installed.
+    """
+    reader = io.TextIOWrapper(stream, encoding="utf-8")
+    decoder = json.JSONDecoder()
+    marker = f'"{name}"'
+    buffer = ""
+
+    while True:
+        start = buffer.find(marker)
+        bracket = buffer.find("[", start) if start != -1 else -1
+        if bracket != -1:
+            position = bracket + 1
+            break
+
+        chunk = reader.read(READ_SIZE)
+        if not chunk:
+            return
+        buffer = (buffer if start != -1 else buffer[-len(marker):]) + chunk
+
+    while True:
+        position = WHITESPACE.match(buffer, position).end()
+
+        if position < len(buffer) and buffer[position] == "]":
+            return
+
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except ValueError:
+            chunk = reader.read(READ_SIZE)
+            if not chunk:
+                raise
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+
+        if end == len(buffer):
+            # Possibly cut short by the read, decode it again with more of the document.
+            chunk = reader.read(READ_SIZE)
+            if chunk:
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+
+        yield item
+        position = end
+
+
+def elements(query, replay=None, cache=None):
+    """Stream the elements of the Overpass response to ``query``."""
+    with fetch(query, replay, cache) as f:
+        if ijson is not None:
+            yield from ijson.items(f, "elements.item", use_float=True)
+        else:
+            yield from iter_array(f)
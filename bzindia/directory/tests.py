@@ -1,3 +1,93 @@
-from django.test import TestCase
+import io
+import json
+import os
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.test import SimpleTestCase
+
+from directory import overpass
+
+
+DOCUMENT = {
+    "version": 0.6,
+    "osm3s": {"copyright": "elements [of] the \"elements\" key"},
+    "elements": [
+        {"type": "node", "id": 1, "lat": 12.9716, "lon": 77.5946, "tags": {"name": "CSC, Bengaluru ]"}},
+        {"type": "node", "id": 22, "lat": -0.5, "lon": 1e-3, "tags": {"name": "सेवा केंद्र", "note": "{\"x\": [1, 2]}"}},
+        {"type": "way", "id": 333, "nodes": [1, 22, 4444], "tags": {}},
+        12345,
+        True,
+        None,
+    ],
+    "remark": "after the array",
+}
+
+
+def stream(text):
+    return io.BytesIO(text.encode("utf-8"))
+
+
+class IterArrayTests(SimpleTestCase):
+    def parse(self, text, read_size):
+        with mock.patch.object(overpass, "READ_SIZE", read_size):
+            return list(overpass.iter_array(stream(text)))
+
+    def test_items_across_read_boundaries(self):
+        expected = DOCUMENT["elements"]
+
+        for indent in (None, 2):
+            text = json.dumps(DOCUMENT, indent=indent, ensure_ascii=False)
+            for read_size in (1, 2, 3, 5, 7, 16, 64, len(text)):
+                with self.subTest(indent=indent, read_size=read_size):
+                    self.assertEqual(self.parse(text, read_size), expected)
+
+    def test_number_ending_a_read(self):
+        text = '{"elements": [123456, 7]}'
+        for read_size in range(1, len(text) + 1):
+            with self.subTest(read_size=read_size):
+                self.assertEqual(self.parse(text, read_size), [123456, 7])
+
+    def test_empty_and_missing_array(self):
+        for read_size in (1, 4, 1024):
+            self.assertEqual(self.parse('{"elements" : [ ]}', read_size), [])
+            self.assertEqual(self.parse('{"remark": "runtime error"}', read_size), [])
+
+    def test_truncated_document(self):
+        for read_size in (1, 3, 1024):
+            with self.subTest(read_size=read_size), self.assertRaises(ValueError):
+                self.parse('{"elements": [{"id": 1}, {"id": ', read_size)
+
+
+class OverpassCacheTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def test_response_larger_than_the_bound_is_readable(self):
+        cache = overpass.OverpassCache(self.directory, max_bytes=1)
+        body = json.dumps(DOCUMENT).encode("utf-8")
+
+        with cache.store("old", [b'{"elements": []}']):
+            pass
+        with cache.store("new", [body[:10], body[10:]]) as f:
+            self.assertEqual(f.read(), body)
+
+        self.assertEqual(list(cache.index), ["new"])
+        with cache.open("new") as f:
+            self.assertEqual(json.load(f), DOCUMENT)
+
+    def test_hits_save_the_index_in_batches(self):
+        cache = overpass.OverpassCache(self.directory)
+        cache.store("key", [b'{"elements": [1]}']).close()
+
+        with mock.patch.object(cache, "save_index", wraps=cache.save_index) as save_index:
+            for _ in range(overpass.INDEX_SAVE_HITS - 1):
+                cache.open("key").close()
+            save_index.assert_not_called()
+
+            cache.open("key").close()
+            save_index.assert_called_once()
+
+        self.assertTrue(os.path.exists(os.path.join(self.directory, overpass.INDEX_NAME)))
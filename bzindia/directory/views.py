@@ -4,75 +4,78 @@ import os
 import pandas
 import time
 import sys
-from django.core.paginator import Paginator
 from django.views.generic import ListView
 from django.templatetags.static import static
 from django.db import IntegrityError
 from django.db.models import Q
 import logging
+from decimal import Decimal
 from django.db import transaction
+from django.utils.text import slugify
 
 from .models import PostOffice, PoliceStation, Bank, Destination, Court
+from . import overpass
+from locations.ingest import BATCH_SIZE
+from utility.tabular import CHUNK_SIZE, flags, integers, read_records
 
 logger = logging.getLogger(__name__)
 
-def row_generator(csv_data):
-    for index, row in csv_data.iterrows():
-        yield index, row
-
-def import_postoffice_data():
-    GREEN = "\033[92m"
-    RESET = "\033[0m"
-
-    # Corrected path string (remove the extra quotes)
-    csv_data = pandas.read_csv(r"C:\Users\HP\Downloads\pincode.csv")
-    length = len(csv_data)
-
-    post_offices = []
-
-    for index, row in csv_data.iterrows():
-        time.sleep(0.001)
-
-        circle_name = row["CircleName"] if pandas.notna(row["CircleName"]) else None
-        region_name = row["RegionName"] if pandas.notna(row["RegionName"]) else None
-        division_name = row["DivisionName"] if pandas.notna(row["DivisionName"]) else None
-        office_name = row["OfficeName"] if pandas.notna(row["OfficeName"]) else None
-        pincode = row["Pincode"] if pandas.notna(row["Pincode"]) else None
-        office_type = row["OfficeType"] if pandas.notna(row["OfficeType"]) else None
-        delivery = True if row["Delivery"] == "Delivery" else False
-        district = row["District"] if pandas.notna(row["District"]) else None
-        state_name = row["StateName"] if pandas.notna(row["StateName"]) else None
-        latitude = row["Latitude"] if pandas.notna(row["Latitude"]) else None
-        longitude = row["Longitude"] if pandas.notna(row["Longitude"]) else None
-        
-        post_offices.append(PostOffice(
-            circle_name=circle_name,
-            region_name=region_name,
-            division_name=division_name,
-            office_name=office_name,
-            pincode=pincode,
-            office_type=office_type,
-            delivery=delivery,
-            district=district,
-            state_name=state_name,
-            latitude=latitude,
-            longitude=longitude
-        ))
-
-        # Progress bar display
-        sys.stdout.write(
-            f"{GREEN}\rExecuted {index + 1}/{length} rows - Completed {int((index + 1) / length * 100)}%{RESET}"
-        )
-        sys.stdout.flush()
+def import_checkpoint(path, resume):
+    """The checkpoint of ``path``, a fresh one when not resuming so the new run can still be resumed."""
+    from locations.ingest import Checkpoint
+
+    checkpoint = Checkpoint(path)
+    if not resume:
+        checkpoint.clear()
+
+    return checkpoint
+
+
+def postoffice_frame(frame):
+    return pandas.DataFrame({
+        "circle_name": frame["CircleName"],
+        "region_name": frame["RegionName"],
+        "division_name": frame["DivisionName"],
+        "office_name": frame["OfficeName"],
+        "pincode": integers(frame["Pincode"]),
+        "office_type": frame["OfficeType"],
+        "delivery": flags(frame["Delivery"], "Delivery"),
+        "district": frame["District"],
+        "state_name": frame["StateName"],
+        "latitude": frame["Latitude"],
+        "longitude": frame["Longitude"],
+    })
+
 
-    # Bulk create all the PostOffice instances at once
-    PostOffice.objects.bulk_create(post_offices)
+def import_postoffice_data(path, resume=True, chunk_size=CHUNK_SIZE):
+    from locations.ingest import run_import
 
-    print()  # To move the cursor to a new line after the progress bar
+    def import_chunk(chunk):
+        PostOffice.objects.bulk_create([PostOffice(**row) for row in chunk], batch_size=BATCH_SIZE)
+        return {"post offices": len(chunk)}
+
+    return run_import(
+        read_records(path, postoffice_frame, chunk_size), import_chunk,
+        import_checkpoint(path, resume), chunk_size, label="post offices"
+    )
 
     
-def import_police_stations():
-    overpass_url = "https://overpass-api.de/api/interpreter"
+def coordinate_key(model, latitude, longitude):
+    """(latitude, longitude) rounded like ``model`` stores them, None without both."""
+    if latitude is None or longitude is None:
+        return None
+
+    quantum = Decimal(1).scaleb(-model._meta.get_field("latitude").decimal_places)
+    return Decimal(str(latitude)).quantize(quantum), Decimal(str(longitude)).quantize(quantum)
+
+
+def stored_coordinates(model):
+    """Coordinates of every ``model`` row, one query replacing a lookup per imported element."""
+    rows = model.objects.exclude(latitude=None).exclude(longitude=None).values_list("latitude", "longitude")
+    return {coordinate_key(model, latitude, longitude) for latitude, longitude in rows.iterator(chunk_size=20000)}
+
+
+def import_police_stations(replay=None):
     overpass_query = """
     [out:json][timeout:100];
     area["name"="India"]->.searchArea;
@@ -86,13 +89,10 @@ def import_police_stations():
     out skel qt;
     """
     try:
-        response = requests.post(overpass_url, data={'data': overpass_query})
-        response.raise_for_status()
-
-        data = response.json()
         police_stations = []
+        seen = stored_coordinates(PoliceStation)
 
-        for element in data.get('elements', []):
+        for element in overpass.elements(overpass_query, replay):
             if element.get("tags"):
                 # Ensure essential fields are available
                 name = element['tags'].get('name') or element['tags'].get('name:en')
@@ -103,10 +103,11 @@ def import_police_stations():
                     continue
                 
                 # Avoid duplicates
-                if PoliceStation.objects.filter(
-                    Q(latitude=latitude) & Q(longitude=longitude)
-                ).exists():
+                key = coordinate_key(PoliceStation, latitude, longitude)
+                if key in seen:
                     continue
+                if key:
+                    seen.add(key)
 
                 # Create a new object
                 police_stations.append(PoliceStation(
@@ -144,12 +145,14 @@ def import_police_stations():
                 ))
 
         # Bulk create objects
-        PoliceStation.objects.bulk_create(police_stations)
+        PoliceStation.objects.bulk_create(police_stations, batch_size=BATCH_SIZE)
 
         logger.info(f"Successfully imported {len(police_stations)} police stations into the database.")
     
     except requests.exceptions.RequestException as e:
         logger.error(f"Error fetching data from Overpass API: {e}")
+    except overpass.OverpassCacheMiss as e:
+        logger.error(f"{e}, run without replay to fetch it")
     except ValueError:
         logger.error("Invalid JSON response received from Overpass API.")
     except IntegrityError as e:
@@ -157,54 +160,48 @@ def import_police_stations():
 
 
 
-def row_generator(csv_data):
-    for index, row in csv_data.iterrows():
-        yield index, row
-
-def import_banks():
-    GREEN = "\033[92m"
-    RESET = "\033[0m"
-
-    file = r"D:\Projects\BZ India\bzindia\static\w3\document\bank\bank.csv"
-    csv_data = pandas.read_csv(file)
-
-    banks = []  # List to hold Bank objects
-    length = len(csv_data)
-
-    for index, row in row_generator(csv_data):
-        bank = Bank(
-            name = row["BANK"],
-            ifsc = row["IFSC"],
-            branch = row["BRANCH"],
-            center = row["CENTRE"],
-            city = row["CITY"],
-            district = row["DISTRICT"],
-            state = row["STATE"],
-            address = row["ADDRESS"],
-            contact = row["CONTACT"],
-            iso3166 = row["ISO3166"],
-            micr = row["MICR"],
-            swift = row["SWIFT"] if row["SWIFT"] and row["SWIFT"] != "nan" else None,
-            imps = True if row["IMPS"] == "True" else False,
-            rtgs = True if row["RTGS"] == "True" else False,
-            neft = True if row["NEFT"] == "True" else False,
-            upi = True if row["UPI"] == "True" else False
-        )
-        banks.append(bank)
+BANK_TEXT_COLUMNS = {
+    "BANK": "name", "IFSC": "ifsc", "BRANCH": "branch", "CENTRE": "center", "CITY": "city",
+    "DISTRICT": "district", "STATE": "state", "ADDRESS": "address", "CONTACT": "contact",
+    "ISO3166": "iso3166", "MICR": "micr",
+}
 
-        # Progress bar
-        sys.stdout.write(
-            f"{GREEN}\rProcessed {index + 1}/{length} rows - Completed {int((index + 1) / length * 100)}%{RESET}"
-        )
-        sys.stdout.flush()
+BANK_FLAG_COLUMNS = {"IMPS": "imps", "RTGS": "rtgs", "NEFT": "neft", "UPI": "upi"}
+
+
+def bank_frame(frame):
+    banks = pandas.DataFrame({field: frame[column].fillna("") for column, field in BANK_TEXT_COLUMNS.items()})
+    banks["swift"] = frame["SWIFT"]
+    for column, field in BANK_FLAG_COLUMNS.items():
+        banks[field] = flags(frame[column], "True")
+
+    return banks
+
+
+def import_banks(path, resume=True, chunk_size=CHUNK_SIZE):
+    from locations.ingest import run_import
+    from utility.slugs import allocate_slugs
+
+    imported_ifscs = set(Bank.objects.values_list("ifsc", flat=True))
+
+    def import_chunk(chunk):
+        banks = []
+        for row in chunk:
+            if row["ifsc"] not in imported_ifscs:
+                imported_ifscs.add(row["ifsc"])
+                banks.append(Bank(**row))
+
+        allocate_slugs(Bank, banks, lambda bank: slugify(f"{bank.name}-{bank.ifsc}"))
+        Bank.objects.bulk_create(banks, batch_size=BATCH_SIZE)
+        return {"banks": len(banks), "skipped": len(chunk) - len(banks)}
 
-    # Bulk creation
-    Bank.objects.bulk_create(banks, ignore_conflicts=True)
-    print("\nImport complete!")
+    return run_import(
+        read_records(path, bank_frame, chunk_size), import_chunk,
+        import_checkpoint(path, resume), chunk_size, label="banks"
+    )
 
 
-def import_courts():
-    overpass_url = "https://overpass-api.de/api/interpreter"
+def import_courts(replay=None):
     overpass_query = """
         [out:json][timeout:100];
         area["name"="India"]->.searchArea;
@@ -218,20 +215,12 @@ def import_courts():
         out skel qt;
     """
     try:
-        # Send the request to Overpass API
-        response = requests.post(overpass_url, data={'data': overpass_query})
-        response.raise_for_status()
-
-        # Parse the response JSON
-        data = response.json()
-
-        print(data)
 
         tags = []
         lis = set()
                                                             
         # # Iterate over the elements in the response
-        for element in data.get('elements', []):
+        for element in overpass.elements(overpass_query, replay):
             if element.get("tags"):
                 print("/n",element.get("tags"))
         #         # alt_name = f"Name: {element['tags'].get('name_ja', '')}"
@@ -260,12 +249,13 @@ def import_courts():
 
     except requests.exceptions.RequestException as e:
         print(f"Error fetching data from Overpass API: {e}")
+    except overpass.OverpassCacheMiss as e:
+        print(f"{e}, run without replay to fetch it")
     except ValueError:
         print("Invalid JSON response received from Overpass API.")
             
 
-def import_attractions():
-    overpass_url = "https://overpass-api.de/api/interpreter"
+def import_attractions(replay=None):
     overpass_query = """
     [out:json][timeout:100];
     area["name"="India"]->.searchArea;
@@ -279,13 +269,10 @@ def import_attractions():
     out skel qt;
     """
     try:
-        response = requests.post(overpass_url, data={'data': overpass_query})
-        response.raise_for_status()
-
-        data = response.json()
         attractions = []
+        seen = stored_coordinates(Destination)
 
-        for element in data.get('elements', []):
+        for element in overpass.elements(overpass_query, replay):
             if element.get("tags"):
                 # Ensure essential fields are available
                 name = element['tags'].get('name') or element['tags'].get('name:en')
@@ -297,13 +284,11 @@ def import_attractions():
                 #     continue
                 
                 # Avoid duplicates
-                if Destination.objects.filter(
-                    latitude=latitude,
-                    longitude=longitude
-                ).exclude(
-                    Q(latitude__isnull=True) | Q(longitude__isnull=True)
-                ).exists():
+                key = coordinate_key(Destination, latitude, longitude)
+                if key in seen:
                     continue
+                if key:
+                    seen.add(key)
 
                 # Create a new object
                 attractions.append(Destination(
@@ -393,20 +378,21 @@ def import_attractions():
                 ))
 
         # Bulk create objects
-        Destination.objects.bulk_create(attractions)
+        Destination.objects.bulk_create(attractions, batch_size=BATCH_SIZE)
 
         logger.info(f"Successfully imported {len(attractions)} attractions into the database.")
     
     except requests.exceptions.RequestException as e:
         logger.error(f"Error fetching data from Overpass API: {e}")
+    except overpass.OverpassCacheMiss as e:
+        logger.error(f"{e}, run without replay to fetch it")
     except ValueError:
         logger.error("Invalid JSON response received from Overpass API.")
     except IntegrityError as e:
         logger.error(f"Database integrity error: {e}")
 
 
-def import_courts_data():
-    overpass_url = "https://overpass-api.de/api/interpreter"
+def import_courts_data(replay=None):
     overpass_query = """
     [out:json][timeout:100];
     area["name"="India"]->.searchArea;
@@ -420,13 +406,10 @@ def import_courts_data():
     out skel qt;
     """
     try:
-        response = requests.post(overpass_url, data={'data': overpass_query})
-        response.raise_for_status()
-
-        data = response.json()
         courts = []
+        seen = stored_coordinates(Court)
 
-        for element in data.get('elements', []):
+        for element in overpass.elements(overpass_query, replay):
             if element.get("tags"):
                 # Ensure essential fields are available
                 name = element['tags'].get('name') or element['tags'].get('name:en')
@@ -437,10 +420,11 @@ def import_courts_data():
                     continue
                 
                 # Avoid duplicates
-                if Court.objects.filter(
-                    Q(latitude=latitude) & Q(longitude=longitude)
-                ).exists():
+                key = coordinate_key(Court, latitude, longitude)
+                if key in seen:
                     continue
+                if key:
+                    seen.add(key)
 
                 # Create a new object
                 courts.append(Court(
@@ -483,240 +467,110 @@ def import_courts_data():
                 ))
 
         # Bulk create objects
-        Court.objects.bulk_create(courts)
+        Court.objects.bulk_create(courts, batch_size=BATCH_SIZE)
 
         logger.info(f"Successfully imported {len(courts)} courts into the database.")
     
     except requests.exceptions.RequestException as e:
         logger.error(f"Error fetching data from Overpass API: {e}")
+    except overpass.OverpassCacheMiss as e:
+        logger.error(f"{e}, run without replay to fetch it")
     except ValueError:
         logger.error("Invalid JSON response received from Overpass API.")
     except IntegrityError as e:
         logger.error(f"Database integrity error: {e}")
 
 
-def fetch_destination_locations(batch_size=100, buffer_size=10):
-    api_key = os.getenv("OPENCAGE_API_KEY_1")
-    base_url = 'https://api.opencagedata.com/geocode/v1/json'
+def location_components(components):
+    place = components.get("hamlet") \
+            or components.get("village") \
+            or components.get("neighbourhood") \
+            or components.get("suburb") \
+            or components.get("town") \
+            or components.get("city_district") \
+            or components.get("municipality") \
+            or components.get("city") \
+            or components.get("county")
 
-    destinations_qs = Destination.objects.filter(
-        Q(place__isnull=True) |
-        Q(district__isnull=True) |
-        Q(state__isnull=True) |
-        Q(pincode__isnull=True)
-    ).exclude(
-        latitude__isnull=True, longitude__isnull=True
-    ).order_by('id')  # Always order when paginating
+    district = components.get("state_district")
+    if not district and components.get("suburb") and components.get("city"):
+        district = components.get("city")
 
-    total = destinations_qs.count()
-    logger.info(f"Found {total} destinations to update")
+    return place, district, components.get("state"), components.get("postcode")
 
-    paginator = Paginator(destinations_qs, batch_size)
-    counting = 0
 
-    for page_number in paginator.page_range:
-        page = paginator.page(page_number)
-        updating_destinations = []
+def fill_missing_locations(queryset, place_field, label, api_keys=None, batch_size=100):
+    """Reverse geocode rows missing any location field and bulk update what was found."""
+    from locations.geocoding import geocode
 
-        logger.info(f"Processing batch {page_number}/{paginator.num_pages} (Batch size: {batch_size})")
+    model = queryset.model
+    fields = [place_field, "district", "state", "pincode"]
 
-        for destination in page.object_list:
-            latitude = destination.latitude
-            longitude = destination.longitude
+    total = queryset.count()
+    logger.info(f"Found {total} {label} to update")
 
-            try:
-                response = requests.get(
-                    base_url,
-                    params={'q': f'{latitude}+{longitude}', 'key': api_key},
-                    timeout=10
-                )
-                response.raise_for_status()
-
-                data = response.json()
-
-                if data.get("results"):
-                    components = data["results"][0].get("components", {})
-                    if components.get("country") == "India":
-
-                        place = components.get("hamlet") \
-                                or components.get("village") \
-                                or components.get("neighbourhood") \
-                                or components.get("suburb") \
-                                or components.get("town") \
-                                or components.get("city_district") \
-                                or components.get("municipality") \
-                                or components.get("city") \
-                                or components.get("county")
-
-                        state = components.get("state")
-                        district = components.get("state_district")
-                        pincode = components.get("postcode")
-
-                        if not district and components.get("suburb") and components.get("city"):
-                            district = components.get("city")
-
-                        if any([place, district, state, pincode]):
-                            destination.place = place or destination.place
-                            destination.district = district or destination.district
-                            destination.state = state or destination.state
-                            destination.pincode = pincode or destination.pincode
-
-                            updating_destinations.append(destination)
-                            counting += 1
-
-                            percentage = (counting / total) * 100 if total else 0
-                            logger.info(f"Progress: {percentage:.2f}%")
-
-                            # Flush buffer every `buffer_size` records
-                            if len(updating_destinations) >= buffer_size:
-                                with transaction.atomic():
-                                    Destination.objects.bulk_update(
-                                        updating_destinations, ["place", "district", "state", "pincode"]
-                                    )
-                                logger.info(f"Buffered update: {buffer_size} destinations updated")
-                                updating_destinations.clear()  # reset buffer
-
-                time.sleep(0.25)  # Respect API rate limit
-
-            except requests.exceptions.RequestException as e:
-                logger.error(f"API request error for ({latitude}, {longitude}): {e}")
-                if response.status_code == 429:
-                    retry_after = int(response.headers.get("Retry-After", 60))
-                    logger.warning(f"Rate limit exceeded. Sleeping for {retry_after} seconds...")
-                    time.sleep(retry_after)
-                else:
-                    logger.warning("Retrying after 5 seconds...")
-                    time.sleep(5)
+    def sink(batch):
+        objects = model.objects.in_bulk([pk for pk, _ in batch])
+        updating = []
+
+        for pk, data in batch:
+            instance = objects.get(pk)
+            if instance is None or not data.get("results"):
                 continue
 
-            except Exception as e:
-                logger.error(f"Unexpected error: {e}")
-                time.sleep(5)
+            components = data["results"][0].get("components", {})
+            if components.get("country") != "India":
                 continue
 
-        # Flush remaining buffered updates after batch
-        if updating_destinations:
-            with transaction.atomic():
-                Destination.objects.bulk_update(
-                    updating_destinations, ["place", "district", "state", "pincode"]
-                )
-            logger.info(f"Final buffered update: {len(updating_destinations)} destinations updated for batch {page_number}")
-            updating_destinations.clear()
+            values = location_components(components)
+            if any(values):
+                for field, value in zip(fields, values):
+                    setattr(instance, field, value or getattr(instance, field))
+                updating.append(instance)
 
-    logger.info("Location fetching completed for all destinations!")
+        with transaction.atomic():
+            model.objects.bulk_update(updating, fields)
 
-def fetch_police_locations(batch_size=100, buffer_size=10):
-    api_key = os.getenv("OPENCAGE_API_KEY_2")
-    base_url = 'https://api.opencagedata.com/geocode/v1/json'
+        logger.info(f"Updated {len(updating)} {label}")
+        return len(updating)
 
-    police_stations_qs = PoliceStation.objects.filter(
-        Q(city__isnull=True) |
+    items = (
+        (f"{latitude},{longitude}", pk)
+        for pk, latitude, longitude in queryset.values_list("pk", "latitude", "longitude").iterator(chunk_size=2000)
+    )
+    stats = geocode(items, sink, api_keys=api_keys, batch_size=batch_size)
+
+    logger.info(f"Location fetching completed for all {label}! {stats}")
+    return stats
+
+
+def fetch_destination_locations(batch_size=100, api_keys=None):
+    destinations_qs = Destination.objects.filter(
+        Q(place__isnull=True) |
         Q(district__isnull=True) |
         Q(state__isnull=True) |
         Q(pincode__isnull=True)
     ).exclude(
         latitude__isnull=True, longitude__isnull=True
-    ).order_by('id')  # Always order when paginating
-
-    total = police_stations_qs.count()
-    logger.info(f"Found {total} police stations to update")
-
-    paginator = Paginator(police_stations_qs, batch_size)
-    counting = 0
+    ).order_by('id')
 
-    for page_number in paginator.page_range:
-        page = paginator.page(page_number)
-        updating_police_stations = []
+    return fill_missing_locations(destinations_qs, "place", "destinations", api_keys, batch_size)
 
-        logger.info(f"Processing batch {page_number}/{paginator.num_pages} (Batch size: {batch_size})")
 
-        for police_station in page.object_list:
-            latitude = police_station.latitude
-            longitude = police_station.longitude
-
-            try:
-                response = requests.get(
-                    base_url,
-                    params={'q': f'{latitude}+{longitude}', 'key': api_key},
-                    timeout=10
-                )
-                response.raise_for_status()
-
-                data = response.json()
-
-                if data.get("results"):
-                    components = data["results"][0].get("components", {})
-                    if components.get("country") == "India":
-                        city = components.get("hamlet") \
-                                or components.get("village") \
-                                or components.get("neighbourhood") \
-                                or components.get("suburb") \
-                                or components.get("town") \
-                                or components.get("city_district") \
-                                or components.get("municipality") \
-                                or components.get("city") \
-                                or components.get("county")
-                        state = components.get("state")
-                        district = components.get("state_district")
-                        pincode = components.get("postcode")
-
-                        if not district and components.get("suburb") and components.get("city"):
-                            district = components.get("city")
-
-                        if any([city, district, state, pincode]):
-                            police_station.city = city or police_station.city
-                            police_station.district = district or police_station.district
-                            police_station.state = state or police_station.state
-                            police_station.pincode = pincode or police_station.pincode
-
-                            updating_police_stations.append(police_station)
-                            counting += 1
-
-                            percentage = (counting / total) * 100 if total else 0
-                            logger.info(f"Progress: {percentage:.2f}%")
-
-                            # Flush buffer every `buffer_size` records
-                            if len(updating_police_stations) >= buffer_size:
-                                with transaction.atomic():
-                                    PoliceStation.objects.bulk_update(
-                                        updating_police_stations, ["city", "district", "state", "pincode"]
-                                    )
-                                logger.info(f"Buffered update: {buffer_size} police stations updated")
-                                updating_police_stations.clear()  # reset buffer
-
-                time.sleep(0.25)  # Respect API rate limit
-
-            except requests.exceptions.RequestException as e:
-                logger.error(f"API request error for ({latitude}, {longitude}): {e}")
-                if response.status_code == 429:
-                    retry_after = int(response.headers.get("Retry-After", 60))
-                    logger.warning(f"Rate limit exceeded. Sleeping for {retry_after} seconds...")
-                    time.sleep(retry_after)
-                else:
-                    logger.warning("Retrying after 5 seconds...")
-                    time.sleep(5)
-                continue
-
-            except Exception as e:
-                logger.error(f"Unexpected error: {e}")
-                time.sleep(5)
-                continue
-
-        # Flush remaining buffered updates after batch
-        if updating_police_stations:
-            with transaction.atomic():
-                PoliceStation.objects.bulk_update(
-                    updating_police_stations, ["city", "district", "state", "pincode"]
-                )
-            logger.info(f"Final buffered update: {len(updating_police_stations)} police stations updated for batch {page_number}")
-            updating_police_stations.clear()
+def fetch_police_locations(batch_size=100, api_keys=None):
+    police_stations_qs = PoliceStation.objects.filter(
+        Q(city__isnull=True) |
+        Q(district__isnull=True) |
+        Q(state__isnull=True) |
+        Q(pincode__isnull=True)
+    ).exclude(
+        latitude__isnull=True, longitude__isnull=True
+    ).order_by('id')
 
-    logger.info("Location fetching completed for all police stations!")
+    return fill_missing_locations(police_stations_qs, "city", "police stations", api_keys, batch_size)
 
-def fetch_court_locations(batch_size=100, buffer_size=10):
-    api_key = os.getenv("OPENCAGE_API_KEY_3")
-    base_url = 'https://api.opencagedata.com/geocode/v1/json'
 
+def fetch_court_locations(batch_size=100, api_keys=None):
     courts_qs = Court.objects.filter(
         Q(city__isnull=True) |
         Q(district__isnull=True) |
@@ -724,104 +578,9 @@ def fetch_court_locations(batch_size=100, buffer_size=10):
         Q(pincode__isnull=True)
     ).exclude(
         latitude__isnull=True, longitude__isnull=True
-    ).order_by('id')  # Always order when paginating
-
-    total = courts_qs.count()
-    logger.info(f"Found {total} courts to update")
-
-    paginator = Paginator(courts_qs, batch_size)
-    counting = 0
-
-    for page_number in paginator.page_range:
-        page = paginator.page(page_number)
-        updating_courts = []
-
-        logger.info(f"Processing batch {page_number}/{paginator.num_pages} (Batch size: {batch_size})")
+    ).order_by('id')
 
-        for court in page.object_list:
-            latitude = court.latitude
-            longitude = court.longitude
-
-            try:
-                response = requests.get(
-                    base_url,
-                    params={'q': f'{latitude}+{longitude}', 'key': api_key},
-                    timeout=10
-                )
-                response.raise_for_status()
-
-                data = response.json()
-
-                if data.get("results"):
-                    components = data["results"][0].get("components", {})
-                    if components.get("country") == "India":
-
-                        city = components.get("hamlet") \
-                                or components.get("village") \
-                                or components.get("neighbourhood") \
-                                or components.get("suburb") \
-                                or components.get("town") \
-                                or components.get("city_district") \
-                                or components.get("municipality") \
-                                or components.get("city") \
-                                or components.get("county")
-
-                        state = components.get("state")
-                        district = components.get("state_district")
-                        pincode = components.get("postcode")
-
-                        if not district and components.get("suburb") and components.get("city"):
-                            district = components.get("city")
-
-                        if any([city, district, state, pincode]):
-                            court.city = city or court.city
-                            court.district = district or court.district
-                            court.state = state or court.state
-                            court.pincode = pincode or court.pincode
-
-                            updating_courts.append(court)
-                            counting += 1
-
-                            percentage = (counting / total) * 100 if total else 0
-                            logger.info(f"Progress: {percentage:.2f}%")
-
-                            # Flush buffer every `buffer_size` records
-                            if len(updating_courts) >= buffer_size:
-                                with transaction.atomic():
-                                    Court.objects.bulk_update(
-                                        updating_courts, ["city", "district", "state", "pincode"]
-                                    )
-                                logger.info(f"Buffered update: {buffer_size} courts updated")
-                                updating_courts.clear()  # reset buffer
-
-                time.sleep(0.25)  # Respect API rate limit
-
-            except requests.exceptions.RequestException as e:
-                logger.error(f"API request error for ({latitude}, {longitude}): {e}")
-                if response.status_code == 429:
-                    retry_after = int(response.headers.get("Retry-After", 60))
-                    logger.warning(f"Rate limit exceeded. Sleeping for {retry_after} seconds...")
-                    time.sleep(retry_after)
-                else:
-                    logger.warning("Retrying after 5 seconds...")
-                    time.sleep(5)
-                continue
-
-            except Exception as e:
-                logger.error(f"Unexpected error: {e}")
-                time.sleep(5)
-                continue
-
-        # Flush remaining buffered updates after batch
-        if updating_courts:
-            with transaction.atomic():
-                Court.objects.bulk_update(
-                    updating_courts, ["city", "district", "state", "pincode"]
-                )
-            logger.info(f"Final buffered update: {len(updating_courts)} courts updated for batch {page_number}")
-            updating_courts.clear()
-
-    logger.info("Location fetching completed for all courts!")
+    return fill_missing_locations(courts_qs, "city", "courts", api_keys, batch_size)
 
 import pandas as pd
 
@@ -840,84 +599,126 @@ def clean_number(value):
     except Exception:
         return None
 
-def import_csc_centers():
+def csc_service_names(row):
+    services = row.get("Services")
+    if not services or not isinstance(services, str):
+        return []
+
+    return list(dict.fromkeys(name.strip() for name in services.split(",") if name.strip()))
+
+
+def build_csc_center(csc_id, row, state_id, district_id, place_id):
+    from .models import CscCenter
+
+    contact_number = clean_number(row.get("csc_phone"))
+    mobile_number = clean_number(row.get("csc_phonetwo"))
+
+    if not contact_number and mobile_number:
+        contact_number = mobile_number
+
+    csc_center = CscCenter(
+        csc_id=csc_id,
+        name=clean_string(row.get("csc_name")),
+        state_id=state_id,
+        district_id=district_id,
+        place_id=place_id,
+        location=clean_string(row.get("cs_address")),
+        pincode=clean_string(row.get("csc_pincode")),
+        street=clean_string(row.get("csc_place")),
+        owner=clean_string(row.get("CSC Owner Name")),
+        email = clean_string(row.get("csc_email") or row.get("CSC Email")),
+        contact_number=contact_number,
+        mobile_number=mobile_number,
+        latitude=clean_string(row.get("csc_latitude")),
+        longitude=clean_string(row.get("csc_longitude")),
+    )
+
+    whatsapp = clean_string(row.get("csc_whatsapp"))
+    if whatsapp:
+        parts = whatsapp.split(",")
+        csc_center.whatsapp_number = parts[0].strip()
+        if len(parts) > 1 and not csc_center.mobile_number:
+            csc_center.mobile_number = clean_number(parts[1])
+
+    csc_center.set_geohash()
+    return csc_center
+
+
+def import_csc_centers(path, resume=True, chunk_size=CHUNK_SIZE):
     from .models import CscCenter
-    from locations.models import UniquePlace, UniqueDistrict, UniqueState    
+    from locations.ingest import KeyMap, LocationKeys, link_many, notify_location_changes, run_import
     from registration.models import RegistrationSubType, RegistrationType
     from company.models import Company
+    from utility.slugs import allocate_slugs
 
-    csv_data = pd.read_csv(r'D:\Projects\CSC\csc\static\w3\admin_csc_center\documents\csc-centers.csv')
-    length = len(csv_data)
-
-    company = Company.objects.filter(type="Registration").first()
+    company = Company.objects.filter(type__name="Registration").first()
     if not company:
         return "Failed! Registration company not found."
 
     registration_type, _ = RegistrationType.objects.get_or_create(company=company, name="Service")
 
-    logger.info("Importing data . . .")
+    locations = LocationKeys()
+    sub_types = KeyMap(
+        RegistrationSubType, ("name",),
+        lambda key: RegistrationSubType(name=key[0], type=registration_type, company=company),
+        slug_source=lambda sub_type: slugify(sub_type.name),
+        queryset=RegistrationSubType.objects.filter(type=registration_type, company=company),
+    )
+    imported_ids = set(CscCenter.objects.exclude(csc_id=None).values_list("csc_id", flat=True))
+    registrations = CscCenter._meta.get_field("registrations")
+
+    def import_chunk(chunk):
+        rows = []
+        for row in chunk:
+            csc_id = f"CSC{row['ID']}"
+            if csc_id not in imported_ids:
+                imported_ids.add(csc_id)
+                rows.append((csc_id, row))
 
-    for index, row in row_generator(csv_data):
-        try:
-            time.sleep(0.001)
+        location_ids = locations.resolve([
+            (clean_string(row.get("cs_state")), clean_string(row.get("cs_district")), clean_string(row.get("cs_block")))
+            for _, row in rows
+        ])
 
-            state_name = clean_string(row.get("cs_state"))
-            district_name = clean_string(row.get("cs_district"))
-            place_name = clean_string(row.get("cs_block"))
+        services = [csc_service_names(row) for _, row in rows]
+        sub_types.ensure({(name,) for names in services for name in names})
 
-            state, _ = UniqueState.objects.get_or_create(state=state_name)
-            district, _ = UniqueDistrict.objects.get_or_create(district=district_name, state=state)
-            place, _ = UniquePlace.objects.get_or_create(block=place_name, state=state, district=district)
+        centers, base_slugs, center_services = [], {}, []
+        for (csc_id, row), ids, names in zip(rows, location_ids, services):
+            try:
+                center = build_csc_center(csc_id, row, *ids)
+            except Exception as e:
+                logger.error(f"Error processing {csc_id}: {e} | Row: {row}")
+                continue
 
-            csc_id = f"CSC{row['ID']}"
-            if not CscCenter.objects.filter(csc_id=csc_id).exists():
-                with transaction.atomic():
-                    contact_number = clean_number(row.get("csc_phone"))
-                    mobile_number = clean_number(row.get("csc_phonetwo"))
-
-                    if not contact_number and mobile_number:
-                        contact_number = mobile_number
-
-                    csc_center = CscCenter.objects.create(
-                        csc_id=csc_id,
-                        name=clean_string(row.get("csc_name")),
-                        slug=slugify(clean_string(row.get("Slug"))),
-                        state=state,
-                        district=district,
-                        place=place,
-                        location=clean_string(row.get("cs_address")),
-                        zipcode=clean_string(row.get("csc_pincode")),
-                        street=clean_string(row.get("csc_place")),
-                        owner=clean_string(row.get("CSC Owner Name")),
-                        email = clean_string(row.get("csc_email") or row.get("CSC Email")),
-                        contact_number=contact_number,
-                        mobile_number=mobile_number,
-                        latitude=clean_string(row.get("csc_latitude")),
-                        longitude=clean_string(row.get("csc_longitude")),
-                    )
-
-                    whatsapp = clean_string(row.get("csc_whatsapp"))
-                    if whatsapp:
-                        parts = whatsapp.split(",")
-                        csc_center.whatsapp_number = parts[0].strip()
-                        if len(parts) > 1 and not csc_center.mobile_number:
-                            csc_center.mobile_number = clean_number(parts[1])
-
-                    services = row.get("Services")
-                    if services and isinstance(services, str):
-                        for registration in services.split(","):
-                            reg_name = registration.strip()
-                            reg_obj, _ = RegistrationSubType.objects.get_or_create(
-                                name=reg_name, type=registration_type, company=company
-                            )
-                            csc_center.registrations.add(reg_obj)
-
-                    csc_center.save()
-
-            logger.info(f"Processed row {index + 1} of {length}")
-
-        except Exception as e:
-            logger.error(f"Error processing row {index + 1}: {e} | Row: {row.to_dict()}")
-            continue
-
-    logger.info("Importing Completed!")
+            base_slugs[csc_id] = slugify(clean_string(row.get("Slug")) or "") or slugify(
+                "-".join(filter(None, (center.name, row.get("cs_block"), row.get("cs_district"), row.get("cs_state"))))
+            )
+            centers.append(center)
+            center_services.append(names)
+
+        allocate_slugs(CscCenter, centers, lambda center: base_slugs[center.csc_id], start=2)
+        CscCenter.objects.bulk_create(centers, batch_size=BATCH_SIZE)
+
+        center_ids = dict(
+            CscCenter.objects.filter(csc_id__in=[center.csc_id for center in centers]).values_list("csc_id", "pk")
+        )
+        links = link_many(registrations, [
+            (center_ids[center.csc_id], sub_types.get((name,)))
+            for center, names in zip(centers, center_services) for name in names
+        ])
+
+        return {"centers": len(centers), "skipped": len(chunk) - len(centers), "registrations": links}
+
+    logger.info("Importing data . . .")
+
+    counts = run_import(
+        read_records(path, chunk_size=chunk_size), import_chunk,
+        import_checkpoint(path, resume), chunk_size, label="CSC centers"
+    )
+
+    counts.update(locations.counts())
+    notify_location_changes()
+
+    logger.info(f"Importing Completed! {counts}")
+    return counts
@@ -3,12 +3,24 @@ from rest_framework import serializers
 from directory.models import CscCenter
 
 class CscCenterSerializer(serializers.ModelSerializer):
-    place_name = serializers.SerializerMethodField(source = "place.name", read_only=True)
-    district_name = serializers.SerializerMethodField(source = "district.name", read_only=True)
-    state_name = serializers.SerializerMethodField(source = "state.name", read_only=True)
-
-    model = CscCenter
-    fields = [
-        "csc_id", "name", "slug", "place_name", "district_name",
-        "state_name"
-    ]
\ No newline at end of file
+    place_name = serializers.CharField(source = "place.name", read_only=True, default=None)
+    district_name = serializers.CharField(source = "district.name", read_only=True, default=None)
+    state_name = serializers.CharField(source = "state.name", read_only=True, default=None)
+
+    class Meta:
+        model = CscCenter
+        fields = [
+            "csc_id", "name", "slug", "place_name", "district_name",
+            "state_name"
+        ]
+
+
+class NearbyCscCenterSerializer(CscCenterSerializer):
+    distance_km = serializers.SerializerMethodField()
+
+    class Meta(CscCenterSerializer.Meta):
+        fields = CscCenterSerializer.Meta.fields + ["latitude", "longitude", "distance_km"]
+
+    def get_distance_km(self, obj):
+        distance = getattr(obj, "distance_km", None)
+        return round(distance, 3) if distance is not None else None
\ No newline at end of file
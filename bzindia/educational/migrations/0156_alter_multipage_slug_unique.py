@@ -0,0 +1,23 @@
+from django.db import migrations, models
+
+from utility.slugs import deduplicate_slugs
+
+
+def deduplicate(apps, schema_editor):
+    deduplicate_slugs(apps.get_model('educational', 'MultiPage'), start=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('educational', '0155_alter_coursedetail_company'),
+    ]
+
+    operations = [
+        migrations.RunPython(deduplicate, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='multipage',
+            name='slug',
+            field=models.SlugField(blank=True, max_length=500, null=True, unique=True),
+        ),
+    ]
@@ -6,9 +6,12 @@ from django.utils import timezone
 from datetime import datetime, timedelta
 
 from company.models import Company
+from company.ratings import company_rating
 
 from locations.models import UniquePlace, UniqueState
 from base.models import MetaTag
+from utility.placeholders import strip_slug_placeholders
+from utility.slugs import unique_slug
 
 
 class Program(models.Model):
@@ -874,7 +877,7 @@ class MultiPage(models.Model):
     hide_support_languages = models.BooleanField(default=False)
     home_footer_visibility = models.BooleanField(default=False)
 
-    slug = models.SlugField(blank=True, null=True, max_length=500)
+    slug = models.SlugField(blank=True, null=True, max_length=500, unique=True)
 
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
@@ -887,17 +890,12 @@ class MultiPage(models.Model):
             self.home_footer_visibility = True
 
         base_slug = slugify(self.title)
-        slug = base_slug
-        count = 1
-
-        while MultiPage.objects.filter(slug = slug).exclude(pk = self.pk).exists():
-            slug = f"{base_slug}-{count}"
-            count += 1
 
+        # Placeholders are dropped before allocating, it's the stored slug that has to be unique.
         if self.url_type != "slug_filtered":
-            slug = slug.replace("-in-place_name", "").replace("-in-district_name", "").replace("-in-state_name", "").replace("-place_name", "").replace("-district_name", "").replace("-state_name", "")
+            base_slug = strip_slug_placeholders(base_slug)
 
-        self.slug = slug
+        self.slug = unique_slug(MultiPage, base_slug, exclude_pk=self.pk)
 
         super().save(*args, **kwargs)
 
@@ -964,6 +962,14 @@ class MultiPage(models.Model):
         from blog.models import Blog
 
         return Blog.objects.filter(course = self.course, company = self.company)
+
+    @property
+    def rating(self):
+        return company_rating(self.company)[0]
+
+    @property
+    def rating_count(self):
+        return company_rating(self.company)[1]
     
     @property
     def toc(self):
@@ -21,7 +21,7 @@ class HomeView(BaseView, TemplateView):
         context = super().get_context_data(**kwargs)
         try:
             context["home_page"] = True
-            context["companies"] = Company.objects.all().order_by("name")
+            context["companies"] = Company.objects.with_summaries().order_by("name")
             context["courses"] = Course.objects.all().order_by("?")[:12]
             context["registration_details"] = Registration.objects.all().order_by("sub_type__name")[:12]
             context["services"] = Service.objects.all().order_by("?")[:12]
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class LocationApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'location_api'
+
+    def ready(self):
+        from .signals import connect_signals
+        connect_signals()
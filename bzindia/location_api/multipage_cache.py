@@ -0,0 +1,193 @@
+import hashlib
+import logging
+import threading
+import time
+import uuid
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404
+
+logger = logging.getLogger(__name__)
+
+PAYLOAD_TIMEOUT = getattr(settings, "MULTIPAGE_CACHE_TIMEOUT", 60 * 60 * 6)
+OVERLAY_TIMEOUT = getattr(settings, "MULTIPAGE_CACHE_OVERLAY_TIMEOUT", 60 * 60 * 6)
+
+TAG_KEY = "multipage_cache:tag:{}"
+PAYLOAD_KEY = "multipage_cache:payload:{}:{}:{}"
+OVERLAY_KEY = "multipage_cache:overlay:{}:{}:{}"
+
+# Multipage model of each kind and the field pointing at the items it lists.
+MULTIPAGE_MODELS = {
+    "course": ("educational.MultiPage", "course"),
+    "registration": ("registration.MultiPage", "registration"),
+    "product": ("product.MultiPage", "products"),
+    "service": ("service.MultiPage", "service"),
+}
+
+# Resolutions also depend on the state slugs the overlays were keyed by.
+STATES_TAG = "states"
+
+
+def multipage_model(kind):
+    return apps.get_model(MULTIPAGE_MODELS[kind][0])
+
+
+def tag(name, pk):
+    return f"{name}:{pk}"
+
+
+def collection_tag(kind):
+    """Purged by any change to a kind's multipages, which may move a slug or state onto another page."""
+    return f"multipages:{kind}"
+
+
+def multipage_tags(kind, multipage):
+    """Tags of everything a rendered multipage payload is built from."""
+    item_field = MULTIPAGE_MODELS[kind][1]
+
+    if item_field == "products":
+        item_tags = [tag("product", product.pk) for product in multipage.products.all()]
+    else:
+        item_tags = [tag(item_field, getattr(multipage, f"{item_field}_id"))]
+
+    return [
+        tag(f"multipage:{kind}", multipage.pk), tag("company", multipage.company_id),
+        tag("testimonials", multipage.company_id), *item_tags,
+    ]
+
+
+def purge_tags(tags):
+    """Invalidate every entry built under any of ``tags`` by giving them a new version."""
+    tags = set(tags)
+    if not tags:
+        return
+
+    # A fresh random version rather than a counter, so a tag evicted from the
+    # cache can never come back with a version some stale entry was built with.
+    try:
+        cache.set_many({TAG_KEY.format(name): uuid.uuid4().hex for name in tags}, timeout=None)
+    except Exception as e:
+        logger.warning(f"Multipage cache purge of {len(tags)} tags failed: {e}")
+
+
+class TaggedCache:
+    """Cache entries stamped with the versions of their tags, valid while none of the tags is purged."""
+
+    def __init__(self, name, timeout):
+        self.name = name
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "render_ms": 0.0, "saved_ms": 0.0}
+
+    def _count(self, **amounts):
+        with self.lock:
+            for counter, amount in amounts.items():
+                self.counters[counter] += amount
+
+    def _versions(self, found, tags):
+        versions = {name: found.get(TAG_KEY.format(name)) for name in tags}
+
+        for name, version in versions.items():
+            if version is None:
+                cache.add(TAG_KEY.format(name), uuid.uuid4().hex, timeout=None)
+                versions[name] = cache.get(TAG_KEY.format(name))
+
+        return versions
+
+    def get(self, key, tags):
+        """(value, versions) where value is None on a miss; ``versions`` are what a rebuilt entry is stamped with."""
+        try:
+            found = cache.get_many([key, *(TAG_KEY.format(name) for name in tags)])
+            versions = self._versions(found, tags)
+        except Exception as e:
+            logger.warning(f"Multipage cache unavailable: {e}")
+            return None, None
+
+        entry = found.get(key)
+        if entry is None or entry["tags"] != versions:
+            self._count(misses=1)
+            return None, versions
+
+        self._count(hits=1, saved_ms=entry["render_ms"])
+        return entry["value"], versions
+
+    def set(self, key, value, versions, render_ms):
+        self._count(render_ms=render_ms)
+
+        # Versions read before rendering: a purge racing the render leaves the entry already stale.
+        if versions is None:
+            return
+
+        try:
+            cache.set(key, {"tags": versions, "value": value, "render_ms": render_ms}, timeout=self.timeout)
+        except Exception as e:
+            logger.warning(f"Multipage cache unavailable: {e}")
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counters)
+
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else None
+        stats["render_ms"] = round(stats["render_ms"], 2)
+        stats["saved_ms"] = round(stats["saved_ms"], 2)
+        return stats
+
+
+class MultipageResponseCache:
+    """Two level cache of multipage landing page responses.
+
+    The overlay level resolves a (kind, state slug, slug) request to the
+    multipage it shows, or to a 404. The payload level holds the rendered
+    multipage, which is the same whichever location it is requested under,
+    so every state shares one entry per multipage.
+    """
+
+    def __init__(self):
+        self.overlays = TaggedCache("overlay", OVERLAY_TIMEOUT)
+        self.payloads = TaggedCache("payload", PAYLOAD_TIMEOUT)
+
+    def retrieve(self, kind, location, slug, base_url, get_object, render):
+        """Serialized multipage for ``slug`` under ``location``.
+
+        ``get_object`` resolves the multipage the uncached way, raising
+        Http404 when there is none, and ``render`` serializes it.
+        """
+        overlay_key = OVERLAY_KEY.format(kind, location, slug)
+        overlay_tags = [collection_tag(kind), STATES_TAG]
+        overlay, overlay_versions = self.overlays.get(overlay_key, overlay_tags)
+
+        instance = None
+        if overlay is None:
+            start = time.perf_counter()
+            try:
+                instance = get_object()
+            except Http404:
+                overlay = {"pk": None, "tags": []}
+            else:
+                overlay = {"pk": instance.pk, "tags": multipage_tags(kind, instance)}
+
+            self.overlays.set(overlay_key, overlay, overlay_versions, (time.perf_counter() - start) * 1000)
+
+        if overlay["pk"] is None:
+            raise Http404
+
+        # Absolute media urls follow the requested host, keep one payload per host.
+        host = hashlib.md5(base_url.encode("utf-8")).hexdigest()[:12]
+        payload_key = PAYLOAD_KEY.format(kind, overlay["pk"], host)
+        data, payload_versions = self.payloads.get(payload_key, overlay["tags"])
+
+        if data is None:
+            start = time.perf_counter()
+            data = render(instance if instance is not None else get_object())
+            self.payloads.set(payload_key, data, payload_versions, (time.perf_counter() - start) * 1000)
+
+        return data
+
+    def stats(self):
+        return {"overlay": self.overlays.stats(), "payload": self.payloads.stats()}
+
+
+multipage_response_cache = MultipageResponseCache()
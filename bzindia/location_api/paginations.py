@@ -0,0 +1,5 @@
+from rest_framework.pagination import LimitOffsetPagination
+
+class NearbyCscCenterPagination(LimitOffsetPagination):
+    default_limit = 20
+    max_limit = 100
@@ -0,0 +1,203 @@
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+
+from .multipage_cache import MULTIPAGE_MODELS, STATES_TAG, collection_tag, multipage_model, purge_tags, tag
+
+# Item models listed by multipages, their tag names match MULTIPAGE_MODELS' item fields.
+ITEM_MODELS = {
+    "course": "educational.Course",
+    "registration": "registration.Registration",
+    "product": "product.Product",
+    "service": "service.Service",
+}
+
+TESTIMONIAL_MODELS = ["company.Testimonial", "educational.Testimonial"]
+
+# Levels of relations rendered below a multipage's own ones (a table's datas,
+# a slider page's tables and their datas) whose changes purge the multipage.
+NESTED_DEPTH = 2
+
+
+def purge_on_commit(tags):
+    tags = list(tags)
+    transaction.on_commit(lambda: purge_tags(tags))
+
+
+def multipage_changed(kind):
+    def receiver(sender, instance, **kwargs):
+        purge_on_commit([tag(f"multipage:{kind}", instance.pk), collection_tag(kind)])
+
+    return receiver
+
+
+def multipage_relation_changed(kind, field):
+    model = multipage_model(kind)
+
+    def receiver(sender, instance, action, reverse, pk_set, **kwargs):
+        # A clear is caught before it runs, while the multipages it detaches can still be found.
+        if action not in ("post_add", "post_remove", "pre_clear"):
+            return
+
+        if reverse:
+            # Changed from the related object's side, pk_set holds multipages.
+            pks = pk_set if pk_set is not None else model.objects.filter(**{field.name: instance}).values_list("pk", flat=True)
+        else:
+            pks = [instance.pk]
+
+        tags = [tag(f"multipage:{kind}", pk) for pk in pks]
+        # Resolutions hold the page's states and the item tags its payload is purged by.
+        if field.name in ("available_states", MULTIPAGE_MODELS[kind][1]):
+            tags.append(collection_tag(kind))
+
+        purge_on_commit(tags)
+
+    return receiver
+
+
+def related_object_changed(kind, field):
+    model = multipage_model(kind)
+
+    def receiver(sender, instance, **kwargs):
+        pks = model.objects.filter(**{field.name: instance}).values_list("pk", flat=True)
+        purge_on_commit(tag(f"multipage:{kind}", pk) for pk in pks)
+
+    return receiver
+
+
+def nested_relations(model, lookup, depth):
+    """(lookup from the multipage, field) of the forward relations below ``model``, reached through ``lookup``."""
+    if depth == 0:
+        return
+
+    for field in model._meta.get_fields():
+        if not (field.many_to_many or field.many_to_one) or field.auto_created or field.related_model is None:
+            continue
+
+        # The company has its own tag, states are covered by the states tag.
+        if field.name == "company" or field.related_model._meta.label == "locations.UniqueState":
+            continue
+
+        nested_lookup = f"{lookup}__{field.name}"
+        yield nested_lookup, field
+        yield from nested_relations(field.related_model, nested_lookup, depth - 1)
+
+
+def nested_object_changed(kind, lookup):
+    model = multipage_model(kind)
+
+    def receiver(sender, instance, **kwargs):
+        pks = model.objects.filter(**{lookup: instance}).values_list("pk", flat=True).distinct()
+        purge_on_commit(tag(f"multipage:{kind}", pk) for pk in pks)
+
+    return receiver
+
+
+def nested_relation_changed(kind, lookup):
+    model = multipage_model(kind)
+    owner_lookup = lookup.rsplit("__", 1)[0]
+
+    def receiver(sender, instance, action, reverse, pk_set, **kwargs):
+        if action not in ("post_add", "post_remove", "pre_clear"):
+            return
+
+        if not reverse:
+            multipages = model.objects.filter(**{owner_lookup: instance})
+        elif pk_set is not None:
+            # Changed from the related object's side, pk_set holds the owners.
+            multipages = model.objects.filter(**{f"{owner_lookup}__in": pk_set})
+        else:
+            multipages = model.objects.filter(**{lookup: instance})
+
+        pks = multipages.values_list("pk", flat=True).distinct()
+        purge_on_commit(tag(f"multipage:{kind}", pk) for pk in pks)
+
+    return receiver
+
+
+def company_changed(sender, instance, **kwargs):
+    purge_on_commit([tag("company", instance.pk)])
+
+
+def testimonial_changed(sender, instance, **kwargs):
+    purge_on_commit([tag("testimonials", instance.company_id)])
+
+
+def item_changed(name):
+    def receiver(sender, instance, **kwargs):
+        purge_on_commit([tag(name, instance.pk)])
+
+    return receiver
+
+
+def review_changed(sender, instance, **kwargs):
+    # Product multipages show their products' reviews and are rated from them.
+    purge_on_commit([tag("product", instance.product_id)])
+
+
+def blog_changed(sender, instance, **kwargs):
+    item_ids = {name: getattr(instance, f"{name}_id") for name in ITEM_MODELS}
+    purge_on_commit(tag(name, pk) for name, pk in item_ids.items() if pk)
+
+
+def state_changed(sender, instance, **kwargs):
+    purge_on_commit([STATES_TAG])
+
+
+def connect(signal, receiver, sender):
+    # Receivers are closures built per model, held strongly or they'd be collected.
+    signal.connect(receiver, sender=sender, weak=False)
+
+
+def connect_signals():
+    for kind in MULTIPAGE_MODELS:
+        model = multipage_model(kind)
+
+        receiver = multipage_changed(kind)
+        connect(post_save, receiver, model)
+        connect(post_delete, receiver, model)
+
+        for field in model._meta.many_to_many:
+            connect(m2m_changed, multipage_relation_changed(kind, field), field.remote_field.through)
+
+            # States are covered by the states tag, and items by their own tags.
+            if field.name in ("available_states", MULTIPAGE_MODELS[kind][1]):
+                continue
+
+            # Before the delete, while the through rows still point at the multipages.
+            receiver = related_object_changed(kind, field)
+            connect(post_save, receiver, field.related_model)
+            connect(pre_delete, receiver, field.related_model)
+
+            for lookup, nested_field in nested_relations(field.related_model, field.name, NESTED_DEPTH):
+                receiver = nested_object_changed(kind, lookup)
+                connect(post_save, receiver, nested_field.related_model)
+                connect(pre_delete, receiver, nested_field.related_model)
+
+                if nested_field.many_to_many:
+                    connect(m2m_changed, nested_relation_changed(kind, lookup), nested_field.remote_field.through)
+
+    for label in TESTIMONIAL_MODELS:
+        connect(post_save, testimonial_changed, apps.get_model(label))
+        connect(post_delete, testimonial_changed, apps.get_model(label))
+
+    for name, label in ITEM_MODELS.items():
+        receiver = item_changed(name)
+        connect(post_save, receiver, apps.get_model(label))
+        connect(post_delete, receiver, apps.get_model(label))
+
+    Company = apps.get_model("company.Company")
+    connect(post_save, company_changed, Company)
+    connect(post_delete, company_changed, Company)
+
+    Review = apps.get_model("product.Review")
+    connect(post_save, review_changed, Review)
+    connect(post_delete, review_changed, Review)
+
+    Blog = apps.get_model("blog.Blog")
+    connect(post_save, blog_changed, Blog)
+    connect(post_delete, blog_changed, Blog)
+
+    UniqueState = apps.get_model("locations.UniqueState")
+    connect(post_save, state_changed, UniqueState)
+    connect(post_delete, state_changed, UniqueState)
@@ -8,7 +8,7 @@ from .views import (
     StateRegistrationMultiPageViewSet, PlaceViewset, LocationMatchViewSet,
     StateProductMultiPageViewSet, StateServiceMultiPageViewSet,
     StateDistrictsViewSet, DistrictPlacesViewset, GetNearbyCscCentersViewSet,
-    PopularCityViewSet
+    PopularCityViewSet, StatsViewSet, MultipageUrlCheckViewSet
     )
 
 app_name = "location_api"
@@ -42,4 +42,9 @@ urlpatterns = [
     path('', include(districts_router.urls)),
     path('nearest_place/', GetNearestLocationViewSet.as_view({"get":"get"})),
     path('get_location/<str:location_type>/<str:slug>/', LocationMatchViewSet.as_view({"get":"retrieve"}), name="get_location"),
+    path('location_resolver_stats/', StatsViewSet.as_view({"get":"list"}, source="location_resolver"), name="location_resolver_stats"),
+    path('multipage_cache_stats/', StatsViewSet.as_view({"get":"list"}, source="multipage_cache"), name="multipage_cache_stats"),
+    path('multipage_url_check/', MultipageUrlCheckViewSet.as_view({"get":"list"}), name="multipage_url_check"),
+    path('geoip_stats/', StatsViewSet.as_view({"get":"list"}, source="geoip"), name="geoip_stats"),
+    path('feed_cache_stats/', StatsViewSet.as_view({"get":"list"}, source="feed_cache"), name="feed_cache_stats"),
 ]
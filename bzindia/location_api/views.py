@@ -1,13 +1,19 @@
 from rest_framework import viewsets, status
 from rest_framework.response import  Response
 from rest_framework.decorators import action
+from rest_framework.permissions import IsAdminUser
 
-from django.db.models import F, FloatField, ExpressionWrapper
-from django.db.models.functions import Sqrt
 from django.shortcuts import get_object_or_404
+from django.conf import settings
+from django.core.cache import cache
 from django.http import Http404
 
-from locations.trie_cache import get_place_trie, get_district_trie, get_state_trie
+from locations.resolver import resolve_location_slug, location_resolver
+from locations.suffix_index import get_suffix_index
+from locations.spatial_index import nearest_place_id
+from base import url_catalog
+from utility.feed_cache import feed_cache_stats
+from utility.geoip import ip_location_cache
 
 from .serializers import (
     PlaceSerializer, StateSerializer, DistrictSerializer, SimplePlaceSerializer, 
@@ -17,7 +23,7 @@ from course_api.serializers import MultiPageSerializer
 from registration_api.serializers import MultipageSerializer as RegistrationMultipageSerializer
 from product_api.serializers import MultiPageSerializer as ProductMultipageSerializer
 from service_api.serializers import MultipageSerializer as ServiceMultipageSerializer
-from directory_api.serializers import CscCenterSerializer
+from directory_api.serializers import NearbyCscCenterSerializer
 
 from educational.models import MultiPage
 from registration.models import MultiPage as RegistrationMultiPage
@@ -32,10 +38,13 @@ from service_api.paginations import ServiceMultipagePagination
 from product_api.paginations import ProductMultipagePagination
 from course_api.paginations import CourseMultipagePagination
 from registration_api.paginations import RegistrationMultipagePagination
+from .paginations import NearbyCscCenterPagination
 
 from rest_framework.decorators import action
 
-from utility.location import get_nearby_locations
+from utility.location import get_nearby_locations, get_nearby_csc_center_ids
+from utility.prefetch import PlannedQuerysetMixin
+from .multipage_cache import multipage_response_cache
 
 import logging
 
@@ -102,14 +111,12 @@ class GetNearestLocationViewSet(viewsets.ReadOnlyModelViewSet):
         except (TypeError, ValueError):
             return Response({"place": "Provided values are not coordinates"}, status=status.HTTP_400_BAD_REQUEST)
             
-        nearest_place = PlaceCoordinate.objects.annotate(
-            distance=ExpressionWrapper(
-                Sqrt((F('latitude') - lat) ** 2 + (F('longitude') - lon) ** 2),
-                output_field=FloatField()
-                )
-            ).order_by('distance').first()
-        
-        place = nearest_place.place
+        place_id = nearest_place_id(lat, lon)
+
+        if not place_id:
+            return Response({"place": "Not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        place = get_object_or_404(UniquePlace, pk=place_id)
         
         serializer = self.get_serializer(place)
 
@@ -316,9 +323,25 @@ class DistrictPlacesViewset(viewsets.ReadOnlyModelViewSet):
         return UniquePlace.objects.none()
 
 
-class StateCourseMultiPageViewSet(viewsets.ReadOnlyModelViewSet):
+class CachedMultipageMixin:
+    """Serve retrieve from the multipage response cache, shared by every location showing the page."""
+    cache_kind = None
+
+    def retrieve(self, request, *args, **kwargs):
+        if not getattr(settings, "MULTIPAGE_RESPONSE_CACHE", True):
+            return super().retrieve(request, *args, **kwargs)
+
+        data = multipage_response_cache.retrieve(
+            self.cache_kind, self.kwargs.get("state_slug"), self.kwargs.get(self.lookup_field),
+            request.build_absolute_uri("/"), self.get_object, lambda instance: self.get_serializer(instance).data,
+        )
+        return Response(data)
+
+
+class StateCourseMultiPageViewSet(CachedMultipageMixin, PlannedQuerysetMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = MultiPageSerializer
     lookup_field = "slug"
+    cache_kind = "course"
     pagination_class = CourseMultipagePagination
 
     def get_queryset(self):
@@ -329,16 +352,17 @@ class StateCourseMultiPageViewSet(viewsets.ReadOnlyModelViewSet):
             raise ValidationError({"detail": "Slug was not provided"})
         
         if slug == "all" or slug == "india":
-            return MultiPage.objects.all()
+            return MultiPage.objects
 
         state = get_object_or_404(UniqueState, slug=slug)
 
         return MultiPage.objects.filter(available_states=state)
     
 
-class StateRegistrationMultiPageViewSet(viewsets.ReadOnlyModelViewSet):
+class StateRegistrationMultiPageViewSet(CachedMultipageMixin, PlannedQuerysetMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = RegistrationMultipageSerializer
     lookup_field = "slug"
+    cache_kind = "registration"
     pagination_class = RegistrationMultipagePagination
 
     def get_queryset(self):
@@ -349,16 +373,17 @@ class StateRegistrationMultiPageViewSet(viewsets.ReadOnlyModelViewSet):
             raise ValidationError({"detail": "Slug was not provided"})
         
         if slug == "all" or slug == "india":
-            return RegistrationMultiPage.objects.all()
+            return RegistrationMultiPage.objects
 
         state = get_object_or_404(UniqueState, slug=slug)
 
         return RegistrationMultiPage.objects.filter(available_states=state)
     
 
-class StateProductMultiPageViewSet(viewsets.ReadOnlyModelViewSet):
+class StateProductMultiPageViewSet(CachedMultipageMixin, PlannedQuerysetMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = ProductMultipageSerializer
     lookup_field = "slug"
+    cache_kind = "product"
     pagination_class = ProductMultipagePagination
 
     def get_queryset(self):
@@ -370,18 +395,20 @@ class StateProductMultiPageViewSet(viewsets.ReadOnlyModelViewSet):
             raise ValidationError({"detail": "Slug was not provided"})
         
         if slug == "all" or slug == "india":
-            return ProductMultiPage.objects.all()
+            return ProductMultiPage.objects
 
         state = get_object_or_404(UniqueState, slug=slug)
 
         return ProductMultiPage.objects.filter(available_states=state)
 
 
-MATCH_ORDER = [
-    ("state", get_state_trie, UniqueState, StateSerializer),
-    ("district", get_district_trie, UniqueDistrict, DistrictSerializer),
-    ("place", get_place_trie, UniquePlace, PlaceSerializer),
-]
+MATCH_MODELS = {
+    "state": (UniqueState, StateSerializer),
+    "district": (UniqueDistrict, DistrictSerializer),
+    "place": (UniquePlace, PlaceSerializer),
+}
+
+LOCATION_PAYLOAD_TIMEOUT = 60 * 60 * 24
 
 class LocationMatchViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = UniquePlace.objects.none()
@@ -391,32 +418,84 @@ class LocationMatchViewSet(viewsets.ReadOnlyModelViewSet):
         slug = self.kwargs.get("slug")
         location_type = self.kwargs.get("location_type")        
 
-        for model_type, get_trie_fn, model, serializer_class in MATCH_ORDER:
-            if location_type and location_type != "undefined" and model_type != location_type:
-                continue
-            trie = get_trie_fn()
-            matched_slug = trie.match_suffix(slug)
-            if matched_slug:
-                try:
-                    instance = model.objects.get(slug=matched_slug)
-                    serializer = serializer_class(instance)
-                    return Response({
-                        "match_type": model_type,
-                        "data": serializer.data
-                    })
-                except model.DoesNotExist:
-                    return Response({
-                        "match_type": model_type,
-                        "matched_slug": matched_slug,
-                        "warning": "Slug matched in trie but not found in DB."
-                    })                                            
-
-        return Response({"match_type": None, "matched_slug": None})
+        resolution = resolve_location_slug(slug, location_type)
+
+        if not resolution:
+            return Response({"match_type": None, "matched_slug": None})
+
+        model, serializer_class = MATCH_MODELS[resolution.match_type]
+
+        # The serialized location is keyed by pk and index version, any location
+        # change publishes a new index version and so invalidates it.
+        version = get_suffix_index().version
+        cache_key = f"locations:match_payload:{version}:{resolution.match_type}:{resolution.pk}"
+        data = cache.get(cache_key)
+
+        if data is None:
+            try:
+                instance = model.objects.get(pk=resolution.pk)
+            except model.DoesNotExist:
+                return Response({
+                    "match_type": resolution.match_type,
+                    "matched_slug": resolution.matched_slug,
+                    "warning": "Slug matched in index but not found in DB."
+                })
+
+            data = serializer_class(instance).data
+            cache.set(cache_key, data, timeout=LOCATION_PAYLOAD_TIMEOUT)
+
+        return Response({
+            "match_type": resolution.match_type,
+            "data": data
+        })
+
+
+# Per-process counters of the caches and indexes, served by name.
+STATS_SOURCES = {
+    "location_resolver": location_resolver,
+    "multipage_cache": multipage_response_cache,
+    "geoip": ip_location_cache,
+    "feed_cache": feed_cache_stats,
+}
+
+
+class StatsViewSet(viewsets.ViewSet):
+    """Counters of the ``source`` cache or index, for admin users only."""
+    permission_classes = [IsAdminUser]
+    source = None
+
+    def list(self, request, *args, **kwargs):
+        return Response(STATS_SOURCES[self.source].stats(), status=status.HTTP_200_OK)
+
+
+class MultipageUrlCheckViewSet(viewsets.ViewSet):
+    """Whether ``?path=`` is a canonical multipage URL, answered from the URL catalog."""
+
+    def list(self, request, *args, **kwargs):
+        path = request.GET.get("path")
+
+        if not path:
+            return Response({"detail": "Path was not provided"}, status=status.HTTP_400_BAD_REQUEST)
+
+        row = url_catalog.lookup(path if path.endswith("/") else f"{path}/")
+
+        if row is None:
+            return Response({"detail": "Not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({
+            "multipage_type": row.multipage_type,
+            "multipage_id": row.multipage_id,
+            "location_type": row.location_type,
+            "location_id": row.location_id,
+            "path": row.path,
+            "lastmod": row.lastmod,
+        }, status=status.HTTP_200_OK)
     
 
-class StateServiceMultiPageViewSet(viewsets.ReadOnlyModelViewSet):
+class StateServiceMultiPageViewSet(CachedMultipageMixin, PlannedQuerysetMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = ServiceMultipageSerializer
     lookup_field = "slug"
+    cache_kind = "service"
     pagination_class = ServiceMultipagePagination
 
     def get_queryset(self):
@@ -427,51 +506,54 @@ class StateServiceMultiPageViewSet(viewsets.ReadOnlyModelViewSet):
             raise ValidationError({"detail": "Slug was not provided"})
 
         if slug == "all" or slug == "india":
-            return ServiceMultiPage.objects.all()
+            return ServiceMultiPage.objects
 
         state = get_object_or_404(UniqueState, slug=slug)
 
         return ServiceMultiPage.objects.filter(available_states=state)
     
 
-class GetNearbyCscCentersViewSet(viewsets.ModelViewSet):
-    serializer_class = CscCenterSerializer
+class GetNearbyCscCentersViewSet(viewsets.ReadOnlyModelViewSet):
+    serializer_class = NearbyCscCenterSerializer
+    pagination_class = NearbyCscCenterPagination
     queryset = CscCenter.objects.none()
 
-    def get_queryset(self):
+    default_radius_km = 5
+    max_radius_km = 50
+
+    def list(self, request, *args, **kwargs):
         lat = self.request.query_params.get('lat')
         lon = self.request.query_params.get('lon')
 
-        if lat and lon:
-            try:
-                lat = float(lat)
-                lon = float(lon)
-            except (TypeError, ValueError):
-                return CscCenter.objects.none()
-
-            difference = 0.05
+        if not lat or not lon:
+            return Response({"detail": "Not provided latitude and longitude"}, status=status.HTTP_400_BAD_REQUEST)
 
-            start_lat = lat - difference
-            start_lon = lon - difference
+        try:
+            lat = float(lat)
+            lon = float(lon)
+            radius_km = float(self.request.query_params.get('radius_km', self.default_radius_km))
+        except (TypeError, ValueError):
+            return Response({"detail": "Provided values are not valid numbers"}, status=status.HTTP_400_BAD_REQUEST)
 
-            end_lat = lat + difference
-            end_lon = lon + difference
+        radius_km = min(max(radius_km, 0), self.max_radius_km)
 
-            starting_point = [start_lat, start_lon]
-            ending_point = [end_lat, end_lon]
+        ranked = get_nearby_csc_center_ids(lat, lon, radius_km)
+        page = self.paginate_queryset(ranked)
 
-            centers = CscCenter.objects.filter(
-                latitude__range=(starting_point[0], ending_point[0]),
-                longitude__range=(starting_point[1], ending_point[1])
-            )
+        # Only the requested page of centers is loaded from the database.
+        centers = CscCenter.objects.select_related("place", "district", "state").in_bulk(
+            [center_id for center_id, _ in page]
+        )
 
-            # unique_centers_dict = dict()
-            # for center_obj in unfiltered_centers:
-            #     unique_centers_dict[center_obj.center.name] = center_obj.center.slug
+        page_centers = []
+        for center_id, distance in page:
+            center = centers.get(center_id)
+            if center:
+                center.distance_km = distance
+                page_centers.append(center)
 
-            # return UniquePlace.objects.filter(slug__in = unique_centers_dict.values())
-        
-        return CscCenter.objects.none()
+        serializer = self.get_serializer(page_centers, many=True)
+        return self.get_paginated_response(serializer.data)
 
 
 # class PopularCityViewSet(viewsets.ModelViewSet):
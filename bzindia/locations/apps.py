@@ -1,3 +1,5 @@
+import os
+
 from django.apps import AppConfig
 
 
@@ -5,6 +7,10 @@ class LocationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'locations'
 
-    # def ready(self):
-    #     from .trie_loader import load_location_data
-    #     load_location_data()
\ No newline at end of file
+    def ready(self):
+        from . import signals
+        from utility.geoip import geoip_reader
+
+        # Map the GeoIP database once at startup, workers forked afterwards share the mapping.
+        if os.path.exists(geoip_reader.path):
+            geoip_reader.get()
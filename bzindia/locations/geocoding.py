@@ -0,0 +1,387 @@
+import asyncio
+import hashlib
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from itertools import islice
+
+import httpx
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+OPENCAGE_URL = getattr(settings, "OPENCAGE_URL", "https://api.opencagedata.com/geocode/v1/json")
+REQUESTS_PER_SECOND = getattr(settings, "OPENCAGE_REQUESTS_PER_SECOND", 4)
+DAILY_QUOTA = getattr(settings, "OPENCAGE_DAILY_QUOTA", 6666)
+
+CONCURRENCY = 8
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+REQUEST_TIMEOUT = 10
+WRITE_BATCH_SIZE = 200
+READ_CHUNK_SIZE = 500
+QUOTA_RESERVATION = 10
+
+QUOTA_KEY = "opencage:quota:{}:{}"
+
+
+def default_api_keys():
+    return [key for key in getattr(settings, "OPENCAGE_API_KEYS", []) if key]
+
+
+class QuotaExhausted(Exception):
+    pass
+
+
+class TokenBucket:
+    """Async token bucket: ``rate`` requests per second with bursts up to ``capacity``."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = asyncio.Lock()
+
+    def pause(self, seconds):
+        """Hold every caller back, used when the server asks us to slow down."""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.tokens = 0
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    await asyncio.sleep(self.blocked_until - now)
+                    continue
+
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class SharedQuota:
+    """Daily request counter of one API key, shared by every process through the cache.
+
+    Requests are reserved from the shared counter in small blocks so the
+    cache is not hit on every call; a process can leave at most one block
+    unused when it stops.
+    """
+
+    def __init__(self, api_key, limit=DAILY_QUOTA, reservation=QUOTA_RESERVATION):
+        self.key_digest = hashlib.sha1(api_key.encode("utf-8")).hexdigest()[:12]
+        self.limit = limit
+        self.reservation = reservation
+        self.reserved = 0
+        self.day = None
+
+    @property
+    def cache_key(self):
+        return QUOTA_KEY.format(self.key_digest, datetime.now(timezone.utc).strftime("%Y%m%d"))
+
+    def take(self):
+        key = self.cache_key
+        if key != self.day:
+            # The quota resets at midnight UTC, drop what was reserved for the previous day.
+            self.day = key
+            self.reserved = 0
+
+        if self.reserved == 0:
+            cache.add(key, 0, timeout=60 * 60 * 48)
+            used = cache.incr(key, self.reservation)
+            granted = min(self.reservation, self.limit - (used - self.reservation))
+            if granted <= 0:
+                raise QuotaExhausted(f"Daily quota of {self.limit} requests used up")
+            self.reserved = granted
+
+        self.reserved -= 1
+
+    def used(self):
+        return cache.get(self.cache_key, 0)
+
+
+class ApiKeyLane:
+    def __init__(self, api_key, rate, daily_quota):
+        self.api_key = api_key
+        self.bucket = TokenBucket(rate)
+        self.quota = SharedQuota(api_key, daily_quota)
+        self.exhausted = False
+
+
+class GeocodeEngine:
+    """Concurrent OpenCage client spreading requests over several API keys.
+
+    Every key has its own token bucket and shared daily quota. Failed
+    requests are retried with exponential backoff. The items are read and
+    the results handed to a synchronous ``sink`` in batches from one
+    database thread, so lazy querysets and database writes never run (or
+    block) in the event loop, and that thread's connections are closed at
+    the end.
+    """
+
+    def __init__(self, api_keys=None, url=OPENCAGE_URL, rate=REQUESTS_PER_SECOND, daily_quota=DAILY_QUOTA,
+                 concurrency=CONCURRENCY, max_retries=MAX_RETRIES, batch_size=WRITE_BATCH_SIZE, params=None):
+        api_keys = api_keys or default_api_keys()
+        if not api_keys:
+            raise ValueError("No OpenCage API key configured")
+
+        self.lanes = [ApiKeyLane(api_key, rate, daily_quota) for api_key in api_keys]
+        self.url = url
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.batch_size = batch_size
+        self.params = {"no_annotations": 1, "limit": 1, **(params or {})}
+
+        self.next_lane = 0
+        self.stats = {"requested": 0, "succeeded": 0, "failed": 0, "retried": 0, "written": 0}
+
+    def _lane(self):
+        for _ in range(len(self.lanes)):
+            lane = self.lanes[self.next_lane % len(self.lanes)]
+            self.next_lane += 1
+            if not lane.exhausted:
+                return lane
+
+        raise QuotaExhausted("Every API key has used up its daily quota")
+
+    def _backoff(self, attempt):
+        return min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+    async def _reserve(self):
+        """A lane with a token and a quota slot reserved for one request."""
+        while True:
+            lane = self._lane()
+            await lane.bucket.acquire()
+            try:
+                lane.quota.take()
+                return lane
+            except QuotaExhausted:
+                if not lane.exhausted:
+                    logger.warning(f"OpenCage key ...{lane.api_key[-4:]} reached its daily quota")
+                lane.exhausted = True
+
+    async def geocode(self, client, query):
+        """Return the decoded response for ``query``, or None when it keeps failing."""
+        for attempt in range(self.max_retries + 1):
+            lane = await self._reserve()
+            self.stats["requested"] += 1
+
+            try:
+                response = await client.get(self.url, params={**self.params, "q": query, "key": lane.api_key})
+            except httpx.TransportError as e:
+                delay = self._backoff(attempt)
+                logger.info(f"Error during API request for '{query}': {e}, retrying in {delay:.1f}s")
+            else:
+                if response.status_code == 200:
+                    self.stats["succeeded"] += 1
+                    return response.json()
+
+                if response.status_code in (401, 402, 403):
+                    # Invalid, out of quota or suspended: this key is done for the day.
+                    logger.warning(f"OpenCage key ...{lane.api_key[-4:]} rejected with {response.status_code}")
+                    lane.exhausted = True
+                    continue
+
+                if response.status_code == 429:
+                    delay = float(response.headers.get("Retry-After") or self._backoff(attempt))
+                    lane.bucket.pause(delay)
+                elif response.status_code >= 500:
+                    delay = self._backoff(attempt)
+                else:
+                    logger.info(f"OpenCage rejected '{query}' with {response.status_code}")
+                    break
+
+                logger.info(f"OpenCage returned {response.status_code} for '{query}', retrying in {delay:.1f}s")
+
+            self.stats["retried"] += 1
+            await asyncio.sleep(delay)
+
+        self.stats["failed"] += 1
+        return None
+
+    async def run(self, items, sink):
+        """Geocode every (query, context) in ``items``, passing (context, data) batches to ``sink``.
+
+        ``items`` may be a lazy queryset iterator and ``sink`` returns the
+        number of rows it wrote, both run in the database thread.
+        """
+        loop = asyncio.get_running_loop()
+        database = ThreadPoolExecutor(max_workers=1, thread_name_prefix="geocode-db")
+
+        def in_database(func, *args):
+            return loop.run_in_executor(database, func, *args)
+
+        try:
+            return await self._run(iter(items), sink, in_database)
+        finally:
+            await in_database(connections.close_all)
+            database.shutdown(wait=False)
+
+    async def _run(self, items, sink, in_database):
+        queue = asyncio.Queue(maxsize=self.concurrency * 4)
+        results = []
+        flush_lock = asyncio.Lock()
+        stopped = asyncio.Event()
+
+        async def flush():
+            async with flush_lock:
+                if not results:
+                    return
+                batch = results[:]
+                results.clear()
+                self.stats["written"] += await in_database(sink, batch) or 0
+
+        async def worker(client):
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                if stopped.is_set():
+                    continue
+
+                query, context = item
+                try:
+                    data = await self.geocode(client, query)
+                except QuotaExhausted as e:
+                    logger.info(f"Stopping: {e}")
+                    stopped.set()
+                    continue
+
+                if data is not None:
+                    results.append((context, data))
+                    if len(results) >= self.batch_size:
+                        await flush()
+
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT, limits=limits) as client:
+            workers = [asyncio.create_task(worker(client)) for _ in range(self.concurrency)]
+
+            while not stopped.is_set():
+                chunk = await in_database(lambda: list(islice(items, READ_CHUNK_SIZE)))
+                if not chunk:
+                    break
+
+                for item in chunk:
+                    if stopped.is_set():
+                        break
+                    await queue.put(item)
+
+            for _ in workers:
+                await queue.put(None)
+
+            await asyncio.gather(*workers)
+            await flush()
+
+        return dict(self.stats, stopped_on_quota=stopped.is_set())
+
+
+def geocode(items, sink, **options):
+    """Run the engine to completion from synchronous code (Celery tasks, management commands)."""
+    engine = GeocodeEngine(**options)
+    stats = asyncio.run(engine.run(items, sink))
+    logger.info(f"Geocoding finished: {stats}")
+    return stats
+
+
+def grid_coordinates(top_left, bottom_right, step, skip=frozenset()):
+    """Yield (lat, lon) from the top-left corner, row by row, rounded as stored."""
+    rows = int(round((top_left[0] - bottom_right[0]) / step))
+    columns = int(round((bottom_right[1] - top_left[1]) / step))
+
+    for row in range(rows + 1):
+        latitude = round(top_left[0] - row * step, 2)
+        for column in range(columns + 1):
+            longitude = round(top_left[1] + column * step, 2)
+            if (latitude, longitude) not in skip:
+                yield latitude, longitude
+
+
+def first_address(data):
+    """(country, address) of the best result, with the road dropped from the address."""
+    if not data.get("results"):
+        return None, None
+
+    first_result = data["results"][0]
+    components = first_result.get("components", {})
+    formatted = first_result.get("formatted") or ""
+
+    road = components.get("road")
+    address = formatted.replace(f"{road},", "").strip() if road else formatted
+    return str(components.get("country")).lower(), address
+
+
+def country_grids():
+    from .models import (
+        IndiaCoordinates, IndiaLocationData, UaeCoordinates, UaeLocationData, KsaCoordinates, KsaLocationData,
+        KuwaitCoordinates, KuwaitLocationData, BahrainCoordinates, BahrainLocationData,
+        QatarCoordinates, QatarLocationData, OmanCoordinates, OmanLocationData
+    )
+
+    # country: (requested coordinates model, location data model, grid step, accepted country names)
+    return {
+        "india": (IndiaCoordinates, IndiaLocationData, 0.05, {"india"}),
+        "uae": (UaeCoordinates, UaeLocationData, 0.01, {"united arab emirates", "uae"}),
+        "ksa": (KsaCoordinates, KsaLocationData, 0.02, {"kingdom of saudi arabia", "saudi arabia", "ksa"}),
+        "kuwait": (KuwaitCoordinates, KuwaitLocationData, 0.02, {"kuwait"}),
+        "bahrain": (BahrainCoordinates, BahrainLocationData, 0.02, {"bahrain"}),
+        "qatar": (QatarCoordinates, QatarLocationData, 0.02, {"qatar"}),
+        "oman": (OmanCoordinates, OmanLocationData, 0.02, {"oman"}),
+    }
+
+
+def location_data_sink(coordinates_model, location_model, country_names):
+    """Store a batch of reverse-geocoded grid points with two bulk inserts."""
+    from django.db import transaction
+
+    def sink(batch):
+        locations = {}
+        for (latitude, longitude), data in batch:
+            country, address = first_address(data)
+            if country in country_names and address and address not in locations:
+                locations[address] = location_model(
+                    address=address, json_data=data, requested_latitude=latitude, requested_longitude=longitude
+                )
+
+        existing = set(location_model.objects.filter(address__in=list(locations)).values_list("address", flat=True))
+        new_locations = [location for address, location in locations.items() if address not in existing]
+
+        with transaction.atomic():
+            location_model.objects.bulk_create(new_locations)
+            coordinates_model.objects.bulk_create([
+                coordinates_model(latitude=latitude, longitude=longitude) for (latitude, longitude), _ in batch
+            ])
+
+        logger.info(f"Stored {len(new_locations)} new locations from {len(batch)} coordinates")
+        return len(new_locations)
+
+    return sink
+
+
+def fetch_country_locations(country, top_left, bottom_right, api_keys=None, **options):
+    """Reverse geocode the grid between two corners, skipping points requested before."""
+    coordinates_model, location_model, step, country_names = country_grids()[country]
+
+    requested = set(
+        coordinates_model.objects.filter(
+            latitude__lte=top_left[0], latitude__gte=bottom_right[0],
+            longitude__gte=top_left[1], longitude__lte=bottom_right[1]
+        ).values_list("latitude", "longitude").iterator(chunk_size=20000)
+    )
+
+    items = (
+        (f"{latitude},{longitude}", (latitude, longitude))
+        for latitude, longitude in grid_coordinates(top_left, bottom_right, step, requested)
+    )
+    return geocode(items, location_data_sink(coordinates_model, location_model, country_names), api_keys=api_keys, **options)
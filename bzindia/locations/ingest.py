@@ -0,0 +1,221 @@
+import itertools
+import json
+import logging
+import os
+import time
+from collections import Counter
+from datetime import datetime
+
+from django.db import transaction
+from django.utils.text import slugify
+
+from utility.slugs import allocate_slugs
+
+from .models import UniqueState, UniqueDistrict, UniquePlace
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 2000
+CHUNK_SIZE = 5000
+
+# Lookups per IN clause when reloading the pks of created rows.
+RELOAD_BATCH_SIZE = 1000
+
+
+def chunked(rows, chunk_size):
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class KeyMap:
+    """Natural key -> pk of one model, preloaded with one query and extended by batched creates.
+
+    Keys are tuples of the values of ``fields``. ``build`` turns a missing
+    key into an unsaved instance, and models whose ``save`` allocates a
+    slug get ``slug_source`` so ``bulk_create`` rows are slugged too.
+    ``queryset`` limits the rows preloaded.
+    """
+
+    def __init__(self, model, fields, build, slug_source=None, slug_start=1, queryset=None):
+        self.model = model
+        self.fields = fields
+        self.build = build
+        self.slug_source = slug_source
+        self.slug_start = slug_start
+        self.keys = {}
+        self.created = 0
+
+        # Oldest row first, where duplicates already exist the first one wins.
+        rows = (model.objects.all() if queryset is None else queryset).order_by("pk").values_list(*fields, "pk")
+        for row in rows.iterator(chunk_size=20000):
+            self.keys.setdefault(tuple(row[:-1]), row[-1])
+
+    def get(self, key):
+        return self.keys.get(key)
+
+    def ensure(self, keys):
+        """Create every key not in the map with one ``bulk_create``, keys holding a None are skipped."""
+        missing = {key for key in keys if key not in self.keys and None not in key}
+        if not missing:
+            return
+
+        instances = [self.build(key) for key in missing]
+        if self.slug_source:
+            allocate_slugs(self.model, instances, self.slug_source, start=self.slug_start)
+
+        self.model.objects.bulk_create(instances, batch_size=BATCH_SIZE)
+        self.created += len(instances)
+
+        # bulk_create doesn't return the pks on MySQL, read them back.
+        for batch in chunked(missing, RELOAD_BATCH_SIZE):
+            lookups = {f"{field}__in": {key[index] for key in batch} for index, field in enumerate(self.fields)}
+            for row in self.model.objects.filter(**lookups).values_list(*self.fields, "pk"):
+                if tuple(row[:-1]) in missing:
+                    self.keys.setdefault(tuple(row[:-1]), row[-1])
+
+
+def location_slug(instance):
+    return slugify(instance.name)
+
+
+class LocationKeys:
+    """State, district and place maps resolving (state, district, place) names to pks."""
+
+    def __init__(self):
+        self.states = KeyMap(
+            UniqueState, ("name",), lambda key: UniqueState(name=key[0]), location_slug, slug_start=1
+        )
+        self.districts = KeyMap(
+            UniqueDistrict, ("state_id", "name"),
+            lambda key: UniqueDistrict(state_id=key[0], name=key[1]), location_slug, slug_start=2
+        )
+        self.places = KeyMap(
+            UniquePlace, ("state_id", "district_id", "name"),
+            lambda key: UniquePlace(state_id=key[0], district_id=key[1], name=key[2]), location_slug, slug_start=2
+        )
+
+    def resolve(self, names):
+        """(state id, district id, place id) of every (state, district, place) name triple.
+
+        Missing locations are created, parents first, with one bulk insert
+        per level for the whole batch. Ids are None below a missing name.
+        """
+        self.states.ensure({(state,) for state, _, _ in names})
+        state_ids = [self.states.get((state,)) for state, _, _ in names]
+
+        district_keys = [(state_id, district) for state_id, (_, district, _) in zip(state_ids, names)]
+        self.districts.ensure(district_keys)
+        district_ids = [self.districts.get(key) for key in district_keys]
+
+        place_keys = [
+            (state_id, district_id, place)
+            for state_id, district_id, (_, _, place) in zip(state_ids, district_ids, names)
+        ]
+        self.places.ensure(place_keys)
+
+        return [
+            (state_id, district_id, self.places.get(key))
+            for state_id, district_id, key in zip(state_ids, district_ids, place_keys)
+        ]
+
+    def counts(self):
+        return {"states": self.states.created, "districts": self.districts.created, "places": self.places.created}
+
+
+def through_columns(field):
+    through = field.remote_field.through
+    return through, f"{field.model._meta.model_name}_id", f"{field.related_model._meta.model_name}_id"
+
+
+def link_many(field, pairs, batch_size=BATCH_SIZE):
+    """Bulk insert (source pk, target pk) rows into the through table of many to many ``field``."""
+    through, source, target = through_columns(field)
+
+    rows = [through(**{source: source_id, target: target_id}) for source_id, target_id in set(pairs)]
+    through.objects.bulk_create(rows, batch_size=batch_size, ignore_conflicts=True)
+    return len(rows)
+
+
+def set_many(field, source_ids, pairs, batch_size=BATCH_SIZE):
+    """Like ``.set()`` for every source in ``source_ids`` at once, ``pairs`` being the links to keep."""
+    through, source, target = through_columns(field)
+    pairs = set(pairs)
+
+    current = through.objects.filter(**{f"{source}__in": source_ids}).values_list("pk", source, target)
+    stale = [pk for pk, source_id, target_id in current if (source_id, target_id) not in pairs]
+    for batch in chunked(stale, batch_size):
+        through.objects.filter(pk__in=batch).delete()
+
+    return link_many(field, pairs, batch_size)
+
+
+class Checkpoint:
+    """Rows of a file already imported, stored beside it so a rerun resumes after the last committed chunk."""
+
+    def __init__(self, path):
+        self.path = f"{path}.checkpoint"
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)["rows"]
+        except (OSError, ValueError, KeyError):
+            return 0
+
+    def save(self, rows):
+        with open(f"{self.path}.tmp", "w", encoding="utf-8") as f:
+            json.dump({"rows": rows, "updated": datetime.now().isoformat()}, f)
+
+        os.replace(f"{self.path}.tmp", self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def notify_location_changes():
+    """Bulk inserts skip the location signals, schedule what they'd have scheduled once instead."""
+    from base.signals import schedule_location_sync
+    from base.url_catalog import catalog_enabled
+    from .signals import schedule_suffix_index_rebuild
+
+    transaction.on_commit(schedule_suffix_index_rebuild)
+    if catalog_enabled():
+        transaction.on_commit(schedule_location_sync)
+
+
+def run_import(rows, import_chunk, checkpoint=None, chunk_size=CHUNK_SIZE, label="rows"):
+    """Feed ``rows`` to ``import_chunk`` chunk by chunk, one transaction each.
+
+    ``import_chunk`` takes a list of rows and returns a dict of counts. With
+    a ``checkpoint``, rows committed by an earlier run are skipped and the
+    position is saved after every chunk. Returns the summed counts.
+    """
+    done = checkpoint.load() if checkpoint else 0
+    if done:
+        logger.info(f"Resuming {label} import after row {done}")
+
+    totals = Counter()
+    started = time.monotonic()
+    imported = 0
+
+    for chunk in chunked(itertools.islice(rows, done, None), chunk_size):
+        with transaction.atomic():
+            totals.update(import_chunk(chunk))
+
+        done += len(chunk)
+        imported += len(chunk)
+        if checkpoint:
+            checkpoint.save(done)
+
+        elapsed = time.monotonic() - started
+        logger.info(f"Imported {done} {label} ({imported / elapsed:.0f} rows/s): {dict(totals)}")
+
+    if checkpoint:
+        checkpoint.clear()
+
+    return dict(totals)
@@ -0,0 +1,68 @@
+import time
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db.models import F, FloatField, ExpressionWrapper
+from django.db.models.functions import Sqrt
+
+from locations.models import PlaceCoordinate
+from locations.spatial_index import SpatialIndex, haversine_km
+
+# Rough bounding box of India
+LAT_RANGE = (8.0, 37.0)
+LON_RANGE = (68.0, 97.5)
+
+
+def timed(fn, queries):
+    start = time.perf_counter()
+    for lat, lon in queries:
+        fn(lat, lon)
+    return (time.perf_counter() - start) / len(queries)
+
+
+class Command(BaseCommand):
+    help = "Benchmark the spatial index against a full scan and the ORM nearest-place query"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--points', type=int, default=500000, help='Size of the synthetic dataset')
+        parser.add_argument('--queries', type=int, default=1000)
+        parser.add_argument('--radius', type=float, default=6.0, help='Radius in km for the radius query')
+        parser.add_argument('--orm-queries', type=int, default=0, help='Also time N ORM queries on PlaceCoordinate')
+
+    def handle(self, *args, **kwargs):
+        rng = np.random.default_rng(42)
+        points = kwargs['points']
+
+        lats = rng.uniform(*LAT_RANGE, points)
+        lons = rng.uniform(*LON_RANGE, points)
+        queries = list(zip(rng.uniform(*LAT_RANGE, kwargs['queries']), rng.uniform(*LON_RANGE, kwargs['queries'])))
+
+        start = time.perf_counter()
+        index = SpatialIndex(np.arange(points), np.arange(points), lats, lons)
+        build = time.perf_counter() - start
+
+        self.stdout.write(f"Built index over {points} synthetic points in {build:.3f}s")
+
+        knn = timed(lambda lat, lon: index.nearest(lat, lon, k=1), queries)
+        knn_10 = timed(lambda lat, lon: index.nearest(lat, lon, k=10), queries)
+        radius = timed(lambda lat, lon: index.within(lat, lon, kwargs['radius']), queries)
+        scan = timed(lambda lat, lon: np.argsort(haversine_km(lat, lon, lats, lons))[0], queries[:50])
+
+        self.stdout.write(f"{'query':<28} {'mean (ms)':>10}")
+        self.stdout.write(f"{'index nearest (k=1)':<28} {knn * 1e3:>10.3f}")
+        self.stdout.write(f"{'index nearest (k=10)':<28} {knn_10 * 1e3:>10.3f}")
+        self.stdout.write(f"{'index radius':<28} {radius * 1e3:>10.3f}")
+        self.stdout.write(f"{'full scan + sort (numpy)':<28} {scan * 1e3:>10.3f}")
+
+        if kwargs['orm_queries']:
+            # The query GetNearestLocationViewSet used to run, against the real table.
+            def orm_nearest(lat, lon):
+                return PlaceCoordinate.objects.annotate(
+                    distance=ExpressionWrapper(
+                        Sqrt((F('latitude') - lat) ** 2 + (F('longitude') - lon) ** 2),
+                        output_field=FloatField()
+                    )
+                ).order_by('distance').values_list("place_id", flat=True).first()
+
+            rows = PlaceCoordinate.objects.count()
+            orm = timed(orm_nearest, queries[:kwargs['orm_queries']])
+            self.stdout.write(f"{'ORM nearest':<28} {orm * 1e3:>10.3f}  ({rows} rows in PlaceCoordinate)")
@@ -0,0 +1,84 @@
+import random
+import resource
+import string
+import time
+import tracemalloc
+from django.core.management.base import BaseCommand
+
+from locations.trie import SuffixTrie
+from locations.suffix_index import SuffixIndex, iter_location_entries, PLACE
+
+
+def synthetic_entries(count):
+    for pk in range(1, count + 1):
+        words = ["".join(random.choices(string.ascii_lowercase, k=random.randint(3, 9))) for _ in range(random.randint(1, 3))]
+        yield PLACE, "-".join(words), pk
+
+
+def measure(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    structure = build()
+    elapsed = time.perf_counter() - start
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return structure, elapsed, allocated
+
+
+def latencies(match, queries):
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        match(query)
+        timings.append(time.perf_counter() - start)
+
+    timings.sort()
+    return sum(timings) / len(timings), timings[int(len(timings) * 0.99) - 1]
+
+
+class Command(BaseCommand):
+    help = "Compare build time, memory and match_suffix latency of SuffixTrie and SuffixIndex"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--synthetic', type=int, default=0, help='Use N random slugs instead of the database')
+        parser.add_argument('--queries', type=int, default=20000)
+
+    def handle(self, *args, **kwargs):
+        random.seed(42)
+
+        if kwargs['synthetic']:
+            entries = list(synthetic_entries(kwargs['synthetic']))
+        else:
+            entries = list(iter_location_entries())
+
+        slugs = [slug for _, slug, _ in entries if slug]
+        queries = [f"best-service-providers-in-{random.choice(slugs)}" for _ in range(kwargs['queries'])]
+
+        self.stdout.write(f"Benchmarking {len(slugs)} slugs with {len(queries)} queries")
+
+        def build_trie():
+            trie = SuffixTrie()
+            for slug in slugs:
+                trie.insert(slug)
+            return trie
+
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        trie, trie_build, trie_memory = measure(build_trie)
+        rss_trie = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before
+        trie_mean, trie_p99 = latencies(trie.match_suffix, queries)
+        del trie
+
+        index, index_build, index_memory = measure(lambda: SuffixIndex.from_entries(entries))
+        index_mean, index_p99 = latencies(lambda query: index.match_suffix(query, PLACE), queries)
+
+        rows = [
+            ("SuffixTrie", trie_build, trie_memory, trie_mean, trie_p99),
+            ("SuffixIndex", index_build, index_memory, index_mean, index_p99),
+        ]
+
+        self.stdout.write(f"{'structure':<12} {'build (s)':>10} {'memory (MB)':>12} {'mean (µs)':>10} {'p99 (µs)':>10}")
+        for name, build, memory, mean, p99 in rows:
+            self.stdout.write(f"{name:<12} {build:>10.2f} {memory / 2**20:>12.1f} {mean * 1e6:>10.1f} {p99 * 1e6:>10.1f}")
+
+        self.stdout.write(f"Peak RSS growth while building the trie: {rss_trie / 1024:.1f} MB")
+        self.stdout.write(f"Index file size (shared by every worker via mmap): {len(index.buffer) / 2**20:.1f} MB")
@@ -0,0 +1,22 @@
+import time
+from django.core.management.base import BaseCommand
+
+from locations.suffix_index import build_index_file, INDEX_PATH
+
+
+class Command(BaseCommand):
+    help = "Build the memory-mapped location suffix index shared by all workers"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', type=str, default=INDEX_PATH, help='Output path of the index file')
+
+    def handle(self, *args, **kwargs):
+        path = kwargs['path']
+
+        start = time.perf_counter()
+        index = build_index_file(path)
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Indexed {index.count} location slugs in {elapsed:.2f}s at {path} (version {index.version})"
+        ))
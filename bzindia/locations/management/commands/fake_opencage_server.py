@@ -0,0 +1,98 @@
+import json
+import random
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+from django.core.management.base import BaseCommand
+
+
+class FakeOpenCageHandler(BaseHTTPRequestHandler):
+    """Answers /geocode/v1/json like OpenCage, with configurable latency, errors and quota."""
+
+    server_version = "FakeOpenCage/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        options = self.server.options
+        params = parse_qs(urlparse(self.path).query)
+        key = params.get("key", [""])[0]
+        query = params.get("q", [""])[0]
+
+        time.sleep(options["latency"])
+
+        with self.server.lock:
+            self.server.requests[key] = self.server.requests.get(key, 0) + 1
+            used = self.server.requests[key]
+
+        if not key:
+            return self.send_json(401, {"status": {"code": 401, "message": "invalid API key"}})
+        if options["quota"] and used > options["quota"]:
+            return self.send_json(402, {"status": {"code": 402, "message": "quota exceeded"}})
+        if random.random() < options["rate_limit_rate"]:
+            return self.send_json(429, {"status": {"code": 429, "message": "too many requests"}}, {"Retry-After": "1"})
+        if random.random() < options["error_rate"]:
+            return self.send_json(503, {"status": {"code": 503, "message": "service unavailable"}})
+
+        try:
+            latitude, longitude = (float(part) for part in query.split(","))
+        except ValueError:
+            latitude, longitude = 20.0, 78.0
+
+        place = f"Place {latitude:.2f} {longitude:.2f}"
+        self.send_json(200, {
+            "results": [{
+                "components": {
+                    "country": options["country"], "state": "Fake State", "state_district": "Fake District",
+                    "village": place, "postcode": "000000", "road": "Main Road",
+                },
+                "formatted": f"Main Road, {place}, Fake District, Fake State, 000000, {options['country']}",
+                "geometry": {"lat": latitude, "lng": longitude},
+            }],
+            "status": {"code": 200, "message": "OK"},
+        })
+
+
+class Command(BaseCommand):
+    help = "Run a local fake OpenCage server for exercising the geocoding engine"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--latency', type=float, default=0.05, help='Seconds per response')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Share of 503 responses')
+        parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Share of 429 responses')
+        parser.add_argument('--quota', type=int, default=0, help='Requests per key before 402, 0 for unlimited')
+        parser.add_argument('--country', type=str, default='India')
+
+    def handle(self, *args, **kwargs):
+        server = ThreadingHTTPServer(("127.0.0.1", kwargs['port']), FakeOpenCageHandler)
+        server.options = {
+            "latency": kwargs['latency'], "error_rate": kwargs['error_rate'],
+            "rate_limit_rate": kwargs['rate_limit_rate'], "quota": kwargs['quota'], "country": kwargs['country'],
+        }
+        server.requests = {}
+        server.lock = threading.Lock()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Fake OpenCage listening on http://127.0.0.1:{kwargs['port']}/geocode/v1/json"
+        ))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f"Requests per key: {server.requests}")
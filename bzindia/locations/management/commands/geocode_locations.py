@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from locations.geocoding import (
+    fetch_country_locations, country_grids, CONCURRENCY, DAILY_QUOTA, OPENCAGE_URL, REQUESTS_PER_SECOND
+)
+
+
+def corner(value):
+    try:
+        latitude, longitude = (float(part) for part in value.split(","))
+    except ValueError:
+        raise CommandError(f"Expected 'lat,lon', got '{value}'")
+    return latitude, longitude
+
+
+class Command(BaseCommand):
+    help = "Reverse geocode a country grid with the async OpenCage engine"
+
+    def add_arguments(self, parser):
+        parser.add_argument('country', choices=sorted(country_grids()))
+        parser.add_argument('--top-left', type=corner, required=True, help='lat,lon of the north-west corner')
+        parser.add_argument('--bottom-right', type=corner, required=True, help='lat,lon of the south-east corner')
+        parser.add_argument('--api-key', action='append', dest='api_keys', help='Defaults to OPENCAGE_API_KEYS (repeatable)')
+        parser.add_argument('--concurrency', type=int, default=CONCURRENCY)
+        parser.add_argument('--rate', type=float, default=REQUESTS_PER_SECOND, help='Requests per second per API key')
+        parser.add_argument('--daily-quota', type=int, default=DAILY_QUOTA, help='Requests per API key per day')
+        parser.add_argument('--url', type=str, default=OPENCAGE_URL, help='Geocoding endpoint, e.g. a fake_opencage_server')
+
+    def handle(self, *args, **kwargs):
+        stats = fetch_country_locations(
+            kwargs['country'], kwargs['top_left'], kwargs['bottom_right'], kwargs['api_keys'],
+            url=kwargs['url'], rate=kwargs['rate'], daily_quota=kwargs['daily_quota'], concurrency=kwargs['concurrency']
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {stats['succeeded']} coordinates geocoded, {stats['written']} locations stored "
+            f"({stats['retried']} retries, {stats['failed']} failed{', stopped on quota' if stats['stopped_on_quota'] else ''})"
+        ))
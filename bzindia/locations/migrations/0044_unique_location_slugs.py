@@ -0,0 +1,35 @@
+from django.db import migrations, models
+
+from utility.slugs import deduplicate_slugs
+
+
+def deduplicate(apps, schema_editor):
+    deduplicate_slugs(apps.get_model('locations', 'UniqueState'), start=1)
+    deduplicate_slugs(apps.get_model('locations', 'UniqueDistrict'), start=2)
+    deduplicate_slugs(apps.get_model('locations', 'UniquePlace'), start=2)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('locations', '0043_indialocationdata'),
+    ]
+
+    operations = [
+        migrations.RunPython(deduplicate, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='uniquestate',
+            name='slug',
+            field=models.SlugField(blank=True, max_length=500, null=True, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='uniquedistrict',
+            name='slug',
+            field=models.SlugField(blank=True, max_length=500, null=True, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='uniqueplace',
+            name='slug',
+            field=models.SlugField(blank=True, max_length=500, null=True, unique=True),
+        ),
+    ]
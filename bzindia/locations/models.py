@@ -1,6 +1,8 @@
 from django.db import models
 from django.utils.text import slugify
 
+from utility.slugs import unique_slug
+
 class State(models.Model):
     name = models.CharField(max_length=150)    
     slug = models.SlugField(blank=True, null=True, max_length=500)
@@ -128,21 +130,14 @@ class TestPincode(models.Model):
 
 class UniqueState(models.Model):
     name = models.CharField(max_length=150)    
-    slug = models.SlugField(blank=True, null=True, max_length=500)
+    slug = models.SlugField(blank=True, null=True, max_length=500, unique=True)
 
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            base_slug = slugify(self.name)
-            slug = base_slug
-            count = 1
-            while UniqueState.objects.filter(slug = slug).exists():
-                slug = f"{base_slug}-{count}"
-                count += 1
-
-            self.slug = slug
+            self.slug = unique_slug(UniqueState, slugify(self.name), start=1)
         
         super().save(*args, **kwargs)
 
@@ -157,21 +152,14 @@ class UniqueState(models.Model):
 class UniqueDistrict(models.Model):
     name = models.CharField(max_length=150)
     state = models.ForeignKey(UniqueState, on_delete=models.CASCADE, related_name = "districts")
-    slug = models.SlugField(blank=True, null=True, max_length=500)
+    slug = models.SlugField(blank=True, null=True, max_length=500, unique=True)
 
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            base_slug = slugify(self.name)
-            slug = base_slug
-            count = 2
-            while UniqueDistrict.objects.filter(slug = slug).exists():
-                slug = f"{base_slug}-{count}"
-                count += 1
-
-            self.slug = slug
+            self.slug = unique_slug(UniqueDistrict, slugify(self.name), start=2)
         
         super().save(*args, **kwargs)
 
@@ -205,21 +193,14 @@ class UniquePlace(models.Model):
 
     coordinates = models.ManyToManyField(PlaceCoordinate)    
     
-    slug = models.SlugField(blank=True, null=True, max_length=500)
+    slug = models.SlugField(blank=True, null=True, max_length=500, unique=True)
 
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            base_slug = slugify(self.name)
-            slug = base_slug
-            count = 2
-            while UniquePlace.objects.filter(slug = slug).exists():
-                slug = f"{base_slug}-{count}"
-                count += 1
-
-            self.slug = slug
+            self.slug = unique_slug(UniquePlace, slugify(self.name), start=2)
         
         super().save(*args, **kwargs)
 
@@ -0,0 +1,124 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict, namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .suffix_index import get_suffix_index, KIND_NAMES, KINDS, STATE, DISTRICT, PLACE
+
+logger = logging.getLogger(__name__)
+
+LocationResolution = namedtuple("LocationResolution", ["match_type", "matched_slug", "pk"])
+
+# States win over districts, districts over places, as with the old trie walk.
+MATCH_ORDER = (STATE, DISTRICT, PLACE)
+
+LOCAL_CACHE_SIZE = getattr(settings, "LOCATION_RESOLVER_CACHE_SIZE", 10000)
+SHARED_CACHE_TIMEOUT = getattr(settings, "LOCATION_RESOLVER_CACHE_TIMEOUT", 60 * 60 * 24)
+
+NO_MATCH = ()
+
+
+class LocationSlugResolver:
+    """Resolve the location part of a multipage slug in a single index walk.
+
+    Results are memoised in a bounded per-process LRU and in the shared
+    django cache. Both are keyed by the suffix index version, so publishing
+    a rebuilt index invalidates every cached resolution.
+    """
+
+    def __init__(self, maxsize=LOCAL_CACHE_SIZE, timeout=SHARED_CACHE_TIMEOUT):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.local = OrderedDict()
+        self.lock = threading.Lock()
+        self.counters = {"local_hits": 0, "shared_hits": 0, "misses": 0}
+
+    def _count(self, counter):
+        with self.lock:
+            self.counters[counter] += 1
+
+    def _remember(self, key, value):
+        with self.lock:
+            self.local[key] = value
+            self.local.move_to_end(key)
+            if len(self.local) > self.maxsize:
+                self.local.popitem(last=False)
+
+    def _shared_key(self, key):
+        digest = hashlib.md5(":".join(str(part) for part in key).encode("utf-8")).hexdigest()
+        return f"locations:resolve:{digest}"
+
+    def resolve(self, slug, location_type=None):
+        """Return a LocationResolution for ``slug``, or None when nothing matches.
+
+        ``location_type`` ("state", "district" or "place") restricts the match
+        to one kind; anything else searches all kinds in MATCH_ORDER.
+        """
+        kind = KINDS.get(location_type)
+        index = get_suffix_index()
+        key = (index.version, kind, slug)
+
+        with self.lock:
+            value = self.local.get(key)
+            if value is not None:
+                self.local.move_to_end(key)
+
+        if value is not None:
+            self._count("local_hits")
+            return LocationResolution(*value) if value else None
+
+        shared_key = self._shared_key(key)
+        try:
+            value = cache.get(shared_key)
+        except Exception as e:
+            logger.warning(f"Location resolver cache unavailable: {e}")
+            value = None
+
+        if value is not None:
+            self._count("shared_hits")
+        else:
+            self._count("misses")
+            value = self._lookup(index, slug, kind)
+            try:
+                cache.set(shared_key, value, timeout=self.timeout)
+            except Exception as e:
+                logger.warning(f"Location resolver cache unavailable: {e}")
+
+        value = tuple(value)
+        self._remember(key, value)
+        return LocationResolution(*value) if value else None
+
+    def _lookup(self, index, slug, kind):
+        matches = index.longest_matches(slug)
+
+        for match_kind in MATCH_ORDER:
+            if kind is not None and match_kind != kind:
+                continue
+            if match_kind in matches:
+                matched_slug, pk = matches[match_kind]
+                return (KIND_NAMES[match_kind], matched_slug, pk)
+
+        return NO_MATCH
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counters)
+            stats["local_size"] = len(self.local)
+
+        lookups = stats["local_hits"] + stats["shared_hits"] + stats["misses"]
+        stats["hit_ratio"] = round((stats["local_hits"] + stats["shared_hits"]) / lookups, 4) if lookups else None
+        return stats
+
+    def clear(self):
+        with self.lock:
+            self.local.clear()
+
+
+location_resolver = LocationSlugResolver()
+
+
+def resolve_location_slug(slug, location_type=None):
+    return location_resolver.resolve(slug, location_type)
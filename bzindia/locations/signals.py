@@ -0,0 +1,40 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import UniqueState, UniqueDistrict, UniquePlace, PlaceCoordinate
+from .spatial_index import publish_change
+
+SUFFIX_INDEX_REBUILD_LOCK = "locations:suffix_index:rebuild_scheduled"
+SUFFIX_INDEX_REBUILD_DELAY = 60
+
+
+def schedule_suffix_index_rebuild():
+    # Debounce: a bulk of saves within the delay window triggers a single rebuild.
+    if cache.add(SUFFIX_INDEX_REBUILD_LOCK, 1, timeout=SUFFIX_INDEX_REBUILD_DELAY):
+        from .tasks import rebuild_suffix_index
+        rebuild_suffix_index.apply_async(countdown=SUFFIX_INDEX_REBUILD_DELAY)
+
+
+@receiver(post_save, sender=UniqueState)
+@receiver(post_save, sender=UniqueDistrict)
+@receiver(post_save, sender=UniquePlace)
+@receiver(post_delete, sender=UniqueState)
+@receiver(post_delete, sender=UniqueDistrict)
+@receiver(post_delete, sender=UniquePlace)
+def location_slug_changed(sender, instance, **kwargs):
+    transaction.on_commit(schedule_suffix_index_rebuild)
+
+
+@receiver(post_save, sender=PlaceCoordinate)
+def place_coordinate_saved(sender, instance, **kwargs):
+    change = ("upsert", instance.pk, instance.place_id, instance.latitude, instance.longitude)
+    transaction.on_commit(lambda: publish_change(*change))
+
+
+@receiver(post_delete, sender=PlaceCoordinate)
+def place_coordinate_deleted(sender, instance, **kwargs):
+    # The pk is cleared once the delete finishes, capture it now.
+    pk = instance.pk
+    transaction.on_commit(lambda: publish_change("remove", pk))
@@ -0,0 +1,248 @@
+import logging
+import math
+import threading
+
+import numpy as np
+
+from utility.replicated_index import ReplicatedIndex
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+CELL_DEGREES = 0.1
+MAX_RINGS = 40
+COMPACT_THRESHOLD = 5000
+
+
+def haversine_km(lat, lon, lats, lons):
+    """Great-circle distance in km from one point to arrays of points (degrees)."""
+    lat1 = math.radians(lat)
+    lats = np.radians(lats)
+    dlat = lats - lat1
+    dlon = np.radians(lons) - math.radians(lon)
+    a = np.sin(dlat / 2) ** 2 + math.cos(lat1) * np.cos(lats) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def cell_row(lat):
+    return np.floor((np.asarray(lat) + 90) / CELL_DEGREES).astype(np.int64)
+
+
+def cell_col(lon):
+    return np.floor((np.asarray(lon) + 180) / CELL_DEGREES).astype(np.int64)
+
+
+COLUMNS = int(360 / CELL_DEGREES) + 1
+
+
+class SpatialIndex:
+    """Grid-bucketed point index answering haversine k-NN and radius queries.
+
+    Points are kept in NumPy arrays sorted by grid cell, so a cell is a
+    contiguous slice found with ``searchsorted``. Changes after the build
+    go to a small delta (upserts) and a tombstone set (removals) that are
+    merged into every query and folded back into the arrays once they grow.
+    """
+
+    def __init__(self, ids, place_ids, lats, lons, version=0):
+        ids = np.asarray(ids, dtype=np.int64)
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        cells = cell_row(lats) * COLUMNS + cell_col(lons)
+        order = np.argsort(cells, kind="stable")
+
+        self.ids = ids[order]
+        self.place_ids = np.asarray(place_ids, dtype=np.int64)[order]
+        self.lats = lats[order]
+        self.lons = lons[order]
+        self.cells = cells[order]
+        # Sorted copy of the ids, to tell whether a pk is in the arrays without a scan.
+        self.sorted_ids = np.sort(self.ids)
+
+        self.delta = {}
+        self.removed = set()
+        self.version = version
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_queryset(cls, queryset, version=0):
+        count = queryset.count()
+        rows = queryset.values_list("id", "place_id", "latitude", "longitude").iterator(chunk_size=20000)
+        data = np.fromiter(
+            rows, dtype=[("id", np.int64), ("place_id", np.int64), ("lat", np.float64), ("lon", np.float64)],
+            count=count
+        )
+        return cls(data["id"], data["place_id"], data["lat"], data["lon"], version=version)
+
+    def __len__(self):
+        # A delta entry is either a new point or replaces one counted in ``removed``.
+        return len(self.ids) - len(self.removed) + len(self.delta)
+
+    def _indexed(self, pk):
+        i = np.searchsorted(self.sorted_ids, pk)
+        return bool(i < len(self.sorted_ids) and self.sorted_ids[i] == pk)
+
+    def upsert(self, pk, place_id, lat, lon):
+        with self.lock:
+            if self._indexed(pk):
+                self.removed.add(pk)
+            self.delta[pk] = (place_id, lat, lon)
+            self._maybe_compact()
+
+    def remove(self, pk):
+        with self.lock:
+            self.delta.pop(pk, None)
+            if self._indexed(pk):
+                self.removed.add(pk)
+            self._maybe_compact()
+
+    def _maybe_compact(self):
+        if len(self.delta) + len(self.removed) < COMPACT_THRESHOLD:
+            return
+
+        keep = ~np.isin(self.ids, np.fromiter(self.removed, dtype=np.int64, count=len(self.removed)))
+        delta_ids = np.fromiter(self.delta.keys(), dtype=np.int64, count=len(self.delta))
+        delta_values = np.array(list(self.delta.values()), dtype=np.float64).reshape(-1, 3)
+
+        compacted = SpatialIndex(
+            np.concatenate([self.ids[keep], delta_ids]),
+            np.concatenate([self.place_ids[keep], delta_values[:, 0].astype(np.int64)]),
+            np.concatenate([self.lats[keep], delta_values[:, 1]]),
+            np.concatenate([self.lons[keep], delta_values[:, 2]]),
+        )
+        self.ids, self.place_ids = compacted.ids, compacted.place_ids
+        self.lats, self.lons, self.cells = compacted.lats, compacted.lons, compacted.cells
+        self.sorted_ids = compacted.sorted_ids
+        self.delta = {}
+        self.removed = set()
+
+    def _candidates(self, cells, lat, lon, row_radius, col_radius):
+        """Indices of points in the block of cells around (lat, lon)."""
+        row = int(cell_row(lat))
+        col = int(cell_col(lon))
+        slices = []
+
+        for r in range(row - row_radius, row + row_radius + 1):
+            start = np.searchsorted(cells, r * COLUMNS + max(col - col_radius, 0), side="left")
+            end = np.searchsorted(cells, r * COLUMNS + min(col + col_radius, COLUMNS - 1), side="right")
+            if end > start:
+                slices.append(np.arange(start, end))
+
+        return np.concatenate(slices) if slices else np.empty(0, dtype=np.int64)
+
+    def _snapshot(self):
+        with self.lock:
+            return self.cells, (self.ids, self.place_ids, self.lats, self.lons, dict(self.delta), set(self.removed))
+
+    def _rank(self, lat, lon, indices, ids, place_ids, lats, lons, delta, removed):
+        result_ids = ids[indices]
+        result_places = place_ids[indices]
+        distances = haversine_km(lat, lon, lats[indices], lons[indices])
+
+        if removed:
+            keep = ~np.isin(result_ids, np.fromiter(removed, dtype=np.int64, count=len(removed)))
+            result_ids, result_places, distances = result_ids[keep], result_places[keep], distances[keep]
+
+        if delta:
+            delta_ids = np.fromiter(delta.keys(), dtype=np.int64, count=len(delta))
+            delta_values = np.array(list(delta.values()), dtype=np.float64).reshape(-1, 3)
+            result_ids = np.concatenate([result_ids, delta_ids])
+            result_places = np.concatenate([result_places, delta_values[:, 0].astype(np.int64)])
+            distances = np.concatenate([distances, haversine_km(lat, lon, delta_values[:, 1], delta_values[:, 2])])
+
+        return result_ids, result_places, distances
+
+    def nearest(self, lat, lon, k=1):
+        """Return up to ``k`` (coordinate id, place id, distance km) sorted by distance."""
+        cells, snapshot = self._snapshot()
+
+        for rings in range(0, MAX_RINGS + 1):
+            # Longitude cells shrink with latitude, widen the column radius to match.
+            edge_lat = min(abs(lat) + rings * CELL_DEGREES, 89.0)
+            col_rings = int(math.ceil(rings / max(math.cos(math.radians(edge_lat)), 0.01)))
+            indices = self._candidates(cells, lat, lon, rings, col_rings)
+            result_ids, result_places, distances = self._rank(lat, lon, indices, *snapshot)
+
+            # Anything outside the searched block is at least this far away.
+            covered_km = rings * CELL_DEGREES * KM_PER_DEGREE
+            if len(distances) >= k and np.partition(distances, k - 1)[k - 1] <= covered_km:
+                break
+        else:
+            result_ids, result_places, distances = self._rank(lat, lon, np.arange(len(cells)), *snapshot)
+
+        return self._top(result_ids, result_places, distances, k)
+
+    def within(self, lat, lon, radius_km, limit=None):
+        """Return (coordinate id, place id, distance km) within ``radius_km``, nearest first."""
+        cells, snapshot = self._snapshot()
+
+        lat_degrees = radius_km / KM_PER_DEGREE
+        edge_lat = min(abs(lat) + lat_degrees, 89.0)
+        lon_degrees = lat_degrees / max(math.cos(math.radians(edge_lat)), 0.01)
+
+        indices = self._candidates(
+            cells, lat, lon, int(math.ceil(lat_degrees / CELL_DEGREES)), int(math.ceil(lon_degrees / CELL_DEGREES))
+        )
+        result_ids, result_places, distances = self._rank(lat, lon, indices, *snapshot)
+
+        inside = distances <= radius_km
+        result_ids, result_places, distances = result_ids[inside], result_places[inside], distances[inside]
+
+        return self._top(result_ids, result_places, distances, limit)
+
+    def _top(self, ids, place_ids, distances, limit):
+        order = np.argsort(distances, kind="stable")
+        if limit is not None:
+            order = order[:limit]
+
+        return [(int(ids[i]), int(place_ids[i]), float(distances[i])) for i in order]
+
+
+def _load_index(version):
+    from .models import PlaceCoordinate
+
+    index = SpatialIndex.from_queryset(PlaceCoordinate.objects.all(), version=version)
+    logger.info(f"Loaded spatial index with {len(index)} coordinates (version {version})")
+    return index
+
+
+def _apply(index, change):
+    operation, pk, place_id, lat, lon = change
+    if operation == "remove":
+        index.remove(pk)
+    else:
+        index.upsert(pk, place_id, lat, lon)
+
+
+spatial_index = ReplicatedIndex("locations:spatial_index", _load_index, _apply, max_catch_up=COMPACT_THRESHOLD)
+
+
+def get_spatial_index():
+    return spatial_index.get()
+
+
+def publish_change(operation, pk, place_id=None, lat=None, lon=None):
+    """Record a coordinate change so every process can apply it incrementally."""
+    spatial_index.publish((operation, pk, place_id, lat, lon))
+
+
+def nearest_place_id(lat, lon):
+    nearest = get_spatial_index().nearest(lat, lon, k=1)
+    return nearest[0][1] if nearest else None
+
+
+def nearby_place_ids(lat, lon, radius_km, limit=None):
+    """Distinct place ids within ``radius_km``, nearest first."""
+    place_ids = []
+    seen = set()
+
+    for _, place_id, _ in get_spatial_index().within(lat, lon, radius_km):
+        if place_id not in seen:
+            seen.add(place_id)
+            place_ids.append(place_id)
+            if limit and len(place_ids) >= limit:
+                break
+
+    return place_ids
@@ -0,0 +1,242 @@
+import logging
+import mmap
+import os
+import struct
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# On-disk layout:
+#   header  : magic, format version, entry count, build version
+#   records : one (blob offset, key length, kind, pk) per entry, sorted by (key, kind)
+#   blob    : concatenated reversed slugs (utf-8)
+MAGIC = b"BZSX"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sIIQ")
+RECORD = struct.Struct("<IHBxQ")
+
+STATE, DISTRICT, PLACE = 0, 1, 2
+KIND_NAMES = {STATE: "state", DISTRICT: "district", PLACE: "place"}
+KINDS = {name: kind for kind, name in KIND_NAMES.items()}
+
+INDEX_PATH = getattr(
+    settings, "LOCATION_SUFFIX_INDEX_PATH",
+    os.path.join(settings.BASE_DIR, "location_index", "suffix.idx")
+)
+VERSION_KEY = "locations:suffix_index:version"
+VERSION_CHECK_INTERVAL = 30
+
+
+class SuffixIndex:
+    """Sorted array of reversed location slugs answering longest-suffix queries.
+
+    The buffer is either a read-only mmap of the index file, shared between
+    every worker on the host, or an in-memory bytes object when no file has
+    been built yet.
+    """
+
+    def __init__(self, buffer):
+        magic, format_version, count, version = HEADER.unpack_from(buffer, 0)
+
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            raise ValueError("Not a location suffix index")
+
+        self.buffer = buffer
+        self.count = count
+        self.version = version
+        self.records_start = HEADER.size
+        self.blob_start = HEADER.size + count * RECORD.size
+
+    @staticmethod
+    def serialize(entries, version=None):
+        """Pack an iterable of (kind, slug, pk) into the on-disk format."""
+        keyed = sorted(
+            (slug[::-1].encode("utf-8"), kind, pk) for kind, slug, pk in entries if slug
+        )
+
+        records = bytearray()
+        blob = bytearray()
+
+        for key, kind, pk in keyed:
+            records += RECORD.pack(len(blob), len(key), kind, pk)
+            blob += key
+
+        version = version or time.time_ns()
+        return HEADER.pack(MAGIC, FORMAT_VERSION, len(keyed), version) + bytes(records) + bytes(blob)
+
+    @classmethod
+    def from_entries(cls, entries, version=None):
+        return cls(cls.serialize(entries, version))
+
+    @classmethod
+    def open(cls, path):
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        return cls(buffer)
+
+    def _record(self, i):
+        return RECORD.unpack_from(self.buffer, self.records_start + i * RECORD.size)
+
+    def _key(self, i, length=None):
+        offset, key_length, _, _ = self._record(i)
+        if length is not None and length < key_length:
+            key_length = length
+        start = self.blob_start + offset
+        return self.buffer[start:start + key_length]
+
+    def _bisect_left(self, prefix, lo, hi):
+        length = len(prefix)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid, length) < prefix:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _bisect_right(self, prefix, lo, hi):
+        length = len(prefix)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if prefix < self._key(mid, length):
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def longest_matches(self, input_slug):
+        """Return {kind: (slug, pk)} with the longest matching suffix of each kind."""
+        reversed_input = input_slug[::-1].encode("utf-8")
+        matches = {}
+        lo, hi = 0, self.count
+
+        for length in range(1, len(reversed_input) + 1):
+            prefix = reversed_input[:length]
+            lo = self._bisect_left(prefix, lo, hi)
+            hi = self._bisect_right(prefix, lo, hi)
+
+            if lo >= hi:
+                break
+
+            if hi - lo == 1:
+                # A single candidate left: compare it directly instead of narrowing further.
+                _, _, kind, pk = self._record(lo)
+                key = self._key(lo)
+                if reversed_input.startswith(key):
+                    matches[kind] = (key.decode("utf-8")[::-1], pk)
+                break
+
+            # Keys equal to the prefix sort ahead of the longer keys sharing it.
+            i = lo
+            while i < hi:
+                _, key_length, kind, pk = self._record(i)
+                if key_length != length:
+                    break
+                matches[kind] = (prefix.decode("utf-8")[::-1], pk)
+                i += 1
+
+            if i == hi:
+                break
+
+        return matches
+
+    def match_suffix(self, input_slug, kind=None):
+        matches = self.longest_matches(input_slug)
+
+        if kind is not None:
+            match = matches.get(kind)
+            return match[0] if match else None
+
+        best = max(matches.values(), key=lambda match: len(match[0]), default=None)
+        return best[0] if best else None
+
+
+class KindSuffixIndex:
+    """Trie-compatible view of the shared index restricted to one location kind."""
+
+    def __init__(self, index, kind):
+        self.index = index
+        self.kind = kind
+
+    def match_suffix(self, input_slug):
+        return self.index.match_suffix(input_slug, self.kind)
+
+
+def iter_location_entries():
+    from .models import UniqueState, UniqueDistrict, UniquePlace
+
+    for kind, model in ((STATE, UniqueState), (DISTRICT, UniqueDistrict), (PLACE, UniquePlace)):
+        for pk, slug in model.objects.values_list("pk", "slug").iterator(chunk_size=10000):
+            yield kind, slug, pk
+
+
+def build_index_file(path=INDEX_PATH):
+    """Build the index from the database and atomically publish it at ``path``."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    data = SuffixIndex.serialize(iter_location_entries())
+    index = SuffixIndex(data)
+
+    tmp_path = f"{path}.{index.version}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+    # Workers still mapping the old file keep a valid view until they reload.
+    os.replace(tmp_path, path)
+
+    try:
+        cache.set(VERSION_KEY, index.version, timeout=None)
+    except Exception as e:
+        logger.warning(f"Could not publish suffix index version: {e}")
+
+    return index
+
+
+_index = None
+_checked_at = 0.0
+
+
+def _published_version():
+    try:
+        return cache.get(VERSION_KEY)
+    except Exception as e:
+        logger.warning(f"Could not read suffix index version: {e}")
+        return None
+
+
+def _load_index():
+    if os.path.exists(INDEX_PATH):
+        try:
+            return SuffixIndex.open(INDEX_PATH)
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not open suffix index at {INDEX_PATH}: {e}")
+
+    logger.warning("Suffix index file missing, building it in process memory.")
+    return SuffixIndex.from_entries(iter_location_entries())
+
+
+def get_suffix_index():
+    """Return the process-wide index, reloading it when a newer version is published."""
+    global _index, _checked_at
+
+    now = time.monotonic()
+    if _index is not None and now - _checked_at < VERSION_CHECK_INTERVAL:
+        return _index
+
+    _checked_at = now
+    version = _published_version()
+
+    if _index is None:
+        _index = _load_index()
+    elif version and version != _index.version and os.path.exists(INDEX_PATH):
+        # The previous mapping is left to the garbage collector, requests still
+        # holding it keep answering from the old file.
+        _index = _load_index()
+
+    return _index
@@ -238,71 +238,39 @@ def fetch_pincode_and_coordinate():
     logger.info("Program Completed.")
 
 
-def get_indian_locations(places_ids, api_key, opencage_cache):
+def place_location_sink(batch):
     from django.db import transaction
-    from django.core.cache import cache
-    import time
-    import requests
+    from .geocoding import first_address
+
+    new_locations = []
+    for place_id, data in batch:
+        country, address = first_address(data)
+        if country == "india" and address:
+            geometry = data["results"][0].get("geometry", {})
+            new_locations.append(IndiaLocationData(
+                address=address, json_data=data,
+                requested_latitude=geometry.get("lat"), requested_longitude=geometry.get("lng")
+            ))
 
-    base_url = 'https://api.opencagedata.com/geocode/v1/json'
-    request_count = cache.get(opencage_cache, 0)
-
-    places = UniquePlace.objects.filter(id__in = places_ids)
-
-    for place in places:
-        if request_count <= 10000:
-            with transaction.atomic():
-                try:
-                    logger.info(f"Querying place: {place.name},{place.district.name},{place.state.name},India")
-
-                    response = requests.get(base_url, params={
-                        "q": f"{place.name},{place.district.name},{place.state.name},India",
-                        "key": api_key
-                    })
-
-                    response.raise_for_status()
-
-                    request_count += 1
-                    cache.set(opencage_cache, request_count, timeout=60*60*24)
-                    data = response.json()
-
-                    logger.info(f"Request number: {request_count}")
-
-                    if "results" in data and data["results"]:
-                        first_result = data["results"][0]
-                        components = first_result.get("components", {})
-                        formatted = first_result.get("formatted", "")
-
-                        country = components.get("country")                    
-
-                        if str(country).lower() in {"india"}:
-                            road = components.get("road")
-                            address = formatted.replace(f"{road},", "").strip() if road else formatted
+    with transaction.atomic():
+        IndiaLocationData.objects.bulk_create(new_locations)
 
-                            IndiaLocationData.objects.create(                                        
-                                address = address, json_data = data, place = place                                            
-                            )
+    logger.info(f"Stored {len(new_locations)} locations from {len(batch)} places")
+    return len(new_locations)
 
-                            logger.info(f"Location fetched for: '{address}'\n")
-                    
 
-                except requests.exceptions.RequestException as e:
-                    logger.info(f"Error during API request: {e}")
-                    time.sleep(2)
-                    continue
+def get_indian_locations(places_ids, api_key=None, opencage_cache=None):
+    from .geocoding import geocode
 
-                except Exception as e:
-                    logger.exception(f"An Unexpected Error occured: {e}")
-                    time.sleep(2)
-                    continue
-        
-                time.sleep(0.2)
+    places = UniquePlace.objects.filter(id__in=places_ids).values_list("id", "name", "district__name", "state__name")
+    items = (
+        (f"{name},{district_name},{state_name},India", place_id)
+        for place_id, name, district_name, state_name in places.iterator(chunk_size=2000)
+    )
 
-        else:
-            logger.info("You have used up your daily API call limit.")
-            return
-    
-    logger.info("Fetching Completed")
+    stats = geocode(items, place_location_sink, api_keys=[api_key] if api_key else None, daily_quota=10000)
+    logger.info(f"Fetching Completed: {stats}")
+    return stats
 
 @shared_task(queue="worker1_queue")
 def run_india1(place_ids): 
@@ -325,6 +293,17 @@ def run_india3(place_ids):
     
     get_indian_locations(place_ids, api_key, opencage_cache)
 
+@shared_task(queue="worker1_queue")
+def fetch_place_locations(place_ids):
+    # One engine spreads the requests over every configured API key.
+    get_indian_locations(place_ids)
+
+
+@shared_task(queue="worker1_queue")
+def fetch_india_grid(top_left, bottom_right):
+    get_india_locations(tuple(top_left), tuple(bottom_right))
+
+
 def run_place_fetching():    
     from django.db.models import Count    
 
@@ -342,16 +321,7 @@ def run_place_fetching():
         ).values_list("id", flat=True)
     )
     
-    places_count = len(places)
-    limit = int(places_count/3)
-
-    place_ids_1 = places[:limit]
-    place_ids_2 = places[limit:2*limit]
-    place_ids_3 = places[2*limit:]
-
-    run_india1.delay(place_ids_1)
-    run_india2.delay(place_ids_2)
-    run_india3.delay(place_ids_3)
+    fetch_place_locations.delay(places)
 
 
 @shared_task(queue="worker5_queue")
@@ -519,3 +489,11 @@ def update_pincodes():
         place.coordinates.set(PlaceCoordinate.objects.filter(place=place))
 
     logger.info(f"Completed")
+
+
+@shared_task
+def rebuild_suffix_index():
+    from .suffix_index import build_index_file
+
+    index = build_index_file()
+    logger.info(f"Rebuilt location suffix index with {index.count} slugs (version {index.version})")
@@ -11,6 +11,7 @@ import time
 import os
 import pandas
 import sys
+from collections import defaultdict
 
 
 from .models import (
@@ -25,6 +26,12 @@ from .models import (
     IndiaCoordinates, IndiaLocationData
     )
 
+from .geocoding import fetch_country_locations
+from .ingest import (
+    BATCH_SIZE, CHUNK_SIZE, Checkpoint, KeyMap, LocationKeys, chunked, notify_location_changes, run_import,
+    set_many
+    )
+
 logger = logging.getLogger(__name__)
 
 def generate_location_csv(request):
@@ -56,637 +63,37 @@ def places_count():
     places = Place.objects.all()
     return places.count()
 
-def get_locations(top_left, bottom_right, api_key, opencage_cache):
-    base_url = 'https://api.opencagedata.com/geocode/v1/json'
-
-    lat_step = 0.02
-    lon_step = 0.02
-
-    latitude = top_left[0]
-    
-    while latitude >= bottom_right[0]:
-        longitude = top_left[1]
-
-        while longitude <= bottom_right[1]:
-            request_count = cache.get(opencage_cache, 0)
-
-            with transaction.atomic():            
-                if not RetestedCoordinates.objects.filter(latitude=latitude, longitude=longitude).exists():
-                    if request_count <= 6667:
-                        try:
-                            logger.info(f"Querying Coordinates: ({latitude}, {longitude})")
-                            response = requests.get(f"{base_url}?q={latitude}+{longitude}&key={api_key}")
-                            response.raise_for_status()
-
-                            request_count += 1
-                            cache.set(opencage_cache, request_count, timeout=60*60*24)
-                            data = response.json()
-
-                            logger.info(f"Request number: {request_count}")
-
-                            if "results" in data and data["results"]:
-                                components = data["results"][0].get("components", {})
-                                country = components.get("country")
-
-                                if country == "India":
-                                    place = components.get("village") or components.get("town") or components.get("city") or components.get("county")
-                                    state_name = components.get("state")
-                                    district_name = components.get("state_district")
-                                    pincode = components.get("postcode")
-                                    
-                                    if place and state_name and district_name:
-                                        state, _ = State.objects.get_or_create(name=state_name)
-                                        district, _ = District.objects.get_or_create(name=district_name, state=state)
-
-                                        if not Place.objects.filter(name = place, district = district, state = state, pincode = pincode).exists():
-
-                                            Place.objects.create(
-                                                name = place,
-                                                district=district,
-                                                state=state,
-                                                pincode=pincode,
-                                                latitude=data["results"][0]["geometry"]["lat"],
-                                                longitude=data["results"][0]["geometry"]["lng"]
-                                            )
-                                            logger.info(f"Place created for {place}, {district.name}, {state.name}")
-                            
-                            RetestedCoordinates.objects.create(latitude=latitude, longitude=longitude)
-                            
-                        except requests.exceptions.RequestException as e:
-                            logger.info(f"Error during API request: {e}")
-                            time.sleep(2)
-                            break
-
-                        except Exception as e:
-                            logger.info(f"An Unexpected Error occured: {e}")
-                            
-                            time.sleep(2)
-                            break
-                
-                        time.sleep(0.25)
-
-                    else:
-                        logger.info("You have used up your daily API call limit.")
-                        break
-
-                longitude += lon_step
-                longitude = round(longitude, 2)
-
-        latitude -= lat_step
-        latitude = round(latitude, 2)
-
-def get_uae_locations(top_left, bottom_right, api_key, opencage_cache):
-    base_url = 'https://api.opencagedata.com/geocode/v1/json'
-
-    lat_step = 0.01
-    lon_step = 0.01
-
-    latitude = top_left[0]
-    
-    while latitude >= bottom_right[0]:
-        longitude = top_left[1]
-
-        while longitude <= bottom_right[1]:
-            request_count = cache.get(opencage_cache, 0)
-
-            if not UaeCoordinates.objects.filter(latitude=latitude, longitude=longitude).exists():
-                with transaction.atomic():            
-                    if request_count <= 10000:
-                        try:
-                            logger.info(f"Querying Coordinates: ({latitude}, {longitude})")
-
-                            response = requests.get(base_url, params={
-                                "q": f"{latitude},{longitude}",
-                                "key": api_key
-                            })
-
-                            response.raise_for_status()
-
-                            request_count += 1
-                            cache.set(opencage_cache, request_count, timeout=60*60*24)
-                            data = response.json()
-
-                            logger.info(f"Request number: {request_count}")
-
-                            if "results" in data and data["results"]:
-                                first_result = data["results"][0]
-                                components = first_result.get("components", {})
-                                formatted = first_result.get("formatted")
-
-                                country = components.get("country")
-
-                                if str(country).lower() in {"united arab emirates", "uae"}:
-                                    road = components.get("road")
-                                    address = formatted.replace(f"{road},", "").strip() if road else formatted
-
-                                    location, created = UaeLocationData.objects.get_or_create(                                        
-                                        address= address,                                        
-                                        defaults={
-                                            "json_data": data,
-                                            "requested_latitude": latitude,
-                                            "requested_longitude": longitude
-                                            }
-                                    )
-
-                                    if created:
-                                        logger.info(f"Place created: '{address}'\n")
-                            
-                            UaeCoordinates.objects.get_or_create(latitude=latitude, longitude=longitude)
-
-                        except requests.exceptions.RequestException as e:
-                            logger.info(f"Error during API request: {e}")
-                            time.sleep(2)
-                            continue
-
-                        except Exception as e:
-                            logger.info(f"An Unexpected Error occured: {e}")
-                            time.sleep(2)
-                            continue
-                
-                        time.sleep(0.2)
-
-                    else:
-                        logger.info("You have used up your daily API call limit.")
-                        return
-
-            longitude += lon_step
-            longitude = round(longitude, 2)
-
-        latitude -= lat_step
-        latitude = round(latitude, 2)
-
-def get_ksa_locations(top_left, bottom_right, api_key, opencage_cache):
-    base_url = 'https://api.opencagedata.com/geocode/v1/json'
-
-    lat_step = 0.02
-    lon_step = 0.02
-
-    latitude = top_left[0]
-    
-    while latitude >= bottom_right[0]:
-        longitude = top_left[1]
-
-        while longitude <= bottom_right[1]:
-            request_count = cache.get(opencage_cache, 0)
-
-            if not KsaCoordinates.objects.filter(latitude=latitude, longitude=longitude).exists():
-                with transaction.atomic():            
-                    if request_count <= 6666:
-                        try:
-                            logger.info(f"Querying Coordinates: ({latitude}, {longitude})")
-
-                            response = requests.get(base_url, params={
-                                "q": f"{latitude},{longitude}",
-                                "key": api_key
-                            })
-
-                            response.raise_for_status()
-
-                            request_count += 1
-                            cache.set(opencage_cache, request_count, timeout=60*60*24)
-                            data = response.json()
-
-                            logger.info(f"Request number: {request_count}")
-
-                            if "results" in data and data["results"]:
-                                first_result = data["results"][0]
-                                components = first_result.get("components", {})
-                                formatted = first_result.get("formatted")
-
-                                country = components.get("country")                    
-
-                                if str(country).lower() in {"kingdom of saudi arabia", "saudi arabia", "ksa"}:
-                                    road = components.get("road")
-                                    address = formatted.replace(f"{road},", "").strip() if road else formatted
-
-                                    if not KsaLocationData.objects.filter(address= address).exists():
-
-                                        KsaLocationData.objects.create(                                        
-                                            address = address, json_data = data, requested_latitude = latitude, requested_longitude = longitude                                            
-                                        )
-
-                                        logger.info(f"Place created: '{address}'\n")
-                            
-                            KsaCoordinates.objects.get_or_create(latitude=latitude, longitude=longitude)
-
-                        except requests.exceptions.RequestException as e:
-                            logger.info(f"Error during API request: {e}")
-                            time.sleep(2)
-                            continue
-
-                        except Exception as e:
-                            # logger.info(f"An Unexpected Error occured: {e}")
-                            logger.exception(f"An Unexpected Error occured: {e}")
-                            time.sleep(2)
-                            continue
-                
-                        time.sleep(0.2)
-
-                    else:
-                        logger.info("You have used up your daily API call limit.")
-                        return
-
-            longitude += lon_step
-            longitude = round(longitude, 2)
-
-        latitude -= lat_step
-        latitude = round(latitude, 2)
-
-
-def get_kuwait_locations(top_left, bottom_right, api_key, opencage_cache):
-    base_url = 'https://api.opencagedata.com/geocode/v1/json'
-
-    lat_step = 0.02
-    lon_step = 0.02
-
-    latitude = top_left[0]
-    
-    while latitude >= bottom_right[0]:
-        longitude = top_left[1]
-
-        while longitude <= bottom_right[1]:
-            request_count = cache.get(opencage_cache, 0)
-
-            if not KuwaitCoordinates.objects.filter(latitude=latitude, longitude=longitude).exists():
-                with transaction.atomic():            
-                    if request_count <= 6666:
-                        try:
-                            logger.info(f"Querying Coordinates: ({latitude}, {longitude})")
-
-                            response = requests.get(base_url, params={
-                                "q": f"{latitude},{longitude}",
-                                "key": api_key
-                            })
-
-                            response.raise_for_status()
-
-                            request_count += 1
-                            cache.set(opencage_cache, request_count, timeout=60*60*24)
-                            data = response.json()
-
-                            logger.info(f"Request number: {request_count}")
-
-                            if "results" in data and data["results"]:
-                                first_result = data["results"][0]
-                                components = first_result.get("components", {})
-                                formatted = first_result.get("formatted")
-
-                                country = components.get("country")                    
-
-                                if str(country).lower() in {"kuwait"}:
-                                    road = components.get("road")
-                                    address = formatted.replace(f"{road},", "").strip() if road else formatted
-
-                                    if not KuwaitLocationData.objects.filter(address= address).exists():
-
-                                        KuwaitLocationData.objects.create(                                        
-                                            address = address, json_data = data, requested_latitude = latitude, requested_longitude = longitude                                            
-                                        )
-
-                                        logger.info(f"Place created: '{address}'\n")
-                            
-                            KuwaitCoordinates.objects.get_or_create(latitude=latitude, longitude=longitude)
-
-                        except requests.exceptions.RequestException as e:
-                            logger.info(f"Error during API request: {e}")
-                            time.sleep(2)
-                            continue
-
-                        except Exception as e:
-                            # logger.info(f"An Unexpected Error occured: {e}")
-                            logger.exception(f"An Unexpected Error occured: {e}")
-                            time.sleep(2)
-                            continue
-                
-                        time.sleep(0.2)
-
-                    else:
-                        logger.info("You have used up your daily API call limit.")
-                        return
-
-            longitude += lon_step
-            longitude = round(longitude, 2)
-
-        latitude -= lat_step
-        latitude = round(latitude, 2)
-
-
-def get_bahrain_locations(top_left, bottom_right, api_key, opencage_cache):
-    base_url = 'https://api.opencagedata.com/geocode/v1/json'
-
-    lat_step = 0.02
-    lon_step = 0.02
-
-    latitude = top_left[0]
-    
-    while latitude >= bottom_right[0]:
-        longitude = top_left[1]
-
-        while longitude <= bottom_right[1]:
-            request_count = cache.get(opencage_cache, 0)
-
-            if not BahrainCoordinates.objects.filter(latitude=latitude, longitude=longitude).exists():
-                with transaction.atomic():            
-                    if request_count <= 6666:
-                        try:
-                            logger.info(f"Querying Coordinates: ({latitude}, {longitude})")
-
-                            response = requests.get(base_url, params={
-                                "q": f"{latitude},{longitude}",
-                                "key": api_key
-                            })
-
-                            response.raise_for_status()
-
-                            request_count += 1
-                            cache.set(opencage_cache, request_count, timeout=60*60*24)
-                            data = response.json()
-
-                            logger.info(f"Request number: {request_count}")
-
-                            if "results" in data and data["results"]:
-                                first_result = data["results"][0]
-                                components = first_result.get("components", {})
-                                formatted = first_result.get("formatted")
-
-                                country = components.get("country")                    
-
-                                if str(country).lower() in {"bahrain"}:
-                                    road = components.get("road")
-                                    address = formatted.replace(f"{road},", "").strip() if road else formatted
-
-                                    if not BahrainLocationData.objects.filter(address= address).exists():
-
-                                        BahrainLocationData.objects.create(                                        
-                                            address = address, json_data = data, requested_latitude = latitude, requested_longitude = longitude                                            
-                                        )
-
-                                        logger.info(f"Place created: '{address}'\n")
-                            
-                            BahrainCoordinates.objects.get_or_create(latitude=latitude, longitude=longitude)
-
-                        except requests.exceptions.RequestException as e:
-                            logger.info(f"Error during API request: {e}")
-                            time.sleep(2)
-                            continue
-
-                        except Exception as e:
-                            # logger.info(f"An Unexpected Error occured: {e}")
-                            logger.exception(f"An Unexpected Error occured: {e}")
-                            time.sleep(2)
-                            continue
-                
-                        time.sleep(0.2)
-
-                    else:
-                        logger.info("You have used up your daily API call limit.")
-                        return
 
-            longitude += lon_step
-            longitude = round(longitude, 2)
+# The per-country fetchers share one engine; ``opencage_cache`` is kept for callers,
+# request counting now happens per API key in locations.geocoding.SharedQuota.
 
-        latitude -= lat_step
-        latitude = round(latitude, 2)
+def get_uae_locations(top_left, bottom_right, api_key, opencage_cache=None):
+    return fetch_country_locations("uae", top_left, bottom_right, [api_key] if api_key else None, daily_quota=10000)
 
 
-def get_qatar_locations(top_left, bottom_right, api_key, opencage_cache):
-    base_url = 'https://api.opencagedata.com/geocode/v1/json'
+def get_ksa_locations(top_left, bottom_right, api_key, opencage_cache=None):
+    return fetch_country_locations("ksa", top_left, bottom_right, [api_key] if api_key else None)
 
-    lat_step = 0.02
-    lon_step = 0.02
 
-    latitude = top_left[0]
-    
-    while latitude >= bottom_right[0]:
-        longitude = top_left[1]
-
-        while longitude <= bottom_right[1]:
-            request_count = cache.get(opencage_cache, 0)
-
-            if not QatarCoordinates.objects.filter(latitude=latitude, longitude=longitude).exists():
-                with transaction.atomic():            
-                    if request_count <= 6666:
-                        try:
-                            logger.info(f"Querying Coordinates: ({latitude}, {longitude})")
-
-                            response = requests.get(base_url, params={
-                                "q": f"{latitude},{longitude}",
-                                "key": api_key
-                            })
-
-                            response.raise_for_status()
-
-                            request_count += 1
-                            cache.set(opencage_cache, request_count, timeout=60*60*24)
-                            data = response.json()
-
-                            logger.info(f"Request number: {request_count}")
-
-                            if "results" in data and data["results"]:
-                                first_result = data["results"][0]
-                                components = first_result.get("components", {})
-                                formatted = first_result.get("formatted")
-
-                                country = components.get("country")                    
-
-                                if str(country).lower() in {"qatar"}:
-                                    road = components.get("road")
-                                    address = formatted.replace(f"{road},", "").strip() if road else formatted
-
-                                    if not QatarLocationData.objects.filter(address= address).exists():
-
-                                        QatarLocationData.objects.create(                                        
-                                            address = address, json_data = data, requested_latitude = latitude, requested_longitude = longitude                                            
-                                        )
-
-                                        logger.info(f"Place created: '{address}'\n")
-                            
-                            QatarCoordinates.objects.get_or_create(latitude=latitude, longitude=longitude)
-
-                        except requests.exceptions.RequestException as e:
-                            logger.info(f"Error during API request: {e}")
-                            time.sleep(2)
-                            continue
-
-                        except Exception as e:
-                            # logger.info(f"An Unexpected Error occured: {e}")
-                            logger.exception(f"An Unexpected Error occured: {e}")
-                            time.sleep(2)
-                            continue
-                
-                        time.sleep(0.2)
-
-                    else:
-                        logger.info("You have used up your daily API call limit.")
-                        return
-
-            longitude += lon_step
-            longitude = round(longitude, 2)
-
-        latitude -= lat_step
-        latitude = round(latitude, 2)
-
-
-def get_oman_locations(top_left, bottom_right, api_key, opencage_cache):
-    base_url = 'https://api.opencagedata.com/geocode/v1/json'
-
-    lat_step = 0.02
-    lon_step = 0.02
-
-    latitude = top_left[0]
-    
-    while latitude >= bottom_right[0]:
-        longitude = top_left[1]
-
-        while longitude <= bottom_right[1]:
-            request_count = cache.get(opencage_cache, 0)
-
-            if not OmanCoordinates.objects.filter(latitude=latitude, longitude=longitude).exists():
-                with transaction.atomic():            
-                    if request_count <= 6666:
-                        try:
-                            logger.info(f"Querying Coordinates: ({latitude}, {longitude})")
-
-                            response = requests.get(base_url, params={
-                                "q": f"{latitude},{longitude}",
-                                "key": api_key
-                            })
-
-                            response.raise_for_status()
-
-                            request_count += 1
-                            cache.set(opencage_cache, request_count, timeout=60*60*24)
-                            data = response.json()
-
-                            logger.info(f"Request number: {request_count}")
-
-                            if "results" in data and data["results"]:
-                                first_result = data["results"][0]
-                                components = first_result.get("components", {})
-                                formatted = first_result.get("formatted")
-
-                                country = components.get("country")                    
-
-                                if str(country).lower() in {"oman"}:
-                                    road = components.get("road")
-                                    address = formatted.replace(f"{road},", "").strip() if road else formatted
-
-                                    if not OmanLocationData.objects.filter(address= address).exists():
-
-                                        OmanLocationData.objects.create(                                        
-                                            address = address, json_data = data, requested_latitude = latitude, requested_longitude = longitude                                            
-                                        )
-
-                                        logger.info(f"Place created: '{address}'\n")
-                            
-                            OmanCoordinates.objects.get_or_create(latitude=latitude, longitude=longitude)
-
-                        except requests.exceptions.RequestException as e:
-                            logger.info(f"Error during API request: {e}")
-                            time.sleep(2)
-                            continue
-
-                        except Exception as e:
-                            # logger.info(f"An Unexpected Error occured: {e}")
-                            logger.exception(f"An Unexpected Error occured: {e}")
-                            time.sleep(2)
-                            continue
-                
-                        time.sleep(0.2)
-
-                    else:
-                        logger.info("You have used up your daily API call limit.")
-                        return
-
-            longitude += lon_step
-            longitude = round(longitude, 2)
-
-        latitude -= lat_step
-        latitude = round(latitude, 2)
-
-def get_india_locations(top_left, bottom_right, api_key, opencage_cache):
-    base_url = 'https://api.opencagedata.com/geocode/v1/json'
-
-    lat_step = 0.05
-    lon_step = 0.05
-
-    latitude = top_left[0]
-    
-    while latitude >= bottom_right[0]:
-        longitude = top_left[1]
-
-        while longitude <= bottom_right[1]:
-            request_count = cache.get(opencage_cache, 0)
-
-            if not IndiaCoordinates.objects.filter(latitude=latitude, longitude=longitude).exists():
-                with transaction.atomic():            
-                    if request_count <= 6666:
-                        try:
-                            logger.info(f"Querying Coordinates: ({latitude}, {longitude})")
-
-                            response = requests.get(base_url, params={
-                                "q": f"{latitude},{longitude}",
-                                "key": api_key
-                            })
-
-                            response.raise_for_status()
-
-                            request_count += 1
-                            cache.set(opencage_cache, request_count, timeout=60*60*24)
-                            data = response.json()
-
-                            logger.info(f"Request number: {request_count}")
-
-                            if "results" in data and data["results"]:
-                                first_result = data["results"][0]
-                                components = first_result.get("components", {})
-                                formatted = first_result.get("formatted")
-
-                                country = components.get("country")                    
-
-                                if str(country).lower() in {"india"}:
-                                    road = components.get("road")
-                                    address = formatted.replace(f"{road},", "").strip() if road else formatted
-
-                                    if not IndiaLocationData.objects.filter(address= address).exists():
+def get_kuwait_locations(top_left, bottom_right, api_key, opencage_cache=None):
+    return fetch_country_locations("kuwait", top_left, bottom_right, [api_key] if api_key else None)
 
-                                        IndiaLocationData.objects.create(                                        
-                                            address = address, json_data = data, requested_latitude = latitude, requested_longitude = longitude                                            
-                                        )
 
-                                        logger.info(f"Place created: '{address}'\n")
-                            
-                            IndiaCoordinates.objects.get_or_create(latitude=latitude, longitude=longitude)
+def get_bahrain_locations(top_left, bottom_right, api_key, opencage_cache=None):
+    return fetch_country_locations("bahrain", top_left, bottom_right, [api_key] if api_key else None)
 
-                        except requests.exceptions.RequestException as e:
-                            logger.info(f"Error during API request: {e}")
-                            time.sleep(2)
-                            continue
 
-                        except Exception as e:
-                            # logger.info(f"An Unexpected Error occured: {e}")
-                            logger.exception(f"An Unexpected Error occured: {e}")
-                            time.sleep(2)
-                            continue
-                
-                        time.sleep(0.2)
+def get_qatar_locations(top_left, bottom_right, api_key, opencage_cache=None):
+    return fetch_country_locations("qatar", top_left, bottom_right, [api_key] if api_key else None)
 
-                    else:
-                        logger.info("You have used up your daily API call limit.")
-                        return
 
-            longitude += lon_step
-            longitude = round(longitude, 2)
+def get_oman_locations(top_left, bottom_right, api_key, opencage_cache=None):
+    return fetch_country_locations("oman", top_left, bottom_right, [api_key] if api_key else None)
 
-        latitude -= lat_step
-        latitude = round(latitude, 2)
 
+def get_india_locations(top_left, bottom_right, api_key=None, opencage_cache=None):
+    return fetch_country_locations("india", top_left, bottom_right, [api_key] if api_key else None)
 
-def reset_count():
-    for opencage_count in ("opencage_requested_1", "opencage_requested_2", "opencage_requested_3"):
-        cache.set(opencage_count, 0, 24 * 3600)
-    
-    print("Resetted Counts\n")
 
 # def update_location_data():
 #     # Maharashtra
@@ -839,42 +246,22 @@ def populate_unique_states():
     print(f"Inserted {len(unique_states)} new records into unique state.")
 
 def populate_unique_districts():
-    districts = District.objects.all()
-
-    existing_states = {state.name: state for state in UniqueState.objects.all()}
-
-    unique_districts = []
-    unique_combinations = set()  
+    keys = LocationKeys()
 
-    for district in districts:
-        name = district.name
-        state_name = district.state.name
+    # Only districts of states already in unique states, as before.
+    district_keys = set()
+    for state_name, name in District.objects.values_list("state__name", "name").distinct().iterator():
+        state_id = keys.states.get((state_name,))
+        if state_id:
+            district_keys.add((state_id, name))
 
-        if state_name in existing_states:
-            state = existing_states[state_name]
-        else:
-            continue
-        
-        unique_key = (name, state.id)
+    print(f"Checked {len(district_keys)} districts.")
 
-        if unique_key not in unique_combinations:
-            
-            if not UniqueDistrict.objects.filter(name=name, state=state).exists():
-                unique_districts.append(UniqueDistrict(name=name, state=state))
-            
-            unique_combinations.add(unique_key)
-
-    print(f"Checked {len(districts)} districts.")
-
-    if unique_districts:
-        UniqueDistrict.objects.bulk_create(unique_districts)
-
-    unsaved_districts = UniqueDistrict.objects.all()
-
-    for district in unsaved_districts:
-        district.save()
+    with transaction.atomic():
+        keys.districts.ensure(district_keys)
+        notify_location_changes()
 
-    print(f"Inserted {len(unique_districts)} new unique district records.")
+    print(f"Inserted {keys.districts.created} new unique district records.")
 
 # def populate_unique_places():
 #     places = Place.objects.all()
@@ -954,56 +341,31 @@ def populate_unique_districts():
 #     print(f"\nInserted {len(unique_places)} new unique place records.")
 
 
-def populate_unique_places():
-    places = Place.objects.all()
-    length = places.count()
-    
-    existing_states = {state.name: state for state in UniqueState.objects.all()}
-    existing_districts = {
-        (district.name, district.state.name): district
-        for district in UniqueDistrict.objects.select_related("state")
-    }
-    existing_places = set(UniquePlace.objects.values_list("name", "district_id", "state_id"))
-
-    unique_places = []
-    unique_combinations = set()
-    
-    progress = 0
-    batch_size = 1000
-
-    for index, place in enumerate(places.iterator()):
-        name = place.name
-        state = existing_states.get(place.state.name)
-        district = existing_districts.get((place.district.name, place.state.name))
-        
-        if not state or not district:
-            continue
-        
-        unique_key = (name, district.id, state.id)
-        
-        if unique_key not in existing_places:
-            unique_places.append(UniquePlace(name=name, district=district, state=state))
-            existing_places.add(unique_key)
-
-        if (index + 1) % batch_size == 0 or index + 1 == length:
-            UniquePlace.objects.bulk_create(unique_places, ignore_conflicts=True)
-            unique_places.clear()
-
-        new_progress = (index + 1) * 100 // length
-        if new_progress > progress:
-            print(f"\rProgress: {new_progress}%", end="")
-            progress = new_progress
+def populate_unique_places(checkpoint_path=None):
+    keys = LocationKeys()
+    places = Place.objects.order_by("pk").values_list("state__name", "district__name", "name")
 
-    print(f"\nInserted {len(existing_places)} new unique place records.")
+    def import_chunk(chunk):
+        place_keys = []
+        for state_name, district_name, name in chunk:
+            state_id = keys.states.get((state_name,))
+            district_id = keys.districts.get((state_id, district_name))
 
-    print(f"\nWait for the function to finish. . .")
+            # Places are only added under existing unique states and districts.
+            if state_id and district_id:
+                place_keys.append((state_id, district_id, name))
 
-    unsaved_places = UniquePlace.objects.all()
+        created = keys.places.created
+        keys.places.ensure(place_keys)
+        return {"places": keys.places.created - created}
 
-    for place in unsaved_places:
-        place.save()
+    counts = run_import(
+        places.iterator(chunk_size=CHUNK_SIZE), import_chunk,
+        Checkpoint(checkpoint_path) if checkpoint_path else None, label="places"
+    )
+    notify_location_changes()
 
-    print(f"\nCompleted!")
+    print(f"\nInserted {counts.get('places', 0)} new unique place records.")
 
 
 # def update_places(self):
@@ -1043,70 +405,56 @@ def populate_unique_places():
 #         place.pincodes.set(updating_pincode_set)
 #         place.coordinates.set(updating_coordinate_set)
 
-from collections import defaultdict
-from django.db import transaction
-
 def update_places(selected_state):
-    # Step 1: Index all Place records in memory
     print(f"Loading all Place of {selected_state} into memory...")
-    place_index = defaultdict(lambda: {"pincodes": set(), "coordinates": set()})
-    for pl in Place.objects.filter(state__name = selected_state).select_related("district", "state").values(
-        "name", "district__name", "state__name", "pincode", "latitude", "longitude"
-    ):
-        key = (pl["name"], pl["district__name"], pl["state__name"])
-        place_index[key]["pincodes"].add(pl["pincode"])
-        place_index[key]["coordinates"].add((pl["latitude"], pl["longitude"]))
-
-    print(f"Indexed {len(place_index)} place groups.")
-
-    # Step 2: Process UniquePlaces with minimal DB hits
-    unique_places = UniquePlace.objects.select_related("district", "state").prefetch_related("pincodes", "coordinates")
-
-    new_pincodes = []
-    new_coordinates = []
-    place_pincode_map = defaultdict(list)
-    place_coordinate_map = defaultdict(list)
-
-    print("Processing UniquePlaces...")
-    for place in unique_places:
-        key = (place.name, place.district.name, place.state.name)
-        data = place_index.get(key)
-        if not data:
-            continue
-
-        for pincode in data["pincodes"]:
-            new_pincodes.append(PlacePincode(place=place, pincode=pincode))
-            place_pincode_map[place].append(pincode)
-
-        for lat, lng in data["coordinates"]:
-            new_coordinates.append(PlaceCoordinate(place=place, latitude=lat, longitude=lng))
-            place_coordinate_map[place].append((lat, lng))
-
-    print("Bulk creating PlacePincode and PlaceCoordinate objects...")
-
-    # Step 3: Bulk create (ignore duplicates)
-    with transaction.atomic():
-        PlacePincode.objects.bulk_create(new_pincodes, ignore_conflicts=True)
-        PlaceCoordinate.objects.bulk_create(new_coordinates, ignore_conflicts=True)
-
-    print("Re-fetching created pincode and coordinate objects...")
-
-    # Step 4: Re-fetch related objects to set M2M
-    pincode_objs = PlacePincode.objects.filter(place__in=unique_places)
-    coordinate_objs = PlaceCoordinate.objects.filter(place__in=unique_places)
-
-    pincode_lookup = defaultdict(list)
-    for pp in pincode_objs:
-        pincode_lookup[pp.place_id].append(pp)
-
-    coordinate_lookup = defaultdict(list)
-    for pc in coordinate_objs:
-        coordinate_lookup[pc.place_id].append(pc)
+    unique_places = {
+        (district_name, name): pk
+        for pk, district_name, name in UniquePlace.objects.filter(state__name=selected_state).values_list(
+            "pk", "district__name", "name"
+        )
+    }
 
-    print("Updating M2M relations in bulk...")
-    for place in unique_places:
-        place.pincodes.set(pincode_lookup[place.id])
-        place.coordinates.set(coordinate_lookup[place.id])
+    pincodes = defaultdict(set)
+    coordinates = defaultdict(set)
+    for name, district_name, pincode, latitude, longitude in Place.objects.filter(state__name=selected_state).values_list(
+        "name", "district__name", "pincode", "latitude", "longitude"
+    ).iterator(chunk_size=CHUNK_SIZE):
+        place_id = unique_places.get((district_name, name))
+        if place_id:
+            pincodes[place_id].add((place_id, pincode))
+            coordinates[place_id].add((place_id, latitude, longitude))
+
+    print(f"Indexed {len(pincodes)} place groups.")
+
+    place_ids = list(unique_places.values())
+    pincode_field = UniquePlace._meta.get_field("pincodes")
+    coordinate_field = UniquePlace._meta.get_field("coordinates")
+
+    for batch in chunked(place_ids, BATCH_SIZE):
+        with transaction.atomic():
+            # Rows already there are reused, so reruns don't duplicate them.
+            pincode_map = KeyMap(
+                PlacePincode, ("place_id", "pincode"), lambda key: PlacePincode(place_id=key[0], pincode=key[1]),
+                queryset=PlacePincode.objects.filter(place_id__in=batch),
+            )
+            coordinate_map = KeyMap(
+                PlaceCoordinate, ("place_id", "latitude", "longitude"),
+                lambda key: PlaceCoordinate(place_id=key[0], latitude=key[1], longitude=key[2]),
+                queryset=PlaceCoordinate.objects.filter(place_id__in=batch),
+            )
+
+            batch_pincodes = [key for place_id in batch for key in pincodes.get(place_id, ())]
+            batch_coordinates = [key for place_id in batch for key in coordinates.get(place_id, ())]
+            pincode_map.ensure(batch_pincodes)
+            coordinate_map.ensure(batch_coordinates)
+
+            pincode_pks = {key: pincode_map.get(key) for key in batch_pincodes if pincode_map.get(key)}
+            coordinate_pks = {key: coordinate_map.get(key) for key in batch_coordinates if coordinate_map.get(key)}
+
+            set_many(pincode_field, batch, [(key[0], pk) for key, pk in pincode_pks.items()])
+            set_many(coordinate_field, batch, [(key[0], pk) for key, pk in coordinate_pks.items()])
+
+        print(f"Updated {len(batch)} places.")
 
     print("Update complete.")
 
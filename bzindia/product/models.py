@@ -8,6 +8,8 @@ from django.db.models import Avg
 from company.models import Company
 from locations.models import UniqueState
 from base.models import MetaTag
+from utility.placeholders import strip_slug_placeholders
+from utility.slugs import unique_slug
 
 class Category(models.Model):
     company = models.ForeignKey(Company, on_delete=models.CASCADE)
@@ -660,7 +662,7 @@ class MultiPage(models.Model):
 
     home_footer_visibility = models.BooleanField(default=False)
 
-    slug = models.SlugField(null=True, blank=True, max_length=500)
+    slug = models.SlugField(null=True, blank=True, max_length=500, unique=True)
 
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
@@ -673,17 +675,12 @@ class MultiPage(models.Model):
             self.home_footer_visibility = True
 
         base_slug = slugify(self.title)
-        slug = base_slug
-        count = 1
-
-        while MultiPage.objects.filter(slug = slug).exclude(pk = self.pk).exists():
-            slug = f"{base_slug}-{count}"
-            count += 1
 
+        # Placeholders are dropped before allocating, it's the stored slug that has to be unique.
         if self.url_type != "slug_filtered":
-            slug = slug.replace("-in-place_name", "").replace("-in-district_name", "").replace("-in-state_name", "").replace("-place_name", "").replace("-district_name", "").replace("-state_name", "")
+            base_slug = strip_slug_placeholders(base_slug)
 
-        self.slug = slug
+        self.slug = unique_slug(MultiPage, base_slug, exclude_pk=self.pk)
 
         super().save(*args, **kwargs)
 
@@ -714,6 +711,21 @@ class MultiPage(models.Model):
 
         return toc
 
+    @property
+    def best_rated_product(self):
+        """The product whose reviews rate this page."""
+        return max(self.products.all(), key=lambda product: product.rating, default=None)
+
+    @property
+    def rating(self):
+        product = self.best_rated_product
+        return product.rating if product and product.rating else 0
+
+    @property
+    def rating_count(self):
+        product = self.best_rated_product
+        return product.rating_count if product and product.rating_count else 0
+
     @property
     def image_count(self):
         if self.products.count() > 0:
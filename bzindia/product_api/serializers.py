@@ -1,6 +1,6 @@
 from rest_framework import serializers
 from django.conf import settings
-from django.db.models import Max
+from django.db.models import Max, Prefetch
 
 from utility.text import clean_string
 from datetime import datetime
@@ -15,6 +15,7 @@ from blog_api.serializers import BlogSerializer
 from blog.models import Blog
 from locations.models import UniqueState
 from meta_api.serializers import MetaTagSerializer
+from utility.prefetch import prefetched
 
 class FaqSerializer(serializers.ModelSerializer):
     class Meta:
@@ -169,15 +170,23 @@ class ProductSerializer(serializers.ModelSerializer):
             "sku", "stock", "faqs", "category_slug", "brand_name",
             "detail_page_slug", "sub_category_slug", "sub_category_name"
             ]
+        prefetch_related = [("faq_set", FaqSerializer), "productdetailpage_set"]
         
     def get_rating(self, obj):
         from django.db.models import Avg
 
+        reviews = prefetched(obj, "reviews", None)
+        if reviews is not None:
+            return sum(review.rating for review in reviews) / len(reviews) if reviews else "0"
+
         if obj.reviews:
             return obj.reviews.aggregate(avg_rating=Avg("rating"))["avg_rating"] or "0"
         return "0"
     
     def get_rating_count(self, obj):
+        reviews = prefetched(obj, "reviews", None)
+        if reviews is not None:
+            return len(reviews) or "0"
 
         if obj.reviews:
             return obj.reviews.count() or "0"
@@ -196,7 +205,9 @@ class ProductSerializer(serializers.ModelSerializer):
         if not obj:
             return None
         
-        faqs = Faq.objects.filter(product = obj)
+        faqs = prefetched(obj, "faq_set", None)
+        if faqs is None:
+            faqs = Faq.objects.filter(product = obj)
 
         serializer = FaqSerializer(faqs, many = True)
 
@@ -205,6 +216,10 @@ class ProductSerializer(serializers.ModelSerializer):
     def get_detail_page_slug(self, obj):
         if not obj:
             return None
+
+        detail_pages = prefetched(obj, "productdetailpage_set", None)
+        if detail_pages is not None:
+            return detail_pages[0].slug if detail_pages else None
         
         try:
             detail_page = ProductDetailPage.objects.get(product = obj)
@@ -339,8 +354,6 @@ class MultiPageSerializer(serializers.ModelSerializer):
     timelines = MultipageTimelineSerializer(many=True, read_only=True)
     faqs = MultipageFaqSerializer(many=True, read_only=True)
     meta_tags = MetaTagSerializer(many=True, read_only=True)
-    rating = serializers.SerializerMethodField()
-    rating_count = serializers.SerializerMethodField()
     reviews = serializers.SerializerMethodField()
     blogs = serializers.SerializerMethodField()
     published = serializers.SerializerMethodField()
@@ -356,6 +369,9 @@ class MultiPageSerializer(serializers.ModelSerializer):
             "blogs", "meta_title", "created", "updated", "published", "url_type",
             "sub_title", 
             ]
+        prefetch_related = [
+            (Prefetch("products__blog_set", queryset=Blog.objects.filter(is_published=True), to_attr="published_blogs"), BlogSerializer),
+        ]
         
     def get_reviews(self, obj):
         if not obj:
@@ -363,6 +379,12 @@ class MultiPageSerializer(serializers.ModelSerializer):
         
         products = obj.products.all()
 
+        if all(prefetched(product, "reviews", None) is not None for product in products):
+            reviews = sorted(
+                (review for product in products for review in product.reviews.all()), key=lambda review: review.created
+            )
+            return ReviewSerializer(reviews, many=True).data
+
         reviews_slug = []
 
         for product in products:
@@ -376,32 +398,18 @@ class MultiPageSerializer(serializers.ModelSerializer):
 
         return serializer.data
         
-    def get_rating(self, obj):
-        if not obj:
-            return None
-        
-        products = obj.products.all()
-
-        highest_rating = (max(products, key=lambda p: p.rating)).rating        
-
-        return highest_rating if highest_rating else 0
-    
-    def get_rating_count(self, obj):
-        if not obj:
-            return None
-        
-        products = obj.products.all()
-
-        highest_rating_count = (max(products, key=lambda p: p.rating)).rating_count
-
-        return highest_rating_count if highest_rating_count else 0
-    
     def get_blogs(self, obj):
         if not obj:
             return None
         
         products = obj.products.all()
 
+        if all(prefetched(product, "published_blogs", None) is not None for product in products):
+            blogs = sorted(
+                (blog for product in products for blog in product.published_blogs), key=lambda blog: blog.created, reverse=True
+            )
+            return BlogSerializer(blogs, many=True).data
+
         blogs_slug = []
 
         for product in products:
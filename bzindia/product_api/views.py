@@ -19,6 +19,7 @@ from product.models import (
     )
 from company.models import Company
 from .paginations import ProductDetailPagination
+from utility.prefetch import PlannedQuerysetMixin
 
 import logging
 
@@ -47,7 +48,7 @@ class ProductViewset(viewsets.ModelViewSet):
         return context
 
 
-class ProductDetailViewset(viewsets.ReadOnlyModelViewSet):
+class ProductDetailViewset(PlannedQuerysetMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = DetailSerializer
     pagination_class = ProductDetailPagination
     lookup_field = "slug"
@@ -145,7 +146,7 @@ class ProductCategoryViewSet(viewsets.ReadOnlyModelViewSet):
         return context
     
 
-class ProductMultipageViewSet(viewsets.ReadOnlyModelViewSet):
+class ProductMultipageViewSet(PlannedQuerysetMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = MultiPageSerializer
     lookup_field = "slug"
     
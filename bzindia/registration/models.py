@@ -2,11 +2,13 @@ from django.db import models
 from django.utils.text import slugify
 from ckeditor.fields import RichTextField
 from datetime import datetime
-from django.db.models import Avg
 
 from company.models import Company
+from company.ratings import company_rating
 from locations.models import UniqueState
 from base.models import MetaTag
+from utility.placeholders import strip_slug_placeholders
+from utility.slugs import unique_slug
 from company.models import Testimonial
 
 class RegistrationType(models.Model):
@@ -773,7 +775,7 @@ class MultiPage(models.Model):
     hide_support_languages = models.BooleanField(default=False)
     home_footer_visibility = models.BooleanField(default=False)
 
-    slug = models.SlugField(null=True, blank=True, max_length=500)
+    slug = models.SlugField(null=True, blank=True, max_length=500, unique=True)
 
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
@@ -786,17 +788,12 @@ class MultiPage(models.Model):
             self.home_footer_visibility = True
 
         base_slug = slugify(self.title)
-        slug = base_slug
-        count = 1
-
-        while MultiPage.objects.filter(slug = slug).exclude(pk = self.pk).exists():
-            slug = f"{base_slug}-{count}"
-            count += 1
 
+        # Placeholders are dropped before allocating, it's the stored slug that has to be unique.
         if self.url_type != "slug_filtered":
-            slug = slug.replace("-in-place_name", "").replace("-in-district_name", "").replace("-in-state_name", "").replace("-place_name", "").replace("-district_name", "").replace("-state_name", "")
+            base_slug = strip_slug_placeholders(base_slug)
 
-        self.slug = slug
+        self.slug = unique_slug(MultiPage, base_slug, exclude_pk=self.pk)
 
         super().save(*args, **kwargs)
 
@@ -882,13 +879,11 @@ class MultiPage(models.Model):
     
     @property
     def rating(self):
-        testimonials = Testimonial.objects.filter(company = self.company).values_list("rating", flat=True)        
-        
-        return testimonials.aggregate(Avg('rating'))['rating__avg'] if testimonials else 0
+        return company_rating(self.company)[0]
 
     @property
     def rating_count(self):
-        return Testimonial.objects.filter(company = self.company).count()
+        return company_rating(self.company)[1]
     
     @property
     def image_count(self):        
@@ -1,7 +1,6 @@
 from rest_framework import serializers
 from utility.text import clean_string
 from django.conf import settings
-from django.db.models import Avg
 
 from registration.models import (
     RegistrationSubType, RegistrationDetailPage, Feature, VerticalBullet, 
@@ -15,9 +14,20 @@ from registration.models import (
     )
 from locations.models import UniqueState
 
+from company.ratings import company_rating
 from company_api.serializers import CompanySerializer, TestimonialSerializer
 from blog_api.serializers import BlogSerializer
 from meta_api.serializers import MetaTagSerializer
+from utility.prefetch import prefetched
+
+def ordered_testimonials(company):
+    """The company's prefetched testimonials in the pages' ``order``, or None without the prefetch."""
+    testimonials = prefetched(company, "testimonials", None)
+    if testimonials is None:
+        return None
+
+    return sorted(testimonials, key=lambda testimonial: testimonial.order)
+
 
 class FaqSerializer(serializers.ModelSerializer):
     company = CompanySerializer(read_only = True)
@@ -52,20 +62,17 @@ class SubTypeSerializer(serializers.ModelSerializer):
             ]
         
         read_only_fields = fields    
+        select_related = ["company__rating_summary"]
+        prefetch_related = ["registrations", ("company__testimonials", TestimonialSerializer)]
 
     def get_rating(self, obj):
-        if not obj.company:
-            return 0
-        
-        testimonials = obj.company.testimonials.values_list("rating", flat=True)
-
-        return testimonials.aggregate(Avg('rating'))['rating__avg'] if testimonials else 0    
+        return company_rating(obj.company)[0]    
 
     def get_price(self, obj):
         if obj.registrations:
         
             # registration_obj = Registration.objects.filter(sub_type = obj).first()
-            registration_obj = obj.registrations.first()
+            registration_obj = next(iter(obj.registrations.all()), None)
 
             if registration_obj and registration_obj.price:
                 return registration_obj.price
@@ -78,14 +85,20 @@ class SubTypeSerializer(serializers.ModelSerializer):
         if not obj.company: 
             return None
         
-        testimonials = Testimonial.objects.filter(company = obj.company)
+        testimonials = prefetched(obj.company, "testimonials", None)
+        if testimonials is None:
+            testimonials = Testimonial.objects.filter(company = obj.company)
 
         serializer = TestimonialSerializer(testimonials, many=True)
 
         return serializer.data
     
     def get_image_url(self, obj):
-        first_registration_with_image = obj.registrations.filter(image__isnull = False).first()
+        registrations = prefetched(obj, "registrations", None)
+        if registrations is None:
+            first_registration_with_image = obj.registrations.filter(image__isnull = False).first()
+        else:
+            first_registration_with_image = next((registration for registration in registrations if registration.image), None)
 
         if first_registration_with_image:
             request = self.context.get('request')
@@ -190,14 +203,11 @@ class RegistrationSerializer(serializers.ModelSerializer):
             "time_required", "required_documents", "additional_info",
             "slug", "updated", "blogs", "rating"
         ]
+        select_related = ["company__rating_summary"]
+        prefetch_related = [("blogs", BlogSerializer)]
 
     def get_rating(self, obj):
-        if not obj.company:
-            return 0
-        
-        testimonials = obj.company.testimonials.values_list("rating", flat=True)
-
-        return testimonials.aggregate(Avg('rating'))['rating__avg'] if testimonials else 0
+        return company_rating(obj.company)[0]
 
     def get_blogs(self, obj):
         blogs = obj.blogs.all()
@@ -252,7 +262,7 @@ class DetailSerializer(serializers.ModelSerializer):
     bullet_points = BulletPointSerializer(many=True, read_only=True)    
     timelines = TimelineSerializer(many=True, read_only=True)
     faqs = serializers.SerializerMethodField()
-    testimonials = TestimonialSerializer(many=True, read_only=True)
+    testimonials = serializers.SerializerMethodField()
     meta_tags = MetaTagSerializer(many=True, read_only=True)
     item_name = serializers.CharField(source="registration.title", read_only=True)
     company_sub_type = serializers.CharField(source="company.sub_type", read_only=True)
@@ -274,6 +284,11 @@ class DetailSerializer(serializers.ModelSerializer):
             "modified", "item_name", "created", "updated",
             "company_slug", "company_sub_type", "url", "company_meta_title"
             ]
+        select_related = ["registration__registration_type", "registration__sub_type"]
+        prefetch_related = [
+            "tables__datas", ("registration__faqs", FaqSerializer),
+            ("company__testimonials", TestimonialSerializer),
+        ]
         
     def get_url(self, obj):
         try:
@@ -295,6 +310,13 @@ class DetailSerializer(serializers.ModelSerializer):
                 return serializer.data
             
         return None
+
+    def get_testimonials(self, obj):
+        testimonials = ordered_testimonials(obj.company)
+        if testimonials is None:
+            testimonials = obj.testimonials
+
+        return TestimonialSerializer(testimonials, many=True, context=self.context).data
             
 
 
@@ -459,7 +481,7 @@ class MultipageSerializer(serializers.ModelSerializer):
     bullet_points = MultipageBulletPointSerializer(many=True, read_only=True)    
     timelines = MultipageTimelineSerializer(many=True, read_only=True)
     faqs = MultipageFaqSerializer(many=True, read_only=True)
-    testimonials = TestimonialSerializer(many=True, read_only=True)
+    testimonials = serializers.SerializerMethodField()
     meta_tags = MetaTagSerializer(many=True, read_only=True)
 
     company_slug = serializers.CharField(source = "company.slug", read_only=True)
@@ -484,6 +506,15 @@ class MultipageSerializer(serializers.ModelSerializer):
             ]
         
         read_only = fields
+        select_related = ["company__rating_summary"]
+        prefetch_related = ["tables__datas", ("company__testimonials", TestimonialSerializer)]
+
+    def get_testimonials(self, obj):
+        testimonials = ordered_testimonials(obj.company)
+        if testimonials is None:
+            testimonials = obj.testimonials
+
+        return TestimonialSerializer(testimonials, many=True, context=self.context).data
 
 
 class TypeSerializer(serializers.ModelSerializer):
@@ -503,12 +534,7 @@ class TypeSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
     def get_rating(self, obj):
-        if not obj.company:
-            return 0
-        
-        testimonials = obj.company.testimonials.values_list("rating", flat=True)
-
-        return testimonials.aggregate(Avg('rating'))['rating__avg'] if testimonials else 0
+        return company_rating(obj.company)[0]
 
     def get_blogs(self, obj):
         from blog.models import  Blog        
@@ -16,6 +16,7 @@ from registration.models import RegistrationSubType, RegistrationDetailPage, Reg
 from company.models import Company
 
 from .paginations import RegistrationPagination
+from utility.prefetch import PlannedQuerysetMixin
 
 import logging
 
@@ -76,7 +77,7 @@ class TypeViewSet(viewsets.ReadOnlyModelViewSet):
         return RegistrationType.objects.none()
 
 
-class DetailViewSet(viewsets.ReadOnlyModelViewSet):
+class DetailViewSet(PlannedQuerysetMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = DetailSerializer
     lookup_field = "slug"
     pagination_class = RegistrationPagination
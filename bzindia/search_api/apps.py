@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class SearchApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'search_api'
+
+    def ready(self):
+        from . import signals
@@ -0,0 +1,211 @@
+import logging
+
+from django.db import connection, transaction
+from django.db.models.expressions import RawSQL
+from django.utils.html import strip_tags
+
+from .models import SearchDocument
+
+logger = logging.getLogger(__name__)
+
+PRODUCT, SERVICE, COURSE, REGISTRATION = "product", "service", "course", "registration"
+
+# InnoDB ignores words shorter than innodb_ft_min_token_size (3 by default).
+FULLTEXT_MIN_LENGTH = 3
+INDEX_BATCH_SIZE = 500
+
+
+def _join(*parts):
+    return " ".join(strip_tags(str(part)) for part in parts if part)
+
+
+def _image_url(image):
+    return image.url if image and image.name else None
+
+
+def _company_fields(company):
+    from company.registry import company_type
+
+    found = company_type(company)
+    return {
+        "company_name": company.name,
+        "company_slug": company.slug,
+        "company_type_name": found.name if found else None,
+        "company_type_slug": found.slug if found else None,
+    }
+
+
+def _meta_tags(detail):
+    return [tag.name for tag in detail.meta_tags.all()]
+
+
+def _product_document(detail):
+    product = detail.product
+    return {
+        "title": product.name,
+        "image": _image_url(product.image),
+        "price": str(product.price),
+        "extra": {},
+        "search_text": _join(
+            detail.company.name, product.name, product.description, product.category.name,
+            product.sub_category.name, product.brand.name, detail.summary, detail.description,
+            *_meta_tags(detail)
+        ),
+    }
+
+
+def _service_document(detail):
+    service = detail.service
+    return {
+        "title": service.name,
+        "image": _image_url(service.image),
+        "price": service.price,
+        "extra": {},
+        "search_text": _join(
+            detail.company.name, service.name, service.category.name, service.sub_category.name,
+            detail.summary, detail.description, *_meta_tags(detail)
+        ),
+    }
+
+
+def _course_document(detail):
+    course = detail.course
+    return {
+        "title": course.name,
+        "image": _image_url(course.image),
+        "price": str(course.price),
+        "extra": {
+            "course_id": course.pk,
+            "mode": course.mode,
+            "duration": course.duration,
+            "category": course.program.name,
+        },
+        "search_text": _join(
+            detail.company.name, course.name, course.program.name, course.specialization.name,
+            detail.summary, detail.description, *_meta_tags(detail)
+        ),
+    }
+
+
+def _registration_document(detail):
+    registration = detail.registration
+    sub_type = registration.sub_type if registration else None
+    return {
+        "title": (registration.title or sub_type.name) if registration else detail.meta_title,
+        "image": _image_url(registration.image) if registration else None,
+        "price": registration.price if registration else "",
+        "extra": {},
+        "search_text": _join(
+            detail.company.name, registration.title if registration else None,
+            sub_type.name if sub_type else None, sub_type.description if sub_type else None,
+            sub_type.type.name if sub_type else None, detail.summary, detail.description,
+            *_meta_tags(detail)
+        ),
+    }
+
+
+def _detail_models():
+    from company.registry import by_kind
+
+    return {
+        PRODUCT: (
+            by_kind(PRODUCT).details("product__category", "product__sub_category", "product__brand"),
+            _product_document
+        ),
+        SERVICE: (
+            by_kind(SERVICE).details("service__category", "service__sub_category"),
+            _service_document
+        ),
+        COURSE: (
+            by_kind(COURSE).details("course__program", "course__specialization"),
+            _course_document
+        ),
+        REGISTRATION: (
+            by_kind(REGISTRATION).details("registration__sub_type__type"),
+            _registration_document
+        ),
+    }
+
+
+def item_type_for(model):
+    for item_type, (queryset, _) in _detail_models().items():
+        if queryset.model is model:
+            return item_type
+    return None
+
+
+def build_document(item_type, detail):
+    _, builder = _detail_models()[item_type]
+    fields = builder(detail)
+    fields.update(_company_fields(detail.company))
+    fields.update({
+        "summary": detail.summary,
+        "meta_description": detail.meta_description,
+        "slug": detail.slug,
+    })
+    return SearchDocument(item_type=item_type, object_id=detail.pk, **fields)
+
+
+def index_objects(item_type, pks):
+    """(Re)build the search documents of the given detail pages."""
+    queryset, _ = _detail_models()[item_type]
+    pks = list(pks)
+
+    details = queryset.filter(pk__in=pks).prefetch_related("meta_tags")
+    documents = [build_document(item_type, detail) for detail in details]
+    found = {document.object_id for document in documents}
+
+    with transaction.atomic():
+        SearchDocument.objects.filter(item_type=item_type, object_id__in=pks).delete()
+        SearchDocument.objects.bulk_create(documents, batch_size=INDEX_BATCH_SIZE)
+
+    missing = set(pks) - found
+    if missing:
+        logger.debug(f"Dropped {len(missing)} {item_type} search documents without a detail page")
+
+    return len(documents)
+
+
+def remove_objects(item_type, pks):
+    SearchDocument.objects.filter(item_type=item_type, object_id__in=list(pks)).delete()
+
+
+def rebuild_index(item_types=None, batch_size=INDEX_BATCH_SIZE):
+    """Rebuild every search document, one batch of detail pages at a time."""
+    indexed = {}
+
+    for item_type, (queryset, _) in _detail_models().items():
+        if item_types and item_type not in item_types:
+            continue
+
+        pks = list(queryset.values_list("pk", flat=True))
+        SearchDocument.objects.filter(item_type=item_type).exclude(object_id__in=pks).delete()
+
+        count = 0
+        for start in range(0, len(pks), batch_size):
+            count += index_objects(item_type, pks[start:start + batch_size])
+        indexed[item_type] = count
+
+    return indexed
+
+
+def use_fulltext(query):
+    return connection.vendor == "mysql" and all(len(word) >= FULLTEXT_MIN_LENGTH for word in query.split())
+
+
+def search(query):
+    """Matching SearchDocuments, best match first.
+
+    On MySQL the FULLTEXT index ranks the results, elsewhere (and for words
+    shorter than the index token size) a substring match ordered by title is used.
+    """
+    documents = SearchDocument.objects.all()
+
+    if use_fulltext(query):
+        relevance = RawSQL(
+            "MATCH (search_documents.title, search_documents.search_text) AGAINST (%s IN NATURAL LANGUAGE MODE)",
+            (query,)
+        )
+        return documents.annotate(relevance=relevance).filter(relevance__gt=0).order_by("-relevance", "title", "pk")
+
+    return documents.filter(search_text__icontains=query).order_by("title", "pk")
@@ -0,0 +1,52 @@
+import random
+import string
+import time
+from django.core.management.base import BaseCommand
+
+from search_api.suggest import SuggestIndex, iter_suggest_items, KIND_ORDER
+
+
+def synthetic_items(count):
+    kinds = list(KIND_ORDER)
+    for pk in range(1, count + 1):
+        words = ["".join(random.choices(string.ascii_lowercase, k=random.randint(3, 9))) for _ in range(random.randint(1, 4))]
+        yield random.choice(kinds), pk, " ".join(words).title(), None
+
+
+class Command(BaseCommand):
+    help = "Measure build time and suggest latency of the typeahead prefix index"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--synthetic', type=int, default=0, help='Use N random names instead of the database')
+        parser.add_argument('--queries', type=int, default=20000)
+        parser.add_argument('--limit', type=int, default=10)
+
+    def handle(self, *args, **kwargs):
+        random.seed(42)
+
+        items = list(synthetic_items(kwargs['synthetic']) if kwargs['synthetic'] else iter_suggest_items())
+
+        start = time.perf_counter()
+        index = SuggestIndex(items)
+        build = time.perf_counter() - start
+
+        names = [name for _, _, name, _ in items if name]
+        queries = []
+        for _ in range(kwargs['queries']):
+            word = random.choice(random.choice(names).split())
+            queries.append(word[:random.randint(1, len(word))])
+
+        timings = []
+        for query in queries:
+            start = time.perf_counter()
+            index.suggest(query, kwargs['limit'])
+            timings.append(time.perf_counter() - start)
+
+        timings.sort()
+        mean = sum(timings) / len(timings)
+        p99 = timings[int(len(timings) * 0.99) - 1]
+
+        self.stdout.write(f"Indexed {len(index)} names ({sum(map(len, index.entries.values()))} keys) in {build:.2f}s")
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {len(queries)} prefixes: mean {mean * 1e6:.1f}µs, p99 {p99 * 1e6:.1f}µs"
+        ))
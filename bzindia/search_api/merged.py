@@ -0,0 +1,177 @@
+from django.db.models import Q
+
+from .models import SearchDocument
+from .documents import _company_fields, _image_url, PRODUCT, SERVICE, COURSE, REGISTRATION
+
+DETAIL_FIELDS = (
+    "id", "slug", "summary", "meta_description",
+    "company__name", "company__slug", "company__type__name", "company__type__slug",
+)
+
+
+class MergedSource:
+    """One detail page model taking part in a merged result stream."""
+
+    def __init__(self, item_type, queryset, related, fields, convert):
+        self.item_type = item_type
+        self.queryset = queryset
+        self.related = related
+        self.fields = fields
+        self.convert = convert
+
+    def matches(self):
+        # Filtering across meta_tags duplicates rows, match on the distinct ids instead.
+        model = self.queryset.model
+        return model.objects.filter(pk__in=self.queryset.values("pk")).order_by("pk")
+
+    def count(self):
+        return self.matches().count()
+
+    def fetch(self, start, stop):
+        rows = self.matches().select_related("company__type", *self.related).only(*DETAIL_FIELDS, *self.fields)
+        return [self.to_document(detail) for detail in rows[start:stop]]
+
+    def to_document(self, detail):
+        fields = self.convert(detail)
+        fields.update(_company_fields(detail.company))
+        return SearchDocument(
+            item_type=self.item_type, object_id=detail.pk, slug=detail.slug,
+            summary=detail.summary, meta_description=detail.meta_description, **fields
+        )
+
+
+class MergedResults:
+    """Lazy concatenation of several querysets that behaves like one for pagination.
+
+    ``count()`` runs one COUNT per source and slicing works out which part of
+    which source a page covers, so only the rows on that page are fetched.
+    """
+
+    ordered = True
+
+    def __init__(self, sources):
+        self.sources = sources
+        self._counts = None
+
+    def counts(self):
+        if self._counts is None:
+            self._counts = [source.count() for source in self.sources]
+        return self._counts
+
+    def count(self):
+        return sum(self.counts())
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            results = self[key:key + 1]
+            if not results:
+                raise IndexError("MergedResults index out of range")
+            return results[0]
+
+        start, stop, step = key.indices(self.count())
+        if step != 1:
+            raise ValueError("MergedResults does not support slice steps")
+
+        results = []
+        offset = 0
+
+        for source, count in zip(self.sources, self.counts()):
+            if offset >= stop:
+                break
+
+            source_start = max(start - offset, 0)
+            source_stop = min(stop - offset, count)
+
+            if source_start < source_stop:
+                results += source.fetch(source_start, source_stop)
+
+            offset += count
+
+        return results
+
+
+def _product(detail):
+    return {"title": detail.product.name, "image": _image_url(detail.product.image), "price": str(detail.product.price)}
+
+
+def _service(detail):
+    return {"title": detail.service.name, "image": _image_url(detail.service.image), "price": detail.service.price}
+
+
+def _course(detail):
+    course = detail.course
+    return {
+        "title": course.name,
+        "image": _image_url(course.image),
+        "price": str(course.price),
+        "extra": {"course_id": course.pk, "mode": course.mode, "duration": course.duration, "category": course.program.name},
+    }
+
+
+def _registration(detail):
+    registration = detail.registration
+    if not registration:
+        return {"title": detail.meta_title, "image": None, "price": ""}
+
+    return {
+        "title": registration.title or registration.sub_type.name,
+        "image": _image_url(registration.image),
+        "price": registration.price,
+    }
+
+
+def merged_search(query):
+    """Substring search across the four detail page models without the search document table."""
+    from product.models import ProductDetailPage
+    from service.models import ServiceDetail
+    from educational.models import CourseDetail
+    from registration.models import RegistrationDetailPage
+
+    common = (
+        Q(company__name__icontains=query) | Q(summary__icontains=query) |
+        Q(description__icontains=query) | Q(meta_tags__name__icontains=query)
+    )
+
+    return MergedResults([
+        MergedSource(
+            PRODUCT,
+            ProductDetailPage.objects.filter(
+                common | Q(product__name__icontains=query) | Q(product__description__icontains=query) |
+                Q(product__category__name__icontains=query) | Q(product__sub_category__name__icontains=query) |
+                Q(product__brand__name__icontains=query)
+            ),
+            ("product",), ("product__name", "product__image", "product__price"), _product
+        ),
+        MergedSource(
+            SERVICE,
+            ServiceDetail.objects.filter(
+                common | Q(service__name__icontains=query) | Q(service__category__name__icontains=query) |
+                Q(service__sub_category__name__icontains=query)
+            ),
+            ("service",), ("service__name", "service__image", "service__price"), _service
+        ),
+        MergedSource(
+            COURSE,
+            CourseDetail.objects.filter(
+                common | Q(course__name__icontains=query) | Q(course__program__name__icontains=query) |
+                Q(course__specialization__name__icontains=query)
+            ),
+            ("course__program",),
+            ("course__name", "course__image", "course__price", "course__mode", "course__duration", "course__program__name"),
+            _course
+        ),
+        MergedSource(
+            REGISTRATION,
+            RegistrationDetailPage.objects.filter(
+                common | Q(registration__title__icontains=query) | Q(registration__sub_type__name__icontains=query) |
+                Q(registration__sub_type__description__icontains=query) |
+                Q(registration__sub_type__type__name__icontains=query)
+            ),
+            ("registration__sub_type",),
+            ("meta_title", "registration__title", "registration__image", "registration__price", "registration__sub_type__name"),
+            _registration
+        ),
+    ])
@@ -0,0 +1,52 @@
+from django.db import migrations, models
+
+
+def create_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'mysql':
+        schema_editor.execute(
+            "CREATE FULLTEXT INDEX search_documents_fulltext ON search_documents (title, search_text)"
+        )
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'mysql':
+        schema_editor.execute("DROP INDEX search_documents_fulltext ON search_documents")
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('item_type', models.CharField(max_length=20)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('title', models.CharField(max_length=255)),
+                ('summary', models.TextField(blank=True, null=True)),
+                ('meta_description', models.TextField(blank=True, null=True)),
+                ('image', models.CharField(blank=True, max_length=500, null=True)),
+                ('price', models.CharField(blank=True, max_length=100, null=True)),
+                ('slug', models.SlugField(blank=True, max_length=500, null=True)),
+                ('company_name', models.CharField(max_length=150)),
+                ('company_slug', models.SlugField(blank=True, max_length=175, null=True)),
+                ('company_type_name', models.CharField(blank=True, max_length=150, null=True)),
+                ('company_type_slug', models.SlugField(blank=True, max_length=175, null=True)),
+                ('extra', models.JSONField(blank=True, default=dict)),
+                ('search_text', models.TextField()),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'search_documents',
+                'ordering': ['title'],
+                'unique_together': {('item_type', 'object_id')},
+            },
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
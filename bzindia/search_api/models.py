@@ -1,3 +1,35 @@
 from django.db import models
 
-# Create your models here.
+
+class SearchDocument(models.Model):
+    """Denormalized, full-text indexed copy of a detail page used by the search API."""
+
+    item_type = models.CharField(max_length=20)
+    object_id = models.PositiveBigIntegerField()
+
+    title = models.CharField(max_length=255)
+    summary = models.TextField(null=True, blank=True)
+    meta_description = models.TextField(null=True, blank=True)
+    image = models.CharField(max_length=500, null=True, blank=True)
+    price = models.CharField(max_length=100, null=True, blank=True)
+    slug = models.SlugField(max_length=500, null=True, blank=True)
+
+    company_name = models.CharField(max_length=150)
+    company_slug = models.SlugField(max_length=175, null=True, blank=True)
+    company_type_name = models.CharField(max_length=150, null=True, blank=True)
+    company_type_slug = models.SlugField(max_length=175, null=True, blank=True)
+
+    extra = models.JSONField(default=dict, blank=True)
+
+    search_text = models.TextField()
+
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.item_type}-{self.title}"
+
+    class Meta:
+        db_table = "search_documents"
+        ordering = ["title"]
+        unique_together = ("item_type", "object_id")
@@ -0,0 +1,120 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from company.models import Company
+from product.models import Product, ProductDetailPage
+from service.models import Service, ServiceDetail
+from educational.models import Course, CourseDetail
+from registration.models import Registration, RegistrationDetailPage, RegistrationSubType
+from locations.models import UniquePlace
+
+from .documents import index_objects, remove_objects, PRODUCT, SERVICE, COURSE, REGISTRATION
+from . import suggest
+
+DETAIL_TYPES = {
+    ProductDetailPage: PRODUCT,
+    ServiceDetail: SERVICE,
+    CourseDetail: COURSE,
+    RegistrationDetailPage: REGISTRATION,
+}
+
+# Items whose names are copied into the documents of their detail pages.
+ITEM_DETAILS = {
+    Product: (ProductDetailPage, "product"),
+    Service: (ServiceDetail, "service"),
+    Course: (CourseDetail, "course"),
+    Registration: (RegistrationDetailPage, "registration"),
+}
+
+
+def reindex_on_commit(item_type, pks):
+    pks = list(pks)
+    if pks:
+        transaction.on_commit(lambda: index_objects(item_type, pks))
+
+
+@receiver(post_save, sender=ProductDetailPage)
+@receiver(post_save, sender=ServiceDetail)
+@receiver(post_save, sender=CourseDetail)
+@receiver(post_save, sender=RegistrationDetailPage)
+def detail_page_saved(sender, instance, **kwargs):
+    reindex_on_commit(DETAIL_TYPES[sender], [instance.pk])
+
+
+@receiver(post_delete, sender=ProductDetailPage)
+@receiver(post_delete, sender=ServiceDetail)
+@receiver(post_delete, sender=CourseDetail)
+@receiver(post_delete, sender=RegistrationDetailPage)
+def detail_page_deleted(sender, instance, **kwargs):
+    item_type, pk = DETAIL_TYPES[sender], instance.pk
+    transaction.on_commit(lambda: remove_objects(item_type, [pk]))
+
+
+@receiver(m2m_changed, sender=ProductDetailPage.meta_tags.through)
+@receiver(m2m_changed, sender=ServiceDetail.meta_tags.through)
+@receiver(m2m_changed, sender=CourseDetail.meta_tags.through)
+@receiver(m2m_changed, sender=RegistrationDetailPage.meta_tags.through)
+def detail_page_meta_tags_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not reverse:
+        reindex_on_commit(DETAIL_TYPES[type(instance)], [instance.pk])
+    elif pk_set:
+        reindex_on_commit(DETAIL_TYPES[model], pk_set)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=Service)
+@receiver(post_save, sender=Course)
+@receiver(post_save, sender=Registration)
+def item_saved(sender, instance, created, **kwargs):
+    if created:
+        return
+
+    detail_model, field = ITEM_DETAILS[sender]
+    pks = detail_model.objects.filter(**{field: instance}).values_list("pk", flat=True)
+    reindex_on_commit(DETAIL_TYPES[detail_model], pks)
+
+
+@receiver(post_save, sender=Company)
+def company_saved(sender, instance, created, **kwargs):
+    if created:
+        return
+
+    for detail_model, item_type in DETAIL_TYPES.items():
+        pks = detail_model.objects.filter(company=instance).values_list("pk", flat=True)
+        reindex_on_commit(item_type, pks)
+
+
+SUGGEST_KINDS = {
+    Company: suggest.COMPANY,
+    Product: suggest.PRODUCT,
+    Service: suggest.SERVICE,
+    Course: suggest.COURSE,
+    RegistrationSubType: suggest.REGISTRATION,
+    UniquePlace: suggest.PLACE,
+}
+
+
+@receiver(post_save, sender=Company)
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=Service)
+@receiver(post_save, sender=Course)
+@receiver(post_save, sender=RegistrationSubType)
+@receiver(post_save, sender=UniquePlace)
+def suggestion_saved(sender, instance, **kwargs):
+    change = ("upsert", SUGGEST_KINDS[sender], instance.pk, instance.name, instance.slug)
+    transaction.on_commit(lambda: suggest.publish_change(*change))
+
+
+@receiver(post_delete, sender=Company)
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=Service)
+@receiver(post_delete, sender=Course)
+@receiver(post_delete, sender=RegistrationSubType)
+@receiver(post_delete, sender=UniquePlace)
+def suggestion_deleted(sender, instance, **kwargs):
+    kind, pk = SUGGEST_KINDS[sender], instance.pk
+    transaction.on_commit(lambda: suggest.publish_change("remove", kind, pk))
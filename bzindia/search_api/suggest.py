@@ -0,0 +1,176 @@
+import bisect
+import logging
+import re
+import threading
+
+from utility.replicated_index import ReplicatedIndex
+
+logger = logging.getLogger(__name__)
+
+PRODUCT, SERVICE, COURSE, REGISTRATION, COMPANY, PLACE = (
+    "product", "service", "course", "registration", "company", "place"
+)
+
+# Kinds listed first win ties between equally good matches.
+KIND_ORDER = {kind: order for order, kind in enumerate((COMPANY, PRODUCT, SERVICE, COURSE, REGISTRATION, PLACE))}
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 25
+SCAN_FACTOR = 20
+
+MAX_CATCH_UP = 5000
+
+NON_WORD = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text):
+    return NON_WORD.sub(" ", (text or "").lower()).strip()
+
+
+def index_keys(name):
+    """The normalized name and every suffix of it that starts at a word."""
+    normalized = normalize(name)
+    if not normalized:
+        return []
+
+    keys = [normalized]
+    for match in re.finditer(" ", normalized):
+        keys.append(normalized[match.end():])
+
+    return list(dict.fromkeys(keys))
+
+
+class SuggestIndex:
+    """Sorted arrays of (key, pk), one per kind, answering prefix queries with bisect.
+
+    A name is indexed under its own start and under the start of each of its
+    words, so "delhi" also suggests "New Delhi". Keeping a kind per array
+    lets a filtered query scan only the kinds asked for. Single entries are
+    inserted and removed in place so saves never rebuild the arrays.
+    """
+
+    def __init__(self, items=(), version=0):
+        self.items = {}
+        self.entries = {kind: [] for kind in KIND_ORDER}
+
+        for kind, pk, name, slug in items:
+            keys = index_keys(name)
+            self.items[(kind, pk)] = (name, slug, keys[0] if keys else "")
+            self.entries[kind] += [(key, pk) for key in keys]
+
+        for entries in self.entries.values():
+            entries.sort()
+
+        self.version = version
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.items)
+
+    def _remove(self, kind, pk):
+        current = self.items.pop((kind, pk), None)
+        if current is None:
+            return
+
+        entries = self.entries[kind]
+        for key in index_keys(current[0]):
+            i = bisect.bisect_left(entries, (key, pk))
+            if i < len(entries) and entries[i] == (key, pk):
+                del entries[i]
+
+    def upsert(self, kind, pk, name, slug=None):
+        with self.lock:
+            self._remove(kind, pk)
+            keys = index_keys(name)
+            self.items[(kind, pk)] = (name, slug, keys[0] if keys else "")
+            for key in keys:
+                bisect.insort(self.entries[kind], (key, pk))
+
+    def remove(self, kind, pk):
+        with self.lock:
+            self._remove(kind, pk)
+
+    def suggest(self, prefix, limit=DEFAULT_LIMIT, kinds=None):
+        query = normalize(prefix)
+        if not query:
+            return []
+
+        found = {}
+        for kind in kinds or KIND_ORDER:
+            entries = self.entries.get(kind)
+            if not entries:
+                continue
+
+            start = bisect.bisect_left(entries, (query,))
+            stop = bisect.bisect_left(entries, (query + "\uffff",))
+
+            # The slice is lexicographic, look a little further than ``limit`` to rank.
+            for key, pk in entries[start:min(stop, start + limit * SCAN_FACTOR)]:
+                item = self.items.get((kind, pk))
+                if item is None:
+                    continue
+
+                # Keys other than the whole name start at a later word.
+                rank = (0 if key == item[2] else 1, KIND_ORDER[kind], len(item[0]), item[0])
+                if (kind, pk) not in found or rank < found[(kind, pk)][0]:
+                    found[(kind, pk)] = (rank, item)
+
+        ranked = sorted(found.items(), key=lambda entry: entry[1][0])[:limit]
+        return [
+            {"type": kind, "id": pk, "name": item[0], "slug": item[1]}
+            for (kind, pk), (_, item) in ranked
+        ]
+
+
+def suggest_sources():
+    from company.models import Company
+    from product.models import Product
+    from service.models import Service
+    from educational.models import Course
+    from registration.models import RegistrationSubType
+    from locations.models import UniquePlace
+
+    return {
+        COMPANY: Company,
+        PRODUCT: Product,
+        SERVICE: Service,
+        COURSE: Course,
+        REGISTRATION: RegistrationSubType,
+        PLACE: UniquePlace,
+    }
+
+
+def iter_suggest_items():
+    for kind, model in suggest_sources().items():
+        for pk, name, slug in model.objects.values_list("pk", "name", "slug").iterator(chunk_size=10000):
+            yield kind, pk, name, slug
+
+
+def _load_index(version):
+    index = SuggestIndex(iter_suggest_items(), version=version)
+    logger.info(f"Loaded suggest index with {len(index)} names (version {version})")
+    return index
+
+
+def _apply(index, change):
+    operation, kind, pk, name, slug = change
+    if operation == "remove":
+        index.remove(kind, pk)
+    else:
+        index.upsert(kind, pk, name, slug)
+
+
+suggest_index = ReplicatedIndex("search:suggest_index", _load_index, _apply, max_catch_up=MAX_CATCH_UP)
+
+
+def get_suggest_index():
+    return suggest_index.get()
+
+
+def publish_change(operation, kind, pk, name=None, slug=None):
+    """Record a name change so every process can apply it incrementally."""
+    suggest_index.publish((operation, kind, pk, name, slug))
+
+
+def suggest(prefix, limit=DEFAULT_LIMIT, kinds=None):
+    return get_suggest_index().suggest(prefix, min(limit, MAX_LIMIT), kinds)
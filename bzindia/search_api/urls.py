@@ -1,7 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
-from .views import ItemViewSet
+from .views import ItemViewSet, SuggestViewSet
 
 app_name = "search_api"
 
@@ -10,5 +10,6 @@ router = DefaultRouter()
 router.register(r'results', ItemViewSet)
 
 urlpatterns = [
-    path('', include(router.urls))
+    path('', include(router.urls)),
+    path('suggest/', SuggestViewSet.as_view({"get": "list"}), name="suggest"),
 ]
@@ -1,4 +1,5 @@
-from django.db.models import Q
+from django.conf import settings
+from django.db.models import Avg, Count
 
 from utility.text import clean_string
 
@@ -7,116 +8,92 @@ from rest_framework.response import Response
 
 from .serializers import ItemSerializer
 from .paginations import ItemPagination
+from .models import SearchDocument
+from .documents import search, COURSE
+from .merged import merged_search
+from .suggest import suggest, DEFAULT_LIMIT, KIND_ORDER
 
-from product.models import ProductDetailPage
-from service.models import ServiceDetail
-from educational.models import CourseDetail
-from registration.models import RegistrationDetailPage
+from educational.models import Course, Testimonial as CourseTestimonial
+
+# Without the search document table, page through the detail models directly.
+SEARCH_DOCUMENT_INDEX = getattr(settings, "SEARCH_DOCUMENT_INDEX", True)
 
 class ItemViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = ProductDetailPage.objects.none()
+    queryset = SearchDocument.objects.none()
     pagination_class = ItemPagination
     serializer_class = ItemSerializer
 
+    def course_ratings(self, documents):
+        course_ids = [document.extra.get("course_id") for document in documents if document.item_type == COURSE]
+
+        if not course_ids:
+            return {}
+
+        ratings = CourseTestimonial.objects.filter(course__in=course_ids).values("course").annotate(
+            rating=Avg("rating"), rating_count=Count("id")
+        )
+        return {rating["course"]: (rating["rating"], rating["rating_count"]) for rating in ratings}
+
+    def to_item(self, document, ratings):
+        item = {
+            "title": document.title,
+            "image_url": self.request.build_absolute_uri(document.image) if document.image else "",
+            "summary": document.summary,
+            "company_name": document.company_name,
+            "company_type_name": document.company_type_name,
+            "company_type_slug": document.company_type_slug,
+            "company_slug": document.company_slug,
+            "meta_description": document.meta_description,
+            "price": document.price or "",
+            "slug": document.slug
+        }
+
+        if document.item_type == COURSE:
+            course = Course(duration=document.extra.get("duration") or 0)
+            rating, rating_count = ratings.get(document.extra.get("course_id"), (0, 0))
+
+            item.update({
+                "mode": document.extra.get("mode"),
+                "start_date": course.starting_date.date(),
+                "end_date": course.ending_date.date(),
+                "duration": course.duration,
+                "category": document.extra.get("category"),
+                "rating": rating or 0,
+                "rating_count": rating_count,
+            })
+
+        return item
+
     def list(self, request, *args, **kwargs):
         query = clean_string(self.request.query_params.get("query", ""))
 
         if not query:
             return Response({"items": "Query is not provided"}, status=status.HTTP_400_BAD_REQUEST)
 
-        items = []        
-
-        product_details = ProductDetailPage.objects.filter(
-            Q(company__name__icontains = query) | Q(product__name__icontains = query) |
-            Q(product__description__icontains = query) | Q(product__category__name__icontains = query) |
-            Q(product__sub_category__name__icontains = query) | Q(product__brand__name__icontains = query) |
-            Q(summary__icontains = query) | Q(description__icontains = query) |
-            Q(meta_tags__name__icontains = query)
-        )   
-
-        service_details = ServiceDetail.objects.filter(
-            Q(company__name__icontains = query) | Q(service__name__icontains = query) |
-            Q(service__category__name__icontains = query) | Q(service__sub_category__name__icontains = query) | 
-            Q(summary__icontains = query) | Q(description__icontains = query) | 
-            Q(meta_tags__name__icontains = query)
-        )
+        results = search(query) if SEARCH_DOCUMENT_INDEX else merged_search(query)
 
-        course_details = CourseDetail.objects.filter(
-            Q(company__name__icontains = query) | Q(course__name__icontains = query) |
-            Q(course__program__name__icontains = query) | Q(course__specialization__name__icontains = query) | 
-            Q(summary__icontains = query) | Q(description__icontains = query) | 
-            Q(meta_tags__name__icontains = query)
-        )
+        # Counting and slicing happen in the database, only one page is loaded.
+        documents = self.paginate_queryset(results)
+        ratings = self.course_ratings(documents)
 
-        registration_details = RegistrationDetailPage.objects.filter(
-            Q(company__name__icontains = query) | Q(registration_sub_type__name__icontains = query) |
-            Q(registration_sub_type__description__icontains = query) | Q(registration_sub_type__type__name__icontains = query) |
-            Q(summary__icontains = query) | Q(description__icontains = query) | 
-            Q(meta_tags__name__icontains = query)
-        )
+        serializer = self.get_serializer([self.to_item(document, ratings) for document in documents], many=True)
+
+        return self.get_paginated_response(serializer.data)
+
+
+
+class SuggestViewSet(viewsets.ViewSet):
+    def list(self, request, *args, **kwargs):
+        query = clean_string(request.query_params.get("query", ""))
+
+        if not query:
+            return Response({"suggestions": []}, status=status.HTTP_200_OK)
+
+        try:
+            limit = int(request.query_params.get("limit", DEFAULT_LIMIT))
+        except ValueError:
+            return Response({"limit": "Limit must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+        kinds = [kind for kind in request.query_params.get("type", "").split(",") if kind in KIND_ORDER]
 
-        items += [{
-            "title": detail.product.name,
-            "image_url": request.build_absolute_uri(detail.product.image.url) if detail.product.image and detail.product.image.name else "",
-            "summary": detail.summary,
-            "company_name": detail.company.name,
-            "company_type_name": detail.company.type.name,
-            "company_type_slug": detail.company.type.slug,
-            "company_slug": detail.company.slug,
-            "meta_description": detail.meta_description,
-            "price": detail.product.price,
-            "slug": detail.slug            
-            } for detail in product_details]
-        
-        items += [{
-            "title": detail.service.name,
-            "image_url": request.build_absolute_uri(detail.service.image.url) if detail.service.image and detail.service.image.name else "",
-            "summary": detail.summary,
-            "company_name": detail.company.name,
-            "company_type_name": detail.company.type.name,
-            "company_type_slug": detail.company.type.slug,
-            "company_slug": detail.company.slug,
-            "meta_description": detail.meta_description,
-            "price": detail.service.price,
-            "slug": detail.slug            
-            } for detail in service_details]
-        
-        items += [{
-            "title": detail.registration_sub_type.name,
-            "image_url": None,
-            "summary": detail.summary,
-            "company_name": detail.company.name,
-            "company_type_name": detail.company.type.name,
-            "company_type_slug": detail.company.type.slug,
-            "company_slug": detail.company.slug,
-            "meta_description": detail.meta_description,
-            "price": "",
-            "slug": detail.slug            
-            } for detail in registration_details]
-        
-        items += [{
-            "title": detail.course.name,
-            "image_url": request.build_absolute_uri(detail.course.image.url) if detail.course.image and detail.course.image.name else "",
-            "summary": detail.summary,
-            "company_name": detail.company.name,
-            "company_type_name": detail.company.type.name,
-            "company_type_slug": detail.company.type.slug,
-            "company_slug": detail.company.slug,
-            "meta_description": detail.meta_description,
-            "price": detail.course.price,
-            "slug": detail.slug,    
-
-            "mode": detail.course.mode,
-            "start_date": detail.course.starting_date.date(),
-            "end_date": detail.course.ending_date.date(),
-            "duration": detail.course.duration,
-            "category": detail.course.program.name,
-            "rating": detail.course.rating,
-            "rating_count": detail.course.rating_count,
-
-            } for detail in course_details]
-        
-        paginated_items = self.paginate_queryset(items)
-        serializer = self.get_serializer(paginated_items, many=True)
-
-        return self.get_paginated_response(serializer.data)
\ No newline at end of file
+        return Response({"suggestions": suggest(query, max(limit, 1), kinds)}, status=status.HTTP_200_OK)
@@ -3,11 +3,13 @@ from django.utils.text import slugify
 from datetime import datetime
 from ckeditor.fields import RichTextField
 
-from django.db.models import Avg
 
 from company.models import Company
+from company.ratings import company_rating
 from locations.models import UniqueState
 from base.models import MetaTag
+from utility.placeholders import strip_slug_placeholders
+from utility.slugs import unique_slug
 
 class Category(models.Model):
     company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name="service_category_company")
@@ -751,7 +753,7 @@ class MultiPage(models.Model):
     hide_support_languages = models.BooleanField(default=False)
     home_footer_visibility = models.BooleanField(default=False)
 
-    slug = models.SlugField(blank=True, null=True, max_length=500)
+    slug = models.SlugField(blank=True, null=True, max_length=500, unique=True)
 
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
@@ -764,17 +766,12 @@ class MultiPage(models.Model):
             self.home_footer_visibility = True
 
         base_slug = slugify(self.title)
-        slug = base_slug
-        count = 1
-
-        while MultiPage.objects.filter(slug = slug).exclude(pk = self.pk).exists():
-            slug = f"{base_slug}-{count}"
-            count += 1
 
+        # Placeholders are dropped before allocating, it's the stored slug that has to be unique.
         if self.url_type != "slug_filtered":
-            slug = slug.replace("-in-place_name", "").replace("-in-district_name", "").replace("-in-state_name", "").replace("-place_name", "").replace("-district_name", "").replace("-state_name", "")
+            base_slug = strip_slug_placeholders(base_slug)
 
-        self.slug = slug
+        self.slug = unique_slug(MultiPage, base_slug, exclude_pk=self.pk)
 
         super().save(*args, **kwargs)
 
@@ -851,15 +848,11 @@ class MultiPage(models.Model):
     
     @property
     def rating(self):
-        from company.models import Testimonial
-        testimonials = Testimonial.objects.filter(company = self.company).values_list("rating", flat=True)        
-        
-        return testimonials.aggregate(Avg('rating'))['rating__avg'] if testimonials else 0
+        return company_rating(self.company)[0]
 
     @property
     def rating_count(self):
-        from company.models import Testimonial
-        return Testimonial.objects.filter(company = self.company).count()
+        return company_rating(self.company)[1]
     
     @property
     def image_count(self):
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from django.conf import settings
+from django.db.models import Prefetch
 
 from utility.text import clean_string
 
@@ -18,6 +19,57 @@ from blog.models import Blog
 from company_api.serializers import CompanySerializer, TestimonialSerializer
 from blog_api.serializers import BlogSerializer
 from meta_api.serializers import MetaTagSerializer
+from utility.dataloader import BatchedListSerializer, DataLoaderMixin, first_rows, keyed_rows, row_counts
+from utility.prefetch import plan_queryset, prefetched
+
+# Detail pages inlined per category, the rest are counted in detail_pages_count.
+CATEGORY_DETAIL_PAGES = getattr(settings, "SERVICE_CATEGORY_DETAIL_PAGES", 12)
+
+
+def company_testimonials(company_ids):
+    testimonials = Testimonial.objects.filter(company__in = company_ids)
+    return keyed_rows(plan_queryset(testimonials, TestimonialSerializer), "company")
+
+
+def category_blogs(category_ids):
+    blogs = Blog.objects.filter(service__category__in = category_ids)
+    return keyed_rows(plan_queryset(blogs, BlogSerializer), "service__category")
+
+
+def sub_category_blogs(sub_category_ids):
+    blogs = Blog.objects.filter(service__sub_category__in = sub_category_ids)
+    return keyed_rows(plan_queryset(blogs, BlogSerializer), "service__sub_category")
+
+
+def category_images(category_ids):
+    services = Service.objects.filter(category__in = category_ids, image__isnull = False).only("id", "name", "category", "image")
+    return first_rows(services, "category", 1)
+
+
+def sub_category_images(sub_category_ids):
+    services = Service.objects.filter(sub_category__in = sub_category_ids, image__isnull = False).only("id", "name", "sub_category", "image")
+    return first_rows(services, "sub_category", 1)
+
+
+def category_detail_pages(category_ids):
+    details = ServiceDetail.objects.filter(service__category__in = category_ids)
+    return first_rows(plan_queryset(details, DetailSerializer), "service__category", CATEGORY_DETAIL_PAGES)
+
+
+def category_detail_page_counts(category_ids):
+    return row_counts(ServiceDetail.objects.filter(service__category__in = category_ids), "service__category")
+
+
+def service_image_url(services, context):
+    service = services[0] if services else None
+    request = context.get('request')
+
+    if service and service.image and hasattr(service.image, 'url'):
+        if request is not None:
+            return request.build_absolute_uri(service.image.url)
+        return f"{settings.SITE_URL}{service.image.url}"
+
+    return None
 
 class FaqSerializer(serializers.ModelSerializer):
     company = CompanySerializer(read_only = True)
@@ -80,6 +132,7 @@ class ServiceSerializer(serializers.ModelSerializer):
             ]
 
         read_only_fields = ["id","company_name"]
+        prefetch_related = [("faq_set", FaqSerializer), ("company__testimonials", TestimonialSerializer)]
 
     def get_image_url(self, obj):
         request = self.context.get('request')
@@ -112,7 +165,7 @@ class ServiceSerializer(serializers.ModelSerializer):
         if not obj:
             return None
         
-        faqs = Faq.objects.filter(service = obj)
+        faqs = obj.faq_set.all()
 
         serializers = FaqSerializer(faqs, many=True)
 
@@ -122,61 +175,67 @@ class ServiceSerializer(serializers.ModelSerializer):
         if not obj:
             return None
         
-        testimonials = Testimonial.objects.filter(company = obj.company)
+        testimonials = obj.company.testimonials.all()
 
         serializer = TestimonialSerializer(testimonials, many=True)
 
         return serializer.data    
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(DataLoaderMixin, serializers.ModelSerializer):
     detail_pages = serializers.SerializerMethodField()
+    detail_pages_count = serializers.SerializerMethodField()
     blogs = serializers.SerializerMethodField()
     testimonials = serializers.SerializerMethodField()
     image_url = serializers.SerializerMethodField()
 
+    dataloaders = {
+        "company_testimonials": ("company_id", company_testimonials),
+        "category_blogs": ("pk", category_blogs),
+        "category_images": ("pk", category_images),
+        "category_detail_pages": ("pk", category_detail_pages),
+        "category_detail_page_counts": ("pk", category_detail_page_counts),
+    }
+
     class Meta:
         model = Category
         fields = ["id","name", "slug", "updated", "detail_pages", "blogs", "testimonials",
-                  "image_url"]
+                  "image_url", "detail_pages_count"]
+        list_serializer_class = BatchedListSerializer
         
     def get_image_url(self, obj):
-        request = self.context.get('request')
-
-        service = obj.services.filter(image__isnull = False).first()
-
-        if service and service.image and hasattr(service.image, 'url'):
-            if request is not None:
-                return request.build_absolute_uri(service.image.url)
-            return f"{settings.SITE_URL}{service.image.url}"
-        
-        return None
+        return service_image_url(self.load("category_images", obj), self.context)
 
     def get_detail_pages(self, obj):
         if not obj:
             return None
         
-        details = ServiceDetail.objects.filter(service__category = obj)
+        details = self.load("category_detail_pages", obj)
 
         return DetailSerializer(details, many=True).data
+
+    def get_detail_pages_count(self, obj):
+        counts = self.load("category_detail_page_counts", obj)
+
+        return counts[0] if counts else 0
     
     def get_blogs(self, obj):
 
-        blogs = Blog.objects.filter(service__category = obj)
-        serializer = BlogSerializer(blogs, many=True)
+        blogs = self.load("category_blogs", obj)
+        serializer = BlogSerializer(blogs, many=True, context={"dataloaders": self.context.setdefault("dataloaders", {})})
 
         return serializer.data
     
     def get_testimonials(self, obj):
 
-        testimonials = Testimonial.objects.filter(company = obj.company)
+        testimonials = self.load("company_testimonials", obj)
 
         serializer = TestimonialSerializer(testimonials, many=True)
 
         return serializer.data
     
 
-class SubCategorySerializer(serializers.ModelSerializer):
+class SubCategorySerializer(DataLoaderMixin, serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
     category_name = serializers.CharField(source="category.name", read_only=True)
     category_slug = serializers.CharField(source="category.slug", read_only=True)
@@ -189,35 +248,33 @@ class SubCategorySerializer(serializers.ModelSerializer):
             "name", "slug", "updated", "image_url", "category_name", 
             "category_slug", "testimonials", "blogs"
             ]
+        list_serializer_class = BatchedListSerializer
 
     read_only_fields = "__all__"
 
+    dataloaders = {
+        "company_testimonials": ("company_id", company_testimonials),
+        "sub_category_blogs": ("pk", sub_category_blogs),
+        "sub_category_images": ("pk", sub_category_images),
+    }
+
     def get_blogs(self, obj):
 
-        blogs = Blog.objects.filter(service__sub_category = obj)
-        serializer = BlogSerializer(blogs, many=True)
+        blogs = self.load("sub_category_blogs", obj)
+        serializer = BlogSerializer(blogs, many=True, context={"dataloaders": self.context.setdefault("dataloaders", {})})
 
         return serializer.data
     
     def get_testimonials(self, obj):
 
-        testimonials = Testimonial.objects.filter(company = obj.company)
+        testimonials = self.load("company_testimonials", obj)
 
         serializer = TestimonialSerializer(testimonials, many=True)
 
         return serializer.data
 
     def get_image_url(self, obj):
-        request = self.context.get('request')
-
-        service = obj.services.filter(image__isnull = False).first()
-
-        if service and service.image and hasattr(service.image, 'url'):
-            if request is not None:
-                return request.build_absolute_uri(service.image.url)
-            return f"{settings.SITE_URL}{service.image.url}"
-        
-        return None
+        return service_image_url(self.load("sub_category_images", obj), self.context)
     
     
 
@@ -337,6 +394,8 @@ class DetailSerializer(serializers.ModelSerializer):
             "meta_tags", "published", "company_sub_type",
             "modified", "updated", "created", "url"
             ] 
+        select_related = ["service__category", "service__sub_category"]
+        prefetch_related = ["tables__datas"]
         
     def get_url(self, obj):
         try:
@@ -540,12 +599,22 @@ class MultipageSerializer(serializers.ModelSerializer):
             ]
         
         read_only = fields
+        select_related = ["company__rating_summary"]
+        prefetch_related = [
+            "tables__datas",
+            (Prefetch("service__blog_set", queryset=Blog.objects.filter(is_published=True), to_attr="published_blogs"), BlogSerializer),
+            ("company__testimonials", TestimonialSerializer),
+        ]
 
     def get_blogs(self, obj):
         if not obj:
             return None
         
-        blogs = Blog.objects.filter(company = obj.company, service = obj.service, is_published = True)
+        blogs = prefetched(obj.service, "published_blogs", None)
+        if blogs is None:
+            blogs = Blog.objects.filter(company = obj.company, service = obj.service, is_published = True)
+        else:
+            blogs = [blog for blog in blogs if blog.company_id == obj.company_id]
 
         serializer = BlogSerializer(blogs, many=True)
 
@@ -555,7 +624,7 @@ class MultipageSerializer(serializers.ModelSerializer):
         if not obj:
             return None
         
-        testimonials = Testimonial.objects.filter(company = obj.company)
+        testimonials = obj.company.testimonials.all()
 
         serializer = TestimonialSerializer(testimonials, many=True)
 
@@ -15,6 +15,7 @@ from service.models import Service, ServiceDetail, Enquiry, SubCategory, Categor
 from company.models import Company
 
 from .paginations import ServiceDetailPagination
+from utility.prefetch import PlannedQuerysetMixin
 
 import logging
 
@@ -43,7 +44,7 @@ class ServiceViewset(viewsets.ModelViewSet):
         return context
 
 
-class CategoryViewset(viewsets.ModelViewSet):
+class CategoryViewset(PlannedQuerysetMixin, viewsets.ModelViewSet):
     serializer_class = CategorySerializer
     pagination_class = ServiceDetailPagination
     lookup_field = "slug"
@@ -59,7 +60,7 @@ class CategoryViewset(viewsets.ModelViewSet):
         return Category.objects.none()
 
 
-class SubCategoryViewset(viewsets.ModelViewSet):
+class SubCategoryViewset(PlannedQuerysetMixin, viewsets.ModelViewSet):
     serializer_class = SubCategorySerializer
     pagination_class = ServiceDetailPagination
     lookup_field = "slug"
@@ -79,7 +80,7 @@ class SubCategoryViewset(viewsets.ModelViewSet):
         return SubCategory.objects.none()
     
 
-class DetailViewSet(viewsets.ReadOnlyModelViewSet):
+class DetailViewSet(PlannedQuerysetMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = DetailSerializer
     pagination_class = ServiceDetailPagination
     lookup_field = "slug"
@@ -0,0 +1,96 @@
+from django.db import models
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+from rest_framework import serializers
+
+
+class DataLoader:
+    """Rows of one relation for many keys, fetched with one ``IN`` query.
+
+    Keys primed before the first ``load`` are fetched together, so a page of
+    serialized objects costs one query per relation instead of one per row.
+    """
+
+    def __init__(self, fetch):
+        self.fetch = fetch
+        self.pending = set()
+        self.loaded = {}
+
+    def prime(self, keys):
+        self.pending.update(key for key in keys if key is not None and key not in self.loaded)
+
+    def load(self, key):
+        if key not in self.loaded:
+            keys = self.pending | {key}
+            self.pending = set()
+
+            found = {pending: [] for pending in keys}
+            for row_key, row in self.fetch(keys):
+                found[row_key].append(row)
+
+            self.loaded.update(found)
+
+        return self.loaded[key]
+
+
+def get_loader(context, name, fetch):
+    """The request's loader called ``name``, shared by every serializer given the same context."""
+    loaders = context.setdefault("dataloaders", {})
+    if name not in loaders:
+        loaders[name] = DataLoader(fetch)
+
+    return loaders[name]
+
+
+def keyed_rows(queryset, key):
+    """(key, row) pairs of ``queryset`` with the key read from the ``key`` lookup."""
+    return ((row.loader_key, row) for row in queryset.annotate(loader_key=F(key)))
+
+
+def first_rows(queryset, key, limit):
+    """Like ``keyed_rows`` keeping only the first ``limit`` rows, in the model ordering, of every key."""
+    ordering = [
+        F(field[1:]).desc() if field.startswith("-") else F(field).asc()
+        for field in queryset.query.order_by or queryset.model._meta.ordering
+    ]
+    numbered = queryset.annotate(
+        loader_row=Window(RowNumber(), partition_by=F(key), order_by=ordering or [F("pk").asc()])
+    )
+
+    return keyed_rows(numbered.filter(loader_row__lte=limit), key)
+
+
+def row_counts(queryset, key):
+    """(key, count) pairs, one grouped query for all the keys."""
+    return queryset.values_list(key).annotate(count=Count("pk")).order_by()
+
+
+class BatchedListSerializer(serializers.ListSerializer):
+    """Primes the child's loaders with the whole page before serializing any of it."""
+
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        self.child.prime_loaders(items)
+
+        return super().to_representation(items)
+
+
+class DataLoaderMixin:
+    """Serializer mixin serving method fields from batched loaders.
+
+    ``dataloaders`` maps a loader name to the attribute holding each
+    object's key and the fetch function turning a set of keys into
+    (key, row) pairs. Set ``Meta.list_serializer_class`` to
+    ``BatchedListSerializer`` so lists prime every key up front.
+    """
+    dataloaders = {}
+
+    def loader(self, name):
+        return get_loader(self.context, name, self.dataloaders[name][1])
+
+    def prime_loaders(self, instances):
+        for name, (attr, _) in self.dataloaders.items():
+            self.loader(name).prime(getattr(instance, attr) for instance in instances)
+
+    def load(self, name, obj):
+        return self.loader(name).load(getattr(obj, self.dataloaders[name][0]))
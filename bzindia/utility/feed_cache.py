@@ -0,0 +1,160 @@
+import hashlib
+import logging
+import threading
+from datetime import date, datetime
+
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Model
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+logger = logging.getLogger(__name__)
+
+FEED_KEY = "feed:{}:{}:{}"
+FEED_TIMEOUT = getattr(settings, "FEED_CACHE_TIMEOUT", 60 * 60)
+
+STYLESHEET = '<?xml-stylesheet type="text/xsl" href="/static/rss-stylesheet.xsl"?>\n'
+
+# Keys of the dict items some feeds build from .values(), enough to tell two items apart.
+ITEM_KEYS = ("company__slug", "slug", "name", "created", "updated")
+
+# Feed level text, read from the feed object and often from its company.
+FEED_ATTRIBUTES = ("title", "link", "description", "subtitle", "author_name", "categories", "feed_copyright")
+
+
+def feed_cache_enabled():
+    # Read per request so the feed benchmark can compare with and without.
+    return getattr(settings, "FEED_CACHE", True)
+
+
+def identity(value):
+    if isinstance(value, Model):
+        return value._meta.label, value.pk, getattr(value, "updated", None)
+
+    if isinstance(value, dict):
+        return tuple(value.get(key) for key in ITEM_KEYS)
+
+    return value if value is None or isinstance(value, (str, int)) else type(value).__name__
+
+
+class FeedCacheStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "not_modified": 0}
+
+    def count(self, counter):
+        with self.lock:
+            self.counters[counter] += 1
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counters)
+
+        polls = stats["hits"] + stats["misses"] + stats["not_modified"]
+        stats["hit_ratio"] = round((stats["hits"] + stats["not_modified"]) / polls, 4) if polls else None
+        return stats
+
+
+feed_cache_stats = FeedCacheStats()
+
+
+class CachedFeed(Feed):
+    """Feed answering conditional GETs and serving its rendered bytes from the cache.
+
+    The version of a feed is a digest of its object and company, its feed
+    level text and every item's identity and date, read without rendering
+    any item. It is the ETag, the newest item date is the Last-Modified,
+    and a poll matching either gets a 304. Rendered documents are cached
+    per feed class, path and version, so any change renders a new one.
+    """
+
+    # Styled feeds point browsers at the XSL stylesheet.
+    stylesheet = False
+    # Feeds whose items depend on the client's location, kept out of shared caches.
+    personalised = False
+
+    def version(self, obj, request):
+        """(ETag, newest item date or None) of the feed of ``obj``."""
+        parts = [
+            type(self).__name__, request.get_host(), request.path, identity(obj), identity(getattr(obj, "company", None)),
+            *(self._get_dynamic_attr(name, obj) for name in FEED_ATTRIBUTES),
+        ]
+        dates = []
+
+        for item in self._get_dynamic_attr("items", obj) or []:
+            updated = self._get_dynamic_attr("item_updateddate", item) or self._get_dynamic_attr("item_pubdate", item)
+            parts.append((identity(item), updated))
+
+            if isinstance(updated, datetime):
+                dates.append(updated)
+            elif isinstance(updated, date):
+                dates.append(datetime(updated.year, updated.month, updated.day))
+
+        digest = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+        return f'"{digest}"', max(dates, default=None)
+
+    def render(self, obj, request):
+        document = self.get_feed(obj, request).writeString("utf-8")
+
+        if self.stylesheet:
+            declaration, _, body = document.partition("\n")
+            document = f"{declaration}\n{STYLESHEET}{body}"
+
+        return document.encode("utf-8")
+
+    def respond(self, content, etag=None, last_modified=None):
+        response = HttpResponse(content, content_type=self.feed_type.content_type)
+        self.add_headers(response, etag, last_modified)
+        return response
+
+    def add_headers(self, response, etag=None, last_modified=None):
+        if etag:
+            response.headers["ETag"] = etag
+        if last_modified:
+            response.headers["Last-Modified"] = http_date(last_modified.timestamp())
+        if self.personalised:
+            patch_cache_control(response, private=True)
+
+    def __call__(self, request, *args, **kwargs):
+        try:
+            obj = self.get_object(request, *args, **kwargs)
+        except ObjectDoesNotExist:
+            raise Http404("Feed object does not exist.")
+
+        if not feed_cache_enabled():
+            return self.respond(self.render(obj, request))
+
+        etag, last_modified = self.version(obj, request)
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified.timestamp() if last_modified else None
+        )
+        if response is not None:
+            feed_cache_stats.count("not_modified")
+            self.add_headers(response, etag, last_modified)
+            return response
+
+        key = FEED_KEY.format(type(self).__name__, request.path, etag.strip('"'))
+
+        try:
+            content = cache.get(key)
+        except Exception as e:
+            logger.warning(f"Feed cache unavailable: {e}")
+            content = None
+
+        if content is not None:
+            feed_cache_stats.count("hits")
+        else:
+            feed_cache_stats.count("misses")
+            content = self.render(obj, request)
+
+            try:
+                cache.set(key, content, timeout=FEED_TIMEOUT)
+            except Exception as e:
+                logger.warning(f"Feed cache unavailable: {e}")
+
+        return self.respond(content, etag, last_modified)
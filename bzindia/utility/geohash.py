@@ -0,0 +1,83 @@
+import math
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+KM_PER_DEGREE = 111.195
+
+STORED_PRECISION = 9
+
+
+def to_coordinate(value):
+    """Parse a latitude/longitude stored as text, returning None when invalid."""
+    try:
+        number = float(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+
+    return number if math.isfinite(number) else None
+
+
+def encode(lat, lon, precision=STORED_PRECISION):
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+
+    while len(chars) < precision:
+        interval, value = (lon_range, lon) if even else (lat_range, lat)
+        middle = (interval[0] + interval[1]) / 2
+
+        if value >= middle:
+            bits = bits * 2 + 1
+            interval[0] = middle
+        else:
+            bits = bits * 2
+            interval[1] = middle
+
+        even = not even
+        bit_count += 1
+
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(chars)
+
+
+def cell_size(precision):
+    """Return (lat degrees, lon degrees) covered by one cell of ``precision``."""
+    total_bits = 5 * precision
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def precision_for_radius(lat, radius_km, max_precision=STORED_PRECISION):
+    """Finest precision whose cells are at least ``radius_km`` wide at ``lat``.
+
+    With such cells the 3x3 block around the centre cell contains the whole circle.
+    """
+    cos_lat = max(math.cos(math.radians(lat)), 0.01)
+
+    for precision in range(max_precision, 0, -1):
+        lat_degrees, lon_degrees = cell_size(precision)
+        if lat_degrees * KM_PER_DEGREE >= radius_km and lon_degrees * KM_PER_DEGREE * cos_lat >= radius_km:
+            return precision
+
+    return 1
+
+
+def neighbourhood(lat, lon, precision):
+    """Geohash prefixes of the cell containing (lat, lon) and its eight neighbours."""
+    lat_degrees, lon_degrees = cell_size(precision)
+    cells = set()
+
+    for dlat in (-lat_degrees, 0, lat_degrees):
+        for dlon in (-lon_degrees, 0, lon_degrees):
+            neighbour_lat = min(max(lat + dlat, -90.0), 90.0 - 1e-9)
+            neighbour_lon = (lon + dlon + 180.0) % 360.0 - 180.0
+            cells.add(encode(neighbour_lat, neighbour_lon, precision))
+
+    return sorted(cells)
@@ -0,0 +1,183 @@
+import ipaddress
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from geoip2.database import Reader
+from geoip2.errors import AddressNotFoundError
+from maxminddb import MODE_MMAP
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = getattr(settings, "GEOIP_CITY_DB", os.path.join(settings.GEOIP_PATH, "GeoLite2-City.mmdb"))
+
+# Addresses in one network block share a location, results are cached per block.
+IPV4_PREFIX = getattr(settings, "GEOIP_IPV4_PREFIX", 24)
+IPV6_PREFIX = getattr(settings, "GEOIP_IPV6_PREFIX", 48)
+
+CACHE_SIZE = getattr(settings, "GEOIP_CACHE_SIZE", 50000)
+REDIS_CACHE = getattr(settings, "GEOIP_REDIS_CACHE", True)
+REDIS_TIMEOUT = getattr(settings, "GEOIP_REDIS_TIMEOUT", 60 * 60 * 24)
+
+REDIS_KEY = "geoip:{}:{}"
+MTIME_CHECK_INTERVAL = 30
+
+# Cached in place of a location for addresses the database doesn't place.
+NOT_FOUND = {}
+
+
+def ip_prefix(ip):
+    """The network block of ``ip``, or None for an invalid address."""
+    try:
+        address = ipaddress.ip_address(ip.strip())
+    except (AttributeError, ValueError):
+        return None
+
+    prefix = IPV4_PREFIX if address.version == 4 else IPV6_PREFIX
+    return str(ipaddress.ip_network(f"{address}/{prefix}", strict=False))
+
+
+class GeoIPReader:
+    """One memory mapped reader of the city database per process, reopened when the file changes."""
+
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.reader = None
+        self.mtime = None
+        self.checked_at = 0.0
+
+    def get(self):
+        now = time.monotonic()
+        if self.reader is not None and now - self.checked_at < MTIME_CHECK_INTERVAL:
+            return self.reader
+
+        with self.lock:
+            self.checked_at = now
+
+            try:
+                mtime = os.path.getmtime(self.path)
+            except OSError as e:
+                logger.warning(f"GeoIP database unavailable: {e}")
+                return self.reader
+
+            if self.reader is None or mtime != self.mtime:
+                # Not closed: lookups still holding the old reader finish on it, its map goes with the last of them.
+                self.reader = Reader(self.path, mode=MODE_MMAP)
+                self.mtime = mtime
+                logger.info(f"Opened GeoIP database {self.path} (mtime {mtime})")
+
+        return self.reader
+
+    def city(self, ip):
+        reader = self.get()
+        return reader.city(ip) if reader is not None else None
+
+
+class IPLocationCache:
+    """Bounded LRU of network block -> location, backed by the shared cache across processes.
+
+    A location is {"latitude", "longitude", "place_id", "state_id"}, the
+    place being the nearest one in the spatial index. Entries are dropped
+    whenever the database file is reopened.
+    """
+
+    def __init__(self, reader, max_size=CACHE_SIZE):
+        self.reader = reader
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.mtime = None
+        self.lock = threading.Lock()
+        self.counters = {"hits": 0, "shared_hits": 0, "misses": 0}
+
+    def _count(self, counter):
+        with self.lock:
+            self.counters[counter] += 1
+
+    def _get_local(self, prefix):
+        with self.lock:
+            location = self.entries.get(prefix)
+            if location is not None:
+                self.entries.move_to_end(prefix)
+            return location
+
+    def _set_local(self, prefix, location):
+        with self.lock:
+            self.entries[prefix] = location
+            self.entries.move_to_end(prefix)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def _lookup(self, ip):
+        from locations.models import UniquePlace
+        from locations.spatial_index import nearest_place_id
+
+        try:
+            response = self.reader.city(ip)
+        except (AddressNotFoundError, ValueError):
+            return NOT_FOUND
+
+        if response is None or response.location.latitude is None or response.location.longitude is None:
+            return NOT_FOUND
+
+        latitude, longitude = response.location.latitude, response.location.longitude
+        place_id = nearest_place_id(latitude, longitude)
+        state_id = UniquePlace.objects.filter(pk=place_id).values_list("state_id", flat=True).first() if place_id else None
+
+        return {"latitude": latitude, "longitude": longitude, "place_id": place_id, "state_id": state_id}
+
+    def resolve(self, ip):
+        """The cached location of ``ip``'s network block, or None when it can't be placed."""
+        prefix = ip_prefix(ip)
+        if prefix is None:
+            return None
+
+        # Reopening the database invalidates whatever was resolved with the old one.
+        self.reader.get()
+        if self.reader.mtime != self.mtime:
+            with self.lock:
+                self.entries.clear()
+                self.mtime = self.reader.mtime
+
+        location = self._get_local(prefix)
+        if location is not None:
+            self._count("hits")
+            return location or None
+
+        redis_key = REDIS_KEY.format(int(self.mtime or 0), prefix)
+        if REDIS_CACHE:
+            try:
+                location = cache.get(redis_key)
+            except Exception as e:
+                logger.warning(f"GeoIP shared cache unavailable: {e}")
+
+        if location is not None:
+            self._count("shared_hits")
+        else:
+            self._count("misses")
+            location = self._lookup(ip)
+
+            if REDIS_CACHE:
+                try:
+                    cache.set(redis_key, location, timeout=REDIS_TIMEOUT)
+                except Exception as e:
+                    logger.warning(f"GeoIP shared cache unavailable: {e}")
+
+        self._set_local(prefix, location)
+        return location or None
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counters, size=len(self.entries), max_size=self.max_size)
+
+        lookups = stats["hits"] + stats["shared_hits"] + stats["misses"]
+        stats["hit_ratio"] = round((stats["hits"] + stats["shared_hits"]) / lookups, 4) if lookups else None
+        return stats
+
+
+geoip_reader = GeoIPReader()
+ip_location_cache = IPLocationCache(geoip_reader)
@@ -1,73 +1,91 @@
-import os
+import logging
 from django.conf import settings
 from django.http import HttpRequest
-from geoip2.database import Reader
+from django.db.models import Q
 from ipware import get_client_ip
 
-from locations.models import PlaceCoordinate, UniquePlace
+from locations.models import UniquePlace
+from locations.spatial_index import nearby_place_ids, haversine_km
+from utility.geohash import neighbourhood, precision_for_radius, to_coordinate
+from utility.geoip import ip_location_cache
+
+logger = logging.getLogger(__name__)
 
 def get_ip_location(request: HttpRequest):
+    """{"latitude", "longitude", "place_id", "state_id"} of the client's address, or None.
+
+    Served from the per network block cache over the shared memory mapped
+    reader, the place being the nearest one in the spatial index.
+    """
     ip, _ = get_client_ip(request)
     if not ip:
         return None
     
     ip = request.META.get("HTTP_X_FORWARDED_FOR", "103.25.204.10")
 
-    # Path to the GeoLite2-City.mmdb file
-    db_path = os.path.join(settings.BASE_DIR, 'geoip', 'GeoLite2-City.mmdb')
-
     try:
-        reader = Reader(db_path)
-        response = reader.city(ip)
-
-        # return {
-        #     "ip": ip,
-        #     "country": response.country.name,
-        #     "region": response.subdivisions.most_specific.name,
-        #     "city": response.city.name,
-        #     "latitude": response.location.latitude,
-        #     "longitude": response.location.longitude,
-        # }
-
-        return {            
-            "latitude": response.location.latitude,
-            "longitude": response.location.longitude,
-        }
-
+        return ip_location_cache.resolve(ip)
     except Exception as e:
+        logger.warning(f"GeoIP lookup of {ip} failed: {e}")
         return None
-    finally:
-        reader.close()
 
 
-def get_nearby_locations(lat, lon):
+NEARBY_RADIUS_KM = 6
+
+
+def get_nearby_locations(lat, lon, radius_km=NEARBY_RADIUS_KM):
     try:    
         lat = float(lat)
         lon = float(lon)
     except (TypeError, ValueError):
-        return PlaceCoordinate.objects.none()
+        return UniquePlace.objects.none()
+
+    place_ids = nearby_place_ids(lat, lon, radius_km)
 
-    difference = 0.05
+    if not place_ids:
+        return UniquePlace.objects.none()
 
-    start_lat = lat - difference
-    start_lon = lon - difference
+    # Keep a single place per name, the nearest one, as before.
+    unique_places_dict = dict()
+    for place_id, name in UniquePlace.objects.filter(id__in = place_ids).values_list("id", "name"):
+        unique_places_dict.setdefault(name, []).append(place_id)
 
-    end_lat = lat + difference
-    end_lon = lon + difference
+    rank = {place_id: index for index, place_id in enumerate(place_ids)}
+    nearest_ids = [min(ids, key=rank.get) for ids in unique_places_dict.values()]
 
-    starting_point = [start_lat, start_lon]
-    ending_point = [end_lat, end_lon]
+    return UniquePlace.objects.filter(id__in = nearest_ids)
 
-    unfiltered_places = PlaceCoordinate.objects.filter(
-        latitude__range=(starting_point[0], ending_point[0]),
-        longitude__range=(starting_point[1], ending_point[1])
-    )
 
-    unique_places_dict = dict()
-    for place_obj in unfiltered_places:
-        unique_places_dict[place_obj.place.name] = place_obj.place.slug
+def get_nearby_csc_center_ids(lat, lon, radius_km):
+    """Return [(csc center id, distance km)] within ``radius_km``, nearest first.
+
+    Candidates come from indexed geohash prefix scans over the 3x3 block of
+    cells around the point, and are then ranked by exact haversine distance.
+    """
+    from directory.models import CscCenter
+
+    precision = precision_for_radius(lat, radius_km)
+    prefixes = Q()
+    for cell in neighbourhood(lat, lon, precision):
+        prefixes |= Q(geohash__startswith=cell)
+
+    ids, lats, lons = [], [], []
+    for center_id, latitude, longitude in CscCenter.objects.filter(prefixes).values_list("id", "latitude", "longitude"):
+        latitude = to_coordinate(latitude)
+        longitude = to_coordinate(longitude)
+        if latitude is not None and longitude is not None:
+            ids.append(center_id)
+            lats.append(latitude)
+            lons.append(longitude)
+
+    if not ids:
+        return []
+
+    distances = haversine_km(lat, lon, lats, lons)
+    nearby = [(center_id, float(distance)) for center_id, distance in zip(ids, distances) if distance <= radius_km]
+    nearby.sort(key=lambda item: item[1])
 
-    return UniquePlace.objects.filter(slug__in = unique_places_dict.values())
+    return nearby
 
 
 from indic_transliteration import sanscript
@@ -0,0 +1,136 @@
+import logging
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+PLACE = "place_name"
+DISTRICT = "district_name"
+STATE = "state_name"
+PLACEHOLDERS = (PLACE, DISTRICT, STATE)
+
+PATTERN = re.compile(f"({'|'.join(PLACEHOLDERS)})")
+SLUG_PLACEHOLDERS = re.compile(f"-(?:in-)?(?:{'|'.join(PLACEHOLDERS)})")
+
+# Multipage fields holding placeholders.
+TEMPLATE_FIELDS = ("title", "meta_title", "description", "meta_description", "slug")
+
+TEMPLATE_KEY = "placeholder_templates:{}:{}:{}"
+TEMPLATE_TIMEOUT = 60 * 60 * 24 * 7
+LOCAL_SIZE = getattr(settings, "PLACEHOLDER_TEMPLATE_CACHE_SIZE", 2000)
+
+
+def compile_template(text):
+    """Tokens of ``text``, literals at even positions and placeholder names at odd ones."""
+    return tuple(PATTERN.split(text or ""))
+
+
+def render(tokens, values):
+    """``tokens`` with every placeholder in ``values`` ({placeholder: text}) filled in, the others left as they are."""
+    if len(tokens) == 1:
+        return tokens[0]
+
+    parts = list(tokens)
+    for index in range(1, len(parts), 2):
+        parts[index] = values.get(parts[index], parts[index])
+
+    return "".join(parts)
+
+
+def render_many(tokens, values, placeholder=PLACE):
+    """Yield ``tokens`` rendered with each of ``values`` in place of ``placeholder``.
+
+    The token list is filled in place for every value, one join per
+    rendering, for expanding a field over thousands of locations.
+    """
+    slots = [index for index in range(1, len(tokens), 2) if tokens[index] == placeholder]
+    if not slots:
+        text = "".join(tokens)
+        for _ in values:
+            yield text
+        return
+
+    parts = list(tokens)
+    for value in values:
+        for index in slots:
+            parts[index] = value
+        yield "".join(parts)
+
+
+def strip_slug_placeholders(slug):
+    """``slug`` without its ``-place_name`` / ``-in-place_name`` (district, state) parts."""
+    return SLUG_PLACEHOLDERS.sub("", slug)
+
+
+def compile_fields(values):
+    return {field: compile_template(values.get(field)) for field in TEMPLATE_FIELDS}
+
+
+def version(updated):
+    return int(updated.timestamp() * 1000) if isinstance(updated, datetime) else 0
+
+
+class TemplateStore:
+    """Compiled fields of multipages, by (model label, pk, updated).
+
+    Compiled on save and shared through the cache, with a bounded LRU in
+    front of it. The updated timestamp is part of the key, so an edit
+    never finds the tokens of the text it replaced.
+    """
+
+    def __init__(self, max_size=LOCAL_SIZE):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _set_local(self, key, compiled):
+        with self.lock:
+            self.entries[key] = compiled
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def put(self, label, pk, updated, values):
+        """Compile and store the fields of one multipage, ``values`` being its field values."""
+        key = TEMPLATE_KEY.format(label, pk, version(updated))
+        compiled = compile_fields(values)
+        self._set_local(key, compiled)
+
+        try:
+            cache.set(key, compiled, timeout=TEMPLATE_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Placeholder template cache unavailable: {e}")
+
+        return compiled
+
+    def get_many(self, label, rows):
+        """Compiled fields of every row (a dict with pk, updated and the template fields), compiling the missing ones."""
+        keys = [TEMPLATE_KEY.format(label, row["pk"], version(row["updated"])) for row in rows]
+
+        with self.lock:
+            found = {key: self.entries[key] for key in keys if key in self.entries}
+
+        missing = [key for key in keys if key not in found]
+        if missing:
+            try:
+                shared = cache.get_many(missing)
+            except Exception as e:
+                logger.warning(f"Placeholder template cache unavailable: {e}")
+                shared = {}
+
+            for key, compiled in shared.items():
+                self._set_local(key, compiled)
+            found.update(shared)
+
+        return [
+            found[key] if key in found else self.put(label, row["pk"], row["updated"], row)
+            for key, row in zip(keys, rows)
+        ]
+
+
+template_store = TemplateStore()
@@ -0,0 +1,214 @@
+import logging
+from contextlib import contextmanager
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Prefetch
+from django.db.models.fields.related import ForeignObjectRel
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+MAX_DEPTH = 8
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@lru_cache(maxsize=None)
+def relations(model):
+    """{attribute name: relation field} including reverse accessors such as ``blog_set``."""
+    found = {}
+    for field in model._meta.get_fields():
+        if not field.is_relation or field.related_model is None:
+            continue
+
+        name = field.get_accessor_name() if isinstance(field, ForeignObjectRel) else field.name
+        if name:
+            found[name] = field
+
+    return found
+
+
+class QueryPlan:
+    """Joins and prefetches one model's queryset needs, prefetches nesting their own plans."""
+
+    def __init__(self, model, lookup=None, queryset=None, to_attr=None):
+        self.model = model
+        self.lookup = lookup
+        self.queryset = queryset
+        self.to_attr = to_attr
+        self.select = set()
+        self.prefetch = {}
+
+    def walk(self, path, model, attrs):
+        """Follow ``attrs`` from ``model`` (reached through the joins in ``path``).
+
+        Single relations become joins and many relations prefetches. Returns
+        the (plan, path, model) the last relation ends in, or None when the
+        attributes leave the relations for a column or a property.
+        """
+        plan, path = self, list(path)
+
+        for attr in attrs:
+            field = relations(model).get(attr)
+            if field is None:
+                return None
+
+            if field.many_to_many or field.one_to_many:
+                lookup = "__".join(path + [attr])
+                plan = plan.prefetch.setdefault(lookup, QueryPlan(field.related_model, lookup))
+                path = []
+            else:
+                path.append(attr)
+                plan.select.add("__".join(path))
+
+            model = field.related_model
+
+        return plan, path, model
+
+    def add_prefetch(self, path, model, prefetch):
+        """Attach a Prefetch declared with its own queryset or ``to_attr``."""
+        *through, attr = prefetch.prefetch_through.split("__")
+        target = self.walk(path, model, through)
+        field = target and relations(target[2]).get(attr)
+        if not field:
+            return None
+
+        plan, path, _ = target
+        lookup = "__".join(path + [attr])
+        node = plan.prefetch.setdefault(
+            prefetch.to_attr or lookup, QueryPlan(field.related_model, lookup, prefetch.queryset, prefetch.to_attr)
+        )
+        return node, [], field.related_model
+
+    def apply(self, queryset):
+        queryset = queryset.all()
+
+        if self.select:
+            queryset = queryset.select_related(*sorted(self.select))
+
+        lookups = [
+            Prefetch(
+                node.lookup,
+                queryset=node.apply(node.queryset if node.queryset is not None else node.model._default_manager.all()),
+                to_attr=node.to_attr,
+            )
+            for node in self.prefetch.values()
+        ]
+        return queryset.prefetch_related(*lookups) if lookups else queryset
+
+    def query_count(self):
+        """Queries the plan runs at most, one for this queryset and one per prefetch, whatever the page size."""
+        return 1 + sum(node.query_count() for node in self.prefetch.values())
+
+
+def visit(serializer, plan, path, model, depth=0):
+    """Add what ``serializer`` reads from ``model`` to ``plan``.
+
+    Declared nested serializers and dotted sources are followed automatically.
+    Properties and method fields declare what they read with
+    ``Meta.select_related`` and ``Meta.prefetch_related``; a prefetch entry may
+    be a ``(lookup or Prefetch, serializer class)`` pair to plan what that
+    serializer reads from the prefetched rows as well.
+    """
+    if depth > MAX_DEPTH:
+        return
+
+    meta = getattr(serializer, "Meta", None)
+
+    for hint in getattr(meta, "select_related", ()):
+        plan.walk(path, model, hint.split("__"))
+
+    for hint in getattr(meta, "prefetch_related", ()):
+        nested = None
+        if isinstance(hint, tuple):
+            hint, nested = hint
+
+        if isinstance(hint, Prefetch):
+            target = plan.add_prefetch(path, model, hint)
+        else:
+            target = plan.walk(path, model, hint.split("__"))
+
+        if target and nested:
+            visit(nested(), *target, depth=depth + 1)
+
+    for field in serializer.fields.values():
+        if field.write_only or field.source == "*" or isinstance(field, serializers.PrimaryKeyRelatedField):
+            continue
+
+        target = plan.walk(path, model, field.source.split("."))
+
+        nested = field.child if isinstance(field, serializers.ListSerializer) else field
+        if target and isinstance(nested, serializers.BaseSerializer):
+            visit(nested, *target, depth=depth + 1)
+
+
+@lru_cache(maxsize=None)
+def serializer_plan(serializer_class, model):
+    plan = QueryPlan(model)
+    visit(serializer_class(), plan, [], model)
+    return plan
+
+
+def plan_queryset(queryset, serializer_class):
+    """Add the joins and prefetches ``serializer_class`` needs to ``queryset``."""
+    return serializer_plan(serializer_class, queryset.model).apply(queryset)
+
+
+def prefetched(obj, name, default):
+    """Rows prefetched under ``name`` (a to_attr or relation), or ``default`` when ``obj`` was loaded without the plan."""
+    if name in obj.__dict__:
+        return obj.__dict__[name]
+
+    cache = getattr(obj, "_prefetched_objects_cache", {})
+    return cache[name] if name in cache else default
+
+
+@contextmanager
+def query_budget(limit, label="", strict=None):
+    """Fail (or warn, outside strict mode) when the block runs more than ``limit`` queries."""
+    if strict is None:
+        strict = getattr(settings, "QUERY_BUDGET_STRICT", False)
+
+    with CaptureQueriesContext(connection) as captured:
+        yield captured
+
+    if len(captured) > limit:
+        message = f"{label} ran {len(captured)} queries, over its budget of {limit}"
+        if strict:
+            queries = "\n".join(query["sql"] for query in captured.captured_queries)
+            raise QueryBudgetExceeded(f"{message}:\n{queries}")
+
+        logger.warning(message)
+
+
+class PlannedQuerysetMixin:
+    """Viewset mixin that plans its queryset from the serializer and checks a query budget.
+
+    The budget defaults to the plan's query count plus ``QUERY_BUDGET_SLACK``
+    (pagination counts, location lookups) and is only measured with
+    ``QUERY_BUDGET_CHECKS`` enabled, as in tests and the check_query_budgets command.
+    """
+    query_budget = None
+
+    def filter_queryset(self, queryset):
+        return plan_queryset(super().filter_queryset(queryset), self.get_serializer_class())
+
+    def get_query_budget(self):
+        if self.query_budget is not None:
+            return self.query_budget
+
+        serializer_class = self.get_serializer_class()
+        planned = serializer_plan(serializer_class, serializer_class.Meta.model).query_count()
+        return planned + getattr(settings, "QUERY_BUDGET_SLACK", 10)
+
+    def dispatch(self, request, *args, **kwargs):
+        if not getattr(settings, "QUERY_BUDGET_CHECKS", False):
+            return super().dispatch(request, *args, **kwargs)
+
+        with query_budget(self.get_query_budget(), label=f"{type(self).__name__} {request.path}"):
+            return super().dispatch(request, *args, **kwargs)
@@ -0,0 +1,90 @@
+import logging
+import threading
+import time
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+CHANGE_TIMEOUT = 60 * 60 * 24
+VERSION_CHECK_INTERVAL = 10
+
+
+class ReplicatedIndex:
+    """Process-wide in-memory index kept in step with the other processes through a change log.
+
+    Changes are published in the cache under an incrementing version. Each
+    process applies the ones it has not seen, checking at most every
+    ``check_interval`` seconds, and reloads with ``load(version)`` when
+    the log has gaps or it is more than ``max_catch_up`` changes behind.
+    ``apply(index, change)`` applies one change, the index keeps the last
+    version it holds in ``index.version``.
+    """
+
+    def __init__(self, name, load, apply, max_catch_up, check_interval=VERSION_CHECK_INTERVAL):
+        self.name = name
+        self.version_key = f"{name}:version"
+        self.change_key = f"{name}:change:{{}}"
+        self.load = load
+        self.apply = apply
+        self.max_catch_up = max_catch_up
+        self.check_interval = check_interval
+
+        self.index = None
+        self.lock = threading.Lock()
+        self.checked_at = 0.0
+
+    def _load(self):
+        return self.load(cache.get(self.version_key) or 0)
+
+    def _catch_up(self, index, version):
+        """Apply published changes after ``index.version``; False when the log has gaps."""
+        if version - index.version > self.max_catch_up:
+            return False
+
+        keys = [self.change_key.format(n) for n in range(index.version + 1, version + 1)]
+        changes = cache.get_many(keys)
+
+        if len(changes) != len(keys):
+            return False
+
+        for key in keys:
+            self.apply(index, changes[key])
+
+        index.version = version
+        return True
+
+    def get(self):
+        """The process' index, applying changes published by other processes."""
+        now = time.monotonic()
+        if self.index is not None and now - self.checked_at < self.check_interval:
+            return self.index
+
+        with self.lock:
+            self.checked_at = now
+
+            if self.index is None:
+                self.index = self._load()
+                return self.index
+
+            try:
+                version = cache.get(self.version_key) or 0
+            except Exception as e:
+                logger.warning(f"Could not read {self.name} version: {e}")
+                return self.index
+
+            if version > self.index.version and not self._catch_up(self.index, version):
+                self.index = self._load()
+
+        return self.index
+
+    def publish(self, change):
+        """Record a change so every process can apply it incrementally."""
+        cache.add(self.version_key, 0, timeout=None)
+        version = cache.incr(self.version_key)
+        cache.set(self.change_key.format(version), change, timeout=CHANGE_TIMEOUT)
+
+        index = self.index
+        if index is not None and index.version == version - 1:
+            self.apply(index, change)
+            index.version = version
@@ -0,0 +1,91 @@
+import re
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+
+# Base slugs looked up per range query by ``allocate_slugs``.
+BASE_BATCH_SIZE = 200
+
+
+def taken_suffixes(base_slug, slugs):
+    """Suffixes of ``base_slug`` in use among ``slugs``, 0 standing for the bare base slug."""
+    pattern = re.compile(rf"^{re.escape(base_slug)}(?:-(\d+))?$")
+    taken = set()
+
+    for slug in slugs:
+        match = pattern.match(slug or "")
+        if match:
+            taken.add(int(match.group(1) or 0))
+
+    return taken
+
+
+def first_free(base_slug, taken, start=1):
+    if 0 not in taken:
+        return base_slug
+
+    count = start
+    while count in taken:
+        count += 1
+
+    return f"{base_slug}-{count}"
+
+
+def similar_slugs(queryset, base_slugs, field="slug"):
+    """Slugs equal to, or starting with ``<base>-``, any of ``base_slugs``, one indexed range query."""
+    lookups = (Q(**{field: base}) | Q(**{f"{field}__startswith": f"{base}-"}) for base in base_slugs)
+    return queryset.filter(reduce(or_, lookups)).values_list(field, flat=True)
+
+
+def unique_slug(model, base_slug, exclude_pk=None, start=1, field="slug"):
+    """``base_slug`` or the first free ``<base_slug>-<n>`` from ``n = start``, in one query.
+
+    The slug columns are unique, so two saves racing for the same slug
+    end in an IntegrityError for one of them rather than a duplicate.
+    """
+    queryset = model.objects.all()
+    if exclude_pk is not None:
+        queryset = queryset.exclude(pk=exclude_pk)
+
+    return first_free(base_slug, taken_suffixes(base_slug, similar_slugs(queryset, [base_slug], field)), start)
+
+
+def allocate_slugs(model, instances, source, start=1, field="slug"):
+    """Give every instance without a slug a unique one ahead of ``bulk_create``.
+
+    ``source`` maps an instance to its base slug. Existing slugs are read
+    with one query per ``BASE_BATCH_SIZE`` base slugs, and instances
+    sharing a base get consecutive free suffixes.
+    """
+    pending = defaultdict(list)
+    for instance in instances:
+        if not getattr(instance, field):
+            pending[source(instance)].append(instance)
+
+    bases = list(pending)
+    for offset in range(0, len(bases), BASE_BATCH_SIZE):
+        batch = bases[offset:offset + BASE_BATCH_SIZE]
+        existing = list(similar_slugs(model.objects.all(), batch, field))
+
+        for base_slug in batch:
+            taken = taken_suffixes(base_slug, existing)
+
+            for instance in pending[base_slug]:
+                slug = first_free(base_slug, taken, start)
+                setattr(instance, field, slug)
+                taken |= taken_suffixes(base_slug, [slug])
+
+    return instances
+
+
+def deduplicate_slugs(model, start=1, field="slug"):
+    """Re-slug every row sharing its slug with an older row, for migrations making the column unique."""
+    seen = defaultdict(list)
+    for pk, slug in model.objects.exclude(**{f"{field}__isnull": True}).order_by("pk").values_list("pk", field):
+        seen[slug].append(pk)
+
+    for slug, pks in seen.items():
+        for pk in pks[1:]:
+            model.objects.filter(pk=pk).update(**{field: unique_slug(model, slug, start=start, field=field)})
@@ -0,0 +1,74 @@
+import itertools
+import os
+
+import pandas
+
+CHUNK_SIZE = 5000
+
+EXCEL_EXTENSIONS = (".xlsx", ".xlsm")
+
+
+def excel_chunks(path, chunk_size):
+    # pandas reads a whole sheet at once, openpyxl's read only mode streams its rows.
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(column).strip() for column in next(rows, ())]
+
+        while True:
+            chunk = list(itertools.islice(rows, chunk_size))
+            if not chunk:
+                return
+            yield pandas.DataFrame(chunk, columns=header, dtype=str)
+    finally:
+        workbook.close()
+
+
+def read_chunks(path, chunk_size=CHUNK_SIZE):
+    """DataFrames of at most ``chunk_size`` rows of a CSV or Excel file.
+
+    Every cell is read as stripped text, blank cells as NA, leaving the
+    importer's mapper to convert whole columns of a chunk at once.
+    """
+    if os.path.splitext(path)[1].lower() in EXCEL_EXTENSIONS:
+        frames = excel_chunks(path, chunk_size)
+    else:
+        frames = pandas.read_csv(path, chunksize=chunk_size, dtype=str, keep_default_na=False)
+
+    for frame in frames:
+        frame.columns = [str(column).strip() for column in frame.columns]
+        yield frame.apply(lambda column: column.str.strip()).replace({"": pandas.NA, "None": pandas.NA, "nan": pandas.NA})
+
+
+def plain(value):
+    """None for NA, Python scalars for numpy ones, so rows can go straight into model fields."""
+    if value is None or value is pandas.NA or (isinstance(value, float) and value != value):
+        return None
+
+    return value.item() if hasattr(value, "item") else value
+
+
+def read_records(path, mapper=None, chunk_size=CHUNK_SIZE):
+    """Rows of ``path`` as dicts, each chunk passed through ``mapper`` (DataFrame -> DataFrame) first."""
+    for frame in read_chunks(path, chunk_size):
+        if mapper:
+            frame = mapper(frame)
+
+        columns = list(frame.columns)
+        for values in frame.astype(object).itertuples(index=False, name=None):
+            yield dict(zip(columns, map(plain, values)))
+
+
+def integers(column):
+    """Whole numbers, anything unparsable as NA."""
+    return pandas.to_numeric(column, errors="coerce").round().astype("Int64")
+
+
+def numbers(column):
+    return pandas.to_numeric(column, errors="coerce")
+
+
+def flags(column, true_value):
+    return column.eq(true_value).fillna(False).astype(bool)